@@ -14,6 +14,20 @@ const execAsync = promisify(exec)
 // Use 'python' on Windows, 'python3' on Linux/macOS
 const PYTHON = process.platform === 'win32' ? 'python' : 'python3'
 const SCRIPTS_DIR = path.resolve(process.cwd(), 'scripts', 'pdf')
+// Exit code guardrails.py uses when a payload trips a render limit
+const EXIT_LIMIT = 3
+
+/** Parse the one-line JSON error guardrails.py writes to stderr, if present. */
+function renderLimitError(stderr: unknown): Record<string, unknown> | null {
+  if (typeof stderr !== 'string') return null
+  for (const line of stderr.trim().split('\n').reverse()) {
+    try {
+      const parsed = JSON.parse(line)
+      if (parsed?.error === 'render_limit') return parsed
+    } catch {}
+  }
+  return null
+}
 
 export async function generatePdf(
   scriptName: string,
@@ -41,6 +55,13 @@ export async function generatePdf(
       },
     })
   } catch (err: unknown) {
+    const limit = (err as { code?: number })?.code === EXIT_LIMIT
+      ? renderLimitError((err as { stderr?: unknown }).stderr)
+      : null
+    if (limit) {
+      console.warn(`[PDF/${scriptName}] render limit:`, limit.message)
+      return Response.json({ error: 'PDF render limit exceeded', detail: limit }, { status: 422 })
+    }
     const msg = err instanceof Error ? err.message : String(err)
     console.error(`[PDF/${scriptName}] error:`, msg)
     return Response.json({ error: 'PDF generation failed', detail: msg }, { status: 500 })
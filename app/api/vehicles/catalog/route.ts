@@ -0,0 +1,35 @@
+/**
+ * Vehicle Catalog Refresh API
+ * Drops an org's cached catalog (lib/vehicleCatalog.ts) after its overrides were
+ * written, so pickers and lookups see the change on the next request instead of
+ * within the cache TTL. scripts/vehicles/overlay.py push calls it with CRON_SECRET;
+ * an org's owner or admin may call it for their own org. Each server instance keeps
+ * its own cache: the one that answers reloads now, any others within the TTL.
+ *
+ * POST /api/vehicles/catalog { org_id } → { ok: true }
+ */
+import { NextRequest, NextResponse } from 'next/server'
+import { createClient } from '@/lib/supabase/server'
+import { getSupabaseAdmin } from '@/lib/supabase/service'
+import { forgetOrg } from '@/lib/vehicleCatalog'
+
+export const dynamic = 'force-dynamic'
+
+export async function POST(req: NextRequest) {
+  const body = await req.json().catch(() => ({}))
+  const orgId: string | undefined = body.org_id
+  if (!orgId) return NextResponse.json({ error: 'org_id required' }, { status: 400 })
+
+  const authHeader = req.headers.get('authorization')
+  if (!process.env.CRON_SECRET || authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+    const supabase = createClient()
+    const { data: { user } } = await supabase.auth.getUser()
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    const { data: profile } = await getSupabaseAdmin().from('profiles').select('org_id, role').eq('id', user.id).single()
+    if (!profile || profile.org_id !== orgId || !['owner', 'admin'].includes(profile.role))
+      return NextResponse.json({ error: 'Forbidden' }, { status: 403 })
+  }
+
+  forgetOrg(orgId)
+  return NextResponse.json({ ok: true })
+}
@@ -0,0 +1,32 @@
+/**
+ * Vehicle Facets API
+ * Serves the year → make → model → row-id facet tree for the caller's org: the
+ * shared catalog with the org's overrides, hidden rows and custom vehicles applied
+ * (vehicle_catalog(org), see lib/vehicleCatalog.ts). The tree's content hash is the
+ * ETag, so clients revalidate with If-None-Match and get a 304 until it changes.
+ *
+ * GET /api/vehicles/facets → the facet tree (see lib/vehicleFacets.ts for the layout)
+ */
+import { NextRequest, NextResponse } from 'next/server'
+import { orgFacets, requestOrg } from '@/lib/vehicleCatalog'
+
+export const dynamic = 'force-dynamic'
+
+// per-org content: cache in the browser only, and always revalidate against the ETag
+const CACHE = 'private, max-age=0, must-revalidate'
+
+export async function GET(req: NextRequest) {
+  try {
+    const tree = await orgFacets(await requestOrg())
+    const etag = `"${tree.hash}"`
+    const headers = { ETag: etag, 'Cache-Control': CACHE, Vary: 'Cookie' }
+    const match = req.headers.get('if-none-match')
+    if (match && match.split(',').some(t => t.trim().replace(/^W\//, '') === etag)) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+    return NextResponse.json(tree, { headers })
+  } catch (err: unknown) {
+    const msg = err instanceof Error ? err.message : 'Unknown error'
+    return NextResponse.json({ error: msg }, { status: 500 })
+  }
+}
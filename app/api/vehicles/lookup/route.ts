@@ -1,6 +1,6 @@
 /**
  * Vehicle Measurements Lookup API
- * Queries the vehicle_measurements table (2,034 vehicles imported from industry data).
+ * Vehicle measurements from the industry catalog (2,034 vehicles) plus the org's own.
  *
  * GET /api/vehicles/lookup?years=true                        → distinct years (2026..1990)
  * GET /api/vehicles/lookup?makes=1                           → all distinct makes
@@ -8,9 +8,37 @@
  * GET /api/vehicles/lookup?models=1&make=Toyota              → models for a make
  * GET /api/vehicles/lookup?models=1&make=Toyota&year=2023    → models for make + year
  * GET /api/vehicles/lookup?make=Toyota&model=Camry&year=2020 → best-match measurement
+ * GET /api/vehicles/lookup?q=chevy silverado 2500&year=2020  → ranked suggestions, typo tolerant
+ *
+ * Everything is answered from the caller's org catalog — the shared rows with the
+ * org's overrides, hidden rows and custom vehicles applied by vehicle_catalog(org),
+ * cached per org in lib/vehicleCatalog.ts. make/model match on their search keys
+ * (lib/vehicleKeys.ts), so 'ford', 'Ford ' and 'FORD' find the same rows, and
+ * makes/models lists come from the org's facet tree (lib/vehicleFacets.ts).
+ * A best match is the whole vehicle_measurements row (pricing, wrap areas, install
+ * hours …) with the org's overrides applied, plus catalog_source.
+ * Free text and names that match no catalog row exactly go through the fuzzy match
+ * index (lib/vehicleMatch.ts); a best match found that way comes back with `matched`
+ * set, so the caller can ask the user to confirm it.
  */
 import { NextRequest, NextResponse } from 'next/server'
-import { getSupabaseAdmin } from '@/lib/supabase/service'
+import { orgFacets, orgVehicle, orgVehicleByKey, requestOrg, type CatalogRow } from '@/lib/vehicleCatalog'
+import { facetIds, facetMakes, facetModels } from '@/lib/vehicleFacets'
+import { vehicleMatchIndex } from '@/lib/vehicleMatch'
+
+const SUGGEST_LIMIT = 10
+
+/** Fuzzy hits for `text` that the org's catalog has (not hidden), best first. */
+async function fuzzy(orgId: string, text: string, year: number | undefined, typing: boolean, limit: number) {
+  const index = await vehicleMatchIndex()
+  const out: { row: CatalogRow; score: number; family: string }[] = []
+  for (const hit of index.query(text, { year, typing, limit: limit * 2 })) {
+    const row = await orgVehicleByKey(orgId, hit.key)
+    if (row) out.push({ row, score: hit.score, family: hit.family })
+    if (out.length >= limit) break
+  }
+  return out
+}
 
 export const dynamic = 'force-dynamic'
 
@@ -21,59 +49,36 @@ export async function GET(req: NextRequest) {
   const year  = searchParams.get('year')
 
   try {
-    const admin = getSupabaseAdmin()
-
     // ── Distinct years (static range) ────────────────────────────────────────
     if (searchParams.has('years')) {
       const years = Array.from({ length: 2026 - 1990 + 1 }, (_, i) => 2026 - i)
       return NextResponse.json({ years })
     }
 
+    const orgId = await requestOrg()
+    const tree = await orgFacets(orgId)
+    const yr = year ? parseInt(year, 10) : NaN
+
     // ── Distinct makes (optionally filtered by year) ─────────────────────────
     if (searchParams.has('makes')) {
-      // eslint-disable-next-line @typescript-eslint/no-explicit-any
-      let query: any = admin
-        .from('vehicle_measurements')
-        .select('make')
-        .order('make')
-
-      if (year) {
-        const yr = parseInt(year, 10)
-        if (!isNaN(yr)) {
-          query = query
-            .lte('year_start', yr)
-            .or(`year_end.gte.${yr},year_end.is.null`)
-        }
-      }
-
-      const { data, error } = await query
-      if (error) return NextResponse.json({ error: error.message }, { status: 500 })
-      const makes = [...new Set((data || []).map((r: { make: string }) => r.make))].sort()
-      return NextResponse.json({ makes })
+      return NextResponse.json({ makes: facetMakes(tree, isNaN(yr) ? null : yr) })
     }
 
     // ── Distinct models for a make (optionally filtered by year) ────────────
     if (searchParams.has('models') && make) {
-      // eslint-disable-next-line @typescript-eslint/no-explicit-any
-      let query: any = admin
-        .from('vehicle_measurements')
-        .select('model')
-        .ilike('make', make)
-        .order('model')
-
-      if (year) {
-        const yr = parseInt(year, 10)
-        if (!isNaN(yr)) {
-          query = query
-            .lte('year_start', yr)
-            .or(`year_end.gte.${yr},year_end.is.null`)
-        }
-      }
+      return NextResponse.json({ models: facetModels(tree, make, isNaN(yr) ? null : yr) })
+    }
 
-      const { data, error } = await query
-      if (error) return NextResponse.json({ error: error.message }, { status: 500 })
-      const models = [...new Set((data || []).map((r: { model: string }) => r.model))].sort()
-      return NextResponse.json({ models })
+    // ── Suggestions for free text (the picker's search box) ──────────────────
+    const q = searchParams.get('q')
+    if (q) {
+      const hits = await fuzzy(orgId, q, isNaN(yr) ? undefined : yr, true, SUGGEST_LIMIT)
+      return NextResponse.json({
+        suggestions: hits.map(({ row, score, family }) => ({
+          id: row.id, make: row.make, model: row.model, year_range: row.year_range,
+          year_start: row.year_start, year_end: row.year_end, family, score,
+        })),
+      })
     }
 
     // ── Best-match measurement row ──────────────────────────────────────────
@@ -81,30 +86,17 @@ export async function GET(req: NextRequest) {
       return NextResponse.json({ error: 'make and model are required' }, { status: 400 })
     }
 
-    // eslint-disable-next-line @typescript-eslint/no-explicit-any
-    let query: any = admin
-      .from('vehicle_measurements')
-      .select('*')
-      .ilike('make', make)
-      .ilike('model', model)
-
-    if (year) {
-      const yr = parseInt(year, 10)
-      if (!isNaN(yr)) {
-        // Rows where year range covers the requested year
-        query = query
-          .lte('year_start', yr)
-          .or(`year_end.gte.${yr},year_end.is.null`)
-      }
+    // rows whose year range covers the requested year, newest range first
+    const [id] = facetIds(tree, make, model, isNaN(yr) ? null : yr)
+    if (id || facetIds(tree, make, model).length) {
+      return NextResponse.json({ measurement: id ? await orgVehicle(orgId, id) : null })
     }
-
-    const { data, error } = await query
-      .order('year_start', { ascending: false })
-      .limit(1)
-      .maybeSingle()
-
-    if (error) return NextResponse.json({ error: error.message }, { status: 500 })
-    return NextResponse.json({ measurement: data ?? null })
+    // no catalog vehicle by that name: the closest one, flagged for confirmation
+    const [hit] = await fuzzy(orgId, `${make} ${model}`, isNaN(yr) ? undefined : yr, false, 1)
+    return NextResponse.json({
+      measurement: hit?.row ?? null,
+      matched: hit ? { make: hit.row.make, model: hit.row.model, year_range: hit.row.year_range, score: hit.score } : null,
+    })
 
   } catch (err: unknown) {
     const msg = err instanceof Error ? err.message : 'Unknown error'
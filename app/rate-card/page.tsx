@@ -2,6 +2,7 @@ export const dynamic = 'force-dynamic'
 import { ORG_ID } from '@/lib/org'
 import { createClient } from '@/lib/supabase/server'
 import { getSupabaseAdmin } from '@/lib/supabase/service'
+import { orgCatalog } from '@/lib/vehicleCatalog'
 import { redirect } from 'next/navigation'
 import { TopNav } from '@/components/layout/TopNav'
 import { MobileNav } from '@/components/layout/MobileNav'
@@ -24,14 +25,12 @@ export default async function RateCardPage() {
 
   const orgId = profile.org_id || ORG_ID
 
-  // vehicle_measurements is a global shared table (no org_id)
-  const [vehiclesRes, rulesRes] = await Promise.all([
-    admin
-      .from('vehicle_measurements')
-      .select('id, make, model, total_sqft')
-      .gt('total_sqft', 0)
-      .order('make')
-      .order('model'),
+  // shared catalog with this org's overrides, hidden rows and custom vehicles applied,
+  // paged past PostgREST's row cap. Prices are computed in the browser (RateCardClient
+  // calc()) because the rules are edited live on this page; the printed sheet
+  // (scripts/vehicles/rate_card.py) uses the same formula on the same total_sqft.
+  const [catalog, rulesRes] = await Promise.all([
+    orgCatalog(orgId),
     admin
       .from('rate_card_settings')
       .select('*')
@@ -39,7 +38,10 @@ export default async function RateCardPage() {
       .single(),
   ])
 
-  const vehicles = vehiclesRes.data || []
+  const vehicles = catalog
+    .filter(v => Number(v.total_sqft) > 0)
+    .map(v => ({ id: v.id, make: v.make, model: v.model, total_sqft: Number(v.total_sqft) }))
+    .sort((a, b) => a.make.localeCompare(b.make) || a.model.localeCompare(b.model))
   const rules = rulesRes.data || {
     install_rate_hr: 35,
     production_speed: 35.71,
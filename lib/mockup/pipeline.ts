@@ -732,6 +732,8 @@ export interface PrintSpecs {
   full_wrap_sqft: number | null
 }
 
+// Single-page proof PDF of the whole image. Production print files (true-scale panels with
+// bleed, tiled to the printer width) come from scripts/vehicles/print_export.py.
 export async function exportPrint(params: {
   mockup_id: string
   upscaled_url: string
@@ -0,0 +1,125 @@
+// The vehicle catalog one org sees: shared rows with its overrides, hidden rows and
+// custom vehicles applied by vehicle_catalog(org) (supabase/migrations/…_vehicle_catalog_overlay.sql).
+// Server-only. Rows are paged past PostgREST's max-rows and kept per org for a few
+// minutes, and a user's org is kept as long, so pickers, the facet tree and
+// best-match lookups cost one auth check per signed-in request (auth.getUser(),
+// which verifies the session with Supabase Auth) and no database query.
+// Writing an org's overrides should call forgetOrg() — POST /api/vehicles/catalog
+// does, for scripts/vehicles/overlay.py push — else the change shows within TTL_MS.
+
+import { ORG_ID } from '@/lib/org'
+import { createClient } from '@/lib/supabase/server'
+import { getSupabaseAdmin } from '@/lib/supabase/service'
+import { buildFacets, type FacetTree } from './vehicleFacets'
+import { vehicleKey } from './vehicleKeys'
+
+export interface CatalogRow {
+  id: string
+  make: string
+  model: string
+  year_range: string | null
+  year_start: number | null
+  year_end: number | null
+  total_sqft: number | null
+  catalog_source: 'catalog' | 'override' | 'custom'
+  // every other vehicle_measurements column, overrides applied: side_width … roof_sqft,
+  // full_wrap_sqft, linear_feet, install_pay, suggested_price, … (scripts/vehicles/test_catalog_overlay.py)
+  [measurement: string]: unknown
+}
+
+const PAGE = 1000          // PostgREST's default max-rows
+const TTL_MS = 5 * 60_000
+
+interface Entry {
+  at: number
+  rows: Promise<CatalogRow[]>
+  facets?: FacetTree
+  byId?: Map<string, CatalogRow>
+  byKey?: Map<string, CatalogRow>
+}
+const cache = new Map<string, Entry>()
+const userOrgs = new Map<string, { at: number; org: Promise<string> }>()
+
+async function profileOrg(supabase: ReturnType<typeof createClient>, userId: string): Promise<string> {
+  const { data: profile } = await supabase.from('profiles').select('org_id').eq('id', userId).single()
+  return profile?.org_id || ORG_ID
+}
+
+/** The signed-in user's org, else the shop's (public pickers see the shop's catalog). */
+export async function requestOrg(): Promise<string> {
+  const supabase = createClient()
+  const { data: { user } } = await supabase.auth.getUser()
+  if (!user) return ORG_ID
+  const hit = userOrgs.get(user.id)
+  if (hit && Date.now() - hit.at < TTL_MS) return hit.org
+  const org = profileOrg(supabase, user.id)
+  org.catch(() => userOrgs.delete(user.id))
+  userOrgs.set(user.id, { at: Date.now(), org })
+  return org
+}
+
+/** Drop the org's cached catalog, so the next request reloads it. */
+export function forgetOrg(orgId: string): void {
+  cache.delete(orgId)
+}
+
+async function fetchCatalog(orgId: string): Promise<CatalogRow[]> {
+  const admin = getSupabaseAdmin()
+  const rows: CatalogRow[] = []
+  for (let from = 0; ; from += PAGE) {
+    const { data, error } = await admin
+      .rpc('vehicle_catalog', { p_org: orgId })
+      .select('*')
+      .order('id')
+      .range(from, from + PAGE - 1)
+    if (error) throw new Error(`vehicle_catalog: ${error.message}`)
+    rows.push(...(data || []))
+    if (!data || data.length < PAGE) return rows
+  }
+}
+
+function entry(orgId: string): Entry {
+  const hit = cache.get(orgId)
+  if (hit && Date.now() - hit.at < TTL_MS) return hit
+  const fresh: Entry = { at: Date.now(), rows: fetchCatalog(orgId) }
+  fresh.rows.catch(() => cache.delete(orgId))   // don't keep a failed load for the whole TTL
+  cache.set(orgId, fresh)
+  return fresh
+}
+
+/** Every vehicle the org sees (up to TTL_MS stale). */
+export function orgCatalog(orgId: string): Promise<CatalogRow[]> {
+  return entry(orgId).rows
+}
+
+/** The org's year → make → model facet tree, built once per cached catalog. */
+export async function orgFacets(orgId: string): Promise<FacetTree> {
+  const e = entry(orgId)
+  const rows = await e.rows
+  if (!e.facets) e.facets = buildFacets(rows)
+  return e.facets
+}
+
+/** One row of the org's catalog by id, or null. */
+export async function orgVehicle(orgId: string, id: string): Promise<CatalogRow | null> {
+  const e = entry(orgId)
+  const rows = await e.rows
+  if (!e.byId) e.byId = new Map(rows.map(r => [r.id, r]))
+  return e.byId.get(id) ?? null
+}
+
+/** 'make|model|year_range' search keys — measurements.natural_key(), the match index's `keys`. */
+export function naturalKey(r: { make: string; model: string; year_range: string | null }): string {
+  return [r.make, r.model, r.year_range].map(vehicleKey).join('|')
+}
+
+/** The org's row with this natural key (the first, by id, if the sheet repeats it), or null. */
+export async function orgVehicleByKey(orgId: string, key: string): Promise<CatalogRow | null> {
+  const e = entry(orgId)
+  const rows = await e.rows
+  if (!e.byKey) {
+    e.byKey = new Map()
+    for (const r of rows) if (!e.byKey.has(naturalKey(r))) e.byKey.set(naturalKey(r), r)
+  }
+  return e.byKey.get(key) ?? null
+}
@@ -0,0 +1,108 @@
+// Year → make → model → row-id facets over one org's vehicle catalog (lib/vehicleCatalog.ts).
+// Same layout as scripts/vehicles/facets.py; built once per cached catalog, so the
+// pickers' makes-for-a-year and models-for-a-make lists cost no query.
+
+import { createHash } from 'crypto'
+import { vehicleKey } from './vehicleKeys'
+
+export const FACETS_FORMAT = 1
+
+export interface FacetTree {
+  format: number
+  hash: string
+  built_at: string
+  count: number
+  ids: string[]
+  span: [number | null, number | null][]
+  makes: string[]
+  models: string[]
+  all: Record<string, Record<string, number[]>>
+  years: Record<string, Record<string, number[]>>
+}
+
+interface FacetRow {
+  id: string
+  make: string
+  model: string
+  year_start: number | null
+  year_end: number | null
+}
+
+const byName = (a: string, b: string) => (a < b ? -1 : a > b ? 1 : 0)
+
+/** Facet tree over catalog rows; `hash` changes exactly when the rows' names, years or ids do. */
+export function buildFacets(input: FacetRow[]): FacetTree {
+  const rows = [...input].sort((a, b) =>
+    byName(a.make, b.make) || byName(a.model, b.model) ||
+    (a.year_start ?? 0) - (b.year_start ?? 0) || byName(a.id, b.id))
+  const makes = [...new Set(rows.map(r => r.make))].sort(byName)
+  const models = [...new Set(rows.map(r => r.model))].sort(byName)
+  const makeI = new Map(makes.map((m, i) => [m, i]))
+  const modelI = new Map(models.map((m, i) => [m, i]))
+
+  const all: Record<string, Record<string, number[]>> = {}
+  const yearSets: Record<string, Record<string, Set<number>>> = {}
+  rows.forEach((r, n) => {
+    const mk = makeI.get(r.make)!, md = modelI.get(r.model)!
+    ;((all[mk] ||= {})[md] ||= []).push(n)
+    if (r.year_start === null) return
+    for (let y = r.year_start; y <= (r.year_end ?? r.year_start); y++) {
+      ((yearSets[y] ||= {})[mk] ||= new Set()).add(md)
+    }
+  })
+  const years: Record<string, Record<string, number[]>> = {}
+  for (const y of Object.keys(yearSets)) {
+    years[y] = {}
+    for (const mk of Object.keys(yearSets[y])) years[y][mk] = [...yearSets[y][mk]].sort((a, b) => a - b)
+  }
+
+  const body = {
+    format: FACETS_FORMAT,
+    count: rows.length,
+    ids: rows.map(r => r.id),
+    span: rows.map(r => [r.year_start, r.year_end] as [number | null, number | null]),
+    makes, models, all, years,
+  }
+  const hash = createHash('sha256').update(JSON.stringify(body)).digest('hex').slice(0, 32)
+  return { ...body, hash, built_at: new Date().toISOString() }
+}
+
+function makeIndex(tree: FacetTree, make: string): number {
+  const key = vehicleKey(make)
+  return tree.makes.findIndex(m => vehicleKey(m) === key)
+}
+
+function covers(tree: FacetTree, row: number, year: number): boolean {
+  const [ys, ye] = tree.span[row]
+  return ys !== null && ys <= year && year <= (ye ?? ys)
+}
+
+/** Makes with a row covering `year` (every make without one). */
+export function facetMakes(tree: FacetTree, year?: number | null): string[] {
+  const idx = year ? Object.keys(tree.years[year] || {}) : Object.keys(tree.all)
+  return idx.map(i => tree.makes[+i])
+}
+
+/** Models of `make` (case/punctuation-insensitive), limited to `year` if given. */
+export function facetModels(tree: FacetTree, make: string, year?: number | null): string[] {
+  const mk = makeIndex(tree, make)
+  if (mk < 0) return []
+  const idx = year
+    ? (tree.years[year]?.[mk] || []).map(String)
+    : Object.keys(tree.all[mk] || {})
+  return idx.map(i => tree.models[+i]).sort(byName)
+}
+
+/** Row ids for make + model (both case/punctuation-insensitive), newest span first, limited to `year` if given. */
+export function facetIds(tree: FacetTree, make: string, model: string, year?: number | null): string[] {
+  const mk = makeIndex(tree, make)
+  if (mk < 0) return []
+  const key = vehicleKey(model)
+  const rows: number[] = []
+  for (const [md, ns] of Object.entries(tree.all[mk] || {})) {
+    if (vehicleKey(tree.models[+md]) === key) rows.push(...ns.filter(r => !year || covers(tree, r, year)))
+  }
+  return rows
+    .sort((a, b) => (tree.span[b][0] ?? 0) - (tree.span[a][0] ?? 0))
+    .map(r => tree.ids[r])
+}
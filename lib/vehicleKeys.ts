@@ -0,0 +1,13 @@
+// Search keys for vehicle_measurements.make_key / model_key.
+// Lowercase, punctuation stripped, whitespace collapsed: 'F-150 SuperCrew' → 'f150 supercrew'.
+// Must match norm_key() in scripts/vehicles/measurements.py and vehicle_search_key() in SQL,
+// or lookups miss rows written at ingest.
+
+export function vehicleKey(s: string | null | undefined): string {
+  return (s || '')
+    .toLowerCase()
+    .replace(/[^\p{L}\p{N}\p{M}_\s]/gu, '')
+    .split(/\s+/)
+    .filter(Boolean)
+    .join(' ')
+}
@@ -0,0 +1,200 @@
+// Typo-tolerant make/model matching over lib/data/vehicle-match-index.json.
+// The index is built offline by scripts/vehicles/match_index.py; this is the same
+// query, so suggestions come from memory on every keystroke instead of a DB round trip.
+// Keep the scoring in step with MatchIndex.query() in that script.
+// The lookup API (app/api/vehicles/lookup) uses it for ?q= suggestions and as the
+// fallback when a make/model doesn't match a catalog name exactly.
+
+import { vehicleKey } from './vehicleKeys'
+
+export const MATCH_INDEX_FORMAT = 2
+
+export interface MatchIndexData {
+  format: number
+  built_at: string
+  makes: string[]
+  aliases: Record<string, number>
+  families: [number, string, string][]                                    // [make, name, key]
+  entries: [string, number, string, number, number | null, number | null][] // [id, make, model, family, year_start, year_end]
+  vocab: string[]
+  postings: number[][]
+  grams: Record<string, number[]>
+  keys: string[]                                                          // per entry: 'make|model|year_range' search keys
+}
+
+export interface VehicleMatch {
+  score: number
+  key: string        // the row's natural key; resolve it with orgVehicleByKey() — ids differ per database
+  make: string
+  model: string
+  family: string
+  year_start: number | null
+  year_end: number | null
+}
+
+const FUZZY_MIN = 0.5
+const PREFIX_W = 0.8
+const MAX_EXPAND = 12
+
+function grams(tok: string): Set<string> {
+  const t = `$${tok}$`
+  if (t.length <= 3) return new Set([t])
+  const out = new Set<string>()
+  for (let i = 0; i < t.length - 2; i++) out.add(t.slice(i, i + 3))
+  return out
+}
+
+function dice(a: Set<string>, b: Set<string>): number {
+  let shared = 0
+  a.forEach(g => { if (b.has(g)) shared++ })
+  return (2 * shared) / (a.size + b.size)
+}
+
+export class VehicleMatchIndex {
+  private vocabIndex = new Map<string, number>()
+  private idf: number[]
+  private gramCount: number[]
+  private aliasGrams: [string, Set<string>][] = []
+  private byMake = new Map<number, number[]>()
+
+  constructor(private data: MatchIndexData) {
+    if (data.format !== MATCH_INDEX_FORMAT) {
+      throw new Error(`vehicle match index format ${data.format} (expected ${MATCH_INDEX_FORMAT}) — rebuild it`)
+    }
+    data.vocab.forEach((t, i) => this.vocabIndex.set(t, i))
+    const n = data.entries.length
+    this.idf = data.postings.map(p => Math.log(1 + n / p.length))
+    this.gramCount = data.vocab.map(t => grams(t).size)
+    for (const a of Object.keys(data.aliases)) {
+      if (!a.includes(' ') && a.length >= 4) this.aliasGrams.push([a, grams(a)])
+    }
+    data.entries.forEach((row, e) => {
+      const list = this.byMake.get(row[1]) || []
+      list.push(e)
+      this.byMake.set(row[1], list)
+    })
+  }
+
+  /** [make index, remaining tokens, soft]; see MatchIndex._make_of */
+  private makeOf(toks: string[]): [number | null, string[], boolean] {
+    const { aliases } = this.data
+    for (let i = 0; i < toks.length - 1; i++) {
+      const m = aliases[`${toks[i]} ${toks[i + 1]}`]
+      if (m !== undefined) return [m, [...toks.slice(0, i), ...toks.slice(i + 2)], false]
+    }
+    let soft: number | null = null
+    for (let i = 0; i < toks.length; i++) {
+      const m = aliases[toks[i]]
+      if (m === undefined) continue
+      if (!this.vocabIndex.has(toks[i])) return [m, [...toks.slice(0, i), ...toks.slice(i + 1)], false]
+      if (soft === null) soft = m
+    }
+    if (soft !== null) return [soft, toks, true]
+    for (let i = 0; i < toks.length; i++) {
+      const t = toks[i]
+      if (t.length < 4 || this.vocabIndex.has(t)) continue
+      const g = grams(t)
+      let best = 0
+      let bestAlias = ''
+      for (const [a, ag] of this.aliasGrams) {
+        const d = dice(g, ag)
+        if (d > best) { best = d; bestAlias = a }
+      }
+      if (best >= 0.6) return [aliases[bestAlias], [...toks.slice(0, i), ...toks.slice(i + 1)], false]
+    }
+    return [null, toks, false]
+  }
+
+  /** vocab index → weight: exact 1, prefix while typing, else trigram Dice */
+  private expand(tok: string, typing: boolean): Map<number, number> {
+    const { vocab } = this.data
+    const vi = this.vocabIndex.get(tok)
+    const hits = new Map<number, number>()
+    if (vi !== undefined) {
+      hits.set(vi, 1)
+      if (!typing) return hits
+    }
+    if (typing) {
+      let lo = 0, hi = vocab.length
+      while (lo < hi) { const mid = (lo + hi) >> 1; if (vocab[mid] < tok) lo = mid + 1; else hi = mid }
+      for (let j = lo; j < Math.min(lo + MAX_EXPAND, vocab.length) && vocab[j].startsWith(tok); j++) {
+        if (!hits.has(j)) hits.set(j, PREFIX_W)
+      }
+    }
+    if (vi === undefined && tok.length >= 3) {
+      const g = grams(tok)
+      const shared = new Map<number, number>()
+      g.forEach(gr => {
+        for (const j of this.data.grams[gr] || []) shared.set(j, (shared.get(j) || 0) + 1)
+      })
+      const top = [...shared.entries()].sort((a, b) => b[1] - a[1]).slice(0, MAX_EXPAND * 2)
+      for (const [j, c] of top) {
+        const d = (2 * c) / (g.size + this.gramCount[j])
+        if (d >= FUZZY_MIN && d > (hits.get(j) || 0)) hits.set(j, d)
+      }
+    }
+    return new Map([...hits.entries()].sort((a, b) => b[1] - a[1]).slice(0, MAX_EXPAND))
+  }
+
+  /** Ranked matches for free text. A four-digit year in the text filters like `year`. */
+  query(text: string, opts: { year?: number; limit?: number; typing?: boolean } = {}): VehicleMatch[] {
+    const { limit = 10, typing = true } = opts
+    let year = opts.year
+    let toks = vehicleKey(text).split(' ').filter(Boolean)
+    if (year === undefined) {
+      const y = toks.find(t => /^\d{4}$/.test(t) && +t >= 1900 && +t <= 2100)
+      if (y) { year = +y; toks = toks.filter(t => t !== y) }
+    }
+    const [make, rest, soft] = this.makeOf(toks)
+    toks = rest
+
+    let scores = new Map<number, number>()
+    toks.forEach((tok, k) => {
+      const best = new Map<number, number>()
+      this.expand(tok, typing && k === toks.length - 1).forEach((w, vi) => {
+        const weight = w * this.idf[vi]
+        for (const e of this.data.postings[vi]) {
+          if (weight > (best.get(e) || 0)) best.set(e, weight)
+        }
+      })
+      best.forEach((w, e) => scores.set(e, (scores.get(e) || 0) + w))
+    })
+    if (soft) {
+      const bonus = Math.max(0, ...scores.values()) / Math.max(toks.length, 1)
+      scores.forEach((s, e) => { if (this.data.entries[e][1] === make) scores.set(e, s + bonus) })
+    } else if (make !== null) {
+      if (toks.length) {
+        scores = new Map([...scores].filter(([e]) => this.data.entries[e][1] === make))
+      } else {
+        scores = new Map((this.byMake.get(make) || []).map(e => [e, 1]))
+      }
+    }
+
+    const ranked: [number, number, number][] = []
+    scores.forEach((s, e) => {
+      const [, , , , ys, ye] = this.data.entries[e]
+      if (year !== undefined && ys !== null && !(ys <= year && year <= (ye ?? ys))) s *= 0.5
+      ranked.push([s, ys ?? 0, e])
+    })
+    ranked.sort((a, b) => b[0] - a[0] || b[1] - a[1])
+
+    return ranked.slice(0, limit).map(([s, , e]) => {
+      const [, m, model, f, ys, ye] = this.data.entries[e]
+      return {
+        score: Math.round(s * 1000) / 1000, key: this.data.keys[e], make: this.data.makes[m], model,
+        family: this.data.families[f][1], year_start: ys, year_end: ye,
+      }
+    })
+  }
+}
+
+let shared: VehicleMatchIndex | null = null
+
+/** The index over lib/data/vehicle-match-index.json, loaded on first use (server-side). */
+export async function vehicleMatchIndex(): Promise<VehicleMatchIndex> {
+  if (!shared) {
+    const data = (await import('@/lib/data/vehicle-match-index.json')).default
+    shared = new VehicleMatchIndex(data as unknown as MatchIndexData)
+  }
+  return shared
+}
@@ -1,33 +1,154 @@
 ﻿import gradio as gr
-import xai_sdk
-import base64
-from io import BytesIO
 import os
+import sys
+import asyncio
 
-api_key = os.getenv("XAI_API_KEY")
-if not api_key:
-    raise ValueError("Set XAI_API_KEY first")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "mockup"))
 
-client = xai_sdk.Client(api_key=api_key)
+import preprocess
+from cache import MockupCache
+from scheduler import FairScheduler
+import generate
+import recolor
 
-def generate_mockup(vehicle_img, wrap_desc):
-    if not vehicle_img: return None, "Upload photo"
-    if not wrap_desc: return None, "Enter description"
+MAX_VARIANTS = 4
+TIMEOUT_S = float(os.getenv("MOCKUP_TIMEOUT_S", "120"))
+# the first variant is the description as written; the rest ask for another take on it
+VARIANTS = [
+    "",
+    "Alternate take: same colors, different graphic layout.",
+    "Alternate take: bolder, higher-contrast graphics.",
+    "Alternate take: cleaner, more minimal design.",
+]
+LOCAL_COLOR = os.getenv("MOCKUP_LOCAL_COLOR", "1") != "0"   # plain colour changes skip the image model
+NO_TEMPLATE = "none (find the paint by colour)"
+_backend = None
+cache = MockupCache()
+scheduler = FairScheduler(concurrency=int(os.getenv("MOCKUP_CONCURRENCY", "4")), timeout=TIMEOUT_S)
+
+def get_backend():
+    # MOCKUP_BACKEND=standin runs the app offline
+    global _backend
+    if _backend is None:
+        _backend = generate.make_backend(os.getenv("MOCKUP_BACKEND", "xai"))
+    return _backend
+
+def variant_descs(wrap_desc, n):
+    return [f"{wrap_desc}. {v}" if v else wrap_desc for v in VARIANTS[:max(1, min(n, MAX_VARIANTS))]]
+
+def local_previews(img, wrap_desc, n=1, template=None):
+    """[(image, caption)] for a plain colour change — the asked-for finish first, then the others — or None.
+
+    The paint comes from the template's body outline when the photo is that
+    template's side view, else from colour segmentation; either way it is
+    converted once and each finish reuses it.
+    """
+    spec = recolor.parse_color(wrap_desc) if LOCAL_COLOR else None
+    if spec is None:
+        return None
+    rgb, finish = spec
+    finishes = [finish] + [f for f in recolor.FINISHES if f != finish]
+    paint = recolor.Paint(img, recolor.template_mask(template, img.size) if template else None)
+    return [(paint.recolor(rgb, f)[0], f"{f} #{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}")
+            for f in finishes[:max(1, min(n, len(finishes)))]]
+
+async def generate_variants(vehicle_img, wrap_desc, n_variants, template, request: gr.Request):
+    """Gallery of up to MAX_VARIANTS takes, updated as each one moves along.
+
+    Each slot starts as a blurred low-res placeholder, shows the image as it
+    downloads and ends as the result; the status line ticks every second while
+    the calls wait. Calls go through the shared scheduler: at most
+    MOCKUP_CONCURRENCY at once, round-robin between sessions. Leaving the page
+    closes this generator, which cancels the session's queued and running calls.
+    Per-stage timings go to the timings log (python3 scripts/mockup/generate.py timings).
+    """
+    if not vehicle_img: yield [], "Upload photo"; return
+    if not wrap_desc: yield [], "Enter description"; return
+    timer = generate.StageTimer()
     try:
-        buffered = BytesIO()
-        vehicle_img.save(buffered, format="JPEG")
-        img_b64 = base64.b64encode(buffered.getvalue()).decode()
-        image_url = f"data:image/jpeg;base64,{img_b64}"
-        prompt = f"Apply wrap exactly: {wrap_desc}. Photorealistic mockup. Match lighting, angle, perspective. No vehicle changes."
-        response = client.image.sample(prompt=prompt, model="grok-imagine-image", image_url=image_url)
-        return response.url, "Done"
+        image_url, img, _ = await asyncio.to_thread(preprocess.prepare, vehicle_img)
     except Exception as e:
-        return None, f"Error: {str(e)}"
-
-gr.Interface(
-    fn=generate_mockup,
-    inputs=[gr.Image(type="pil", label="Vehicle photo"), gr.Textbox(label="Wrap description", placeholder="matte black with red flames")],
-    outputs=[gr.Image(label="Mockup"), gr.Textbox(label="Status")],
-    title="USA Wrap Co - Grok AI Mockups",
-    description="Live AI wrap previews"
-).launch(share=True)
+        yield [], f"Error: {str(e)}"; return
+    pre_ms = timer.mark("preprocess")
+    local = await asyncio.to_thread(local_previews, img, wrap_desc, int(n_variants),
+                                    None if template == NO_TEMPLATE else template)
+    if local:
+        yield local, "Done (local colour preview — describe graphics to use the AI)"; return
+    descs = variant_descs(wrap_desc, int(n_variants))
+    user = request.session_hash if request else "local"
+    ahead = scheduler.queued()
+    blur = await asyncio.to_thread(recolor.placeholder, img, wrap_desc)
+    slots = [(blur, f"#{i + 1}") for i in range(len(descs))]
+    state = ["queued"] * len(descs)
+    yield slots, f"Preprocessed in {pre_ms:.0f} ms — queued {len(descs)} ({ahead} ahead)"
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    timers = [generate.StageTimer() for _ in descs]
+
+    def job(i, d):
+        # render_stream runs on a scheduler thread; its stages come back through the queue
+        emit = lambda stage, **info: loop.call_soon_threadsafe(events.put_nowait, (i, stage, info))
+        return lambda: generate.render_stream(get_backend(), cache, image_url, img, d, emit)
+
+    async def collect():
+        async for i, result, error in scheduler.as_completed(user, [job(i, d) for i, d in enumerate(descs)]):
+            events.put_nowait((i, "failed" if error else "finished", {"error": error}))
+        events.put_nowait((None, "end", {}))
+
+    def status():
+        waited = timer.total_ms() / 1000 - pre_ms / 1000
+        done = sum(s in ("ready", "cached") or s.startswith("failed") for s in state)
+        head = f"{done}/{len(descs)} ready" if done == len(descs) else f"Waiting… {waited:.0f}s"
+        return f"{head} — " + ", ".join(f"#{i + 1} {s}" for i, s in enumerate(state))
+
+    collector = asyncio.ensure_future(collect())
+    try:
+        while True:
+            try:
+                i, stage, info = await asyncio.wait_for(events.get(), 1.0)
+            except asyncio.TimeoutError:
+                yield slots, status(); continue
+            if stage == "end":
+                break
+            t = timers[i]
+            if stage == "sent":
+                t.mark("queue"); state[i] = "sent"
+            elif stage == "retry":
+                state[i] = f"retry {info['attempt']}"
+            elif stage == "received":
+                t.mark("request"); state[i] = "downloading"
+            elif stage == "downloading":
+                state[i] = f"downloading {info['bytes'] // 1024} KB"
+                if info["frame"] is not None:
+                    slots[i] = (info["frame"], f"#{i + 1} …")
+            elif stage in ("done", "cached"):
+                t.mark("download" if stage == "done" else "cache")
+                state[i] = "ready" if stage == "done" else "cached"
+                slots[i] = (info["path"], f"#{i + 1}" + (" (cached)" if stage == "cached" else ""))
+                generate.log_timing({"backend": get_backend().model, "variant": i, "cached": stage == "cached",
+                                     "stages": {"preprocess": pre_ms, **t.stages}, "total_ms": t.total_ms() + pre_ms})
+            elif stage == "failed":
+                state[i] = f"failed: {info['error']}"
+                slots[i] = (blur, f"#{i + 1} failed")
+            else:
+                continue
+            yield slots, status()
+    finally:
+        collector.cancel()
+
+def build_ui():
+    return gr.Interface(
+        fn=generate_variants,
+        inputs=[gr.Image(type="filepath", label="Vehicle photo"), gr.Textbox(label="Wrap description", placeholder="matte black with red flames"),
+                gr.Slider(1, MAX_VARIANTS, value=1, step=1, label="Variants"),
+                gr.Dropdown([NO_TEMPLATE, *recolor.templates()], value=NO_TEMPLATE, label="Side-view template (colour previews)")],
+        outputs=[gr.Gallery(label="Mockups", columns=2), gr.Textbox(label="Status")],
+        title="USA Wrap Co - Grok AI Mockups",
+        description="Live AI wrap previews"
+    )
+
+if __name__ == "__main__":
+    get_backend()
+    # the scheduler limits the image calls; Gradio's own queue only has to keep the sessions apart
+    build_ui().queue(default_concurrency_limit=None).launch(share=True)
@@ -0,0 +1,309 @@
+"""
+USA Wrap Co — Codemod Runner
+Applies the patch specs in specs.py (or a --specs JSON file of the same shape)
+across the repo in one pass, instead of a script per change that each rereads
+the tree and hard-codes a path.
+
+  discover  each spec's globs are walked from their fixed prefix only
+            (components/, app/, ...), skipping node_modules, .next and .git
+  cache     .codemod_cache.json keeps each target's mtime, size and sha1, and
+            each spec's verdict for that content (in already / anchor missing).
+            A file whose stat is unchanged is not read again; one that was
+            touched but not edited (checkout, formatter no-op) is read, hashed,
+            and keeps its verdicts
+  apply     one worker per file runs every spec that targets it, in order, on
+            the same buffer, and writes once (atomically). Files are spread
+            over a thread pool
+  verify    the written text is run through the specs again; a spec that would
+            apply twice is reported as not idempotent
+
+Anchors and replacements are written with \\n; in a CRLF file they are matched
+and written with \\r\\n. A UTF-8 BOM is kept.
+
+Run:  python3 codemod.py --dry-run          unified diff of what would change
+      python3 codemod.py                    apply
+      python3 codemod.py --only pnw-sidenav,pnw-mobilenav [--specs refactor.json] [--no-cache]
+"""
+
+import os, re, sys, json, time, fnmatch, difflib, hashlib, argparse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+CACHE = os.environ.get("CODEMOD_CACHE", os.path.join(ROOT, ".codemod_cache.json"))
+SKIP_DIRS = {"node_modules", ".git", ".next", ".vercel", "__pycache__", ".mockup_cache", "dist", "build", "out"}
+WORKERS = min(32, (os.cpu_count() or 4) * 4)      # file I/O bound; threads release the GIL on reads and writes
+KEYS = ("id", "files", "anchor", "replace", "guard")
+
+
+# ── SPECS ────────────────────────────────────────────────────────────────────
+def check_spec(spec):
+    missing = [k for k in KEYS if not spec.get(k)]
+    if missing:
+        raise ValueError(f"spec {spec.get('id', '?')!r}: missing {', '.join(missing)}")
+    if isinstance(spec["files"], str):
+        raise ValueError(f"spec {spec['id']!r}: files must be a list of globs")
+    if spec["guard"] in (spec["anchor"] if not spec.get("regex") else ""):
+        raise ValueError(f"spec {spec['id']!r}: the guard is in the anchor, so it would never apply")
+    if not spec.get("regex") and spec["guard"] not in spec["replace"]:
+        raise ValueError(f"spec {spec['id']!r}: the guard is not in the replacement, so it would apply on every run")
+    return spec
+
+
+def load_specs(path=None):
+    if path:
+        with open(path) as f:
+            specs = json.load(f)
+    else:
+        from specs import SPECS
+        specs = SPECS
+    ids = [s.get("id") for s in specs]
+    dup = {i for i in ids if ids.count(i) > 1}
+    if dup:
+        raise ValueError(f"duplicate spec ids: {', '.join(sorted(dup))}")
+    return [check_spec(dict(s)) for s in specs]
+
+
+def fingerprint(spec):
+    """Changes whenever the spec does, so cached verdicts for an edited spec are not reused."""
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+# ── DISCOVER ─────────────────────────────────────────────────────────────────
+def _fixed_prefix(pattern):
+    """'components/**/*.tsx' -> 'components'; a pattern with no wildcard is the file itself."""
+    parts = pattern.split("/")
+    for i, part in enumerate(parts):
+        if any(ch in part for ch in "*?["):
+            return "/".join(parts[:i]), True
+    return pattern, False
+
+
+def discover(specs, root=ROOT):
+    """{relpath: [spec, ...]} for every file some spec targets, specs in their given order."""
+    found = set()
+    for spec in specs:
+        for pattern in spec["files"]:
+            prefix, wild = _fixed_prefix(pattern)
+            if not wild:
+                if os.path.isfile(os.path.join(root, prefix)):
+                    found.add(prefix)
+                continue
+            for d, dirs, files in os.walk(os.path.join(root, prefix)):
+                dirs[:] = [x for x in dirs if x not in SKIP_DIRS]
+                rel_d = os.path.relpath(d, root).replace(os.sep, "/")
+                found.update(f"{rel_d}/{f}" if rel_d != "." else f for f in files)
+    targets = {}
+    for rel in sorted(found):
+        hit = [s for s in specs if any(fnmatch.fnmatchcase(rel, p) for p in s["files"])]
+        if hit:
+            targets[rel] = hit
+    return targets
+
+
+# ── SCAN CACHE ───────────────────────────────────────────────────────────────
+def read_cache(path=CACHE, root=ROOT):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data.get("files", {}) if data.get("root") == root else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(files, path=CACHE, root=ROOT):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"root": root, "files": files}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# ── PATCH ────────────────────────────────────────────────────────────────────
+def patch_text(text, spec):
+    """(text, verdict, n): verdict is applied | already | missing."""
+    if spec["guard"] in text:
+        return text, "already", 0
+    anchor, replace = spec["anchor"], spec["replace"]
+    if "\r\n" in text and "\r" not in anchor:
+        anchor, replace = anchor.replace("\n", "\r\n"), replace.replace("\n", "\r\n")
+    count = spec.get("count", 1)
+    if spec.get("regex"):
+        out, n = re.subn(anchor, replace, text, count=count)
+    else:
+        n = text.count(anchor) if count == 0 else min(count, text.count(anchor))
+        out = text.replace(anchor, replace, count or -1)
+    return (out, "applied", n) if n else (text, "missing", 0)
+
+
+def patch_all(text, specs):
+    verdicts = {}
+    for spec in specs:
+        text, verdict, n = patch_text(text, spec)
+        verdicts[spec["id"]] = (verdict, n)
+    return text, verdicts
+
+
+def hint(text, spec):
+    """Where the anchor's first line still is, when the whole anchor no longer matches."""
+    first = next((ln.strip() for ln in spec["anchor"].splitlines() if ln.strip()), "")
+    if not first or spec.get("regex"):
+        return None
+    for i, ln in enumerate(text.splitlines(), 1):
+        if first in ln:
+            return i
+    return None
+
+
+def _write(path, text):
+    tmp = path + ".codemod.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    try:
+        os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+    except OSError:
+        pass
+    os.replace(tmp, path)
+
+
+def process(root, rel, specs, entry, dry_run):
+    """One target: every spec that names it, one read, at most one write."""
+    path = os.path.join(root, rel)
+    fps = {s["id"]: fingerprint(s) for s in specs}
+    out = {"rel": rel, "verdicts": {}, "hints": {}, "diff": None, "entry": entry, "read": False, "error": None}
+    st = os.stat(path)
+    known = (entry or {}).get("specs", {})
+    if entry and (entry["mtime"], entry["size"]) == (st.st_mtime_ns, st.st_size) and all(fp in known for fp in fps.values()):
+        out["verdicts"] = {sid: (known[fp], 0) for sid, fp in fps.items()}
+        return out
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    out["read"] = True
+    sha = hashlib.sha1(raw).hexdigest()
+    if entry and entry["sha1"] == sha and all(fp in known for fp in fps.values()):
+        out["verdicts"] = {sid: (known[fp], 0) for sid, fp in fps.items()}
+        out["entry"] = {**entry, "mtime": st.st_mtime_ns, "size": st.st_size}
+        return out
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError as e:
+        out["error"] = f"not UTF-8 ({e.reason} at byte {e.start})"
+        return out
+
+    new, verdicts = patch_all(text, specs)
+    out["verdicts"] = verdicts
+    out["hints"] = {s["id"]: hint(text, s) for s in specs if verdicts[s["id"]][0] == "missing"}
+    keep = dict(known) if sha == (entry or {}).get("sha1") else {}
+    if new == text:
+        keep.update({fps[sid]: v for sid, (v, _) in verdicts.items()})
+        out["entry"] = {"mtime": st.st_mtime_ns, "size": st.st_size, "sha1": sha, "specs": keep}
+        return out
+
+    if dry_run:
+        out["diff"] = "".join(difflib.unified_diff(text.splitlines(True), new.splitlines(True),
+                                                   f"a/{rel}", f"b/{rel}"))
+        # only settled verdicts are cached; a pending patch has to be read again to show or apply it
+        keep.update({fps[sid]: v for sid, (v, _) in verdicts.items() if v != "applied"})
+        out["entry"] = {"mtime": st.st_mtime_ns, "size": st.st_size, "sha1": sha, "specs": keep}
+        return out
+
+    _write(path, new)
+    again, after = patch_all(new, specs)
+    loose = [sid for sid, (v, _) in after.items() if v == "applied"]
+    if loose:
+        out["error"] = f"not idempotent: {', '.join(loose)} would apply again"
+    st = os.stat(path)
+    out["entry"] = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                    "sha1": hashlib.sha1(new.encode("utf-8")).hexdigest(),
+                    "specs": {fps[sid]: v for sid, (v, _) in after.items() if v != "applied"}}
+    return out
+
+
+def run(specs, root=ROOT, cache=None, dry_run=False, workers=WORKERS):
+    """Results per target, in path order, and the updated cache entries."""
+    cache = {} if cache is None else cache
+    targets = discover(specs, root)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(lambda rel: process(root, rel, targets[rel], cache.get(rel), dry_run), targets))
+    for r in results:
+        if r["entry"] is not None:
+            cache[r["rel"]] = r["entry"]
+    return results, cache
+
+
+# ── REPORT ───────────────────────────────────────────────────────────────────
+def summarize(specs, results):
+    """{spec id: {applied, already, missing, files, hints}}."""
+    per = {s["id"]: {"applied": 0, "already": 0, "missing": 0, "files": [], "hints": []} for s in specs}
+    for r in results:
+        for sid, (verdict, _) in r["verdicts"].items():
+            per[sid][verdict] += 1
+            if verdict == "applied":
+                per[sid]["files"].append(r["rel"])
+            elif verdict == "missing" and r["hints"].get(sid):
+                per[sid]["hints"].append(f"{r['rel']}:{r['hints'][sid]}")
+    return per
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply the codemod specs across the repo in one pass.")
+    ap.add_argument("--dry-run", action="store_true", help="print a unified diff instead of writing")
+    ap.add_argument("--only", help="comma list of spec ids")
+    ap.add_argument("--specs", help="JSON list of specs to run instead of specs.py")
+    ap.add_argument("--list", action="store_true", help="list the specs and exit")
+    ap.add_argument("--root", default=ROOT)
+    ap.add_argument("--no-cache", action="store_true", help="read every target, ignoring the scan cache")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    args = ap.parse_args()
+
+    try:
+        specs = load_specs(args.specs)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}"); sys.exit(1)
+    if args.list:
+        for s in specs:
+            print(f"  {s['id']:32s} {', '.join(s['files'])}")
+        return
+    if args.only:
+        want = args.only.split(",")
+        unknown = [w for w in want if w not in {s["id"] for s in specs}]
+        if unknown:
+            print(f"❌ Unknown spec {', '.join(unknown)} (have: {', '.join(s['id'] for s in specs)})"); sys.exit(1)
+        specs = [s for s in specs if s["id"] in want]
+
+    root = os.path.abspath(args.root)
+    cache = {} if args.no_cache else read_cache(root=root)
+    t0 = time.perf_counter()
+    results, cache = run(specs, root, cache, args.dry_run, args.workers)
+    ms = 1000 * (time.perf_counter() - t0)
+    try:
+        write_cache(cache, root=root)
+    except OSError as e:
+        print(f"  ⚠️  scan cache not saved: {e}")
+
+    for r in results:
+        if r["diff"]:
+            sys.stdout.write(r["diff"])
+    failed = False
+    for sid, s in summarize(specs, results).items():
+        done = "would apply" if args.dry_run else "applied"
+        if s["applied"] + s["already"] + s["missing"] == 0:
+            failed = True
+            print(f"  ❌ {sid}: no file matches {', '.join(next(x for x in specs if x['id'] == sid)['files'])}")
+        elif s["applied"] + s["already"] == 0:
+            failed = True
+            where = f" (anchor's first line at {', '.join(s['hints'])})" if s["hints"] else ""
+            print(f"  ❌ {sid}: anchor not found in any of {s['missing']} target(s){where}")
+        else:
+            print(f"  ✅ {sid}: {done} {s['applied']}, already in {s['already']}, no anchor {s['missing']}")
+    for r in results:
+        if r["error"]:
+            failed = True
+            print(f"  ❌ {r['rel']}: {r['error']}")
+    read = sum(r["read"] for r in results)
+    print(f"{'Dry run' if args.dry_run else 'Done'}: {len(results)} target file(s), {read} read, "
+          f"{len(results) - read} from the scan cache, {ms:.0f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+USA Wrap Co — Codemod Specs
+The patches codemod.py applies, in order. Each spec:
+
+  id       short name, for --only and the report
+  files    globs under the repo root (posix, '*' also crosses folders)
+  anchor   the text to find (a regex if "regex": True)
+  replace  what it becomes
+  guard    text that is only there once the patch is in; a file that has it is
+           skipped, so a rerun is a no-op. It must appear in `replace`.
+  count    replacements per file (default 1, 0 for all)
+
+Specs that are in already cost nothing on a rerun: the scan cache remembers
+each file's verdict by content hash.
+"""
+
+SPECS = [
+    # was scripts/add_pnw_nav.py
+    {
+        "id": "pnw-sidenav",
+        "files": ["components/layout/SideNav.tsx"],
+        "anchor": "      { href: '/fleet-map',   label: 'Fleet',        icon: Map },\n",
+        "replace": "      { href: '/fleet-map',   label: 'Fleet',        icon: Map },\n"
+                   "      { href: '/pnw',         label: 'PNW Navigator', icon: Navigation },\n",
+        "guard": "'/pnw'",
+    },
+    # was scripts/add_pnw_mobile.py
+    {
+        "id": "pnw-mobilenav",
+        "files": ["components/layout/MobileNav.tsx"],
+        "anchor": "    label: 'Marine / Fishing',\n    items: [\n",
+        "replace": "    label: 'Marine / Fishing',\n    items: [\n"
+                   "      { href: '/pnw',               label: 'PNW Nav',    icon: Navigation },\n",
+        "guard": "href: '/pnw'",
+    },
+    # was scripts/patch_jobchat_callsites.py
+    {
+        "id": "jobchat-names-jobdetail",
+        "files": ["components/projects/JobDetailClient.tsx"],
+        "anchor": """\
+          {tab === 'comments' && (
+            <JobChat
+              projectId={project.id}
+              orgId={project.org_id}
+              currentUserId={profile.id}
+              currentUserName={profile.name}
+            />
+          )}""",
+        "replace": """\
+          {tab === 'comments' && (
+            <JobChat
+              projectId={project.id}
+              orgId={project.org_id}
+              currentUserId={profile.id}
+              currentUserName={profile.name}
+              customerName={customer?.name}
+              installerName={teammates.find(t => t.id === project.installer_id)?.name}
+            />
+          )}""",
+        "guard": "customerName={customer?.name}",
+    },
+    {
+        "id": "jobchat-names-projectdetail",
+        "files": ["components/projects/ProjectDetail.tsx"],
+        "anchor": "                <JobChat projectId={project.id} orgId={project.org_id} currentUserId={profile.id} "
+                  "currentUserName={profile.name} />",
+        "replace": """\
+                <JobChat
+                  projectId={project.id}
+                  orgId={project.org_id}
+                  currentUserId={profile.id}
+                  currentUserName={profile.name}
+                  customerName={f.client || undefined}
+                  installerName={teammates.find(t => t.id === project.installer_id)?.name || f.installer || undefined}
+                />""",
+        "guard": "customerName={f.client || undefined}",
+    },
+    # was the types half of scripts/update_nav.py
+    {
+        "id": "profile-feature-permissions",
+        "files": ["types/index.ts"],
+        "anchor": "  settings?: Record<string, any> | null\n  email_signature?: string | null\n",
+        "replace": "  feature_permissions?: Record<string, boolean> | null\n"
+                   "  settings?: Record<string, any> | null\n  email_signature?: string | null\n",
+        "guard": "feature_permissions?:",
+    },
+]
@@ -0,0 +1,208 @@
+"""
+USA Wrap Co — Batch Mockups
+Every vehicle photo in a folder x every wrap design in a file, through the same
+generate path as the mockup app (generate.render: cache, image call, retries).
+
+  preprocessing   photos are prepared (preprocess.prepare) in a process pool
+  image calls     run through FairScheduler with --concurrency slots
+  resume          finished pairs are appended to manifest.jsonl in the output
+                  folder as they land, keyed by photo and design text; a re-run
+                  skips them, even after designs.txt was reordered or edited
+  output          <photo>__<design key>.jpg per pair (the key is a hash of the
+                  normalized description), plus contact_sheet.jpg: one row per
+                  photo, the original then each design
+  failures        a photo that can't be prepared fails its pairs; the rest run
+
+HEIC photos are picked up when pillow-heif is installed.
+
+Designs file: one description per line (blank lines and # comments skipped).
+
+Run:  python3 batch.py photos/ designs.txt --out mockups/ [--concurrency 4] [--workers 4]
+      python3 batch.py photos/ designs.txt --backend standin --latency 0.5 --fail-rate 0.1
+"""
+
+import os, sys, json, time, shutil, asyncio, hashlib, argparse
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+import preprocess, generate
+from cache import MockupCache, normalize_prompt
+from scheduler import FairScheduler
+
+PHOTO_EXTS = (".jpg", ".jpeg", ".png", ".webp") + ((".heic",) if preprocess.HEIF else ())
+MANIFEST = "manifest.jsonl"
+THUMB = 256
+
+
+def read_designs(path):
+    with open(path, encoding="utf-8-sig") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def list_photos(folder):
+    return sorted(os.path.join(folder, n) for n in os.listdir(folder) if n.lower().endswith(PHOTO_EXTS))
+
+
+def design_key(desc):
+    """Short hash of a description as the cache normalizes it, so whitespace and case edits keep the key."""
+    return hashlib.sha256(normalize_prompt(desc).encode()).hexdigest()[:12]
+
+
+def out_name(photo, desc):
+    return f"{os.path.splitext(os.path.basename(photo))[0]}__{design_key(desc)}.jpg"
+
+
+def load_manifest(out_dir):
+    """Finished pairs, by (photo basename, design_key(description))."""
+    done = {}
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue            # a line cut short by an interrupted run
+                if os.path.exists(os.path.join(out_dir, rec["file"])):
+                    done[(rec["photo"], design_key(rec["desc"]))] = rec
+    except OSError:
+        pass
+    return done
+
+
+# ── RUN ──────────────────────────────────────────────────────────────────────
+async def run(photos, designs, out_dir, backend, cache, concurrency=4, workers=None, retries=generate.RETRIES,
+              timeout=180.0, log=print):
+    """Generate every missing photo x design pair. Returns a stats dict."""
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_manifest(out_dir)
+    keys = [design_key(desc) for desc in designs]
+    todo = [(p, d) for p in photos for d in range(len(designs)) if (os.path.basename(p), keys[d]) not in done]
+    stats = {"pairs": len(photos) * len(designs), "skipped": len(photos) * len(designs) - len(todo),
+             "written": 0, "cached": 0, "failed": 0, "retries": 0}
+    log(f"{stats['pairs']} pairs, {stats['skipped']} already done, {len(todo)} to run")
+    if not todo:
+        return stats
+
+    t0 = time.monotonic()
+    need = sorted({p for p, _ in todo})
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = await asyncio.gather(*[loop.run_in_executor(pool, preprocess.prepare, p) for p in need],
+                                       return_exceptions=True)
+    prepared = {}
+    for photo, res in zip(need, results):
+        if isinstance(res, BaseException):
+            lost = sum(p == photo for p, _ in todo)
+            stats["failed"] += lost
+            log(f"  ❌ {os.path.basename(photo)}: can't prepare ({res}); {lost} pairs failed")
+        else:
+            prepared[photo] = res
+    unprepared = stats["failed"]
+    todo = [(p, d) for p, d in todo if p in prepared]
+    t1 = time.monotonic()
+    log(f"  prepared {len(prepared)} photos in {t1 - t0:.1f}s")
+
+    def on_retry(_):
+        stats["retries"] += 1
+
+    def job(photo, d):
+        url, img, _ = prepared[photo]
+        return lambda: generate.render(backend, cache, url, img, designs[d], retries, on_retry)
+
+    sched = FairScheduler(concurrency=concurrency, timeout=timeout)
+    with open(os.path.join(out_dir, MANIFEST), "a") as manifest, closing(sched):
+        async for i, result, error in sched.as_completed("batch", [job(p, d) for p, d in todo]):
+            photo, d = todo[i]
+            if error:
+                stats["failed"] += 1
+                log(f"  ❌ {os.path.basename(photo)} #{d + 1}: {error}")
+                continue
+            path, cached = result
+            name = out_name(photo, designs[d])
+            shutil.copyfile(path, os.path.join(out_dir, name))
+            manifest.write(json.dumps({"photo": os.path.basename(photo), "design": keys[d], "file": name,
+                                       "desc": designs[d], "cached": cached}) + "\n")
+            manifest.flush()
+            stats["written"] += 1; stats["cached"] += cached
+            n = stats["written"] + stats["failed"] - unprepared
+            if n % 10 == 0 or n == len(todo):
+                rate = n / (time.monotonic() - t1)
+                log(f"  {n}/{len(todo)}  {rate:.2f} pairs/s  retries {stats['retries']}  failed {stats['failed']}")
+    stats["prepare_s"] = round(t1 - t0, 2)
+    stats["generate_s"] = round(time.monotonic() - t1, 2)
+    stats["pairs_per_s"] = round((stats["written"] + stats["failed"] - unprepared) / max(stats["generate_s"], 1e-9), 2)
+    return stats
+
+
+# ── CONTACT SHEET ────────────────────────────────────────────────────────────
+def _thumb(path):
+    img = preprocess.load(path, THUMB)
+    cell = Image.new("RGB", (THUMB, THUMB), (24, 24, 24))
+    cell.paste(img, ((THUMB - img.width) // 2, (THUMB - img.height) // 2))
+    return cell
+
+
+def contact_sheet(photos, designs, out_dir, path=None):
+    """Grid of originals and results; missing results and unreadable photos are left dark. Returns the sheet's path."""
+    done = load_manifest(out_dir)
+    label_h = 22
+    cols, rows = len(designs) + 1, len(photos)
+    sheet = Image.new("RGB", (cols * THUMB, label_h + rows * THUMB), (12, 12, 12))
+    draw = ImageDraw.Draw(sheet)
+    for c, text in enumerate(["original", *designs]):
+        draw.text((c * THUMB + 6, 5), text[:38], fill=(230, 230, 230))
+    for r, photo in enumerate(photos):
+        y = label_h + r * THUMB
+        try:
+            sheet.paste(_thumb(photo), (0, y))
+        except OSError:
+            pass                        # unreadable: its pairs failed in run(), the row stays dark
+        for d, desc in enumerate(designs):
+            rec = done.get((os.path.basename(photo), design_key(desc)))
+            if rec:
+                sheet.paste(_thumb(os.path.join(out_dir, rec["file"])), ((d + 1) * THUMB, y))
+    path = path or os.path.join(out_dir, "contact_sheet.jpg")
+    sheet.save(path, quality=85)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Mockups for every photo x design pair.")
+    ap.add_argument("photos", help="folder of vehicle photos")
+    ap.add_argument("designs", help="file with one wrap description per line")
+    ap.add_argument("--out", default="mockups")
+    ap.add_argument("--backend", default="xai", choices=sorted(generate.BACKENDS))
+    ap.add_argument("--concurrency", type=int, default=4, help="image calls in flight")
+    ap.add_argument("--workers", type=int, default=None, help="preprocessing processes (default: CPUs)")
+    ap.add_argument("--retries", type=int, default=generate.RETRIES)
+    ap.add_argument("--timeout", type=float, default=180.0, help="seconds per pair, retries included")
+    ap.add_argument("--cache-dir", default=None, help="result cache (default: the app's)")
+    ap.add_argument("--latency", type=float, default=0.5, help="standin: seconds per call")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="standin: share of calls that fail")
+    ap.add_argument("--no-sheet", action="store_true", help="skip the contact sheet")
+    args = ap.parse_args()
+
+    photos, designs = list_photos(args.photos), read_designs(args.designs)
+    if not photos or not designs:
+        print(f"❌ Need photos in {args.photos} and designs in {args.designs}"); sys.exit(1)
+    kw = {"latency_s": args.latency, "fail_rate": args.fail_rate} if args.backend == "standin" else {}
+    backend = generate.make_backend(args.backend, **kw)
+    cache = MockupCache(args.cache_dir) if args.cache_dir else MockupCache()
+
+    stats = asyncio.run(run(photos, designs, args.out, backend, cache, args.concurrency, args.workers,
+                            args.retries, args.timeout))
+    if not args.no_sheet:
+        print(f"  contact sheet -> {contact_sheet(photos, designs, args.out)}")
+    mark = "⚠️ " if stats["failed"] else "✅"
+    print(f"{mark} {stats['written']} written ({stats['cached']} from cache), {stats['failed']} failed, "
+          f"{stats['skipped']} skipped, {stats['retries']} retries"
+          + (f", {stats['pairs_per_s']} pairs/s" if "pairs_per_s" in stats else ""))
+    if stats["failed"]:
+        print("   Re-run the same command to retry the failed pairs.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
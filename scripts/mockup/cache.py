@@ -0,0 +1,258 @@
+"""
+USA Wrap Co — Mockup Result Cache
+Every preview is a paid image call, and the same photo often comes back with the
+same description. This caches results on disk in front of the endpoint.
+
+Key   perceptual hash (64-bit DCT pHash) of the preprocessed photo and its mean
+      colour, plus the normalized wrap description and the model. A re-upload
+      of the same photo (re-encoded, re-cropped by a pixel or two) hashes within
+      HAMMING_MAX bits, so it still hits; the same van in another paint colour
+      does not.
+Value the image bytes themselves. response.url is a temporary link and can't be
+      cached.
+
+Entries are evicted least recently used once the files pass MAX_BYTES. The
+index (index.json beside the files) carries hit/miss/eviction counts, so
+stats() gives the hit rate across restarts. Safe to share between threads and
+between processes on one directory: every write re-reads the index and merges
+into it under a file lock, so no process drops another's entries and the size
+cap covers all of them. Lookups only stat the index; their counts are written
+with the next store, every FLUSH_S seconds, or at exit.
+
+Run:  python3 cache.py stats | clear    [--dir .mockup_cache]
+"""
+
+import os, re, json, time, atexit, hashlib, argparse, threading, contextlib
+
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+CACHE_DIR = os.environ.get("MOCKUP_CACHE_DIR", os.path.join(ROOT, ".mockup_cache"))
+MAX_BYTES = int(os.environ.get("MOCKUP_CACHE_MB", "512")) * 1024 * 1024
+HAMMING_MAX = 4                     # of 64 bits; same photo re-encoded stays under this
+TONE_MAX = 12                       # mean RGB distance; pHash is grayscale, so paint colour is checked apart
+FLUSH_S = 30                        # longest a lookup's hit/miss count waits in memory
+
+_HASH = 32                          # grayscale side the DCT runs on
+_N = np.arange(_HASH)
+_DCT = np.cos(np.pi * (2 * _N[None, :] + 1) * _N[:, None] / (2 * _HASH))   # DCT-II basis
+
+
+def phash(img):
+    """64-bit perceptual hash: low-frequency 8x8 DCT block of a 32x32 grayscale, thresholded at its median."""
+    g = np.asarray(img.convert("L").resize((_HASH, _HASH), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ g @ _DCT.T)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def tone(img):
+    return [round(float(c), 1) for c in np.asarray(img.convert("RGB").resize((16, 16)), dtype=np.float64).mean(axis=(0, 1))]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def normalize_prompt(text):
+    """Case, spacing and trailing punctuation don't change the result, so they don't change the key."""
+    return re.sub(r"\s+", " ", (text or "").lower()).strip(" .,!;")
+
+
+def group_of(prompt, model):
+    return hashlib.sha256(f"{model}|{normalize_prompt(prompt)}".encode()).hexdigest()[:24]
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path` across processes (fcntl, or msvcrt on Windows)."""
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class MockupCache:
+    def __init__(self, path=CACHE_DIR, max_bytes=MAX_BYTES, hamming_max=HAMMING_MAX, flush_s=FLUSH_S):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hamming_max = hamming_max
+        self.flush_s = flush_s
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, "index.json")
+        self.lock_path = self.index_path + ".lock"
+        self.entries = {}       # name -> {group, phash, tone, bytes, used, hits, created}, as last read
+        self.counts = {"hits": 0, "misses": 0, "evictions": 0}
+        self._mtime = None
+        self._pending = {"hits": 0, "misses": 0}      # not yet in index.json
+        self._touched = {}                             # name -> (last used, hits) not yet in index.json
+        self._flushed = time.monotonic()
+        with self.lock:
+            self._sync()
+        atexit.register(self.flush)
+
+    # ── index.json: shared by every process using the directory ────────────────
+    def _read(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        return data.get("entries", {}), {"hits": 0, "misses": 0, "evictions": 0, **data.get("counts", {})}
+
+    def _refresh(self):
+        """Pick up other processes' writes (a stat per lookup; a re-read only when the index changed)."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.entries, self.counts = self._read()
+            self._mtime = mtime
+
+    def _sync(self, add=None):
+        """Under the file lock: re-read the index, merge this process's pending counts and uses
+        (and a new entry), evict past max_bytes, write it back. Caller holds self.lock."""
+        with _file_lock(self.lock_path):
+            entries, counts = self._read()
+            entries = {k: e for k, e in entries.items() if os.path.exists(os.path.join(self.path, k))}
+            for name, (used, hits) in self._touched.items():
+                if name in entries:
+                    e = entries[name]
+                    e["used"] = max(e["used"], used); e["hits"] += hits
+            for k, n in self._pending.items():
+                counts[k] += n
+            if add:
+                entries.update(add)
+            self._evict(entries, counts, keep=set(add or ()))
+            tmp = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"entries": entries, "counts": counts}, f)
+            os.replace(tmp, self.index_path)
+            self._mtime = os.stat(self.index_path).st_mtime_ns
+        self.entries, self.counts = entries, counts
+        self._pending = {"hits": 0, "misses": 0}
+        self._touched = {}
+        self._flushed = time.monotonic()
+
+    def flush(self):
+        """Write pending hit/miss counts and last-used times to the index."""
+        with self.lock:
+            if self._touched or any(self._pending.values()):
+                self._sync()
+
+    def _find(self, group, ph, rgb):
+        best, best_d = None, self.hamming_max + 1
+        for name, e in self.entries.items():
+            if e["group"] == group and max(abs(a - b) for a, b in zip(e.get("tone", rgb), rgb)) <= TONE_MAX:
+                d = hamming(int(e["phash"], 16), ph)
+                if d < best_d:
+                    best, best_d = name, d
+        return best
+
+    def get(self, img, prompt, model):
+        """Path of the cached image for this photo/prompt/model, or None. Counts a hit or miss.
+
+        Counts and last-used times are kept in memory and merged into the index by the
+        next put(), every flush_s seconds, or at exit — a lookup doesn't rewrite it.
+        """
+        group, ph, rgb = group_of(prompt, model), phash(img), tone(img)
+        with self.lock:
+            self._refresh()
+            name = self._find(group, ph, rgb)
+            if name is not None and not os.path.exists(os.path.join(self.path, name)):
+                name = None                                 # evicted by another process
+            if name is None:
+                self._pending["misses"] += 1
+            else:
+                _, hits = self._touched.get(name, (0, 0))
+                self._touched[name] = (time.time(), hits + 1)
+                self._pending["hits"] += 1
+            if time.monotonic() - self._flushed >= self.flush_s:
+                self._sync()
+        return None if name is None else os.path.join(self.path, name)
+
+    def put(self, img, prompt, model, data, ext="jpg"):
+        """Store result bytes; returns their path. Evicts least recently used entries past max_bytes."""
+        group, ph, rgb = group_of(prompt, model), phash(img), tone(img)
+        name = f"{group}-{ph:016x}-{''.join(f'{int(c):02x}' for c in rgb)}.{ext}"
+        file = os.path.join(self.path, name)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, file)
+        now = time.time()
+        with self.lock:
+            self._sync(add={name: {"group": group, "phash": f"{ph:016x}", "tone": rgb, "bytes": len(data),
+                                   "used": now, "created": now, "hits": 0}})
+        return file
+
+    def _evict(self, entries, counts, keep=()):
+        total = sum(e["bytes"] for e in entries.values())
+        for name in sorted(entries, key=lambda k: entries[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            if name in keep:
+                continue
+            total -= entries.pop(name)["bytes"]
+            counts["evictions"] += 1
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            self._sync()
+            lookups = self.counts["hits"] + self.counts["misses"]
+            return {**self.counts, "entries": len(self.entries),
+                    "bytes": sum(e["bytes"] for e in self.entries.values()), "max_bytes": self.max_bytes,
+                    "hit_rate": round(self.counts["hits"] / lookups, 3) if lookups else 0.0}
+
+    def clear(self):
+        with self.lock, _file_lock(self.lock_path):
+            for name in os.listdir(self.path):
+                if name not in ("index.json", os.path.basename(self.lock_path)):
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except OSError:
+                        pass
+            self.entries = {}
+            self.counts = {"hits": 0, "misses": 0, "evictions": 0}
+            self._pending, self._touched = {"hits": 0, "misses": 0}, {}
+            with open(self.index_path, "w") as f:
+                json.dump({"entries": {}, "counts": self.counts}, f)
+            self._mtime = os.stat(self.index_path).st_mtime_ns
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or clear the mockup result cache.")
+    ap.add_argument("cmd", choices=["stats", "clear"])
+    ap.add_argument("--dir", default=CACHE_DIR)
+    args = ap.parse_args()
+    cache = MockupCache(args.dir)
+    if args.cmd == "clear":
+        cache.clear(); print(f"✅ Cleared {args.dir}"); return
+    s = cache.stats()
+    print(f"{s['entries']} entries, {s['bytes'] / 1024 / 1024:.1f} of {s['max_bytes'] / 1024 / 1024:.0f} MB")
+    print(f"hits {s['hits']}  misses {s['misses']}  evictions {s['evictions']}  hit rate {s['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+USA Wrap Co — Mockup Generation
+The one generate call shared by the Gradio app (mockup_app.py) and the batch
+tool (batch.py): cache lookup, image call, download, cache store. render()
+returns when the image is in; render_stream() reports each stage as it happens
+(sent, received, partial frames while downloading, done) for the app's live view.
+
+A backend has request(prompt, image_url) -> a result, download(result) -> byte
+chunks, and sample() -> image bytes (both in one):
+
+  xai      grok-imagine-image over xai_sdk (XAI_API_KEY); the default
+  standin  offline: tints the input photo by a hash of the prompt after a
+           configurable delay, and fails a configurable share of calls, so
+           throughput and the retry path can be measured without the network
+
+Timings: the app appends each request's stages (ms) to timings.jsonl in the
+cache folder.
+Run:  python3 generate.py timings     p50/p95 per stage
+"""
+
+import io, os, sys, json, time, base64, random, hashlib, argparse, urllib.request
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from cache import CACHE_DIR
+
+MODEL = "grok-imagine-image"
+RETRIES = 3
+RETRY_BASE_S = 1.0
+CHUNK = 64 * 1024
+REQUEST_TIMEOUT_S = float(os.environ.get("MOCKUP_REQUEST_TIMEOUT_S", "90"))   # per image call, before retries
+FRAME_EVERY_S = 0.2          # at most this often a partial frame is decoded while downloading
+TIMINGS = os.environ.get("MOCKUP_TIMINGS", os.path.join(CACHE_DIR, "timings.jsonl"))
+
+
+def build_prompt(wrap_desc):
+    return f"Apply wrap exactly: {wrap_desc}. Photorealistic mockup. Match lighting, angle, perspective. No vehicle changes."
+
+
+# ── BACKENDS ─────────────────────────────────────────────────────────────────
+class XaiBackend:
+    model = MODEL
+
+    def __init__(self, api_key=None, timeout=REQUEST_TIMEOUT_S):
+        self.api_key = api_key or os.getenv("XAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("Set XAI_API_KEY first")
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import xai_sdk
+            # without a deadline a stalled call holds a scheduler slot (and its thread) indefinitely
+            self._client = xai_sdk.Client(api_key=self.api_key, timeout=self.timeout)
+        return self._client
+
+    def request(self, prompt, image_url):
+        return self.client.image.sample(prompt=prompt, model=self.model, image_url=image_url).url
+
+    def download(self, url, chunk=CHUNK, timeout=60):
+        # response.url is a temporary link; the bytes are what gets cached
+        with urllib.request.urlopen(url, timeout=timeout) as r:
+            while True:
+                part = r.read(chunk)
+                if not part:
+                    return
+                yield part
+
+    def sample(self, prompt, image_url):
+        return b"".join(self.download(self.request(prompt, image_url)))
+
+
+class StandinBackend:
+    model = "standin"
+
+    def __init__(self, latency_s=0.5, jitter_s=0.2, fail_rate=0.0, download_s=0.0, seed=None):
+        self.latency_s, self.jitter_s, self.fail_rate = latency_s, jitter_s, fail_rate
+        self.download_s = download_s
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def request(self, prompt, image_url):
+        self.calls += 1
+        time.sleep(max(0.0, self.latency_s + self.rng.uniform(-self.jitter_s, self.jitter_s)))
+        if self.rng.random() < self.fail_rate:
+            raise ConnectionError("standin: simulated upstream failure")
+        img = Image.open(io.BytesIO(base64.b64decode(image_url.split(",", 1)[1]))).convert("RGB")
+        h = hashlib.sha256(prompt.encode()).digest()
+        out = ImageOps.colorize(ImageOps.grayscale(img), black=(h[0] // 4, h[1] // 4, h[2] // 4),
+                                white=(128 + h[3] // 2, 128 + h[4] // 2, 128 + h[5] // 2))
+        buf = io.BytesIO(); out.save(buf, format="JPEG", quality=85, progressive=True)
+        return buf.getvalue()
+
+    def download(self, data, chunk=CHUNK):
+        n = max(1, -(-len(data) // chunk))
+        for i in range(0, len(data), chunk):
+            time.sleep(self.download_s / n)
+            yield data[i:i + chunk]
+
+    def sample(self, prompt, image_url):
+        return self.request(prompt, image_url)
+
+
+BACKENDS = {"xai": XaiBackend, "standin": StandinBackend}
+
+
+def make_backend(name, **kw):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r} (have: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kw)
+
+
+# ── GENERATE ─────────────────────────────────────────────────────────────────
+def with_retry(fn, retries=RETRIES, base=RETRY_BASE_S, on_retry=None):
+    """fn() with exponential backoff and jitter; the last error propagates."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            if on_retry:
+                on_retry(attempt + 1)
+            time.sleep(random.uniform(0, base * 2 ** attempt))
+
+
+def render(backend, cache, image_url, img, wrap_desc, retries=RETRIES, on_retry=None):
+    """(path of the mockup, cached?) for one prepared photo and description. Blocking."""
+    hit = cache.get(img, wrap_desc, backend.model)
+    if hit:
+        return hit, True
+    data = with_retry(lambda: backend.sample(build_prompt(wrap_desc), image_url), retries, on_retry=on_retry)
+    return cache.put(img, wrap_desc, backend.model, data), False
+
+
+def partial_frame(buf):
+    """Whatever part of a JPEG has arrived, decoded (rest grey, or coarse for progressive JPEGs); None before the header."""
+    try:
+        img = Image.open(io.BytesIO(buf))
+        if img.format != "JPEG" or len(img.tile) != 1:
+            img.load()                  # other formats only once they are complete
+            return img.convert("RGB")
+        # drive the decoder over the bytes we have, ended by an EOI marker, instead of
+        # Image.load() — that needs the process-wide LOAD_TRUNCATED_IMAGES switch
+        img.load_prepare()
+        codec, extents, offset, args = img.tile[0]
+        decoder = Image._getdecoder(img.mode, codec, args, img.decoderconfig)
+        try:
+            decoder.setimage(img.im, extents)
+            decoder.decode(bytes(buf[offset:]) + b"\xff\xd9")
+        finally:
+            decoder.cleanup()
+        img.tile = []
+        return img.convert("RGB")
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def render_stream(backend, cache, image_url, img, wrap_desc, emit, retries=RETRIES):
+    """render() that calls emit(stage, **info) as it goes; returns (path, cached?).
+
+    Stages: cached | sent, received (request_ms), downloading (frame, bytes), done (download_ms, bytes).
+    """
+    hit = cache.get(img, wrap_desc, backend.model)
+    if hit:
+        emit("cached", path=hit)
+        return hit, True
+    t0 = time.perf_counter()
+    emit("sent")
+    result = with_retry(lambda: backend.request(build_prompt(wrap_desc), image_url), retries,
+                        on_retry=lambda n: emit("retry", attempt=n))
+    t1 = time.perf_counter()
+    emit("received", request_ms=round((t1 - t0) * 1000))
+    buf, last = bytearray(), 0.0
+    for part in backend.download(result):
+        buf += part
+        now = time.perf_counter()
+        if now - last >= FRAME_EVERY_S:
+            last = now
+            emit("downloading", frame=partial_frame(bytes(buf)), bytes=len(buf))
+    path = cache.put(img, wrap_desc, backend.model, bytes(buf))
+    emit("done", path=path, download_ms=round((time.perf_counter() - t1) * 1000), bytes=len(buf))
+    return path, False
+
+
+# ── TIMINGS ──────────────────────────────────────────────────────────────────
+class StageTimer:
+    """Milliseconds per named stage, each measured from the previous mark."""
+
+    def __init__(self):
+        self.t0 = self.last = time.perf_counter()
+        self.stages = {}
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = round((now - self.last) * 1000, 1)
+        self.last = now
+        return self.stages[stage]
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.t0) * 1000, 1)
+
+
+def log_timing(record, path=TIMINGS):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps({"at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **record}) + "\n")
+    except OSError:
+        pass                    # timings are diagnostics; never fail a mockup over them
+
+
+def timing_report(path=TIMINGS):
+    """{stage: (count, p50, p95)} over the logged requests."""
+    per = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            for stage, ms in rec.get("stages", {}).items():
+                per.setdefault(stage, []).append(ms)
+    return {k: (len(v), float(np.percentile(v, 50)), float(np.percentile(v, 95))) for k, v in per.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-stage mockup latency from the timings log.")
+    ap.add_argument("cmd", choices=["timings"])
+    ap.add_argument("--file", default=TIMINGS)
+    args = ap.parse_args()
+    if not os.path.exists(args.file):
+        print(f"❌ No timings yet ({args.file})"); sys.exit(1)
+    print(f"{'stage':14s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s}")
+    for stage, (n, p50, p95) in timing_report(args.file).items():
+        print(f"{stage:14s} {n:5d} {p50:9.0f} {p95:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
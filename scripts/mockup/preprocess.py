@@ -0,0 +1,118 @@
+"""
+USA Wrap Co — Mockup Image Preprocessing
+Gets a vehicle photo ready for the image endpoint without shipping the camera's
+full resolution. Phone photos are 12-48 MP; the model works from about a
+megapixel, so everything above MAX_SIDE is upload time and memory for nothing.
+
+  1. open lazily and let the JPEG decoder scale down while decoding (draft mode),
+     so a 48 MP photo is never fully decoded
+  2. apply the EXIF orientation, then drop the metadata
+  3. resize so the long side is at most MAX_SIDE
+  4. encode JPEG at the highest QUALITY_STEPS entry that fits MAX_JPEG_BYTES
+  5. base64 the one encoded buffer in chunks straight into the data: URL
+
+prepare() returns the data URL, the resized image (for hashing and local
+previews) and a stats dict with the bytes saved against sending the original.
+
+Run:  python3 preprocess.py photo.jpg [more.jpg ...]
+"""
+
+import os, io, sys, time, base64
+
+from PIL import Image, ImageOps
+
+try:                                  # HEIC (iPhone) photos open only with pillow-heif
+    from pillow_heif import register_heif_opener
+except ImportError:
+    HEIF = False
+else:
+    register_heif_opener()
+    HEIF = True
+
+MAX_SIDE = 1024                       # long edge sent to the model
+QUALITY_STEPS = (88, 82, 76, 70, 62)  # tried in order until the JPEG fits
+MAX_JPEG_BYTES = 350_000
+B64_CHUNK = 3 * 64 * 1024             # multiple of 3: chunks encode without padding
+
+
+def b64_chunks(buf, chunk=B64_CHUNK):
+    """Base64 text of a bytes-like object, one chunk at a time (no full-size bytes copy)."""
+    view = memoryview(buf)
+    for i in range(0, len(view), chunk):
+        yield base64.b64encode(view[i:i + chunk]).decode("ascii")
+
+
+def b64_len(n):
+    return (n + 2) // 3 * 4
+
+
+def load(src, max_side=MAX_SIDE):
+    """RGB image, upright, long side <= max_side. `src` is a path, file object or PIL image."""
+    img = src if isinstance(src, Image.Image) else Image.open(src)
+    if img.format == "JPEG":
+        img.draft("RGB", (max_side, max_side))    # decoder-side 1/2, 1/4, 1/8 scaling
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=2.0)
+    return img
+
+
+def encode(img, max_bytes=MAX_JPEG_BYTES, steps=QUALITY_STEPS):
+    """(BytesIO of the JPEG, quality used): the best quality in `steps` under max_bytes, else the last."""
+    for q in steps:
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=q, optimize=True, progressive=True)
+        if out.tell() <= max_bytes:
+            break
+    return out, q
+
+
+def _source_size(src):
+    if isinstance(src, (str, os.PathLike)):
+        return os.path.getsize(src)
+    return None
+
+
+def prepare(src, max_side=MAX_SIDE, max_bytes=MAX_JPEG_BYTES):
+    """(data URL, resized image, stats) for one vehicle photo."""
+    t0 = time.perf_counter()
+    orig = src if isinstance(src, Image.Image) else Image.open(src)
+    source_px = orig.size
+    img = load(orig, max_side)
+    t1 = time.perf_counter()
+    jpeg, quality = encode(img, max_bytes)
+    t2 = time.perf_counter()
+    url = "data:image/jpeg;base64," + "".join(b64_chunks(jpeg.getbuffer()))
+    t3 = time.perf_counter()
+
+    source_bytes = _source_size(src)     # unknown for an in-memory image; re-encoding it would cost what we save
+    stats = {
+        "source_px": list(source_px), "sent_px": list(img.size), "quality": quality,
+        "source_bytes": source_bytes, "jpeg_bytes": jpeg.tell(), "payload_bytes": len(url),
+        "saved_bytes": None if source_bytes is None else max(0, b64_len(source_bytes) - len(url)),
+        "load_ms": round((t1 - t0) * 1000, 1), "encode_ms": round((t2 - t1) * 1000, 1),
+        "b64_ms": round((t3 - t2) * 1000, 1),
+    }
+    return url, img, stats
+
+
+def summary(stats):
+    s = stats
+    saved = f", {s['saved_bytes'] / 1024:.0f} KB saved" if s["saved_bytes"] is not None else ""
+    return (f"{s['source_px'][0]}x{s['source_px'][1]} -> {s['sent_px'][0]}x{s['sent_px'][1]} q{s['quality']}, "
+            f"{s['payload_bytes'] / 1024:.0f} KB sent{saved} "
+            f"({s['load_ms'] + s['encode_ms'] + s['b64_ms']:.0f} ms)")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 preprocess.py photo.jpg [more.jpg ...]"); sys.exit(1)
+    for path in sys.argv[1:]:
+        _, _, stats = prepare(path)
+        print(f"✅ {os.path.basename(path)}: {summary(stats)}")
+
+
+if __name__ == "__main__":
+    main()
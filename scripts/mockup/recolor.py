@@ -0,0 +1,322 @@
+"""
+USA Wrap Co — Local Color-Change Preview
+"Matte black", "satin nardo grey", "gloss #1f4e8c": a colour change doesn't need
+the image model. This recolours the paint in the photo directly — about 75 ms
+for the first finish at the preprocessed size (1024 px), 25 ms for each other
+finish — and leaves the AI path for graphic designs.
+
+  parse_color()   wrap description -> (rgb, finish), or None when it asks for
+                  more than a colour (graphics, flames, chrome, logos ...)
+  masks           template_mask(): the body outline from a side-view template
+                  in public/templates (minus windows and wheels), scaled to the
+                  image; segment_mask(): a classical fallback for photos. It
+                  finds the dominant non-background colour in the middle of the
+                  frame and keeps the pixels near it
+  Paint           the masked pixels converted to CIELAB once; .recolor() per
+                  colour and finish, so a row of finishes pays for one conversion
+  recolor()       CIELAB: a/b are replaced by the target's, L keeps each pixel's
+                  offset from the paint's mean so shading survives, and the
+                  finish shapes the highlights (gloss keeps them, satin softens
+                  them, matte flattens them)
+  placeholder()   a blurred low-res tint shown while the image model renders
+
+Run:  python3 recolor.py photo.jpg "satin blue" [--template sedan] [--out preview.jpg]
+"""
+
+import os, re, sys, time, argparse, functools
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+TEMPLATE_DIR = os.path.join(ROOT, "public", "templates")
+
+COLORS = {
+    "black": "#111111", "white": "#f2f2f0", "pearl white": "#eeeee8", "red": "#b3141b", "candy red": "#9e0c18",
+    "burgundy": "#5e1224", "maroon": "#5a1a1a", "orange": "#e0621b", "yellow": "#f2c318", "gold": "#b8912f",
+    "bronze": "#8c6239", "copper": "#a4582e", "champagne": "#cdb99a", "tan": "#b49a72", "beige": "#d6c7a6",
+    "brown": "#5b3a24", "green": "#1f7a3a", "british racing green": "#0e3b24", "army green": "#4b5320",
+    "olive": "#5b5e2a", "lime": "#84c225", "teal": "#137a7f", "cyan": "#1fb5c9", "blue": "#1f4fa8",
+    "royal blue": "#233fa0", "navy": "#14213d", "navy blue": "#14213d", "midnight blue": "#1a2238",
+    "sky blue": "#6fa8dc", "baby blue": "#9cc3e6", "purple": "#5b2a86", "pink": "#e07aa5", "grey": "#6e7073",
+    "gray": "#6e7073", "nardo grey": "#7c7f80", "nardo gray": "#7c7f80", "silver": "#b8bbbd",
+    "charcoal": "#36393d", "gunmetal": "#2c3539",
+}
+FINISH_WORDS = {"gloss": "gloss", "glossy": "gloss", "high gloss": "gloss", "metallic": "gloss",
+                "satin": "satin", "silk": "satin", "frozen": "satin",
+                "matte": "matte", "matt": "matte", "flat": "matte"}
+SHADE_WORDS = {"dark": 0.7, "deep": 0.75, "light": 1.35, "bright": 1.15, "pale": 1.5}
+FILLER = {"a", "an", "in", "the", "full", "wrap", "wrapped", "color", "colour", "change", "vinyl", "paint",
+          "finish", "film", "whole", "vehicle", "truck", "van", "car", "all", "over", "-", "and", "to"}
+
+# finish -> (shading kept, highlight kept above the knee, original chroma kept)
+FINISHES = {"gloss": (1.0, 1.0, 0.15), "satin": (0.85, 0.45, 0.08), "matte": (0.7, 0.15, 0.0)}
+HIGHLIGHT_KNEE = 10.0        # L units above the paint's mean where a highlight starts
+
+
+# ── COLOR DESCRIPTIONS ───────────────────────────────────────────────────────
+def hex_rgb(h):
+    h = h.lstrip("#")
+    return tuple(int(h[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def parse_color(text):
+    """(rgb, finish) for a plain colour change, else None."""
+    s = " " + re.sub(r"[,.!/]+", " ", (text or "").lower()) + " "
+    finish, shade, rgb = "gloss", 1.0, None
+    m = re.search(r"#([0-9a-f]{6})\b", s)
+    if m:
+        rgb = hex_rgb(m.group(1)); s = s.replace(m.group(0), " ")
+    for name in sorted(COLORS, key=len, reverse=True):        # "navy blue" before "blue"
+        if f" {name} " in s and rgb is None:
+            rgb = hex_rgb(COLORS[name]); s = s.replace(f" {name} ", " ", 1)
+    for word in sorted(FINISH_WORDS, key=len, reverse=True):
+        if f" {word} " in s:
+            finish = FINISH_WORDS[word]; s = s.replace(f" {word} ", " ", 1)
+    for word, k in SHADE_WORDS.items():
+        if f" {word} " in s:
+            shade = k; s = s.replace(f" {word} ", " ", 1)
+    if rgb is None or any(w not in FILLER for w in s.split()):
+        return None
+    if shade != 1.0:
+        L, a, b = srgb_to_lab(np.array([[rgb]], dtype=np.uint8))[0, 0]
+        L = min(96.0, L * shade) if shade < 1 else L + (96.0 - L) * (shade - 1) / shade
+        rgb = tuple(int(v) for v in lab_to_srgb(np.array([[[L, a, b]]], dtype=np.float32))[0, 0])
+    return rgb, finish
+
+
+# ── COLOR SPACE ──────────────────────────────────────────────────────────────
+_M = np.array([[0.4124, 0.3576, 0.1805], [0.2126, 0.7152, 0.0722], [0.0193, 0.1192, 0.9505]], dtype=np.float32)
+_WHITE = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+_M_IN = (_M / _WHITE[:, None]).T                         # rgb-linear -> xyz/white, as a right-multiply
+_M_OUT = np.linalg.inv(_M / _WHITE[:, None]).T.astype(np.float32)
+_c = np.arange(256, dtype=np.float64) / 255
+_TO_LIN = np.where(_c <= 0.04045, _c / 12.92, ((_c + 0.055) / 1.055) ** 2.4).astype(np.float32)
+_GAMMA_N = 4096
+_l = np.arange(_GAMMA_N, dtype=np.float64) / (_GAMMA_N - 1)
+_TO_SRGB = np.round(255 * np.where(_l <= 0.0031308, 12.92 * _l, 1.055 * _l ** (1 / 2.4) - 0.055)).astype(np.uint8)
+_EPS, _K = 216 / 24389, 24389 / 27
+
+
+def srgb_to_lab(rgb):
+    """uint8 (..., 3) -> float32 CIELAB (D65)."""
+    t = _TO_LIN[rgb] @ _M_IN
+    f = np.where(t > _EPS, np.cbrt(t), (_K * t + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def lab_to_srgb(lab):
+    """float32 CIELAB (..., 3) -> uint8 sRGB; the gamma curve is a lookup table."""
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    t = np.where(f > 6 / 29, f * f * f, (116 * f - 16) / _K)
+    lin = np.clip(t @ _M_OUT, 0, 1)
+    return _TO_SRGB[(lin * (_GAMMA_N - 1) + 0.5).astype(np.intp)]
+
+
+# ── MASKS ────────────────────────────────────────────────────────────────────
+def _path_points(d, steps=12):
+    """Polygon for an SVG path made of M/L/Q/Z (what the templates use)."""
+    nums = [float(v) for v in re.findall(r"-?\d+(?:\.\d+)?", d)]
+    cmds = re.findall(r"[MLQZ]", d.upper())
+    pts, i = [], 0
+    for c in cmds:
+        if c in "ML":
+            pts.append((nums[i], nums[i + 1])); i += 2
+        elif c == "Q":
+            (x0, y0), (cx, cy), (x1, y1) = pts[-1], (nums[i], nums[i + 1]), (nums[i + 2], nums[i + 3]); i += 4
+            for k in range(1, steps + 1):
+                t = k / steps
+                pts.append(((1 - t) ** 2 * x0 + 2 * (1 - t) * t * cx + t * t * x1,
+                            (1 - t) ** 2 * y0 + 2 * (1 - t) * t * cy + t * t * y1))
+    return pts
+
+
+@functools.lru_cache(maxsize=32)
+def template_mask(name, size):
+    """Body mask (L image) from public/templates/<name>.svg, its viewBox stretched over `size`.
+
+    Body: closed outlines drawn at stroke-width 3 (paths and rects). Cut out:
+    closed solid stroke-width-2 paths (windows) and stroke-width-3 circles (wheels).
+    Cached per name and size; the returned image is shared, so don't draw on it.
+    """
+    path = name if name.endswith(".svg") else os.path.join(TEMPLATE_DIR, f"{name}.svg")
+    with open(path) as f:
+        svg = f.read()
+    vb = [float(v) for v in re.search(r'viewBox="([^"]+)"', svg).group(1).split()]
+    sx, sy = size[0] / vb[2], size[1] / vb[3]
+    mask = Image.new("L", size, 0)
+    draw = ImageDraw.Draw(mask)
+
+    def attrs(tag):
+        return dict(re.findall(r'([\w-]+)="([^"]*)"', tag))
+
+    def scaled(pts):
+        return [((x - vb[0]) * sx, (y - vb[1]) * sy) for x, y in pts]
+
+    cuts = []
+    for tag in re.findall(r"<(?:path|rect|circle)\b[^>]*>", svg):
+        a = attrs(tag)
+        width = a.get("stroke-width")
+        if tag.startswith("<path"):
+            closed = a["d"].strip().upper().endswith("Z")
+            pts = scaled(_path_points(a["d"]))
+            if closed and width == "3":
+                draw.polygon(pts, fill=255)
+            elif closed and width == "2" and "stroke-dasharray" not in a:
+                cuts.append(("poly", pts))
+        elif tag.startswith("<rect") and width == "3":
+            x, y, w, h = (float(a[k]) for k in ("x", "y", "width", "height"))
+            draw.rectangle(scaled([(x, y), (x + w, y + h)]), fill=255)
+        elif tag.startswith("<circle") and width == "3":
+            cx, cy, r = (float(a[k]) for k in ("cx", "cy", "r"))
+            cuts.append(("ellipse", scaled([(cx - r, cy - r), (cx + r, cy + r)])))
+    for kind, pts in cuts:
+        (draw.polygon if kind == "poly" else draw.ellipse)(pts, fill=0)
+    return mask
+
+
+def _kmeans(x, k, iters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = x[rng.choice(len(x), k, replace=False)]
+    for _ in range(iters):
+        labels = ((centers ** 2).sum(1) - 2 * x @ centers.T).argmin(1)      # |x|² is the same for every centre
+        n = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, x[:, c], minlength=k) for c in range(x.shape[1])], axis=1)
+        centers = np.where(n[:, None] > 0, sums / np.maximum(n, 1)[:, None], centers)
+    return centers, labels
+
+
+def segment_mask(img, work=192, k=5):
+    """Paint mask (L image, img.size) by colour: the dominant non-background cluster mid-frame."""
+    small = img.convert("RGB").copy(); small.thumbnail((work, work))
+    lab = srgb_to_lab(np.asarray(small))
+    h, w = lab.shape[:2]
+    feats = lab * np.array([0.5, 1.0, 1.0], dtype=np.float32)         # lighting varies more than hue
+    border = np.concatenate([feats[:h // 12].reshape(-1, 3), feats[-h // 12:].reshape(-1, 3),
+                             feats[:, :w // 12].reshape(-1, 3), feats[:, -w // 12:].reshape(-1, 3)])
+    core = feats[int(h * .3):int(h * .75), int(w * .2):int(w * .8)].reshape(-1, 3)
+    centers, labels = _kmeans(core, k)
+    bg_dist = np.sqrt(((centers[:, None] - border[None]) ** 2).sum(-1)).mean(1)
+    share = np.bincount(labels, minlength=k) / len(labels)
+    # glass, tyres and shadow are dark too; a dark cluster wins only by a clear margin
+    dark = np.where(centers[:, 0] < 12.5, 0.5, 1.0)              # L < 25 (feats halve L)
+    paint = centers[int(np.argmax(share * np.clip(bg_dist / 25, 0, 1) * dark))]
+
+    dist = np.sqrt(((feats - paint) ** 2).sum(-1))
+    tol = max(10.0, float(np.percentile(np.sqrt(((core - paint) ** 2).sum(-1)), 35)) * 1.6)
+    m = Image.fromarray(((dist < tol) * 255).astype(np.uint8))
+    m = m.filter(ImageFilter.MaxFilter(3)).filter(ImageFilter.MinFilter(3))     # close pinholes
+    m = m.filter(ImageFilter.MinFilter(3)).filter(ImageFilter.MaxFilter(3))     # drop specks
+    return m.resize(img.size, Image.BILINEAR)
+
+
+# ── RECOLOR ──────────────────────────────────────────────────────────────────
+class Paint:
+    """The painted pixels of one photo, converted to CIELAB once; recolor() per colour and finish.
+
+    Conversion and masking are most of the cost, so a set of previews (one per
+    finish) shares them: Paint(img, mask) once, then paint.recolor(rgb, f) each.
+    """
+
+    def __init__(self, img, mask=None, feather=2):
+        t0 = time.perf_counter()
+        img = img.convert("RGB")
+        if mask is None:
+            mask = segment_mask(img)            # already soft-edged by its upscale
+        elif feather:
+            mask = mask.filter(ImageFilter.GaussianBlur(feather))
+        m8 = np.asarray(mask)
+        self.img, self.src = img, np.asarray(img)
+        self.sel = np.flatnonzero(m8 > 0)       # only masked pixels are converted
+        self.region = self.src.reshape(-1, 3)[self.sel]
+        self.alpha = (m8.reshape(-1)[self.sel].astype(np.float32) / 255)[:, None]
+        lab = srgb_to_lab(self.region)
+        self.mean = (lab * self.alpha).sum(0) / max(float(self.alpha.sum()), 1e-6)
+        self.d = lab[:, 0] - self.mean[0]                   # L offset from the paint's mean
+        self.ab = lab[:, 1:] - self.mean[1:]                # chroma offset
+        self.soft = np.flatnonzero(self.alpha[:, 0] < 1)    # edge pixels, blended with the original
+        self.ms = round((time.perf_counter() - t0) * 1000, 1)
+
+    def recolor(self, rgb, finish="gloss"):
+        """(recoloured copy, stats)."""
+        t0 = time.perf_counter()
+        if not len(self.sel):
+            return self.img, {"ms": self.ms, "coverage": 0.0}
+        target = srgb_to_lab(np.array([[rgb]], dtype=np.uint8))[0, 0]
+        shade, high, chroma = FINISHES[finish]
+
+        d = np.where(self.d > HIGHLIGHT_KNEE, HIGHLIGHT_KNEE + (self.d - HIGHLIGHT_KNEE) * high, self.d)
+        L = np.clip(target[0] + shade * d, 0, 100)
+        out = np.empty((len(L), 3), dtype=np.float32)
+        out[:, 0] = L
+        out[:, 1:] = target[1:] + chroma * self.ab
+        if high > 0.5:                                                   # gloss highlights go toward white
+            out[:, 1:] *= 1 - np.clip((L - 85) / 15, 0, 1)[:, None]
+        new = lab_to_srgb(out)
+        soft, a = self.soft, self.alpha[self.soft]
+        new[soft] = np.clip(new[soft] * a + self.region[soft] * (1 - a) + 0.5, 0, 255).astype(np.uint8)
+
+        result = self.src.copy()
+        result.reshape(-1, 3)[self.sel] = new
+        return Image.fromarray(result), {"ms": round(self.ms + (time.perf_counter() - t0) * 1000, 1),
+                                         "coverage": round(float(self.alpha.sum()) / self.src[..., 0].size, 3)}
+
+
+def recolor(img, rgb, finish="gloss", mask=None, feather=2):
+    """Recoloured copy of `img`. `mask` is an L image (255 = paint); None segments by colour."""
+    return Paint(img, mask, feather).recolor(rgb, finish)
+
+
+def templates():
+    """Side-view template names in public/templates."""
+    try:
+        return sorted(f[:-4] for f in os.listdir(TEMPLATE_DIR) if f.endswith(".svg"))
+    except OSError:
+        return []
+
+
+def preview(img, wrap_desc, template=None):
+    """(image, stats) for a plain colour description, or None to use the image model."""
+    spec = parse_color(wrap_desc)
+    if spec is None:
+        return None
+    mask = template_mask(template, img.size) if template else None
+    out, stats = recolor(img, spec[0], spec[1], mask)
+    return out, {**stats, "rgb": "#%02x%02x%02x" % spec[0], "finish": spec[1]}
+
+
+def placeholder(img, wrap_desc, side=256):
+    """Low-res stand-in shown while the image model works: the body in the description's first colour
+    name (graphics and all) when it has one, else a soft blurred copy of the photo. Returned at img.size."""
+    small = img.convert("RGB"); small.thumbnail((side, side))
+    s = " " + re.sub(r"[^a-z0-9# ]+", " ", (wrap_desc or "").lower()) + " "
+    m = re.search(r"#([0-9a-f]{6})\b", s)
+    hits = [(s.find(f" {n} "), -len(n), n) for n in COLORS if f" {n} " in s]
+    rgb = hex_rgb(m.group(1)) if m else hex_rgb(COLORS[min(hits)[2]]) if hits else None
+    if rgb is None:
+        out = Image.blend(small, small.convert("L").convert("RGB"), 0.6).filter(ImageFilter.GaussianBlur(3))
+    else:
+        out = recolor(small, rgb, "satin")[0].filter(ImageFilter.GaussianBlur(1.5))
+    return out.resize(img.size, Image.BILINEAR)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local colour-change preview.")
+    ap.add_argument("photo")
+    ap.add_argument("color", help='e.g. "satin blue", "matte #222222"')
+    ap.add_argument("--template", help="side-view template name in public/templates (image must be that view)")
+    ap.add_argument("--out", default="recolor_preview.jpg")
+    args = ap.parse_args()
+    import preprocess
+    img = preprocess.load(args.photo)
+    res = preview(img, args.color, args.template)
+    if res is None:
+        print(f"❌ Not a plain colour change: {args.color!r} — use the image model"); sys.exit(1)
+    out, stats = res
+    out.save(args.out, quality=90)
+    print(f"✅ {stats['finish']} {stats['rgb']} over {stats['coverage']:.0%} of the frame in {stats['ms']:.0f} ms -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
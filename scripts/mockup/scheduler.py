@@ -0,0 +1,144 @@
+"""
+USA Wrap Co — Mockup Request Scheduler
+Runs image generations concurrently, within a fixed number of slots (the
+endpoint's rate limit), and shares the slots fairly between users. Without the
+scheduler, one slow call holds up everyone behind it. With a plain FIFO, one
+tablet asking for four variants would starve the next customer.
+
+  slots     at most `concurrency` jobs run at once
+  fairness  waiting jobs are queued per user and dispatched round-robin, so
+            each user with work waiting gets the next free slot in turn
+  timeout   a job that runs longer than its timeout fails with TimeoutError
+  cancel    cancelling a job's future (the user left, Gradio closed the
+            generator) drops it from the queue, or gives up on it if it is running
+
+The scheduler lives on one event loop; job functions are blocking calls, run on
+the scheduler's own pool of `concurrency` threads. A thread cannot be stopped:
+a job that timed out or was cancelled resolves its future at once, but keeps
+its slot until its thread returns, so no more than `concurrency` calls are ever
+in flight and the pool never queues behind abandoned work. Bound the call
+itself (the backends' request timeout) to bound how long that lasts.
+
+  sched = FairScheduler(concurrency=4)
+  async for i, result, error in sched.as_completed(user, [fn1, fn2, fn3], timeout=90): ...
+"""
+
+import asyncio, time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+
+CONCURRENCY = 4
+TIMEOUT_S = 120.0
+
+
+class Job:
+    __slots__ = ("user", "fn", "timeout", "future", "queued", "started")
+
+    def __init__(self, user, fn, timeout, future):
+        self.user, self.fn, self.timeout, self.future = user, fn, timeout, future
+        self.queued, self.started = time.monotonic(), None
+
+
+class FairScheduler:
+    def __init__(self, concurrency=CONCURRENCY, timeout=TIMEOUT_S):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.waiting = OrderedDict()        # user -> deque[Job]; dict order is the round-robin order
+        self.running = set()                # asyncio.Task
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mockup-job")
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "timed_out": 0, "cancelled": 0,
+                      "abandoned": 0, "wait_s": 0.0, "run_s": 0.0}
+
+    # ── queue ─────────────────────────────────────────────────────────────────
+    def submit(self, user, fn, timeout=None):
+        """Queue `fn()` (a blocking call) for `user`; returns a future for its result."""
+        fut = asyncio.get_running_loop().create_future()
+        self.waiting.setdefault(user, deque()).append(Job(user, fn, timeout or self.timeout, fut))
+        self.stats["submitted"] += 1
+        fut.add_done_callback(lambda f: self._dispatch())
+        self._dispatch()
+        return fut
+
+    def _next(self):
+        """Oldest job of the user at the head of the rotation; that user moves to the back."""
+        while self.waiting:
+            user, jobs = next(iter(self.waiting.items()))
+            job = jobs.popleft()
+            self.waiting.pop(user)
+            if jobs:
+                self.waiting[user] = jobs
+            if job.future.cancelled():
+                self.stats["cancelled"] += 1
+                continue
+            return job
+        return None
+
+    def _dispatch(self):
+        while len(self.running) < self.concurrency:
+            job = self._next()
+            if job is None:
+                return
+            task = asyncio.ensure_future(self._run(job))
+            self.running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self.running.discard(task)
+        self._dispatch()
+
+    async def _run(self, job):
+        job.started = time.monotonic()
+        self.stats["wait_s"] += job.started - job.queued
+        work = asyncio.wrap_future(self.pool.submit(job.fn))
+        try:
+            # returns when the call finishes, the caller cancels, or the timeout passes
+            await asyncio.wait([work, job.future], timeout=job.timeout, return_when=asyncio.FIRST_COMPLETED)
+            if work.done():
+                err = work.exception()
+                self.stats["failed" if err else "done"] += 1
+                if job.future.done():
+                    pass
+                elif err:
+                    job.future.set_exception(err)
+                else:
+                    job.future.set_result(work.result())
+                return
+            if job.future.cancelled():
+                self.stats["cancelled"] += 1
+            else:
+                self.stats["timed_out"] += 1
+                job.future.set_exception(TimeoutError(f"no result after {job.timeout:.0f} s"))
+            # the slot stays taken until the thread is free again
+            self.stats["abandoned"] += 1
+            await asyncio.wait([work])
+        finally:
+            self.stats["run_s"] += time.monotonic() - job.started
+
+    # ── helpers ───────────────────────────────────────────────────────────────
+    async def as_completed(self, user, fns, timeout=None):
+        """Run `fns` for one user; yields (index, result, error) as each finishes.
+
+        Closing the generator early (the caller went away) cancels whatever is
+        still queued or running.
+        """
+        futures = [self.submit(user, fn, timeout) for fn in fns]
+        index = {f: i for i, f in enumerate(futures)}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for f in sorted(done, key=index.get):
+                    err = f.exception()
+                    yield index[f], (None if err else f.result()), err
+        finally:
+            for f in pending:
+                f.cancel()
+
+    def close(self):
+        """Stop taking jobs; threads still running finish in the background."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def queued(self, user=None):
+        if user is not None:
+            return len(self.waiting.get(user, ()))
+        return sum(len(j) for j in self.waiting.values())
@@ -0,0 +1,179 @@
+"""
+USA Wrap Co — Layout Benchmark
+Renders every document with the hand-written generator and with its compiled
+template (layouts/<name>.py), asserts the two PDFs are byte-identical and times both.
+
+The two paths are timed in alternating runs with the garbage collector paused, so
+drift, GC pauses and cache warmth land on both sides; running all hand renders
+and then all compiled ones showed swings of +-40% that were only run order. A
+difference inside the noise band (the larger run-to-run deviation of the two,
+divided by sqrt(runs)) is printed as '='.
+
+Usage:  python3 bench_layout.py [--runs 60] [--only estimate,invoice]
+Exit code 1 if any compiled render differs from the hand-written one.
+'PDF_LAYOUT=compiled' only uses the templates in layout.COMPILED_FASTER.
+"""
+
+import gc, sys, io, time, argparse, statistics, importlib
+
+from reportlab.pdfgen import canvas as rl_canvas
+
+from layout import load_template, COMPILED_FASTER
+
+DOCS = {                                   # name -> (module, hand render fn)
+    'estimate':   ('gen_estimate',   'gen_estimate'),
+    'invoice':    ('gen_invoice',    'gen_invoice'),
+    'salesorder': ('gen_salesorder', 'gen_salesorder'),
+    'workorder':  ('gen_workorder',  'gen_wo'),
+}
+
+
+# ── SYNTHETIC PAYLOADS ────────────────────────────────────────────────────────
+def _money(v): return f'${v:,.2f}'
+
+def estimate_payload(n):
+    items = [{'name': f'Full Wrap - Unit {i+1}', 'amount': _money(3200 + i*45), 'qty': '1',
+              'vehicle': '2023 Ford Transit 250 High Roof' if i % 2 else '',
+              'sub': 'Avery MPI 1105 EZ-RS + DOL 1060 Gloss',
+              'bullets': ['Design, print and install', 'Door handles and mirrors wrapped',
+                          'Includes removal of existing decals, adhesive cleanup and a full paint-safe '
+                          'surface prep across every panel before install'][:1 + i % 3]}
+             for i in range(n)]
+    return {'ref': 'EST-2041', 'date': 'Oct 19, 2026', 'status': 'Estimate Sent', 'valid_days': 30,
+            'client_name': 'Harbor Freightways', 'client_phone': '(253) 555-0101',
+            'client_email': 'fleet@harborfw.com', 'client_addr': '900 Dock St, Tacoma, WA',
+            'client_zip': '98402', 'agent': 'Sam R.', 'install_date': 'Nov 3, 2026',
+            'line_items': items, 'subtotal': _money(sum(3200 + i*45 for i in range(n))),
+            'inclusions': ['12-month workmanship warranty', 'Pre & post-install photos',
+                           'Design proof with 2 revisions'],
+            'primary_film': 'Avery MPI 1105 EZ-RS', 'overlaminate': 'Avery DOL 1060',
+            'client_brand': {'tagline': 'On time, every tide', 'industry': 'Freight',
+                             'website': 'harborfw.com', 'colors': ['#0e3b5c', '#f2a900', '#ffffff'],
+                             'color_names': ['Harbor Navy', 'Signal Gold', 'White']}}
+
+def invoice_payload(n):
+    return {'ref': 'INV-3310', 'date': 'Oct 19, 2026', 'due_date': 'Nov 2, 2026',
+            'status': 'Balance Due', 'status_color': 'due', 'client_name': 'Harbor Freightways',
+            'client_phone': '(253) 555-0101', 'client_email': 'fleet@harborfw.com',
+            'client_addr': '900 Dock St, Tacoma, WA', 'linked_ref': 'SO-1882', 'install_date': 'Oct 12',
+            'agent': 'Sam R.', 'po_number': 'PO-7781',
+            'line_items': [{'name': f'Fleet Wrap - Unit {i+1}', 'desc': 'Avery MPI 1105 + DOL 1060 gloss',
+                            'qty': '1', 'amount': _money(3200 + i*45)} for i in range(n)],
+            'payments': [{'note': 'Design deposit', 'amount': '$250.00', 'date': 'Sep 30', 'method': 'Card'}],
+            'subtotal': '$9,600.00', 'tax_label': 'Sales Tax (8.1%)', 'tax_amount': '$777.60',
+            'deposit_paid': '$250.00', 'balance': '$10,127.60',
+            'notes': 'Unit 3 had a cracked rear bumper cap at intake; photographed and noted on the work order. '
+                     'Warranty certificates are in the customer portal.'}
+
+def salesorder_payload(n):
+    return {'ref': 'SO-1882', 'est_ref': 'EST-2041', 'date': 'Oct 1, 2026', 'install_date': 'Oct 12',
+            'status': 'APPROVED', 'priority': 'HIGH', 'division': 'WRAPS', 'agent': 'Sam R.',
+            'agent_type': 'outbound', 'installer': 'Dee K.', 'designer': 'Lou P.',
+            'client_name': 'Harbor Freightways', 'client_phone': '(253) 555-0101',
+            'client_email': 'fleet@harborfw.com', 'client_company': 'Harbor Freightways LLC',
+            'vehicle': '2023 Ford Transit 250', 'vin': '1FTBR3X8XPKA00000', 'color': 'White', 'plates': 'C12345X',
+            'scope': 'Full wrap + roof', 'sqft': 612, 'material': 'Avery MPI 1105',
+            'panels': ['Hood', 'Roof', 'Driver side', 'Passenger side', 'Rear doors', 'Bumper'],
+            'line_items': [{'name': f'Fleet Wrap - Unit {i+1}', 'description': 'Full wrap, gloss laminate',
+                            'revenue': 3200 + i*45, 'material_cost': 610, 'labor_cost': 420 + i,
+                            'design_cost': 90} for i in range(n)],
+            'sale_price': 9600, 'material_cost': 1830, 'installer_pay': 1260, 'design_fee': 270,
+            'production_bonus': 96, 'gross_profit': 6144, 'gpm': 64.0, 'gpm_target': 75, 'gpm_bonus_thresh': 73,
+            'torq_completed': True, 'gpm_bonus_earned': False, 'commission_type': 'outbound',
+            'commission_base': 7, 'commission_bonus': 1, 'commission_rate': 8, 'commission_amount': 491.52,
+            'agent_notes': 'Customer wants all three units back before the Nov 1 route change.',
+            'prod_notes': 'Print in two batches; laminate cure overnight.',
+            'internal_notes': 'Net-15 approved by owner.'}
+
+def workorder_payload(n):
+    return {'ref': 'WO-0912', 'so_ref': 'SO-1882', 'date': 'Oct 11, 2026', 'priority': 'HIGH',
+            'installer': 'Dee K.', 'bay': 'Bay 2', 'est_hours': 14, 'installer_pay': '$1,260',
+            'year': '2023', 'make': 'Ford', 'model': 'Transit 250 High Roof', 'color': 'White',
+            'vin': '1FTBR3X8XPKA00000', 'plate': 'C12345X', 'mileage': '18,220',
+            'client_name': 'Harbor Freightways', 'client_contact': 'Pat M.', 'client_phone': '(253) 555-0101',
+            'drop_off': 'Oct 11, 8AM', 'pick_up': 'Oct 13, 4PM', 'sqft': 612, 'linear_ft': '148 LF',
+            'scope': 'Full wrap + roof', 'material': 'Avery MPI 1105 + DOL 1060',
+            'panels': [f'Panel {i+1}' for i in range(n)],
+            'measurements': {'make': 'Ford', 'model': 'Transit 250 High Roof', 'year_range': '2015-2024',
+                             'side_width': 236.0, 'side_height': 82.0, 'side_sqft': 134.4,
+                             'back_width': 70.0, 'back_height': 76.0, 'back_sqft': 36.9,
+                             'hood_width': 62.0, 'hood_length': 30.0, 'hood_sqft': 12.9,
+                             'roof_width': 68.0, 'roof_length': 200.0, 'roof_sqft': 94.4,
+                             'total_sqft': 413.0},
+            'special_notes': 'Remove the old DOT numbers before install; customer supplies new decals.'}
+
+PAYLOADS = {
+    'estimate':   estimate_payload,
+    'invoice':    invoice_payload,
+    'salesorder': salesorder_payload,
+    'workorder':  workorder_payload,
+}
+SIZES = [('small', 2), ('typical', 8), ('large', 40)]
+
+
+# ── BENCH ─────────────────────────────────────────────────────────────────────
+def render(fn, data):
+    """Deterministic PDF bytes (invariant=1, no compression) so outputs diff cleanly."""
+    buf = io.BytesIO()
+    c = rl_canvas.Canvas(buf, invariant=1, pageCompression=0)
+    fn(c, data)
+    c.save()
+    return buf.getvalue()
+
+def draw_only(fn, data):
+    """Time just the drawing calls — the part a layout engine can speed up."""
+    c = rl_canvas.Canvas(io.BytesIO(), invariant=1, pageCompression=0)
+    t0 = time.perf_counter(); fn(c, data); return time.perf_counter() - t0
+
+def bench(hand, tpl, data, runs, warmup=5):
+    """(hand ms, compiled ms, noise ms): medians over alternating runs."""
+    for _ in range(warmup):
+        draw_only(hand, data); draw_only(tpl, data)
+    th, tc = [], []
+    gc.collect(); gc.disable()
+    try:
+        for i in range(runs):
+            if i % 2:
+                th.append(draw_only(hand, data)); tc.append(draw_only(tpl, data))
+            else:
+                tc.append(draw_only(tpl, data)); th.append(draw_only(hand, data))
+    finally:
+        gc.enable()
+    noise = max(statistics.pstdev(th), statistics.pstdev(tc)) / runs ** 0.5
+    return statistics.median(th) * 1000, statistics.median(tc) * 1000, noise * 1000
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument('--runs', type=int, default=60)
+    ap.add_argument('--only', default='')
+    args = ap.parse_args()
+    only = [n for n in args.only.split(',') if n] or list(DOCS)
+
+    failed = False
+    print(f"{'doc':<11}{'payload':<9}{'pages':>6}{'hand ms':>10}{'compiled ms':>13}{'speedup':>9}{'':>3}  identical")
+    for name in only:
+        modname, fnname = DOCS[name]
+        mod = importlib.import_module(modname)
+        hand = getattr(mod, fnname)
+        t0 = time.perf_counter()
+        tpl = load_template(name, vars(mod))
+        compile_ms = (time.perf_counter() - t0) * 1000
+        for label, n in SIZES:
+            data = PAYLOADS[name](n)
+            a, b = render(hand, data), render(tpl, data)
+            same = a == b
+            failed |= not same
+            pages = a.count(b'/Type /Page\n')
+            th, tc, noise = bench(hand, tpl, data, args.runs)
+            mark = '=' if abs(th - tc) <= noise else ('+' if tc < th else '-')
+            print(f'{name:<11}{label:<9}{pages:>6}{th:>10.3f}{tc:>13.3f}{th/tc:>8.2f}x{mark:>3}  {"yes" if same else "NO"}')
+        print(f'{"":<11}compile {compile_ms:.1f} ms, {tpl.op_count} ops, '
+              f'{tpl.source.count(chr(10))} generated lines, '
+              f'{"used" if name in COMPILED_FASTER else "not used"} by PDF_LAYOUT=compiled')
+    if failed:
+        print('compiled output differs from the hand-written generator', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+USA Wrap Co — Page-Parallel Benchmark
+Renders a long invoice and sales order serially and with 2..N workers, checks that
+every page's content stream matches the serial render, and prints timings.
+'walk %' is the pagination pass (what a worker spends re-walking the pages before
+its range) as a share of the serial render.
+
+--save records the speedups in parallel.PROFILE for this host; run_render() only
+goes parallel for a document kind whose best measured speedup reached
+parallel.MIN_SPEEDUP. Run it on the machine that serves the PDFs.
+
+Usage:  python3 bench_parallel.py [--pages 500] [--workers 2,4,8] [--save]
+Exit code 1 if any parallel page differs from the serial one.
+"""
+
+import os, sys, io, re, time, argparse
+
+# long documents are the point here — lift the production ceilings for the run
+os.environ.setdefault('PDF_LIMIT_MAX_PAGES', '5000')
+os.environ.setdefault('PDF_LIMIT_MAX_LINE_ITEMS', '50000')
+os.environ.setdefault('PDF_LIMIT_DEADLINE_S', '600')
+
+from reportlab.lib.pagesizes import letter
+
+from guardrails import GuardedCanvas, RenderGuard
+from parallel import paginate, render_parallel, save_profile, usable_cpus, MIN_SPEEDUP
+from stitch import read_pdf, page_order
+import bench_layout
+
+ROWS_PER_PAGE = {'invoice': 27, 'salesorder': 55}   # rows that fit a continuation page
+
+
+def serial(kind, draw):
+    buf = io.BytesIO()
+    c = GuardedCanvas(buf, pagesize=letter, guard=RenderGuard(kind))
+    draw(c); c.save()
+    return buf.getvalue()
+
+
+def page_streams(pdf):
+    """Raw content stream of every page, in page order."""
+    objs, root, _ = read_pdf(pdf)
+    pages_root = int(re.search(rb'/Pages (\d+) 0 R', objs[root][0]).group(1))
+    out = []
+    for num in page_order(objs, pages_root):
+        ref = int(re.search(rb'/Contents (\d+) 0 R', objs[num][0]).group(1))
+        out.append(objs[ref][1])
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument('--pages', type=int, default=500)
+    ap.add_argument('--workers', default='2,4,8')
+    ap.add_argument('--save', action='store_true', help='record the speedups for run_render()')
+    args = ap.parse_args()
+    counts = [int(w) for w in args.workers.split(',') if w]
+
+    print(f'cpus: {usable_cpus()} usable of {os.cpu_count()}')
+    print(f"{'doc':<11}{'pages':>6}{'mode':>10}{'wall s':>9}{'speedup':>9}{'walk %':>8}"
+          f"{'stitch s':>10}{'shared objs':>13}  identical")
+    failed = False
+    for kind, fn in [('invoice', 'gen_invoice'), ('salesorder', 'gen_salesorder')]:
+        mod = __import__(f'gen_{kind}')
+        data = bench_layout.PAYLOADS[kind](args.pages * ROWS_PER_PAGE[kind])
+        draw = lambda c, f=getattr(mod, fn), d=data: f(c, d)
+
+        t0 = time.perf_counter(); ref = serial(kind, draw); ts = time.perf_counter() - t0
+        ref_pages = page_streams(ref)
+        t0 = time.perf_counter(); pages, fonts = paginate(kind, draw); walk = (time.perf_counter() - t0) / ts
+        print(f'{kind:<11}{len(ref_pages):>6}{"serial":>10}{ts:>9.2f}{1:>8.2f}x{100 * walk:>7.1f}%')
+        speedups = {}
+        for w in counts:
+            t0 = time.perf_counter()
+            pdf, st = render_parallel(kind, draw, workers=w, fonts=fonts, pages=pages)
+            tw = time.perf_counter() - t0
+            same = page_streams(pdf) == ref_pages
+            failed |= not same
+            speedups[w] = ts / tw if same else 0.0
+            print(f'{kind:<11}{st["pages"]:>6}{f"{w} procs":>10}{tw:>9.2f}{ts/tw:>8.2f}x{"":>8}'
+                  f'{st["stitch_s"]:>10.3f}{st["shared"]:>13}  {"yes" if same else "NO"}')
+        if args.save and speedups:
+            e = save_profile(kind, speedups, len(ref_pages))
+            use = f'{e["workers"]} workers' if e['speedup'] >= MIN_SPEEDUP else f'serial (best {e["speedup"]:.2f}x < {MIN_SPEEDUP}x)'
+            print(f'{"":<11}saved: {kind} renders {use}')
+    if failed:
+        print('parallel output differs from the serial render', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,7 +14,6 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas as rl_canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
@@ -22,6 +21,9 @@ from PIL import Image, ImageDraw
 import numpy as np
 import io, math
 
+from guardrails import run_guarded, checkpoint
+from layout import select_renderer
+
 FD = "/usr/share/fonts/truetype/google-fonts"
 for n, f in [('Pop',  'Poppins-Regular'),
              ('PopM', 'Poppins-Medium'),
@@ -364,6 +366,7 @@ def gen_p1(c, job):
 
         hline(c, LX, y-RH, TW, col=RULE)
         y -= RH
+    checkpoint(c, 'line items')
 
     hline(c, LX, y, TW, col=MDGRAY, lw=0.8)
     y -= 10
@@ -634,6 +637,11 @@ def gen_p2(c, job):
 
     footer(c, 2, 2)
 
+def gen_estimate(c, job):
+    gen_p1(c, job)
+    c.showPage()
+    gen_p2(c, job)
+
 
 # ─── MAIN ────────────────────────────────────────────────────────────────────
 if __name__ == '__main__':
@@ -657,9 +665,6 @@ if __name__ == '__main__':
 
     out_path = sys.argv[2] if len(sys.argv) > 2 else '/tmp/estimate.pdf'
 
-    c = rl_canvas.Canvas(out_path, pagesize=letter)
-    gen_p1(c, JOB)
-    c.showPage()
-    gen_p2(c, JOB)
-    c.save()
+    render = select_renderer('estimate', globals(), gen_estimate)
+    run_guarded('estimate', JOB, out_path, lambda c: render(c, JOB))
     print(f"Saved: {out_path}")
@@ -9,13 +9,16 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas as rl_canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from PIL import Image
 import numpy as np, io
 
+from guardrails import checkpoint
+from parallel import run_render
+from layout import select_renderer
+
 FD = "/usr/share/fonts/truetype/google-fonts"
 for n, f in [('Pop','Poppins-Regular'),('PopM','Poppins-Medium'),
              ('PopB','Poppins-Bold'),('PopL','Poppins-Light')]:
@@ -209,6 +212,7 @@ def gen_invoice(c, inv):
         c.setFillColor(DKGRAY); c.setFont('Pop',  8.5); c.drawString(LX+9,   y-21, item.get('desc',''))
         hline(c, LX, y-RH, TW, col=RULE)
         y -= RH
+    checkpoint(c, 'line items')
 
     hline(c, LX, y, TW, col=MDGRAY, lw=0.8)
     y -= 10
@@ -311,7 +315,6 @@ if __name__ == '__main__':
 
     out_path = sys.argv[2] if len(sys.argv) > 2 else '/tmp/invoice.pdf'
 
-    c = rl_canvas.Canvas(out_path, pagesize=letter)
-    gen_invoice(c, INVOICE)
-    c.save()
+    render = select_renderer('invoice', globals(), gen_invoice)
+    run_render('invoice', INVOICE, out_path, lambda c: render(c, INVOICE))
     print(f"Saved: {out_path}")
@@ -0,0 +1,142 @@
+"""
+USA Wrap Co — Rate Card
+Printable price sheet from a rate-card artifact (scripts/vehicles/rate_card.py):
+one film tier per document, vehicles grouped by make, one column per coverage
+package. Header, palette, section bands and footer are the estimate's
+(gen_estimate.py), so the sheet matches the rest of the paperwork.
+
+The artifact is built locally from the catalog, not posted by the app, so this
+draws on a plain canvas rather than through the payload guardrails.
+
+Run:  python3 gen_ratecard.py rate_card-<version>.json.gz out.pdf [--tier 3m2080] [--make Ford,Ram]
+"""
+
+import sys, gzip, json, argparse
+
+from reportlab.pdfgen import canvas as rl_canvas
+from reportlab.lib.pagesizes import letter
+
+from gen_estimate import (bg, brand_header, footer, sec_header, card, hline, W, H,
+                          NAVY, STEEL, STEELD, STEELBG, WHITE, INK, DKGRAY, MDGRAY, RULE, ROWALT, OFF)
+
+TOP    = H - 88 - 20 - 10       # below the brand header and its contact band
+BOTTOM = 32                     # above the footer
+ROW    = 12.5
+MAKE_H = 16
+LX     = 22; TW = W - 44
+
+
+def load(path):
+    with (gzip.open(path, 'rt') if path.endswith('.gz') else open(path)) as f:
+        return json.load(f)
+
+
+def _money(v):
+    return '—' if v is None else f'${v:,.0f}'
+
+
+def lines(rc, t, makes=None):
+    """[('make', name, count) | ('row', i)] in print order; i indexes the artifact's vehicles."""
+    veh = rc['vehicles']; out = []; last = None
+    keep = {m.lower() for m in makes} if makes else None
+    idx = [i for i, mk in enumerate(veh['make']) if not keep or (mk or '').lower() in keep]
+    for i in idx:
+        if all(p[t] is None for p in rc['price'][i]): continue
+        if veh['make'][i] != last:
+            last = veh['make'][i]; out.append(('make', last))
+        out.append(('row', i))
+    return out
+
+
+def paginate(items, first_room):
+    """Split lines into pages by height; a make band never ends a page."""
+    pages = [[]]; room = first_room
+    for it in items:
+        h = MAKE_H if it[0] == 'make' else ROW
+        need = h + (ROW if it[0] == 'make' else 0)
+        if need > room and pages[-1]:
+            pages.append([]); room = TOP - BOTTOM - 18
+        pages[-1].append(it); room -= h
+    return pages
+
+
+def rules_card(c, rc, tier, y):
+    r = rc['rules']
+    card(c, LX, y-34, TW, 34, fill=OFF, stroke=RULE)
+    c.setFillColor(NAVY); c.rect(LX, y-34, 3, 34, fill=1, stroke=0)
+    meta = [('Film', tier['name']), ('Film $/sqft', f"${tier['rate']:.2f}"), ('Install', f"${r['install_rate_hr']:g}/hr"),
+            ('Prod Speed', f"{r['production_speed']:g} sqft/hr"), ('Design Fee', f"${r['design_fee']:,.0f}"),
+            ('Max Cost', f"{r['max_cost_pct']:g}%")]
+    cw = TW / len(meta)
+    for i, (lbl, val) in enumerate(meta):
+        mx = LX + cw*i + 10
+        c.setFillColor(MDGRAY); c.setFont('Pop', 7);  c.drawString(mx, y-12, lbl)
+        c.setFillColor(INK);    c.setFont('PopM', 9); c.drawString(mx, y-25, val)
+    return y - 42
+
+
+def table_head(c, rc, y):
+    c.setFillColor(NAVY); c.rect(LX, y-14, TW, 14, fill=1, stroke=0)
+    c.setFillColor(WHITE); c.setFont('PopB', 6.5)
+    c.drawString(LX+9, y-10, 'MODEL'); c.drawString(LX+232, y-10, 'YEARS')
+    pw = (TW - 290) / len(rc['packages'])
+    for k, p in enumerate(rc['packages']):
+        c.drawRightString(LX+290+pw*(k+1)-6, y-10, p['label'].upper())
+    return y - 14, pw
+
+
+def draw_page(c, rc, t, tier, items, pg, total):
+    bg(c)
+    brand_header(c, 'RATE CARD', rc['version'], rc['built_at'][:10], tier['name'], pg2=pg > 1)
+    y = TOP
+    if pg == 1:
+        y = rules_card(c, rc, tier, y)
+        sec_header(c, LX, y, TW, 'Installed Price by Vehicle', f"{len(rc['packages'])} packages  -  min. revenue at {rc['rules']['max_cost_pct']:g}% cost")
+        y -= 34
+    y, pw = table_head(c, rc, y)
+    veh = rc['vehicles']; alt = False
+    for it in items:
+        if it[0] == 'make':
+            c.setFillColor(STEELBG); c.rect(LX, y-MAKE_H, TW, MAKE_H, fill=1, stroke=0)
+            c.setFillColor(STEELD); c.rect(LX, y-MAKE_H, 3, MAKE_H, fill=1, stroke=0)
+            c.setFillColor(STEELD); c.setFont('PopB', 8); c.drawString(LX+9, y-11, (it[1] or '').upper())
+            y -= MAKE_H; alt = False; continue
+        i = it[1]
+        if alt: c.setFillColor(ROWALT); c.rect(LX, y-ROW, TW, ROW, fill=1, stroke=0)
+        alt = not alt
+        c.setFillColor(INK); c.setFont('Pop', 7)
+        c.drawString(LX+9, y-9, (veh['model'][i] or '')[:52])
+        c.setFillColor(DKGRAY); c.drawString(LX+232, y-9, veh['year_range'][i] or '')
+        c.setFillColor(INK); c.setFont('PopM', 7)
+        for k, p in enumerate(rc['price'][i]):
+            c.drawRightString(LX+290+pw*(k+1)-6, y-9, _money(p[t]))
+        hline(c, LX, y-ROW, TW, col=RULE, lw=0.3)
+        y -= ROW
+    footer(c, pg, total)
+
+
+def render(c, rc, tier_id=None, makes=None):
+    tiers = rc['tiers']
+    t = next((k for k, x in enumerate(tiers) if x['id'] == tier_id), 0) if tier_id else 0
+    first_room = TOP - 42 - 34 - 14 - BOTTOM
+    pages = paginate(lines(rc, t, makes), first_room)
+    for n, items in enumerate(pages, 1):
+        if n > 1: c.showPage()
+        draw_page(c, rc, t, tiers[t], items, n, len(pages))
+    return len(pages)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Printable rate card from a rate_card.py artifact.')
+    ap.add_argument('artifact'); ap.add_argument('out', nargs='?', default='/tmp/rate_card.pdf')
+    ap.add_argument('--tier', help='film tier id (default: the first, the base film)')
+    ap.add_argument('--make', help='comma list of makes to include')
+    args = ap.parse_args()
+    rc = load(args.artifact)
+    if args.tier and args.tier not in {x['id'] for x in rc['tiers']}:
+        print(f"Unknown tier {args.tier!r} (have: {', '.join(x['id'] for x in rc['tiers'])})"); sys.exit(1)
+    c = rl_canvas.Canvas(args.out, pagesize=letter)
+    c.setTitle(f"Rate Card {rc['version']}"); c.setAuthor('USA Wrap Co')
+    pages = render(c, rc, args.tier, args.make.split(',') if args.make else None)
+    c.save()
+    print(f"Saved: {args.out} ({pages} pages)")
@@ -9,13 +9,16 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas as rl_canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from PIL import Image
 import numpy as np, io
 
+from guardrails import checkpoint
+from parallel import run_render
+from layout import select_renderer
+
 FD = "/usr/share/fonts/truetype/google-fonts"
 for n, f in [('Pop','Poppins-Regular'),('PopM','Poppins-Medium'),
              ('PopB','Poppins-Bold'),('PopL','Poppins-Light')]:
@@ -529,6 +532,7 @@ def gen_salesorder(c, so):
     y = job_details(c, so, y)
     y = _page_break_if_needed(c, so, y)
     y = line_items_table(c, so, y)
+    checkpoint(c, 'line items')
     y = _page_break_if_needed(c, so, y)
     y = financials(c, so, y)
     y = _page_break_if_needed(c, so, y)
@@ -565,7 +569,6 @@ if __name__ == '__main__':
 
     out_path = sys.argv[2] if len(sys.argv) > 2 else '/tmp/salesorder.pdf'
 
-    c = rl_canvas.Canvas(out_path, pagesize=letter)
-    gen_salesorder(c, SO)
-    c.save()
+    render = select_renderer('salesorder', globals(), gen_salesorder)
+    run_render('salesorder', SO, out_path, lambda c: render(c, SO))
     print(f"Saved: {out_path}")
@@ -9,13 +9,16 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.pdfgen import canvas as rl_canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from PIL import Image
 import numpy as np, io
 
+from parallel import run_render
+from layout import select_renderer
+import panels as panel_diagram
+
 FD = "/usr/share/fonts/truetype/google-fonts"
 for n, f in [('Pop','Poppins-Regular'),('PopM','Poppins-Medium'),
              ('PopB','Poppins-Bold'),('PopL','Poppins-Light')]:
@@ -155,6 +158,21 @@ def wo_header(c, wo):
     c.drawCentredString(W-14-50, H-ZA-ZD+9, wo.get('status','READY TO INSTALL'))
 
 
+def diagram_section(c, wo, y):
+    """Scaled panel outline from the vehicle's measurement row, if the payload has one."""
+    m = wo.get('measurements') or {}
+    if not panel_diagram.dims(m):
+        return y
+    LX=22; TW=W-44; DW=TW-18
+    sec_header(c, LX, y, TW, "Panel Diagram", panel_diagram.caption(m, wo, DW))
+    y -= 13
+    DH = panel_diagram.DIAGRAM_H+8
+    card(c, LX, y-DH, TW, DH, fill=WHITE, stroke=RULE)
+    c.setFillColor(STEEL); c.rect(LX, y-DH, 3, DH, fill=1, stroke=0)
+    panel_diagram.place(c, LX+9, y-DH+4, DW, m, wo)
+    return y-DH-8
+
+
 def gen_wo(c, wo):
     bg(c)
     wo_header(c, wo)
@@ -221,6 +239,8 @@ def gen_wo(c, wo):
             c.setFillColor(INK);    c.setFont('Pop',  8.5); c.drawString(px+10, py3, panel)
         y -= PNL_H+8
 
+    y = diagram_section(c, wo, y)
+
     if wo.get('special_notes'):
         card(c, LX, y-30, TW, 30, fill=ORANGEBG, stroke=colors.HexColor('#e8a060'))
         c.setFillColor(ORANGE); c.rect(LX, y-30, 3, 30, fill=1, stroke=0)
@@ -275,6 +295,18 @@ def gen_wo(c, wo):
     footer(c, wo)
 
 
+def gen_wo_batch(c, batch, render=gen_wo):
+    """Fleet job: one page per unit in batch['work_orders'].
+
+    Top-level fields (client, dates, installer...) apply to every unit unless the
+    unit overrides them. Units of the same vehicle share one panel diagram form.
+    """
+    shared = {k: v for k, v in batch.items() if k != 'work_orders'}
+    for i, unit in enumerate(batch['work_orders']):
+        if i: c.showPage()
+        render(c, {**shared, **unit})
+
+
 # ─── MAIN ────────────────────────────────────────────────────────────────────
 if __name__ == '__main__':
     WORKORDER = {
@@ -296,7 +328,9 @@ if __name__ == '__main__':
 
     out_path = sys.argv[2] if len(sys.argv) > 2 else '/tmp/workorder.pdf'
 
-    c = rl_canvas.Canvas(out_path, pagesize=letter)
-    gen_wo(c, WORKORDER)
-    c.save()
+    render = select_renderer('workorder', globals(), gen_wo)
+    if WORKORDER.get('work_orders'):
+        run_render('workorder', WORKORDER, out_path, lambda c: gen_wo_batch(c, WORKORDER, render))
+    else:
+        run_render('workorder', WORKORDER, out_path, lambda c: render(c, WORKORDER))
     print(f"Saved: {out_path}")
@@ -0,0 +1,197 @@
+"""
+USA Wrap Co — PDF Render Guardrails
+Keeps one bad payload from eating a whole render slot.
+
+Limits are read from the environment (PDF_LIMIT_<NAME>, e.g. PDF_LIMIT_MAX_PAGES=80)
+so ops can tune them without touching the generators. Every limit trips a
+RenderLimitError, which run_guarded() reports on stderr as one JSON line and exits
+with EXIT_LIMIT so app/api/pdf/_shared.ts can tell a rejected payload from a crash.
+"""
+
+import sys, json, os, re, time, io
+
+from reportlab.pdfgen import canvas as rl_canvas
+
+try:
+    import resource
+except ImportError:          # Windows dev boxes — RSS falls back to unchecked
+    resource = None
+
+EXIT_LIMIT = 3
+
+DEFAULT_LIMITS = {
+    'max_line_items':   1500,       # rows in line_items; ~55 invoice pages, so max_pages is what binds
+    'max_bullets':      40,         # bullets on a single line item
+    'max_total_bullets': 2000,      # bullets across the whole document
+    'max_text_len':     4000,       # any single string field
+    'max_total_text':   200_000,    # all string fields combined
+    'max_list_len':     200,        # any other list (panels, payments, checks...)
+    'max_colors':       8,          # client_brand.colors
+    'max_pages':        60,
+    'max_output_bytes': 20_000_000,
+    'deadline_s':       30.0,       # wall clock, checked between sections
+    'max_rss_mb':       512,
+}
+
+HEX_COLOR = re.compile(r'^#?[0-9a-fA-F]{6}$')
+
+
+def load_limits(env=None):
+    env = os.environ if env is None else env
+    limits = dict(DEFAULT_LIMITS)
+    for name, default in DEFAULT_LIMITS.items():
+        raw = env.get('PDF_LIMIT_' + name.upper())
+        if raw:
+            limits[name] = type(default)(float(raw))
+    return limits
+
+
+class RenderLimitError(Exception):
+    """A guardrail tripped. `limit` names it, `value` is what we saw, `max` the ceiling."""
+
+    def __init__(self, limit, value, max_, where=''):
+        self.limit = limit
+        self.value = value
+        self.max = max_
+        self.where = where
+        super().__init__(f"{limit} exceeded{' at ' + where if where else ''}: {value} > {max_}")
+
+    def __reduce__(self):                 # survives the trip back from a worker process
+        return (RenderLimitError, (self.limit, self.value, self.max, self.where))
+
+    def to_dict(self):
+        return {'error': 'render_limit', 'limit': self.limit, 'value': self.value,
+                'max': self.max, 'where': self.where, 'message': str(self)}
+
+
+# ── PAYLOAD CHECKS ────────────────────────────────────────────────────────────
+def check_payload(data, limits):
+    """Reject oversize or malformed payloads before any drawing happens."""
+    items = data.get('line_items') or []
+    if len(items) > limits['max_line_items']:
+        raise RenderLimitError('max_line_items', len(items), limits['max_line_items'], 'line_items')
+
+    total_bullets = 0
+    for idx, item in enumerate(items):
+        nb = len(item.get('bullets') or []) if isinstance(item, dict) else 0
+        if nb > limits['max_bullets']:
+            raise RenderLimitError('max_bullets', nb, limits['max_bullets'], f'line_items[{idx}].bullets')
+        total_bullets += nb
+    if total_bullets > limits['max_total_bullets']:
+        raise RenderLimitError('max_total_bullets', total_bullets, limits['max_total_bullets'], 'line_items')
+
+    brand = data.get('client_brand') or {}
+    cols = (brand.get('colors') or []) if isinstance(brand, dict) else []
+    if len(cols) > limits['max_colors']:
+        raise RenderLimitError('max_colors', len(cols), limits['max_colors'], 'client_brand.colors')
+    for i, hx in enumerate(cols):
+        if not isinstance(hx, str) or not HEX_COLOR.match(hx):
+            raise RenderLimitError('color_format', repr(hx)[:40], '#rrggbb', f'client_brand.colors[{i}]')
+
+    total = 0
+    stack = [('', data)]
+    while stack:
+        path, node = stack.pop()
+        if isinstance(node, str):
+            n = len(node)
+            if n > limits['max_text_len']:
+                raise RenderLimitError('max_text_len', n, limits['max_text_len'], path or 'root')
+            total += n
+            if total > limits['max_total_text']:
+                raise RenderLimitError('max_total_text', total, limits['max_total_text'], path)
+        elif isinstance(node, dict):
+            stack.extend((f'{path}.{k}' if path else str(k), v) for k, v in node.items())
+        elif isinstance(node, list):
+            if path != 'line_items' and len(node) > limits['max_list_len']:
+                raise RenderLimitError('max_list_len', len(node), limits['max_list_len'], path)
+            stack.extend((f'{path}[{i}]', v) for i, v in enumerate(node))
+
+
+# ── RUNTIME CHECKS ────────────────────────────────────────────────────────────
+def rss_mb():
+    """Current resident set size in MB, or None where we can't read it."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1_048_576
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1_048_576 if sys.platform == 'darwin' else peak / 1024
+    return None
+
+
+class RenderGuard:
+    def __init__(self, kind, limits=None):
+        self.kind = kind
+        self.limits = limits or load_limits()
+        self.started = time.monotonic()
+        self.pages = 0
+
+    def checkpoint(self, where=''):
+        elapsed = time.monotonic() - self.started
+        if elapsed > self.limits['deadline_s']:
+            raise RenderLimitError('deadline_s', round(elapsed, 2), self.limits['deadline_s'], where)
+        mb = rss_mb()
+        if mb is not None and mb > self.limits['max_rss_mb']:
+            raise RenderLimitError('max_rss_mb', round(mb, 1), self.limits['max_rss_mb'], where)
+
+    def page_done(self):
+        self.pages += 1
+        if self.pages > self.limits['max_pages']:
+            raise RenderLimitError('max_pages', self.pages, self.limits['max_pages'], f'page {self.pages}')
+        self.checkpoint(f'page {self.pages}')
+
+
+class GuardedCanvas(rl_canvas.Canvas):
+    """Canvas that runs the guard's checks on every page break."""
+
+    def __init__(self, *args, guard=None, **kw):
+        super().__init__(*args, **kw)
+        self.guard = guard
+
+    def showPage(self):
+        if self.guard:
+            self.guard.page_done()
+        super().showPage()
+
+
+def checkpoint(c, where=''):
+    """Section boundary hook for the generators. No-op on a plain canvas."""
+    guard = getattr(c, 'guard', None)
+    if guard:
+        guard.checkpoint(where)
+
+
+def exit_limit(kind, e):
+    """Report a tripped limit the way _shared.ts expects and exit EXIT_LIMIT."""
+    err = e.to_dict()
+    err['kind'] = kind
+    sys.stderr.write(json.dumps(err) + '\n')
+    sys.exit(EXIT_LIMIT)
+
+
+def run_guarded(kind, data, out_path, draw, pagesize=None):
+    """Validate `data`, call draw(c), enforce output size, write `out_path`.
+
+    On a tripped limit prints the structured error to stderr and exits EXIT_LIMIT;
+    nothing is written to `out_path`.
+    """
+    from reportlab.lib.pagesizes import letter
+    guard = RenderGuard(kind)
+    try:
+        check_payload(data, guard.limits)
+        buf = io.BytesIO()
+        c = GuardedCanvas(buf, pagesize=pagesize or letter, guard=guard)
+        draw(c)
+        guard.checkpoint('save')
+        c.save()
+        size = buf.tell()
+        if size > guard.limits['max_output_bytes']:
+            raise RenderLimitError('max_output_bytes', size, guard.limits['max_output_bytes'], 'save')
+    except RenderLimitError as e:
+        exit_limit(kind, e)
+    with open(out_path, 'wb') as f:
+        f.write(buf.getbuffer())
+    return guard
@@ -0,0 +1,53 @@
+"""
+Shared op fragments for the document templates — the pieces every generator
+re-implements by hand (page background, accent bars, labelled text, section bands).
+"""
+
+from reportlab.lib.pagesizes import letter
+
+from layout import E, C
+
+W, H = letter
+
+
+def bg(edge=None):
+    """White page, optionally with the sales order's 6pt left edge tint."""
+    ops = [('fill', 'WHITE'), ('rect', 0, 0, W, H, 1, 0)]
+    if edge:
+        ops += [('fill', edge), ('rect', 0, 0, 6, H, 1, 0)]
+    return [('at', 0, ops)]
+
+
+def txt(col, font, size, x, dy, value, align='text'):
+    """setFillColor + setFont + draw — the generators' most common triple."""
+    return [('fill', col), ('font', font, size), (align, x, dy, value)]
+
+
+def accent(x, dy, h, col, w=3):
+    """Solid left-edge bar on a card."""
+    return [('fill', col), ('rect', x, dy, w, h, 1, 0)]
+
+
+def accent_card(x, dy, w, h, fill, stroke, bar):
+    return [('card', x, dy, w, h, fill, stroke)] + accent(x, dy, h, bar)
+
+
+def sec_band(x, w, text, right=''):
+    """12pt SECBG section label used by invoice, sales order and work order.
+
+    Drawn with its bottom on the cursor, like sec_header(c, x, y, ...) in the hand code.
+    """
+    ops = [('fill', 'SECBG'), ('rect', x, 0, w, 12, 1, 0),
+           ('fill', 'STEELD'), ('rect', x, 0, 3, 12, 1, 0)]
+    ops += txt('DKGRAY', 'PopB', 7, x+8, 4, upper(text))
+    if isinstance(right, E):
+        ops += [('if', right, [('fill', 'MDGRAY'), ('font', 'Pop', 6.5), ('rtext', x+w-6, 4, right)])]
+    elif right:
+        ops += [('fill', 'MDGRAY'), ('font', 'Pop', 6.5), ('rtext', x+w-6, 4, right)]
+    return ops
+
+
+def upper(text):
+    if isinstance(text, (E, C)):
+        return type(text)(f'({text}).upper()')
+    return text.upper()
@@ -0,0 +1,378 @@
+"""Estimate — port of gen_estimate.gen_p1() + gen_p2()."""
+
+from reportlab.lib import colors
+
+from layout import E, C
+from layouts.common import W, H, bg, txt, accent_card
+
+ZA, ZD = 88, 20
+EH = 70; EW = int(1230/470*EH)
+NX = 10+EW+10
+NY = -ZA+ZA//2+18                     # relative to page top
+LX = 22; TW = W-44; CW = TW/2-4; CX2 = LX+CW+8
+MCW = TW / 4
+BLOCK_H = 100; TW2 = 200; TX = W-22-TW2; IW = TX-LX-8
+FIN_H = 26
+BP_H = 42; MAT_H = 72; LW = TW * 0.38
+SH = 82; TC_H = 168; CW2 = TW/2 - 10
+EW2 = int(1230/470*20)
+
+MAT_DATA = {
+    "Avery MPI 1105 EZ-RS": {
+        "full_name": "Avery Dennison MPI 1105 EZ-RS Supreme Wrapping Film",
+        "category":  "Professional Cast Vinyl Wrap Film",
+        "url": "averydennison.com/mpi-1105",
+    },
+    "Avery DOL 1060": {
+        "full_name": "Avery Dennison DOL 1060 High-Gloss Overlaminate",
+        "category":  "Cast Protective Overlaminate",
+        "url": "averydennison.com/dol-1060",
+    },
+}
+
+
+def hex_or(hx, fallback):
+    """Client brand swatch color, or `fallback` when the hex does not parse."""
+    try: return colors.HexColor(hx)
+    except Exception: return fallback
+
+
+def band(x, w, text, icon=''):
+    """gen_estimate.sec_header(): 28pt navy band hanging below the cursor."""
+    ops = [('fill', 'NAVY'), ('rect', x, -28, w, 28, 1, 0),
+           ('fill', 'STEEL'), ('rect', x, -28, 5, 28, 1, 0),
+           *txt('WHITE', 'PopB', 12, x+14, -28/2-4, text)]
+    right = [('fill', 'STEELL'), ('font', 'PopM', 7.5), ('rtext', x+w-10, -28/2-2.5, icon)]
+    if isinstance(icon, E):
+        ops += [('if', icon, right)]
+    elif icon:
+        ops += right
+    return ops
+
+
+def footer(pg, total):
+    return [('at', 0, [
+        ('fill', 'NAVY'), ('rect', 0, 0, W, 20, 1, 0),
+        *txt('#4a6888', 'Pop', 6, 22, 6.5, C("f\"{SHOP['name']}  -  {SHOP['address']}  -  {SHOP['email']}  -  {SHOP['web']}\"")),
+        ('fill', '#6a8aaa'), ('rtext', W-22, 6.5, f'Page {pg} of {total}'),
+    ])]
+
+
+HEADER = [('at', H, [
+    ('fill', 'NAVY'),  ('rect', 0, -ZA, W, ZA, 1, 0),
+    ('fill', 'STEEL'), ('rect', 0, -ZA, 5, ZA, 1, 0),
+    ('fill', '#070f1a'), ('rect', 332, -ZA, W-332, ZA, 1, 0),
+    ('image', 'EAGLE_LIGHT', 10, -ZA+(ZA-EH)/2, EW, EH),
+    *txt('WHITE', 'PopB', 16, NX, NY, 'USA WRAP CO'),
+    ('stroke', 'STEEL'), ('lw', 1.2),
+    ('line', NX, NY-5, C(f"{NX}+pdfmetrics.stringWidth('USA WRAP CO','PopB',16)"), NY-5),
+    *txt('STEELL', 'PopM', 8.5, NX, NY-17, C("SHOP['slogan']")),
+    ('fill', '#6a8aaa'), ('font', 'Pop', 7.5),
+    ('text', NX, NY-29, C("SHOP['address']")),
+    ('text', NX, NY-40, C("SHOP['phone']+'  -  '+SHOP['email']")),
+    ('stroke', '#162636'), ('lw', 0.8), ('line', 331, -8, 331, -ZA+6),
+
+    *txt('WHITE', 'PopB', 30, W-14, -32, 'ESTIMATE', 'rtext'),
+    ('let', 'bw2', "max(len(d['status'])*7+22, 90)"),
+    ('fill', 'STEEL'), ('rrect', f'{W-14}-bw2', -52, 'bw2', 13, 3, 1, 0),
+    *txt('NAVY', 'PopB', 6.5, f'{W-14}-bw2/2', -45, E("d['status'].upper()"), 'ctext'),
+    ('fill', '#7a9aba'), ('font', 'Pop', 7.5),
+    ('rtext', W-14, -67, E("f\"REF  {d['ref']}\"")),
+    ('rtext', W-14, -79, E("f\"Issued  {d['date']}\"")),
+
+    ('fill', 'NAVY2'), ('rect', 0, -ZA-ZD, W, ZD, 1, 0),
+    ('hline', 0, -ZA, W, '#162636', 0.8),
+    ('hline', 0, -ZA-ZD, W, '#0b1a28', 0.4),
+    ('fill', '#5a7898'), ('font', 'Pop', 6.5),
+    ('text', 12, -ZA-8, C("SHOP['phone']+'  -  '+SHOP['email']+'  -  '+SHOP['web']")),
+    ('text', 12, -ZA-17, C("SHOP['address']+'  -  '+SHOP['hours']")),
+])]
+
+
+def _meta():
+    ops = []
+    labels = [('Sales Agent', "d['agent']"), ('Est. Install', "d['install_date']"),
+              ('Valid', "f\"{d['valid_days']} days from issue\""), ('REF', "d['ref']")]
+    for i, (lbl, val) in enumerate(labels):
+        mx = LX + MCW*i + 10
+        ops += txt('MDGRAY', 'Pop', 7, mx, -8, lbl)
+        ops += txt('INK', 'PopM', 9, mx, -18, E(val))
+        if i < len(labels)-1:
+            ops += [('stroke', 'RULE'), ('lw', 0.5), ('line', LX+MCW*(i+1), -4, LX+MCW*(i+1), -20)]
+    return ops
+
+
+BULLET = [
+    ('at', 'row_y', txt('STEEL', 'PopB', 9, LX+9, 1, '-')),
+    ('fill', 'DKGRAY'), ('font', 'Pop', 8.5),
+    ('wrap', LX+19, 'row_y', E('bullet'), 'Pop', 8.5, TW-80, 9, 'fit_first'),
+    ('let', 'row_y', 'row_y - 10'),
+]
+
+ROW = [
+    ('let', 'nb', "len(item.get('bullets', []))"),
+    ('let', 'hv', "bool(item.get('vehicle'))"),
+    ('let', 'RH', '13 + (10 if hv else 0) + 11 + nb*10 + 6'),
+    ('fill', E('WHITE if idx%2==0 else ROWALT')), ('rect', LX, '-RH', TW, 'RH', 1, 0),
+    ('fill', E('STEEL if idx%2==0 else STEELL')), ('rect', LX, '-RH', 3, 'RH', 1, 0),
+    *txt('INK', 'PopB', 10, LX+9, -11, E("item['name']")),
+    *txt('INK', 'PopB', 10, W-28, -11, E("item['amount']"), 'rtext'),
+    *txt('DKGRAY', 'Pop', 8.5, LX+340, -11, E("item.get('qty','')")),
+    ('let', 'row_y', 'y - 22'),
+    ('if', 'hv', [('at', 'row_y', txt('MDGRAY', 'Pop', 8.5, LX+9, 0, E("item['vehicle']"))),
+                  ('let', 'row_y', 'row_y - 10')]),
+    ('at', 'row_y', txt('STEELD', 'PopM', 8.5, LX+9, 0, E("item.get('sub','')"))),
+    ('let', 'row_y', 'row_y - 11'),
+    ('each', 'bullet', "item.get('bullets', [])", BULLET),
+    ('hline', LX, '-RH', TW, 'RULE'),
+    ('move', '-RH'),
+]
+
+
+def _totals():
+    ops = []; dy = -14
+    for lbl, val, acc, big in [('Subtotal', E("d['subtotal']"), False, False),
+                               (E("tax['label']"), E("tax['amount']"), False, False),
+                               ('Design Deposit Paid', '-$250.00', False, False),
+                               ('BALANCE DUE', E("f'${bal_f:,.2f}'"), True, True)]:
+        if acc:
+            ops += [('hline', TX+4, dy+13, TW2-8, 'LTGRAY', 0.8),
+                    ('fill', 'OFF'), ('rect', TX+3, dy-6, TW2-3, 22, 1, 0)]
+        ops += txt('INK' if acc else 'DKGRAY', 'PopB' if acc else 'Pop', 9.5 if big else 9, TX+12, dy, lbl)
+        ops += txt('INK', 'PopB', 11 if big else 9, TX+TW2-10, dy, val, 'rtext')
+        dy -= 22 if big else 16
+    return ops + txt('MDGRAY', 'Pop', 6.5, TX+12, dy+6, 'WA vehicle wrap - taxable retail service (RCW 82.04)')
+
+
+PAGE1 = bg() + HEADER + [
+    ('let', 'y', H-(88+20)-10),
+    *accent_card(LX, -70, CW, 70, 'STEELBG', 'STEELD', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -10, 'PREPARED BY'),
+    *txt('NAVY', 'PopB', 12, LX+9, -25, C("SHOP['name']")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -38, C("SHOP['address']")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -50, C("SHOP['email']")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -63, C("SHOP['phone']+'  -  '+SHOP['web']")),
+
+    *accent_card(CX2, -70, CW, 70, 'WHITE', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, CX2+9, -10, 'PREPARED FOR'),
+    *txt('INK', 'PopB', 14, CX2+9, -28, E("d['client_name']")),
+    *txt('DKGRAY', 'Pop', 9.5, CX2+9, -43, E("d['client_phone']+'  -  '+d['client_email']")),
+    *txt('DKGRAY', 'Pop', 9.5, CX2+9, -57, E("d['client_addr']")),
+    ('move', -78),
+
+    *accent_card(LX, -22, TW, 22, 'OFF', 'RULE', 'NAVY'),
+    *_meta(),
+    ('move', -38),
+    *band(LX, TW, 'Scope of Work - Itemized Services'),
+    ('move', -32),
+
+    ('fill', 'NAVY'), ('rect', LX, 0, TW, 14, 1, 0),
+    ('fill', 'WHITE'), ('font', 'PopB', 7),
+    ('text', LX+9, 4, 'DESCRIPTION'), ('text', LX+340, 4, 'QTY'), ('rtext', W-28, 4, 'AMOUNT'),
+    ('move', -14),
+    ('each', 'idx, item', "enumerate(d['line_items'])", ROW),
+    ('py', "checkpoint(c, 'line items')"),
+
+    ('hline', LX, 0, TW, 'MDGRAY', 0.8),
+    ('move', -10),
+    ('let', 'sub_f', "float(d['subtotal'].replace('$', '').replace(',', ''))"),
+    ('let', 'tax', "calc_tax(d['subtotal'], d.get('client_zip','98332'), d.get('b2b_exempt',False), d.get('exempt_cert'))"),
+    ('let', 'tax_f', "float(tax['amount'].replace('$', '').replace(',', ''))"),
+    ('let', 'bal_f', 'sub_f + tax_f - 250.0'),
+
+    *accent_card(LX, -BLOCK_H, IW, BLOCK_H, 'WHITE', 'RULE', 'GREEN'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -10, "WHAT'S INCLUDED"),
+    ('let', 'iy', 'y - 22'),
+    ('each', 'incl', "d.get('inclusions', [])", [
+        ('at', 'iy', [*txt('GREEN', 'Pop', 9, LX+9, 1, '+'), *txt('DKGRAY', 'Pop', 9, LX+21, 0, E('incl'))]),
+        ('let', 'iy', 'iy - 13'),
+    ]),
+    *accent_card(TX, -BLOCK_H, TW2, BLOCK_H, 'WHITE', 'RULE', 'NAVY'),
+    *_totals(),
+    ('move', -(BLOCK_H+8)),
+
+    *accent_card(LX, -FIN_H, TW, FIN_H, 'GOLDBG', '#e8c84a', '#8a6a00'),
+    *txt('#7a5a00', 'PopB', 8, LX+12, -9, 'Financing Available'),
+    *txt('DKGRAY', 'Pop', 8, LX+140, -9,
+         'Get pre-approved in minutes through your customer portal - 0% interest options available'),
+    *txt('LINK', 'PopM', 7.5, W-28, -20, 'Apply at portal.usawrapco.com  ->', 'rtext'),
+    *txt('DKGRAY', 'Pop', 7.5, LX+12, -20, 'No hard credit pull required  -  Terms from 6 to 60 months'),
+    ('move', -(FIN_H+6)),
+
+    ('fill', 'NAVY'), ('rrect', LX, -18, TW, 18, 3, 1, 0),
+    *txt('STEELL', 'PopM', 8.5, LX+12, -7, 'Ready to move forward?'),
+    *txt('#7aaac8', 'Pop', 8, LX+155, -7,
+         'A $250 design deposit secures your slot and starts your design  -  Materials & terms on Page 2'),
+] + footer(1, 2)
+
+
+CHIPS = [
+    ('OUTDOOR DURABILITY',  '7 Years Vertical',          'NAVY',  'WHITE'),
+    ('HORIZONTAL SURFACES', '5 Years Rated',             'NAVY',  'WHITE'),
+    ('FILM CONSTRUCTION',   'Cast - Conforms to Curves', 'SECBG', 'INK'),
+    ('CLEAN REMOVAL',       'Up to 5 Years',             'SECBG', 'INK'),
+]
+
+
+def _chips():
+    ops = []
+    rx = LX + LW + 10; rw = TW - LW - 14
+    chip_w = rw/2 - 4; chip_h = 24
+    for ci, (sub_lbl, val, bg_c, _) in enumerate(CHIPS):
+        cx = rx + (ci % 2)*(chip_w+6)
+        cy = -12 - (ci // 2)*(chip_h+5)
+        ops += [('fill', bg_c), ('rrect', cx, cy-chip_h, chip_w, chip_h, 3, 1, 0)]
+        if bg_c == 'NAVY':
+            ops += txt('STEELL', 'PopB', 5.5, cx+6, cy-8, sub_lbl) + txt('WHITE', 'PopB', 8, cx+6, cy-19, val)
+        else:
+            ops += txt('DKGRAY', 'PopB', 5.5, cx+6, cy-8, sub_lbl) + txt('INK', 'PopB', 7.5, cx+6, cy-19, val)
+    return ops
+
+
+STEPS = [
+    ('01', 'Estimate &\nDeposit',   'STEEL', 'NAVY',  ['Quote in 24 hrs.', '$250 deposit locks', 'your slot & design.']),
+    ('02', 'Design &\nApproval',    'NAVY',  'WHITE', ['Mockup on your exact', 'vehicle. 2 revisions.', 'Approve before print.']),
+    ('03', 'Print &\nProduction',   'STEEL', 'NAVY',  ['HP Latex on Avery', 'MPI 1105. Full QC', 'before it leaves shop.']),
+    ('04', 'Professional\nInstall', 'NAVY',  'WHITE', ['Certified installer.', 'Pre & post photos.', 'Climate-controlled shop.']),
+    ('05', 'Final\nDelivery',       'STEEL', 'NAVY',  ['Full walkthrough.', '12-mo warranty cert.', 'Portal access provided.']),
+]
+
+
+def _steps():
+    ops = []
+    sw2 = TW/len(STEPS) - 2
+    gap = (TW - sw2*len(STEPS)) / (len(STEPS)-1)
+    for i, (num, title, cc, nc, dlines) in enumerate(STEPS):
+        sx = LX + i*(sw2+gap); mid = sx + sw2/2
+        ops += [('card', sx, -SH, sw2, SH, 'OFF' if i % 2 == 0 else 'WHITE', 'LTGRAY'),
+                ('fill', cc), ('circle', mid, -13, 9, 1, 0)]
+        ops += txt(nc, 'PopB', 7.5, mid, -17, num, 'ctext')
+        tls = title.split('\n')
+        ops += [('fill', cc), ('font', 'PopB', 7.5)]
+        ops += [('ctext', mid, -29-(ti*9), tl) for ti, tl in enumerate(tls)]
+        dy = -29-(len(tls)-1)*9-13
+        for dl in dlines:
+            ops += txt('DKGRAY', 'Pop', 6.5, mid, dy, dl, 'ctext'); dy -= 8
+    return ops
+
+
+TERMS_L = [
+    ("Deposit & Payment",
+     ["$250 non-refundable design deposit required to begin design and secure your install slot.",
+      "Full balance is due upon completion before vehicle release.",
+      "Card on file will be automatically charged 10 days after job completion if balance remains unpaid.",
+      "Credit card payments may be subject to a processing fee.",
+      "Late payments: 1.5%/month. Returned checks: $35 fee."]),
+    ("Design Approval",
+     ["Client approves all artwork before production. Changes after approval incur additional fees.",
+      "USA Wrap Co not liable for errors in client-supplied artwork, logos, or text."]),
+    ("Cancellation",
+     ["Cancellations after production begins are billed for all materials and labor.",
+      "$250 design deposit is non-refundable. Schedule changes require 48-hr advance notice."]),
+]
+TERMS_R = [
+    ("Warranty - 12 Months",
+     ["Workmanship warranted 12 months from install date. Issues must be reported within 10 days.",
+      "Client responsible for inspecting wrap within 30 days of installation.",
+      "Repairs subject to USA Wrap Co judgment. Full panel replacement not always feasible."]),
+    ("Vehicle Condition",
+     ["Vehicle must be clean and in good working condition. Pre-existing damage documented at intake.",
+      "Excessive contamination may delay job and incur additional surface prep charges."]),
+    ("Wrap Care",
+     ["Wait 48 hrs before washing. Hand wash only first 2 weeks. No automatic or pressure washes.",
+      "Avoid harsh chemicals. Non-compliance voids warranty coverage."]),
+]
+
+
+def _terms():
+    """Static copy: 'wrap' line-breaks every point at compile time."""
+    ops = []
+    for col_x, cw, terms in [(LX+9, CW2, TERMS_L), (LX+CW2+21, CW2, TERMS_R)]:
+        ops += [('let', 'ty2', 'y - 10')]
+        for title, pts in terms:
+            ops += [('at', 'ty2', txt('INK', 'PopB', 7.5, col_x, 0, title)), ('let', 'ty2', 'ty2 - 11')]
+            for pt in pts:
+                ops += [('at', 'ty2', txt('STEEL', 'PopB', 8, col_x, 1, '-')),
+                        ('fill', 'DKGRAY'), ('font', 'Pop', 6.5),
+                        ('wrap', col_x+10, 'ty2', pt, 'Pop', 6.5, cw-12, 8, 'greedy_tail')]
+            ops += [('let', 'ty2', 'ty2 - 5')]
+    return ops
+
+
+PAGE2 = bg() + [
+    ('at', H, [
+        ('fill', 'NAVY'), ('rect', 0, -18, W, 18, 1, 0),
+        ('fill', 'STEELL'), ('rect', 0, -18, 5, 18, 1, 0),
+        *txt('#5a7898', 'Pop', 6.5, 12, -12, C("SHOP['name']+'  -  '+SHOP['phone']+'  -  '+SHOP['email']+'  -  '+SHOP['web']")),
+        *txt('MDGRAY', 'Pop', 6.5, W-14, -12, E("'ESTIMATE  -  '+d['ref']+'  -  Page 2 of 2'"), 'rtext'),
+    ]),
+    ('let', 'y', H-28),
+    ('let', 'br', "d.get('client_brand', {})"),
+    *band(LX, TW, 'Client Profile', 'portal.usawrapco.com'),
+    ('move', -32),
+
+    *accent_card(LX, -BP_H, TW, BP_H, 'OFF', 'RULE', 'STEEL'),
+    *txt('INK', 'PopB', 13, LX+10, -18, E("d['client_name']")),
+    ('let', 'nw', "pdfmetrics.stringWidth(d['client_name'], 'PopB', 13)"),
+    *txt('STEELL', 'PopM', 8.5, f'{LX+10} + nw + 8', -18, E("'-  '+br.get('tagline','')")),
+    *txt('DKGRAY', 'Pop', 8.5, LX+10, -32, E("br.get('industry','')+'  -  '+br.get('website','')")),
+    ('let', 'sx', W-28),
+    ('each', 'hx, nm', "reversed(list(zip(br.get('colors',[])[:3], br.get('color_names',[])[:3])))", [
+        ('fill', E('hex_or(hx, MDGRAY)')),
+        ('stroke', 'MDGRAY'), ('lw', 0.3), ('rrect', 'sx-20', -22, 18, 13, 2, 1, 1),
+        *txt('MDGRAY', 'Pop', 5.5, 'sx-11', -34, E('nm[:10]'), 'ctext'),
+        ('let', 'sx', 'sx - 28'),
+    ]),
+    ('move', -(BP_H+6)),
+
+    ('let', 'primary_film', "d.get('primary_film', 'Avery MPI 1105 EZ-RS')"),
+    ('let', 'overlaminate', "d.get('overlaminate', '')"),
+    ('let', 'mat', "MAT_DATA.get(primary_film, {'full_name': primary_film, 'category': 'Vinyl Wrap Film', 'url': ''})"),
+    ('let', 'ol', "MAT_DATA.get(overlaminate, {'full_name': overlaminate, 'category': ''})"),
+    ('move', -6),
+    *band(LX, TW, 'Wrap Materials', E('primary_film')),
+    ('move', -32),
+
+    ('card', LX, -MAT_H, TW, MAT_H, 'WHITE', 'RULE'),
+    ('fill', 'STEEL'), ('rrect', LX+9, -13, 76, 10, 2, 1, 0),
+    *txt('WHITE', 'PopB', 6, LX+13, -8, 'PRIMARY WRAP FILM'),
+    *txt('INK', 'PopB', 9.5, LX+9, -25, E("mat.get('full_name','')")),
+    *txt('DKGRAY', 'Pop', 7, LX+9, -36, E("mat.get('category','')")),
+    ('if', "ol and ol.get('full_name')",
+     txt('MDGRAY', 'Pop', 6.5, LX+9, -47, E("'Overlaminate: '+ol.get('full_name','')[:40]"))),
+    ('if', "mat.get('url')",
+     txt('LINK', 'PopM', 6.5, LX+9, -MAT_H+9, E("'Spec Sheet:  '+mat['url']"))),
+    ('stroke', 'LTGRAY'), ('lw', 0.6), ('line', LX+LW, -4, LX+LW, -MAT_H+4),
+    *_chips(),
+    ('move', -(MAT_H+10)),
+    ('move', -6),
+
+    *band(LX, TW, 'Our Process - What to Expect', 'Delivering Premium Results, Every Time'),
+    ('move', -13),
+    *_steps(),
+    ('move', -(SH+10)),
+    ('move', -6),
+
+    *band(LX, TW, 'Terms & Conditions'),
+    ('move', -32),
+    ('card', LX, -TC_H, TW, TC_H, 'WHITE', 'RULE'),
+    *_terms(),
+    ('hline', LX+9, -TC_H+11+9, TW-18, 'LTGRAY'),
+    *txt('DKGRAY', 'Pop', 7, LX+9, -TC_H+11,
+         'Client Signature: ___________________________   Printed Name: ___________________________   Date: ___________'),
+    ('move', -(TC_H+10)),
+
+    ('fill', 'NAVY'), ('rrect', LX, -28, TW, 28, 3, 1, 0),
+    ('image', 'EAGLE_LIGHT', LX+10, -24, EW2, 20),
+    *txt('WHITE', 'PopB', 9, LX+EW2+16, -11, C("SHOP['name']")),
+    *txt('STEELL', 'PopM', 7.5, LX+EW2+16, -21, C("SHOP['slogan']")),
+    *txt('GOLD', 'PopB', 7.5, W-28, -11, C("'***** '+SHOP['reviews']+' Five-Star Google Reviews'"), 'rtext'),
+    *txt('#5a7a9a', 'Pop', 7, W-28, -21, C("SHOP['phone']+'  -  '+SHOP['email']+'  -  '+SHOP['web']"), 'rtext'),
+] + footer(2, 2)
+
+TEMPLATE = {
+    'name': 'estimate',
+    'pagesize': (W, H),
+    'ops': PAGE1 + [('page',)] + PAGE2,
+    'env': {'MAT_DATA': MAT_DATA, 'hex_or': hex_or},
+}
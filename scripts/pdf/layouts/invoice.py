@@ -0,0 +1,156 @@
+"""Invoice — port of gen_invoice.gen_invoice()."""
+
+from layout import E, C
+from layouts.common import W, H, bg, txt, accent, accent_card, sec_band
+
+ZA, ZD = 88, 20
+EH = 70; EW = int(1230/470*EH)
+NX = 10+EW+10
+NY = -ZA+ZA//2+18                     # relative to page top
+LX = 22; TW = W-44; CW = TW/2-4; CX2 = LX+CW+8
+TW2 = 218; TX = W-22-TW2; IW = TX-LX-8; RVAL = TX+TW2-10
+PH_H = 88; RH = 26; FOOTER_Y = 40
+
+HEADER = [('at', H, [
+    ('fill', 'NAVY'),  ('rect', 0, -ZA, W, ZA, 1, 0),
+    ('fill', 'STEEL'), ('rect', 0, -ZA, 5, ZA, 1, 0),
+    ('fill', '#070f1a'), ('rect', 332, -ZA, W-332, ZA, 1, 0),
+    ('image', 'EAGLE_LIGHT', 10, -ZA+(ZA-EH)/2, EW, EH),
+    *txt('WHITE', 'PopB', 16, NX, NY, 'USA WRAP CO'),
+    ('stroke', 'STEEL'), ('lw', 1.2),
+    ('line', NX, NY-5, C(f"{NX}+pdfmetrics.stringWidth('USA WRAP CO','PopB',16)"), NY-5),
+    *txt('STEELL', 'PopM', 8.5, NX, NY-17, C("SHOP['slogan']")),
+    ('fill', '#6a8aaa'), ('font', 'Pop', 7.5),
+    ('text', NX, NY-29, C("SHOP['address']")),
+    ('text', NX, NY-40, C("SHOP['phone']+'  -  '+SHOP['email']")),
+    ('stroke', '#162636'), ('lw', 0.8), ('line', 331, -8, 331, -ZA+6),
+
+    *txt('WHITE', 'PopB', 30, W-14, -32, 'INVOICE', 'rtext'),
+    ('let', 'bw2', "max(len(d.get('status',''))*7+22, 90)"),
+    ('fill', E("{'due': STEEL, 'paid': GREEN, 'overdue': RED}.get(d.get('status_color','due'), STEEL)")),
+    ('rrect', f'{W-14}-bw2', -52, 'bw2', 13, 3, 1, 0),
+    *txt('NAVY', 'PopB', 6.5, f'{W-14}-bw2/2', -45, E("d.get('status','INVOICE').upper()"), 'ctext'),
+    ('fill', '#7a9aba'), ('font', 'Pop', 7.5),
+    ('rtext', W-14, -67, E("'INV NO.  '+d.get('ref','')")),
+    ('rtext', W-14, -79, E("'Issued  '+d.get('date','')+'   -   Due  '+d.get('due_date','')")),
+
+    ('fill', 'NAVY2'), ('rect', 0, -ZA-ZD, W, ZD, 1, 0),
+    ('hline', 0, -ZA, W, '#162636', 0.8),
+    ('fill', '#5a7898'), ('font', 'Pop', 6.5),
+    ('text', 12, -ZA-8, C("SHOP['phone']+'  -  '+SHOP['email']+'  -  '+SHOP['web']")),
+    ('text', 12, -ZA-17, C("SHOP['address']+'  -  '+SHOP['hours']")),
+])]
+
+FOOTER = [('at', 0, [
+    ('fill', 'MDGRAY'), ('font', 'Pop', 6.5),
+    ('text', 22, 18, C("f\"{SHOP['name']}  -  {SHOP['address']}  -  {SHOP['web']}\"")),
+    ('rtext', W-22, 18, 'Questions? Call (253) 853-0900 or email shop@usawrapco.com'),
+    ('hline', 22, 24, W-44, '#e8e5e0'),
+])]
+
+TABLE_HEAD = [
+    ('fill', 'NAVY'), ('rect', LX, 0, TW, 14, 1, 0),
+    ('fill', 'WHITE'), ('font', 'PopB', 7),
+    ('text', LX+9, 4, 'DESCRIPTION'), ('text', LX+340, 4, 'QTY'), ('rtext', W-28, 4, 'AMOUNT'),
+    ('move', -14),
+]
+
+NEW_PAGE = FOOTER + [('page',)] + bg() + [('let', 'y', H-30)]
+
+ROW = [
+    ('if', f'y - {RH} < {FOOTER_Y}', NEW_PAGE + TABLE_HEAD),
+    ('fill', E('WHITE if idx%2==0 else ROWALT')), ('rect', LX, -RH, TW, RH, 1, 0),
+    ('fill', E('STEEL if idx%2==0 else STEELL')), ('rect', LX, -RH, 3, RH, 1, 0),
+    *txt('INK', 'PopB', 10, LX+9, -11, E("item.get('name','')")),
+    *txt('INK', 'PopB', 10, W-28, -11, E("item.get('amount','')"), 'rtext'),
+    *txt('DKGRAY', 'Pop', 8.5, LX+340, -11, E("item.get('qty','')")),
+    *txt('DKGRAY', 'Pop', 8.5, LX+9, -21, E("item.get('desc','')")),
+    ('hline', LX, -RH, TW, 'RULE'),
+    ('move', -RH),
+]
+
+PAYMENT = [('at', 'py', [
+    *txt('GREEN', 'PopB', 9, LX+9, 1, '+'),
+    *txt('INK', 'PopM', 9, LX+21, 0, E("pmt.get('note','Payment')+'  -  '+pmt.get('amount','')")),
+    *txt('MDGRAY', 'Pop', 7.5, LX+21, -10, E("pmt.get('date','')+'  -  '+pmt.get('method','')")),
+]), ('let', 'py', 'py - 24')]
+
+
+def _total_row(lbl, val, accent_row, big, dy):
+    ops = []
+    if accent_row:
+        ops += [('hline', TX+8, dy+10, TW2-16, 'LTGRAY', 0.8),
+                ('fill', 'OFF'), ('rect', TX+3, dy-12, TW2-3, 22, 1, 0)]
+    ops += txt('INK' if accent_row else 'DKGRAY', 'PopB' if big else 'Pop', 10 if big else 9, TX+10, dy, lbl)
+    ops += [('fill', E("RED if d.get('status_color','due')=='overdue' else GREEN if d.get('status_color','due')=='paid' else INK")
+                     if accent_row else 'INK'),
+            ('font', 'PopB', 11 if big else 9), ('rtext', RVAL, dy, val)]
+    return ops
+
+
+TOTALS = (
+    _total_row('Subtotal', E("d.get('subtotal','$0.00')"), False, False, -12) +
+    _total_row(E("d.get('tax_label','Sales Tax')"), E("d.get('tax_amount','$0.00')"), False, False, -26) +
+    _total_row('Design Deposit Paid', E("'-'+d.get('deposit_paid','$0.00')"), False, False, -40) +
+    _total_row('BALANCE DUE', E("d.get('balance','$0.00')"), True, True, -54) +
+    txt('MDGRAY', 'Pop', 6, TX+10, -69, 'WA vehicle wrap installation - taxable retail service (RCW 82.04)')
+)
+
+BODY = [
+    ('let', 'y', H-(88+20)-10),
+    *accent_card(LX, -50, CW, 50, 'WHITE', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'BILL TO'),
+    *txt('INK', 'PopB', 10, LX+9, -21, E("d.get('client_name','')")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -32, E("d.get('client_phone','')+'  -  '+d.get('client_email','')")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -43, E("d.get('client_addr','')")),
+
+    *accent_card(CX2, -50, CW, 50, 'STEELBG', 'STEELD', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 7, CX2+9, -9, 'JOB DETAILS'),
+    *txt('INK', 'PopB', 9, CX2+9, -21, E("'Sales Order  '+d.get('linked_ref','')")),
+    *txt('DKGRAY', 'Pop', 9, CX2+9, -32, E("'Installed '+d.get('install_date','')+'  -  Agent: '+d.get('agent','')")),
+    ('if', "d.get('po_number')", txt('DKGRAY', 'Pop', 9, CX2+9, -43, E("'Client PO:  '+d['po_number']"))),
+    ('move', -58),
+
+    *sec_band(LX, TW, 'Services Rendered'),
+    ('move', -13),
+    *TABLE_HEAD,
+    ('each', 'idx, item', "enumerate(d.get('line_items', []))", ROW),
+    ('py', "checkpoint(c, 'line items')"),
+
+    ('hline', LX, 0, TW, 'MDGRAY', 0.8),
+    ('move', -10),
+    ('if', f"y - ({PH_H+10+26+10} + (44 if d.get('notes') else 0)) < {FOOTER_Y}", NEW_PAGE),
+
+    *accent_card(LX, -PH_H, IW, PH_H, 'WHITE', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'PAYMENT HISTORY'),
+    ('let', 'py', 'y - 22'),
+    ('each', 'pmt', "d.get('payments', [])", PAYMENT),
+    ('if', "not d.get('payments')", txt('MDGRAY', 'Pop', 8, LX+9, -28, 'No payments recorded.')),
+
+    *accent_card(TX, -PH_H, TW2, PH_H, 'WHITE', 'RULE', 'NAVY'),
+    *TOTALS,
+    ('move', -(PH_H+10)),
+
+    *accent_card(LX, -26, TW, 26, 'GREENBG', '#a8d8bc', 'GREEN'),
+    *txt('#1a6a3c', 'PopB', 8, LX+10, -9, 'How to Pay'),
+    *txt('DKGRAY', 'Pop', 8, LX+72, -9,
+         E("d.get('payment_methods','Credit Card  -  Check payable to USA Wrap Co  -  Pay online at portal.usawrapco.com')")),
+    *txt('LINK', 'PopM', 7.5, W-28, -20, C("'Pay online -> '+SHOP['portal']"), 'rtext'),
+    *txt('DKGRAY', 'Pop', 7.5, LX+10, -20, 'Payments received after due date subject to 1.5%/month late fee'),
+    ('move', -34),
+
+    ('if', "d.get('notes')", [
+        *accent_card(LX, -36, TW, 36, 'OFF', 'RULE', 'NAVY'),
+        *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'NOTES'),
+        ('fill', 'DKGRAY'), ('font', 'Pop', 8),
+        ('let', 'ny', 'y - 20'),
+        ('wrap', LX+9, 'ny', E("d['notes']"), 'Pop', 8, TW-20, 10),
+        ('move', -44),
+    ]),
+]
+
+TEMPLATE = {
+    'name': 'invoice',
+    'pagesize': (W, H),
+    'ops': bg() + HEADER + BODY + FOOTER,
+}
@@ -0,0 +1,308 @@
+"""Sales order (internal) — port of gen_salesorder.gen_salesorder()."""
+
+import math
+
+from layout import E, C
+from layouts.common import W, H, bg, txt, accent, accent_card, sec_band
+
+BAND = 62; META_H = 14
+EH = 40; EW = int(1143/469 * EH)
+CONF_X = 14 + EW + 10
+RX = W - 180
+LX = 14; TW = W-28
+CW_L = TW * 0.52; CW_R = TW - CW_L - 8; JRX = LX + CW_L + 8
+COL = {'desc':14, 'revenue':220, 'material':290, 'labor':345, 'design':400, 'cogs':450, 'gp':490, 'gpm':530}
+ROW_H = 13; FOOTER_Y = 40
+CARD_H = 90; CW = (TW - 16) / 3
+C1X = LX; C2X = LX + CW + 8; C3X = LX + 2*(CW+8)
+PCOLS = 4; PCOL_W = TW / PCOLS
+NOTE_H = 46; NCOL_W = TW / 3 - 8
+SIGN_H = 28
+EH2 = 14; EW2 = int(1143/469*EH2)
+
+BG = bg(edge='#f4f2ef')
+
+
+def pill(x, dy, text, bg_col, fg_col, size, font='PopB'):
+    """gen_salesorder.pill(); width is measured once when the text is static."""
+    if isinstance(text, E):
+        pw = f'pdfmetrics.stringWidth({text}, {font!r}, {size!r}) + 10'
+        ops = [('let', '_pw', pw)]
+        w = '_pw'; cx = f'{x!r} + _pw/2'
+    else:
+        ops = []
+        w = C(f'pdfmetrics.stringWidth({text!r}, {font!r}, {size!r}) + 10')
+        cx = C(f'{x!r} + ({w})/2')
+    return ops + [('fill', bg_col), ('rrect', x, dy, w, 12, 4, 1, 0),
+                  ('fill', fg_col), ('font', font, size), ('ctext', cx, dy+3.5, text)]
+
+
+HEADER = [('at', H, [
+    ('fill', 'NAVY'), ('rect', 0, -BAND, W, BAND, 1, 0),
+    ('image', 'EAGLE_LIGHT', 14, -BAND+(BAND-EH)/2, EW, EH),
+    ('fill', 'CONFRED'), ('rrect', CONF_X, -18, 80, 11, 3, 1, 0),
+    *txt('WHITE', 'PopB', 6.5, CONF_X+40, -13, '! CONFIDENTIAL - INTERNAL USE ONLY', 'ctext'),
+    *txt('WHITE', 'PopB', 22, CONF_X, -BAND+24, 'SALES ORDER'),
+    *txt('STEELL', 'PopM', 8, CONF_X, -BAND+13,
+         E("f'{d.get(\"division\",\"WRAPS\")}  -  Internal Financial Summary  -  Not for Customer Distribution'")),
+    ('let', 'sc, fc', "{'APPROVED': (GREEN, WHITE), 'PENDING': (AMBER, WHITE), "
+                      "'IN PROGRESS': (colors.HexColor('#1a4a8a'), WHITE), 'COMPLETED': (NAVY, WHITE)}"
+                      ".get(d.get('status','APPROVED'), (STEEL, WHITE))"),
+    *pill(RX, -20, E("d.get('status','APPROVED')"), E('sc'), E('fc'), 7.5),
+    ('if', "d.get('priority') == 'HIGH'", pill(RX+75, -20, '^ HIGH PRIORITY', 'RED', 'WHITE', 7)),
+    *txt('WHITE', 'PopB', 9.5, W-14, -BAND+38, E("d.get('ref','')"), 'rtext'),
+    ('fill', 'MDGRAY'), ('font', 'Pop', 7.5),
+    ('rtext', W-14, -BAND+27, E("f\"EST Ref: {d.get('est_ref','')}\"")),
+    ('rtext', W-14, -BAND+16, E("f\"Date: {d.get('date','')}  -  Install: {d.get('install_date','')}\"")),
+
+    ('fill', 'NAVY2'), ('rect', 0, -BAND-META_H, W, META_H, 1, 0),
+    ('let', 'IX', 14),
+    *[op for label, val in [
+        ('AGENT',     "f\"{d.get('agent','-')} ({d.get('agent_type','inbound').title()})\""),
+        ('INSTALLER', "d.get('installer','-')"),
+        ('DESIGNER',  "d.get('designer','-')"),
+        ('REF',       "d.get('ref','')"),
+    ] for op in [
+        ('let', 'val', val),
+        *txt('STEELL', 'PopB', 5.5, 'IX', -BAND-META_H+5.5, label),
+        *txt('WHITE', 'PopM', 7.5, 'IX', -BAND-META_H+0.5, E('val')),
+        ('let', 'IX', "IX + max(pdfmetrics.stringWidth(val,'PopM',7.5)+16, 90)"),
+    ]],
+])]
+
+FOOTER = [('at', 0, [
+    ('fill', 'NAVY'), ('rect', 0, 0, W, 20, 1, 0),
+    ('image', 'EAGLE_LIGHT', 14, 3, EW2, EH2),
+    *txt('WHITE', 'PopB', 8, 14+EW2+8, 11, C("SHOP['name']")),
+    *txt('STEELL', 'PopM', 6.5, 14+EW2+8, 3, C("SHOP['phone']+'  -  '+SHOP['email']")),
+    *txt('CONFRED', 'PopB', 7, W/2, 7, '! CONFIDENTIAL - FOR INTERNAL USE ONLY - NOT FOR CUSTOMER DISTRIBUTION', 'ctext'),
+    ('fill', 'MDGRAY'), ('font', 'Pop', 6),
+    ('rtext', W-14, 11, E("f'SO: {d.get(\"ref\",\"\")}  -  Printed {d.get(\"date\",\"\")}'")),
+    ('rtext', W-14, 4, 'WrapShop Pro  -  app.usawrapco.com'),
+])]
+
+
+def page_break(min_space):
+    """gen_salesorder._page_break_if_needed()."""
+    return [('if', f'y < {min_space}', FOOTER + [('page',)] + BG + [('let', 'y', H-30)])]
+
+
+JOB_DETAILS = [
+    *accent_card(LX, -64, CW_L, 64, 'OFF', 'LTGRAY', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 6, LX+8, -10, 'VEHICLE'),
+    *txt('INK', 'PopB', 10, LX+8, -22, E("d.get('vehicle','')")),
+    *txt('DKGRAY', 'Pop', 7.5, LX+8, -32,
+         E("f\"VIN: {d.get('vin','--')}  -  {d.get('color','--')}  -  {d.get('plates','--')}\"")),
+    *txt('DKGRAY', 'PopB', 6, LX+8, -44, 'SCOPE'),
+    *txt('INK', 'Pop', 8, LX+8, -54, E("d.get('scope','')")),
+    *txt('DKGRAY', 'Pop', 7, LX+8, -62, E("f\"Material: {d.get('material','')}  -  {d.get('sqft','')} sqft\"")),
+    *accent_card(JRX, -64, CW_R, 64, 'WHITE', 'LTGRAY', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 6, JRX+8, -10, 'CLIENT'),
+    *txt('INK', 'PopB', 10, JRX+8, -22, E("d.get('client_name','')")),
+    ('fill', 'DKGRAY'), ('font', 'Pop', 7.5),
+    ('text', JRX+8, -32, E("d.get('client_phone','')")),
+    ('text', JRX+8, -42, E("d.get('client_email','')")),
+    ('text', JRX+8, -52, E("d.get('client_company','')")),
+    ('move', -72),
+]
+
+HEADS = [(COL['desc']+2, 'DESCRIPTION'), (COL['revenue'], 'REVENUE'),
+         (COL['material'], 'MATERIAL'), (COL['labor'], 'LABOR'),
+         (COL['design'], 'DESIGN'), (COL['cogs'], 'TOTAL COGS'),
+         (COL['gp'], 'GROSS PROFIT'), (COL['gpm'], 'GPM %')]
+TABLE_HEAD = [('fill', 'NAVY'), ('rect', LX, -ROW_H, TW, ROW_H, 1, 0),
+              ('fill', 'WHITE'), ('font', 'PopB', 6.5)] + \
+             [('text', cx, -ROW_H+4, hdr) for cx, hdr in HEADS] + [('move', -ROW_H)]
+
+MONEY_COLS = [('revenue', 'rev', 'INK'), ('material', 'mat', 'DKGRAY'), ('labor', 'lab', 'DKGRAY'),
+              ('design', 'des', 'DKGRAY'), ('cogs', 'cogs', 'STEELD'), ('gp', 'gp', E('GREEN if gp > 0 else RED'))]
+
+ROW = [
+    ('if', f'y - {ROW_H} < {FOOTER_Y}', [('page',)] + BG + [('let', 'y', H-30)] + TABLE_HEAD),
+    ('fill', E('ROWALT if i % 2 == 0 else WHITE')), ('rect', LX, -ROW_H, TW, ROW_H, 1, 0),
+    ('hline', LX, -ROW_H, TW, 'LTGRAY'),
+    ('let', 'rev', "float(item.get('revenue', 0))"),
+    ('let', 'mat', "float(item.get('material_cost', 0))"),
+    ('let', 'lab', "float(item.get('labor_cost', 0))"),
+    ('let', 'des', "float(item.get('design_cost', 0))"),
+    ('let', 'cogs', 'mat + lab + des'),
+    ('let', 'gp', 'rev - cogs'),
+    ('let', 'gpm', '(gp / rev * 100) if rev > 0 else 0'),
+    *txt('INK', 'PopB', 7.5, COL['desc']+2, -ROW_H+5, E("item.get('name','')")),
+    *txt('DKGRAY', 'Pop', 6, COL['desc']+2, -ROW_H+1, E("item.get('description','')")),
+    ('font', 'PopM', 7.5),
+    *[op for key, var, col in MONEY_COLS
+      for op in [('fill', col), ('text', COL[key], -ROW_H+4, E(f"f'${{{var}:,.2f}}'"))]],
+    *txt(E('GREEN if gpm >= 75 else (AMBER if gpm >= 65 else RED)'), 'PopB', 7.5,
+         COL['gpm'], -ROW_H+4, E("f'{gpm:.1f}%'")),
+    ('move', -ROW_H),
+]
+
+TOTALS = [
+    ('let', 'rev', "sum(float(i.get('revenue',0)) for i in line_items)"),
+    ('let', 'mat', "sum(float(i.get('material_cost',0)) for i in line_items)"),
+    ('let', 'lab', "sum(float(i.get('labor_cost',0)) for i in line_items)"),
+    ('let', 'des', "sum(float(i.get('design_cost',0)) for i in line_items)"),
+    ('let', 'cogs', 'mat + lab + des'),
+    ('let', 'gp', 'rev - cogs'),
+    ('let', 'gpm', '(gp / rev * 100) if rev > 0 else 0'),
+    ('hline', LX, 0, TW, 'STEELD', 1),
+    ('fill', 'SECBG'), ('rect', LX, -ROW_H, TW, ROW_H, 1, 0),
+    *txt('INK', 'PopB', 7.5, COL['desc']+2, -ROW_H+4, 'TOTALS'),
+    *[op for key, var, col in MONEY_COLS
+      for op in [('fill', col), ('font', 'PopB', 7.5), ('text', COL[key], -ROW_H+4, E(f"f'${{{var}:,.2f}}'"))]],
+    *txt(E('GREEN if gpm >= 75 else (AMBER if gpm >= 65 else RED)'), 'PopB', 8,
+         COL['gpm'], -ROW_H+4, E("f'{gpm:.1f}%'")),
+    ('move', -ROW_H),
+]
+
+LINE_ITEMS = [
+    *sec_band(LX, TW, 'Line Items & COGS Breakdown', 'Revenue / Material / Labor / Design / GP / GPM'),
+    ('move', -12),
+    *TABLE_HEAD,
+    ('let', 'line_items', "d.get('line_items', [])"),
+    ('each', 'i, item', 'enumerate(line_items)', ROW),
+    ('if', 'line_items', TOTALS),
+    ('move', -8),
+]
+
+
+def _cost_rows():
+    ops = []; dy = -22
+    for label, key, is_cost in [('Sale Price', 'sale_price', False), ('Material Cost', 'material_cost', True),
+                                ('Installer Pay', 'installer_pay', True), ('Design Fee', 'design_fee', True),
+                                ('Production Bonus', 'production_bonus', True)]:
+        ops += txt('DKGRAY' if is_cost else 'INK', 'Pop', 7, C1X+8, dy, label)
+        ops += txt('STEELD' if is_cost else 'INK', 'PopM', 7, C1X+CW-8, dy,
+                   E(f"f'{'-' if is_cost else ''}${{abs(float(d.get(\"{key}\",0))):,.2f}}'"), 'rtext')
+        dy -= 9
+    return ops
+
+
+def _comm_rows():
+    ops = []; dy = -22
+    for label, val, col in [
+        ('Gross Profit', E("f'${gp:,.2f}'"), 'INK'),
+        (E("f'Base Rate ({d.get(\"commission_type\",\"inbound\").title()})'"),
+         E("f'{d.get(\"commission_base\",4.5)}%'"), 'DKGRAY'),
+        ('Bonus Adjustments', E("f'+{d.get(\"commission_bonus\",0)}%'"), 'AMBER'),
+        ('Effective Rate', E("f'{d.get(\"commission_rate\",4.5)}%'"), 'NAVY'),
+    ]:
+        ops += txt('DKGRAY', 'Pop', 7, C3X+8, dy, label)
+        ops += txt(col, 'PopM', 7, C3X+CW-8, dy, val, 'rtext')
+        dy -= 9
+    return ops
+
+
+FINANCIALS = [
+    *sec_band(LX, TW, 'Financial Summary', 'INTERNAL - Confidential'),
+    ('move', -12),
+
+    *accent_card(C1X, -CARD_H, CW, CARD_H, 'WHITE', 'LTGRAY', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 6.5, C1X+8, -10, 'REVENUE vs COGS'),
+    *_cost_rows(),
+    ('hline', C1X+8, -61, CW-16, 'LTGRAY'),
+    ('let', 'gp', "float(d.get('gross_profit', 0))"),
+    *txt('INK', 'PopB', 7.5, C1X+8, -71, 'Gross Profit'),
+    *txt(E('GREEN if gp >= 0 else RED'), 'PopB', 9, C1X+CW-8, -71, E("f'${gp:,.2f}'"), 'rtext'),
+
+    *accent_card(C2X, -CARD_H, CW, CARD_H, 'WHITE', 'LTGRAY', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 6.5, C2X+8, -10, 'GROSS PROFIT MARGIN'),
+    ('let', 'gpm', "float(d.get('gpm', 0))"),
+    ('let', 'gpm_tgt', "float(d.get('gpm_target', 75.0))"),
+    ('let', 'gpm_bon', "float(d.get('gpm_bonus_thresh', 73.0))"),
+    ('let', 'gpm_col', 'GREEN if gpm >= gpm_tgt else (AMBER if gpm >= gpm_bon else RED)'),
+    *txt(E('gpm_col'), 'PopB', 26, C2X+CW/2, -38, E("f'{gpm:.1f}%'"), 'ctext'),
+    *txt(E('gpm_col'), 'PopB', 7, C2X+CW/2, -50,
+         E("'ABOVE TARGET' if gpm >= gpm_tgt else ('BONUS ELIGIBLE' if gpm >= gpm_bon else 'BELOW THRESHOLD')"), 'ctext'),
+    ('py', f'gpm_bar(c, {C2X+10!r}, y - 62, {CW-20!r}, gpm, gpm_tgt, gpm_bon)'),
+    ('fill', 'MDGRAY'), ('font', 'Pop', 6),
+    ('text', C2X+10, -72, E("f'Target: {gpm_tgt}%'")),
+    ('text', C2X+CW/2-5, -72, E("f'Bonus: {gpm_bon}%'")),
+    ('rtext', C2X+CW-10, -72, E("f'Actual: {gpm:.1f}%'")),
+    ('let', 'torq', "d.get('torq_completed', False)"),
+    ('let', 'bonus_earned', "d.get('gpm_bonus_earned', False)"),
+    *txt('DKGRAY', 'Pop', 6, C2X+8, -CARD_H+8, 'Torq Training:'),
+    *txt(E('GREEN if torq else RED'), 'PopB', 6, C2X+63, -CARD_H+8, E("'Completed' if torq else 'Incomplete'")),
+    *txt('DKGRAY', 'Pop', 6, C2X+CW/2+4, -CARD_H+8, 'GPM Bonus:'),
+    *txt(E('GREEN if bonus_earned else RED'), 'PopB', 6, C2X+CW/2+55, -CARD_H+8,
+         E("'Earned' if bonus_earned else 'Not Earned'")),
+
+    *accent_card(C3X, -CARD_H, CW, CARD_H, 'WHITE', 'LTGRAY', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 6.5, C3X+8, -10, 'COMMISSION CALCULATION'),
+    *_comm_rows(),
+    ('hline', C3X+8, -52, CW-16, 'LTGRAY'),
+    ('let', 'comm_amt', "float(d.get('commission_amount', 0))"),
+    *txt('INK', 'PopB', 7.5, C3X+8, -62, 'Commission Due'),
+    *txt(E('GREEN if comm_amt > 0 else RED'), 'PopB', 9, C3X+CW-8, -62, E("f'${comm_amt:,.2f}'"), 'rtext'),
+    *txt('MDGRAY', 'Pop', 5.5, C3X+8, -80,
+         E("f'Comm. calculated on GP (${gp:,.2f}), NOT on sale price (${float(d.get(\"sale_price\", 0)):,.2f})'")),
+    *txt('MDGRAY', 'Pop', 6, C3X+8, -88,
+         E("f'Torq: {\"+\" if torq else \"-\"} (+1%)  -  GPM Bonus: {\"+\" if bonus_earned else \"-\"} (+2%)'")),
+    ('move', -(CARD_H+8)),
+]
+
+INSTALL = [('let', 'panels', "d.get('panels', [])"), ('if', 'panels', [
+    *sec_band(LX, TW, 'Panels to Wrap', E("f'{d.get(\"sqft\",\"\")} sqft total'")),
+    ('move', -12),
+    ('let', 'PB_H', f'math.ceil(len(panels) / {PCOLS}) * 12 + 8'),
+    ('card', LX, '-PB_H', TW, 'PB_H', 'OFF', 'LTGRAY'),
+    ('each', 'i, panel', 'enumerate(panels)', [
+        ('let', 'px', f'{LX} + (i % {PCOLS}) * {PCOL_W!r} + 8'),
+        ('at', f'y - 10 - (i // {PCOLS}) * 12', [
+            *txt('STEELD', 'Pop', 7, 'px', 0, '>'),
+            *txt('INK', 'PopM', 7.5, 'px+9', 0, E('panel')),
+        ]),
+    ]),
+    ('move', '-(PB_H + 8)'),
+])]
+
+
+def _note_cols():
+    ops = []; nx = LX + 8
+    for label, key, col in [('AGENT NOTES', 'agent_notes', 'INK'), ('PRODUCTION', 'prod_notes', 'DKGRAY'),
+                            ('INTERNAL NOTES', 'internal_notes', E("RED if d.get('internal_notes') else DKGRAY"))]:
+        ops += txt('STEELD', 'PopB', 6, nx, -10, label)
+        ops += [('fill', col), ('font', 'Pop', 7), ('let', 'ny', 'y - 20'),
+                ('wrap', nx, 'ny', E(f"d.get({key!r},'--')"), 'Pop', 7, NCOL_W - 4, 9)]
+        nx += NCOL_W + 8
+    return ops
+
+
+NOTES = [
+    *accent_card(LX, -NOTE_H, TW, NOTE_H, 'OFF', 'LTGRAY', 'STEELD'),
+    *_note_cols(),
+    ('move', -(NOTE_H+8)),
+]
+
+
+def _sign_fields():
+    ops = []; fx = LX + 8
+    for label, default, fw in [('Sales Agent Approval', "d.get('agent','')", 70), ('Production Manager', None, 70),
+                               ('Date Authorized', "d.get('date','')", 55), ('Finance Reviewed', None, 55)]:
+        blank = '_'*int(fw/4.5)
+        ops += txt('DKGRAY', 'Pop', 6.5, fx, -SIGN_H+9, label+':')
+        ops += txt('MDGRAY', 'Pop', 7, fx, -SIGN_H+3, E(f'{default} or {blank!r}') if default else blank)
+        fx += fw + 20
+    return ops
+
+
+SIGNOFF = [
+    ('card', LX, -SIGN_H, TW, SIGN_H, 'WHITE', 'LTGRAY'),
+    *txt('STEELD', 'PopB', 6, LX+8, -10, 'AUTHORIZATION & SIGN-OFF'),
+    ('hline', LX+8, -SIGN_H+12, TW-16),
+    *_sign_fields(),
+    ('move', -(SIGN_H+8)),
+]
+
+TEMPLATE = {
+    'name': 'salesorder',
+    'pagesize': (W, H),
+    'ops': BG + HEADER + [('let', 'y', H - BAND - META_H - 8)] +
+           JOB_DETAILS + page_break(120) +
+           LINE_ITEMS + [('py', "checkpoint(c, 'line items')")] + page_break(120) +
+           FINANCIALS + page_break(120) +
+           INSTALL + page_break(80) +
+           NOTES + page_break(80) +
+           SIGNOFF + FOOTER,
+}
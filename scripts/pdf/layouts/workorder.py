@@ -0,0 +1,152 @@
+"""Work order / installer brief — port of gen_workorder.gen_wo()."""
+
+from layout import E, C
+from layouts.common import W, H, bg, txt, accent_card, sec_band
+
+ZA, ZD = 72, 18
+EH = 56; EW = int(1230/470*EH)
+NX = 10+EW+10; NY = -ZA+ZA//2+14
+LX = 22; TW = W-44
+VW = TW*0.55; CW2 = TW-VW-8; CX2 = LX+VW+8
+HW = TW/2-4; CX3 = LX+HW+8
+COL_N = 3; COL_W2 = TW/COL_N
+
+HEADER = [('at', H, [
+    ('fill', 'NAVY'),  ('rect', 0, -ZA, W, ZA, 1, 0),
+    ('fill', 'STEEL'), ('rect', 0, -ZA, 5, ZA, 1, 0),
+    ('fill', '#070f1a'), ('rect', 320, -ZA, W-320, ZA, 1, 0),
+    ('image', 'EAGLE_LIGHT', 10, -ZA+(ZA-EH)/2, EW, EH),
+    *txt('WHITE', 'PopB', 14, NX, NY, 'USA WRAP CO'),
+    ('stroke', 'STEEL'), ('lw', 1),
+    ('line', NX, NY-5, C(f"{NX}+pdfmetrics.stringWidth('USA WRAP CO','PopB',14)"), NY-5),
+    *txt('STEELL', 'PopM', 8, NX, NY-15, 'Work Order / Installer Brief'),
+    *txt('#5a7898', 'Pop', 7, NX, NY-25, C("SHOP['address']+'  -  '+SHOP['phone']")),
+    ('stroke', '#162636'), ('lw', 0.8), ('line', 319, -6, 319, -ZA+5),
+
+    ('fill', E("colors.HexColor('#c04040') if d.get('priority')=='HIGH' else STEEL")),
+    ('rrect', W-14-60, -22, 60, 12, 3, 1, 0),
+    *txt('WHITE', 'PopB', 7, W-14-30, -16, E("d.get('priority','NORMAL')+' PRIORITY'"), 'ctext'),
+    *txt('WHITE', 'PopB', 22, W-14, -40, 'WORK ORDER', 'rtext'),
+    ('fill', '#5a7a9a'), ('font', 'Pop', 7.5),
+    ('rtext', W-14, -53, E("d.get('ref','')+'  -  '+d.get('date','')")),
+    ('rtext', W-14, -64, E("'Sales Order:  '+d.get('so_ref','')")),
+
+    ('fill', 'NAVY2'), ('rect', 0, -ZA-ZD, W, ZD, 1, 0),
+    ('hline', 0, -ZA, W, '#162636', 0.8),
+    *txt('#5a7898', 'PopB', 7, 12, -ZA-7, 'INSTALLER:'),
+    *txt('WHITE', 'PopB', 9, 75, -ZA-7, E("d.get('installer','—')")),
+    *txt('#5a7898', 'PopB', 7, 160, -ZA-7, 'BAY:'),
+    *txt('WHITE', 'PopB', 9, 185, -ZA-7, E("d.get('bay','—')")),
+    *txt('#5a7898', 'PopB', 7, 250, -ZA-7, 'EST. HRS:'),
+    *txt('WHITE', 'PopB', 9, 298, -ZA-7, E("str(d.get('est_hours','—'))+' hrs'")),
+    *txt('#5a7898', 'PopB', 7, 370, -ZA-7, 'PAY:'),
+    *txt('WHITE', 'PopB', 9, 396, -ZA-7, E("d.get('installer_pay','—')+'  ('+d.get('pay_type','Flat Rate')+')'")),
+    ('fill', 'GREEN'), ('rrect', W-14-100, -ZA-ZD+3, 100, 12, 2, 1, 0),
+    *txt('WHITE', 'PopB', 6.5, W-14-50, -ZA-ZD+9, E("d.get('status','READY TO INSTALL')"), 'ctext'),
+])]
+
+FOOTER = [('at', 0, [
+    ('hline', 22, 24, W-44, 'LTGRAY'),
+    ('fill', 'MDGRAY'), ('font', 'Pop', 6.5),
+    ('text', 22, 16, E("f\"Work Order {d.get('ref','')}  -  Sales Order {d.get('so_ref','')}  -  {SHOP['name']}  -  {SHOP['address']}\"")),
+    ('rtext', W-22, 16, 'Installer keeps this form  -  Sign and return after completion'),
+])]
+
+
+def checkbox(x):
+    """gen_workorder.checkbox() at the `cy` cursor, label bound to `chk`."""
+    return [('at', 'cy', [
+        ('stroke', 'MDGRAY'), ('lw', 0.8), ('rect', x, 0, 9, 9, 0, 1),
+        *txt('INK', 'Pop', 7.5, x+9+5, 1, E('chk')),
+    ]), ('let', 'cy', 'cy - 14')]
+
+
+PANELS = [
+    *sec_band(LX, TW, 'Panels to Wrap'),
+    ('move', -13),
+    ('let', 'PNL_H', f'math.ceil(len(panels)/{COL_N})*12+14'),
+    *accent_card(LX, '-PNL_H', TW, 'PNL_H', 'OFF', 'RULE', 'STEEL'),
+    ('each', 'i, panel', 'enumerate(panels)', [
+        ('let', 'px', f'{LX+9} + (i % {COL_N})*{COL_W2!r}'),
+        ('at', f'y - 9 - (i // {COL_N})*12', [
+            *txt('STEEL', 'PopB', 8.5, 'px', 1, '-'),
+            *txt('INK', 'Pop', 8.5, 'px+10', 0, E('panel')),
+        ]),
+    ]),
+    ('move', '-(PNL_H+8)'),
+]
+
+BODY = [
+    ('let', 'y', H-(72+18)-10),
+    *accent_card(LX, -72, VW, 72, 'WHITE', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'VEHICLE'),
+    *txt('INK', 'PopB', 11, LX+9, -21, E("d.get('year','')+' '+d.get('make','')")),
+    *txt('STEELL', 'PopM', 9, LX+9, -32, E("d.get('model','')")),
+    ('fill', 'DKGRAY'), ('font', 'Pop', 8.5),
+    ('text', LX+9, -44, E("'Color: '+d.get('color','—')")),
+    ('text', LX+9, -55, E("'VIN:  '+d.get('vin','—')")),
+    ('text', LX+9, -66, E("'Plate: '+d.get('plate','—')+'   -   Mileage: '+d.get('mileage','—')")),
+
+    *accent_card(CX2, -72, CW2, 72, 'STEELBG', 'STEELD', 'STEELD'),
+    *txt('DKGRAY', 'PopB', 7, CX2+9, -9, 'CLIENT / PICKUP INFO'),
+    *txt('INK', 'PopB', 9.5, CX2+9, -21, E("d.get('client_name','')")),
+    ('fill', 'DKGRAY'), ('font', 'Pop', 8.5),
+    ('text', CX2+9, -32, E("'Contact: '+d.get('client_contact','')")),
+    ('text', CX2+9, -43, E("d.get('client_phone','')")),
+    ('text', CX2+9, -55, E("'Drop-off: '+d.get('drop_off','')")),
+    ('text', CX2+9, -66, E("'Pick-up:  '+d.get('pick_up','')")),
+    ('move', -80),
+
+    *sec_band(LX, TW, 'Wrap Scope & Material', E("str(d.get('sqft',''))+' sqft  -  '+d.get('linear_ft','')")),
+    ('move', -13),
+    *accent_card(LX, -46, TW, 46, 'WHITE', 'RULE', 'STEEL'),
+    *txt('INK', 'PopB', 10, LX+9, -11, E("d.get('scope','')")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -23, E("'Material: '+d.get('material','')")),
+    *txt('DKGRAY', 'Pop', 9, LX+9, -35,
+         E("'Coverage: '+str(d.get('sqft',''))+' sqft  -  '+d.get('linear_ft','')+' ordered'")),
+    ('fill', 'NAVY'), ('rrect', W-28-50, -32, 50, 24, 3, 1, 0),
+    *txt('STEELL', 'PopB', 6.5, W-28-25, -14, 'SQ FT', 'ctext'),
+    *txt('WHITE', 'PopB', 14, W-28-25, -30, E("str(d.get('sqft',''))"), 'ctext'),
+    ('move', -54),
+
+    ('let', 'panels', "d.get('panels', [])"),
+    ('if', 'panels', PANELS),
+    ('py', 'y = diagram_section(c, d, y)'),
+
+    ('if', "d.get('special_notes')", [
+        *accent_card(LX, -30, TW, 30, 'ORANGEBG', '#e8a060', 'ORANGE'),
+        *txt('ORANGE', 'PopB', 7.5, LX+9, -9, '! SPECIAL INSTRUCTIONS'),
+        ('fill', '#5a3000'), ('font', 'Pop', 8),
+        ('let', 'ny', 'y - 21'),
+        ('wrap', LX+9, 'ny', E("d['special_notes']"), 'Pop', 8, TW-20, 9),
+        ('move', -38),
+    ]),
+
+    *sec_band(LX, TW, 'Installation Checklists'),
+    ('move', -13),
+    ('let', 'pre_checks', "d.get('pre_checks', DEFAULT_PRE_CHECKS)"),
+    ('let', 'post_checks', "d.get('post_checks', DEFAULT_POST_CHECKS)"),
+    ('let', 'CK_H', 'max(len(pre_checks), len(post_checks))*14+18'),
+    *accent_card(LX, '-CK_H', HW, 'CK_H', 'WHITE', 'RULE', 'STEEL'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'PRE-INSTALL  (before starting)'),
+    ('let', 'cy', 'y - 21'),
+    ('each', 'chk', 'pre_checks', checkbox(LX+9)),
+    *accent_card(CX3, '-CK_H', HW, 'CK_H', 'WHITE', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, CX3+9, -9, 'POST-INSTALL  (before releasing)'),
+    ('let', 'cy', 'y - 21'),
+    ('each', 'chk', 'post_checks', checkbox(CX3+9)),
+    ('move', '-(CK_H+10)'),
+
+    *accent_card(LX, -34, TW, 34, 'OFF', 'RULE', 'NAVY'),
+    *txt('DKGRAY', 'PopB', 7, LX+9, -9, 'INSTALLER SIGN-OFF'),
+    *txt('DKGRAY', 'Pop', 8, LX+9, -22,
+         'By signing below, installer confirms all pre/post checklists complete and vehicle released to customer.'),
+    *txt('DKGRAY', 'Pop', 8, LX+9, -32,
+         'Installer Signature: ______________________   Date: ____________   Actual Hrs: _______   Start: _______   End: _______'),
+]
+
+TEMPLATE = {
+    'name': 'workorder',
+    'pagesize': (W, H),
+    'ops': bg() + HEADER + BODY + FOOTER,
+}
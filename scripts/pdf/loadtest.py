@@ -0,0 +1,357 @@
+"""
+USA Wrap Co — PDF Load Test
+Drives the document path at fixed concurrency and reports throughput, latency
+percentiles, CPU saturation and failure rates, so render capacity can be sized
+for month-end invoice runs. Runs entirely locally against the real generators
+with synthetic payloads (bench_layout.py).
+
+Modes
+  spawn   exactly what generatePdf() in app/api/pdf/_shared.ts does per request:
+          write pdf-data-<uuid>.json to the temp dir, run
+          "python3" "scripts/pdf/gen_<kind>.py" "<data>" "<out>" through the shell with a
+          60s timeout, read the PDF back, unlink both files. Exit 3 with a
+          render_limit line on stderr counts as a 422, anything else as a 500.
+  warm    a pool of long-lived worker processes that already imported the generators
+          (fonts registered, logo decoded) and render from memory.
+  inproc  threads rendering inside this process — the GIL-bound ceiling.
+
+Usage
+  python3 loadtest.py --mode spawn --concurrency 1,2,4,8 --requests 200
+  python3 loadtest.py --mix invoice/typical:70,invoice/large:20,salesorder:10 --duration 30
+  python3 loadtest.py --mode warm,spawn --env PDF_LAYOUT=compiled --json report.json
+
+Mix entries are kind[/size]:weight, size one of small|typical|large|huge (default
+typical). 'huge' is over the line-item limit and should come back as a 422.
+"""
+
+import os, sys, io, json, time, uuid, random, shlex, tempfile, argparse, threading, subprocess, statistics
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import bench_layout
+from guardrails import EXIT_LIMIT
+
+SIZES = dict(bench_layout.SIZES, huge=600)
+DEFAULT_MIX = 'invoice/typical:60,invoice/large:10,estimate/typical:20,salesorder/typical:10'
+PYTHON = 'python' if sys.platform == 'win32' else 'python3'
+
+
+# ── PAYLOAD MIX ───────────────────────────────────────────────────────────────
+def parse_mix(spec):
+    """'invoice/large:20,estimate:5' -> [((kind, size), weight), ...]"""
+    out = []
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, weight = part.partition(':')
+        kind, _, size = name.partition('/')
+        size = size or 'typical'
+        if kind not in bench_layout.PAYLOADS:
+            raise SystemExit(f'unknown document kind {kind!r}')
+        if size not in SIZES:
+            raise SystemExit(f'unknown payload size {size!r}')
+        out.append(((kind, size), float(weight or 1)))
+    return out
+
+
+class Mix:
+    def __init__(self, entries, seed=0):
+        self.keys = [k for k, _ in entries]
+        self.weights = [w for _, w in entries]
+        self.payloads = {k: bench_layout.PAYLOADS[k[0]](SIZES[k[1]]) for k in self.keys}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def pick(self):
+        with self.lock:
+            key = self.rng.choices(self.keys, self.weights)[0]
+        return key, self.payloads[key]
+
+
+# ── REQUEST DRIVERS ───────────────────────────────────────────────────────────
+def _limit_line(stderr):
+    for line in reversed(stderr.strip().splitlines()):
+        try:
+            parsed = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict) and parsed.get('error') == 'render_limit':
+            return parsed
+    return None
+
+
+def spawn_request(kind, data, python=PYTHON, timeout=60.0):
+    """One generatePdf() call. Returns (status, pdf_bytes, detail)."""
+    rid = uuid.uuid4()
+    tmp = tempfile.gettempdir()
+    data_file = os.path.join(tmp, f'pdf-data-{rid}.json')
+    out_file = os.path.join(tmp, f'pdf-out-{rid}.pdf')
+    script = os.path.join(SCRIPT_DIR, f'gen_{kind}.py')
+    try:
+        with open(data_file, 'w') as f:
+            json.dump(data, f)
+        cmd = ' '.join(f'"{p}"' for p in (python, script, data_file, out_file))
+        try:
+            proc = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return 'timeout', 0, f'killed after {timeout:g}s'
+        if proc.returncode == 0:
+            with open(out_file, 'rb') as f:
+                return 'ok', len(f.read()), ''
+        limit = _limit_line(proc.stderr) if proc.returncode == EXIT_LIMIT else None
+        if limit:
+            return 'limit', 0, limit.get('limit', '')
+        return 'error', 0, (proc.stderr.strip().splitlines() or [f'exit {proc.returncode}'])[-1][:200]
+    finally:
+        for p in (data_file, out_file):
+            try: os.unlink(p)
+            except OSError: pass
+
+
+_RENDERERS = {}
+
+
+def _warm_up(kinds):
+    """Import the generators once per worker: fonts, palette and decoded assets."""
+    import importlib
+    from layout import select_renderer
+    for kind in kinds:
+        modname, fnname = bench_layout.DOCS[kind]
+        mod = importlib.import_module(modname)
+        _RENDERERS[kind] = select_renderer(kind, vars(mod), getattr(mod, fnname))
+
+
+def render_request(kind, data):
+    """In-memory render with the same guardrails as the CLI path."""
+    from guardrails import RenderGuard, GuardedCanvas, RenderLimitError, check_payload
+    if kind not in _RENDERERS:
+        _warm_up([kind])
+    guard = RenderGuard(kind)
+    try:
+        check_payload(data, guard.limits)
+        buf = io.BytesIO()
+        c = GuardedCanvas(buf, guard=guard)
+        _RENDERERS[kind](c, data)
+        c.save()
+        return 'ok', buf.tell(), ''
+    except RenderLimitError as e:
+        return 'limit', 0, e.limit
+    except Exception as e:                     # a crash in the generator is a 500
+        return 'error', 0, f'{type(e).__name__}: {e}'[:200]
+
+
+# ── CPU SAMPLING ──────────────────────────────────────────────────────────────
+def _proc_stat():
+    try:
+        with open('/proc/stat') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    cpu = [int(v) for v in lines[0].split()[1:]]
+    running = next((int(l.split()[1]) for l in lines if l.startswith('procs_running')), 0)
+    idle = cpu[3] + (cpu[4] if len(cpu) > 4 else 0)
+    return sum(cpu), idle, running
+
+
+class CpuSampler(threading.Thread):
+    """System-wide busy % and run-queue depth, sampled every `interval` seconds."""
+
+    def __init__(self, interval=0.25):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.busy = []; self.runq = []
+        self.stop_evt = threading.Event()
+
+    def run(self):
+        prev = self.first = _proc_stat()
+        while prev and not self.stop_evt.wait(self.interval):
+            cur = _proc_stat()
+            dt, di = cur[0] - prev[0], cur[1] - prev[1]
+            if dt > 0:
+                self.busy.append(100.0 * (dt - di) / dt)
+            self.runq.append(max(cur[2] - 1, 0))           # minus this sampler
+            prev = cur
+
+    def stop(self):
+        self.stop_evt.set(); self.join()
+        cores = os.cpu_count() or 1
+        first, last = getattr(self, 'first', None), _proc_stat()
+        overall = None
+        if first and last and last[0] > first[0]:
+            dt = last[0] - first[0]
+            overall = 100.0 * (dt - (last[1] - first[1])) / dt
+        return {
+            'cpu_busy_pct': round(overall, 1) if overall is not None else None,
+            'cpu_busy_p95_pct': round(pct(self.busy, 95), 1) if self.busy else None,
+            'run_queue_per_core': round(statistics.mean(self.runq) / cores, 2) if self.runq else None,
+        }
+
+
+def _cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ── STEP ──────────────────────────────────────────────────────────────────────
+def pct(values, p):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100
+    lo = int(k); hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def run_step(mode, concurrency, mix, requests=None, duration=None, python=PYTHON, timeout=60.0):
+    """Closed loop: `concurrency` clients, each issuing its next request on completion."""
+    kinds = sorted({k for k, _ in mix.keys})
+    pool = None
+    if mode == 'warm':
+        ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        pool = ProcessPoolExecutor(max_workers=concurrency, mp_context=ctx,
+                                   initializer=_warm_up, initargs=(kinds,))
+        list(pool.map(_noop, range(concurrency * 2)))       # workers up and warm before the clock
+    elif mode == 'inproc':
+        _warm_up(kinds)
+
+    def one(key, data):
+        if mode == 'spawn':
+            return spawn_request(key[0], data, python, timeout)
+        if mode == 'warm':
+            return pool.submit(render_request, key[0], data).result()
+        return render_request(key[0], data)
+
+    results = []; lock = threading.Lock()
+    issued = [0]
+    deadline = time.monotonic() + duration if duration else None
+
+    def client():
+        while True:
+            with lock:
+                if requests is not None and issued[0] >= requests:
+                    return
+                issued[0] += 1
+            if deadline and time.monotonic() >= deadline:
+                return
+            key, data = mix.pick()
+            t0 = time.perf_counter()
+            status, nbytes, detail = one(key, data)
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                results.append((key, status, ms, nbytes, detail))
+
+    sampler = CpuSampler(); sampler.start()
+    cpu0 = _cpu_seconds(); t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for f in [ex.submit(client) for _ in range(concurrency)]:
+            f.result()
+    wall = time.perf_counter() - t0
+    if pool:
+        pool.shutdown()                                     # reap workers so their CPU is counted
+    cpu = _cpu_seconds() - cpu0
+    return summarize(mode, concurrency, results, wall, cpu, sampler.stop())
+
+
+def _noop(_):
+    return None
+
+
+def summarize(mode, concurrency, results, wall, cpu, cpu_stats):
+    n = len(results)
+    by_status = {s: sum(1 for r in results if r[1] == s) for s in ('ok', 'limit', 'error', 'timeout')}
+    lat = [r[2] for r in results if r[1] == 'ok']
+    per_kind = {}
+    for key, status, ms, _, _ in results:
+        k = f'{key[0]}/{key[1]}'
+        d = per_kind.setdefault(k, {'n': 0, 'ok': 0, 'ms': []})
+        d['n'] += 1
+        if status == 'ok':
+            d['ok'] += 1; d['ms'].append(ms)
+    errors = {}
+    for _, status, _, _, detail in results:
+        if status != 'ok':
+            errors[f'{status}: {detail}'] = errors.get(f'{status}: {detail}', 0) + 1
+    return {
+        'mode': mode, 'concurrency': concurrency, 'requests': n, 'wall_s': round(wall, 2),
+        'throughput_rps': round(by_status['ok'] / wall, 2) if wall else 0.0,
+        **by_status,
+        'failure_rate': round((n - by_status['ok']) / n, 4) if n else 0.0,
+        'unexpected_failure_rate': round((by_status['error'] + by_status['timeout']) / n, 4) if n else 0.0,
+        'p50_ms': round(pct(lat, 50), 1), 'p95_ms': round(pct(lat, 95), 1),
+        'p99_ms': round(pct(lat, 99), 1), 'max_ms': round(max(lat), 1) if lat else 0.0,
+        'cpu_s_per_doc': round(cpu / n, 3) if n else None,
+        **cpu_stats,
+        'per_kind': {k: {'n': d['n'], 'ok': d['ok'], 'p50_ms': round(pct(d['ms'], 50), 1),
+                         'p95_ms': round(pct(d['ms'], 95), 1)} for k, d in sorted(per_kind.items())},
+        'errors': errors,
+    }
+
+
+# ── REPORT ────────────────────────────────────────────────────────────────────
+COLS = [('mode', 7, '{}'), ('concurrency', 5, '{}'), ('requests', 6, '{}'), ('throughput_rps', 8, '{:.2f}'),
+        ('p50_ms', 9, '{:.0f}'), ('p95_ms', 9, '{:.0f}'), ('p99_ms', 9, '{:.0f}'),
+        ('cpu_busy_pct', 7, '{}'), ('run_queue_per_core', 6, '{}'), ('cpu_s_per_doc', 8, '{}'),
+        ('limit', 6, '{}'), ('error', 6, '{}'), ('timeout', 6, '{}')]
+HEAD = ['mode', 'conc', 'reqs', 'doc/s', 'p50 ms', 'p95 ms', 'p99 ms', 'cpu%', 'runq', 'cpu s', '422', '500', 'tmout']
+
+
+def print_header():
+    print(''.join(h.rjust(w + 1) if i else h.ljust(w) for i, (h, (_, w, _)) in enumerate(zip(HEAD, COLS))))
+
+
+def print_row(row):
+    cells = []
+    for i, (key, w, fmt) in enumerate(COLS):
+        v = row.get(key)
+        s = '-' if v is None else fmt.format(v)
+        cells.append(s.ljust(w) if i == 0 else s.rjust(w + 1))
+    print(''.join(cells), flush=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument('--mode', default='spawn', help='spawn, warm, inproc or a comma list')
+    ap.add_argument('--concurrency', default='1,2,4,8', help='one level or a comma-separated ramp')
+    ap.add_argument('--requests', type=int, help='requests per step (default 50 unless --duration)')
+    ap.add_argument('--duration', type=float, help='seconds per step instead of a request count')
+    ap.add_argument('--mix', default=DEFAULT_MIX)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--python', default=PYTHON, help='interpreter generatePdf would run')
+    ap.add_argument('--timeout', type=float, default=60.0, help='per request, like execAsync')
+    ap.add_argument('--env', action='append', default=[], metavar='KEY=VAL',
+                    help='set for the generators, e.g. PDF_LAYOUT=compiled or PDF_WORKERS=4')
+    ap.add_argument('--json', metavar='PATH', help='write the full report here')
+    args = ap.parse_args()
+
+    for kv in args.env:
+        k, _, v = kv.partition('=')
+        os.environ[k] = v
+    requests = args.requests if args.requests or args.duration else 50
+    modes = [m for m in args.mode.split(',') if m]
+    for m in modes:
+        if m not in ('spawn', 'warm', 'inproc'):
+            raise SystemExit(f'unknown mode {m!r}')
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+    entries = parse_mix(args.mix)
+
+    print(f'cpus {os.cpu_count()}  mix {args.mix}' + (f"  env {' '.join(args.env)}" if args.env else ''))
+    print_header()
+    report = {'cpus': os.cpu_count(), 'mix': args.mix, 'env': args.env,
+              'command': ' '.join(shlex.quote(a) for a in sys.argv), 'steps': []}
+    for mode in modes:
+        for level in levels:
+            mix = Mix(entries, args.seed)
+            row = run_step(mode, level, mix, requests, args.duration, args.python, args.timeout)
+            report['steps'].append(row)
+            print_row(row)
+            for msg, count in sorted(row['errors'].items(), key=lambda kv: -kv[1])[:3]:
+                print(f'    {count:>4} x {msg}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved: {args.json}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+USA Wrap Co — Vehicle Panel Diagrams
+Scaled, dimensioned outline of the side, back, hood and roof panels for the work
+order, drawn from a vehicle_measurements row (inches, as upload_vehicles.py loads them).
+
+Each vehicle is drawn once per document as a form XObject named after its
+make/model/year and dimensions; every later work order for the same vehicle just
+places that form again, so a fleet batch of 40 identical vans carries one diagram.
+Panel highlighting for the job's scope is drawn under the form per work order, so
+the cached form itself never depends on the job.
+"""
+
+import re, hashlib
+from functools import lru_cache
+
+from reportlab.lib import colors
+
+INK    = colors.HexColor('#1a1917')
+DKGRAY = colors.HexColor('#5a5754')
+MDGRAY = colors.HexColor('#b8b4ae')
+STEELD = colors.HexColor('#8a4a47')
+STEELBG= colors.HexColor('#fdf5f5')
+
+# key, label, across column, up column, sqft column. Side and back are drawn in
+# elevation (width x height); hood and roof in plan, front-to-back left to right.
+PANELS = [
+    ('side', 'SIDE  x2', 'side_width',  'side_height', 'side_sqft'),
+    ('back', 'BACK',     'back_width',  'back_height', 'back_sqft'),
+    ('hood', 'HOOD',     'hood_length', 'hood_width',  'hood_sqft'),
+    ('roof', 'ROOF',     'roof_length', 'roof_width',  'roof_sqft'),
+]
+SCOPE_WORDS = {
+    'side': ('side', 'driver', 'passenger', 'door'),
+    'back': ('back', 'rear', 'tailgate', 'liftgate'),
+    'hood': ('hood', 'bonnet'),
+    'roof': ('roof',),
+}
+
+DIAGRAM_H = 104          # form height in points
+GAP       = 30           # between panels, room for the height dimension
+BASE      = 24           # panel bottoms; width dimensions sit below
+TOP_PAD   = 22           # panel labels sit above
+
+
+def _num(v):
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return None
+    return v if v > 0 else None
+
+
+def _inches(v):
+    return f'{v:g}"'
+
+
+def vehicle_key(m, wo=None):
+    """(make, model, years) for a measurement row, falling back to the work order's own fields."""
+    wo = wo or {}
+    make = (m.get('make') or wo.get('make') or '').strip()
+    model = (m.get('model') or wo.get('model') or '').strip()
+    years = str(m.get('year_range') or wo.get('year') or '').strip()
+    return make, model, years
+
+
+def dims(m):
+    """Tuple of (key, label, across, up, sqft) for every panel with both dimensions."""
+    out = []
+    for key, label, across, up, sqft in PANELS:
+        a, u = _num(m.get(across)), _num(m.get(up))
+        if a and u:
+            out.append((key, label, a, u, _num(m.get(sqft))))
+    return tuple(out)
+
+
+@lru_cache(maxsize=512)
+def plan(panels, width):
+    """Place `panels` (from dims()) on one shared scale inside `width` x DIAGRAM_H.
+
+    Returns (points_per_inch, [(key, label, x, w_pt, h_pt, across, up, sqft), ...]).
+    """
+    across = sum(p[2] for p in panels)
+    tallest = max(p[3] for p in panels)
+    room_w = width - GAP * len(panels)
+    room_h = DIAGRAM_H - BASE - TOP_PAD
+    s = min(room_w / across, room_h / tallest)
+    x = GAP; out = []
+    for key, label, a, u, sqft in panels:
+        out.append((key, label, x, a*s, u*s, a, u, sqft))
+        x += a*s + GAP
+    return s, out
+
+
+def form_name(key, panels):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', '_'.join(key)).strip('_')[:40]
+    digest = hashlib.sha1(repr((key, panels)).encode()).hexdigest()[:8]
+    return f'PanelDiagram_{slug}_{digest}'
+
+
+def in_scope(wo):
+    """Panel keys the job covers, from its panel list and scope text. Empty means unknown."""
+    text = ' '.join([wo.get('scope', '') or ''] + [str(p) for p in wo.get('panels', []) or []]).lower()
+    if 'full' in text:
+        return set(SCOPE_WORDS)
+    return {k for k, words in SCOPE_WORDS.items() if any(w in text for w in words)}
+
+
+# ── DRAWING ───────────────────────────────────────────────────────────────────
+def _dim_h(c, x, y, w, label):
+    c.line(x, y, x+w, y); c.line(x, y-2.5, x, y+2.5); c.line(x+w, y-2.5, x+w, y+2.5)
+    c.drawCentredString(x+w/2, y-8, label)
+
+def _dim_v(c, x, y, h, label):
+    c.line(x, y, x, y+h); c.line(x-2.5, y, x+2.5, y); c.line(x-2.5, y+h, x+2.5, y+h)
+    c.saveState(); c.translate(x-3, y+h/2); c.rotate(90)
+    c.drawCentredString(0, 0, label)
+    c.restoreState()
+
+
+def _draw(c, layout):
+    for key, label, x, w, h, a, u, sqft in layout:
+        c.setStrokeColor(STEELD); c.setLineWidth(0.8)
+        c.rect(x, BASE, w, h, fill=0, stroke=1)
+        c.setFillColor(INK); c.setFont('PopB', 6.5); c.drawString(x, BASE+h+11, label)
+        if sqft:
+            c.setFillColor(DKGRAY); c.setFont('Pop', 6); c.drawString(x, BASE+h+4, f'{sqft:g} sqft')
+        c.setStrokeColor(MDGRAY); c.setLineWidth(0.4)
+        c.setFillColor(DKGRAY); c.setFont('Pop', 6)
+        _dim_h(c, x, BASE-7, w, _inches(a))
+        _dim_v(c, x-6, BASE, h, _inches(u))
+
+
+def place(c, x, y, width, m, wo=None):
+    """Draw the diagram for measurement row `m` with its bottom-left at (x, y).
+
+    Returns the drawn height, or 0 when the row has no usable dimensions.
+    """
+    panels = dims(m)
+    if not panels:
+        return 0
+    s, layout = plan(panels, width)
+    name = form_name(vehicle_key(m, wo), panels)
+    live = getattr(c, '_live', True)          # parallel.PageRangeCanvas off-range pages draw nothing
+    if live and not c.hasForm(name):
+        c.beginForm(name, 0, 0, width, DIAGRAM_H)
+        _draw(c, layout)
+        c.endForm()
+
+    scope = in_scope(wo or {})
+    if scope:
+        c.setFillColor(STEELBG)
+        for key, label, px, w, h, *_ in layout:
+            if key in scope:
+                c.rect(x+px, y+BASE, w, h, fill=1, stroke=0)
+    if live:
+        c.saveState(); c.translate(x, y); c.doForm(name); c.restoreState()
+    return DIAGRAM_H
+
+
+def caption(m, wo, width):
+    """Section header text: vehicle, drawing scale and the row's total sqft."""
+    s, _ = plan(dims(m), width)
+    parts = [' '.join(p for p in vehicle_key(m, wo) if p), f'scale 1:{round(72 / s)}']
+    total = _num(m.get('total_sqft'))
+    if total:
+        parts.append(f'{total:g} sqft total')
+    return '  -  '.join(p for p in parts if p)
@@ -0,0 +1,263 @@
+"""
+USA Wrap Co — Page-Parallel Rendering
+For documents that run to hundreds of pages (fleet sales orders, long invoices),
+where one reportlab canvas would render every page serially on one core.
+
+  1. paginate  run the generator once on a canvas that drops every drawing call.
+               That counts the pages and records the order fonts are first set.
+  2. render    fork workers, and give each one a contiguous page range. A worker
+               re-runs the same generator but only emits its own pages, then stops
+               as soon as its range is done. Every worker walks the real flow up
+               to its range, so page numbers and running totals are the
+               generator's own. The output matches a serial render.
+  3. stitch    stitch.py joins the parts into one PDF, sharing identical objects
+               (standard fonts, the logo and other images) across parts.
+
+Every worker re-walks the pages before its range with drawing dropped; that walk
+costs about 3% of a serial render per page skipped (the pagination pass, timed
+by bench_parallel.py), so the last worker carries the most of it.
+
+Only used where it has been measured to win. PDF_WORKERS=<n> asks for it (0 or 1
+means serial), but a document kind renders in parallel only if
+`bench_parallel.py --save` measured it at least MIN_SPEEDUP faster than serial
+on this host (same number of usable CPUs), and then with the worker count that
+won. The measurement lives in PDF_PARALLEL_PROFILE (default
+.parallel_profile.json beside this file). Without one, on a single-CPU host, or
+for documents shorter than PDF_PARALLEL_MIN_PAGES (default 24), rendering stays
+serial. Workers inherit the parent's registered fonts and decoded assets
+through fork, so this needs the fork start method (Linux). Elsewhere it falls
+back to serial.
+"""
+
+import os, io, json, time, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas as rl_canvas
+from reportlab.pdfbase import pdfmetrics
+
+from guardrails import (RenderGuard, GuardedCanvas, RenderLimitError, check_payload,
+                        exit_limit, run_guarded)
+from stitch import stitch
+
+MIN_PAGES = 24
+MIN_SPEEDUP = 1.15
+PROFILE = os.environ.get('PDF_PARALLEL_PROFILE',
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), '.parallel_profile.json'))
+
+# Canvas calls that either cost real time or register document resources. On a
+# page outside the range they are dropped; anything else just lands in the page's
+# code buffer, which is thrown away with the page.
+_GATED = ('drawString', 'drawRightString', 'drawCentredString', 'drawText',
+          'rect', 'roundRect', 'line', 'lines', 'circle', 'ellipse', 'wedge', 'drawPath',
+          'drawImage', 'drawInlineImage', 'setFillColor', 'setStrokeColor', 'setLineWidth',
+          'setDash', 'linkURL', 'linkRect')
+
+
+class _RangeDone(Exception):
+    """Raised out of showPage() once a worker's last page is closed."""
+
+
+class PageRangeCanvas(GuardedCanvas):
+    """Canvas that only emits pages whose 0-based index is in `pages`.
+
+    `fonts` pre-registers standard fonts in serial first-use order, so every part
+    names them /F1, /F2... exactly as a serial render would and the stitcher can
+    share them.
+    """
+
+    def __init__(self, *args, pages=range(0), fonts=(), stop=False, **kw):
+        super().__init__(*args, **kw)
+        self.pages = pages
+        self.stop = stop
+        self.fonts_seen = []
+        self._seen = set()
+        for name in fonts:
+            if not pdfmetrics.getFont(name)._dynamicFont:
+                self._doc.getInternalFontName(name)
+        self._index = 0
+        self._live = 0 in pages
+        self._dirty = False
+
+    def setFont(self, psfontname, size, leading=None):
+        if psfontname not in self._seen:
+            self._seen.add(psfontname); self.fonts_seen.append(psfontname)
+        if self._live:
+            return rl_canvas.Canvas.setFont(self, psfontname, size, leading)
+        self._dirty = True
+
+    def showPage(self):
+        if self.guard:
+            self.guard.page_done()
+        if self._live:
+            rl_canvas.Canvas.showPage(self)
+        else:
+            self._startPage()
+        self._index += 1
+        self._live = self._index in self.pages
+        self._dirty = False
+        if self.stop and self._index >= self.pages.stop:
+            raise _RangeDone()
+
+    def has_content(self):
+        """Would a serial canvas emit the page in progress on save()?"""
+        return bool(self._code) or self._dirty
+
+    def page_count(self):
+        return self._index + (1 if self.has_content() else 0)
+
+    def save(self):
+        if self._live and len(self._code):
+            if self.guard:
+                self.guard.page_done()
+            rl_canvas.Canvas.showPage(self)
+        self._doc.SaveToFile(self._filename, self)
+
+
+def _gate(name):
+    real = getattr(rl_canvas.Canvas, name)
+
+    def method(self, *a, **kw):
+        if self._live:
+            return real(self, *a, **kw)
+        self._dirty = True
+    method.__name__ = name
+    method.__doc__ = real.__doc__
+    return method
+
+
+for _name in _GATED:
+    setattr(PageRangeCanvas, _name, _gate(_name))
+
+
+# ── PAGINATE / RENDER ─────────────────────────────────────────────────────────
+def paginate(kind, draw, pagesize=None, guard=None):
+    """(page_count, fonts_in_first_use_order) without producing any PDF output."""
+    c = PageRangeCanvas(io.BytesIO(), pagesize=pagesize or letter, guard=guard)
+    draw(c)
+    n = c.page_count()
+    if guard and c.has_content():
+        guard.page_done()
+    return n, c.fonts_seen
+
+
+def split_pages(n, parts):
+    """Contiguous, near-equal [lo, hi) ranges covering 0..n."""
+    parts = max(1, min(parts, n))
+    step, extra = divmod(n, parts)
+    out = []; lo = 0
+    for i in range(parts):
+        hi = lo + step + (1 if i < extra else 0)
+        out.append((lo, hi)); lo = hi
+    return out
+
+
+_JOB = None          # (kind, draw, pagesize, fonts, limits), inherited by forked workers
+
+
+def _render_range(bounds):
+    kind, draw, pagesize, fonts, limits = _JOB
+    lo, hi = bounds
+    buf = io.BytesIO()
+    c = PageRangeCanvas(buf, pagesize=pagesize, guard=RenderGuard(kind, limits),
+                        pages=range(lo, hi), fonts=fonts, stop=True)
+    try:
+        draw(c)
+    except _RangeDone:
+        pass
+    c.save()
+    return buf.getvalue()
+
+
+def render_parallel(kind, draw, pagesize=None, workers=None, guard=None, fonts=None, pages=None):
+    """Render with `workers` processes. Returns (pdf_bytes, stats)."""
+    global _JOB
+    pagesize = pagesize or letter
+    guard = guard or RenderGuard(kind)
+    t0 = time.perf_counter()
+    if pages is None or fonts is None:
+        pages, fonts = paginate(kind, draw, pagesize, RenderGuard(kind, guard.limits))
+    t1 = time.perf_counter()
+    ranges = split_pages(pages, workers or os.cpu_count() or 1)
+    _JOB = (kind, draw, pagesize, fonts, guard.limits)
+    try:
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=ctx) as ex:
+            parts = list(ex.map(_render_range, ranges))
+    finally:
+        _JOB = None
+    t2 = time.perf_counter()
+    guard.checkpoint('stitch')
+    pdf, stats = stitch(parts)
+    t3 = time.perf_counter()
+    stats.update({'workers': len(ranges), 'ranges': ranges,
+                  'paginate_s': t1-t0, 'render_s': t2-t1, 'stitch_s': t3-t2})
+    return pdf, stats
+
+
+def _env_int(name, default):
+    try: return int(os.environ.get(name, default))
+    except ValueError: return default
+
+
+def can_fork():
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def usable_cpus():
+    try: return len(os.sched_getaffinity(0))
+    except AttributeError: return os.cpu_count() or 1
+
+
+def read_profile(path=None):
+    try:
+        with open(path or PROFILE) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+
+def save_profile(kind, results, pages, path=None):
+    """Record bench results for `kind`: {workers: speedup}, measured on `pages` pages."""
+    prof = read_profile(path)
+    if prof.get('cpus') != usable_cpus():
+        prof = {'cpus': usable_cpus(), 'kinds': {}}
+    best = max(results, key=results.get)
+    prof['kinds'][kind] = {'workers': best, 'speedup': round(results[best], 3), 'pages': pages,
+                           'measured': {str(w): round(x, 3) for w, x in results.items()},
+                           'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+    tmp = (path or PROFILE) + '.tmp'
+    with open(tmp, 'w') as f: json.dump(prof, f, indent=1)
+    os.replace(tmp, path or PROFILE)
+    return prof['kinds'][kind]
+
+
+def measured_workers(kind, asked, profile=None):
+    """Workers to use for `kind`, or 0 for serial: only where a bench on this host showed a win."""
+    prof = read_profile() if profile is None else profile
+    entry = (prof.get('kinds') or {}).get(kind)
+    if asked <= 1 or usable_cpus() < 2 or prof.get('cpus') != usable_cpus():
+        return 0
+    if not entry or entry.get('speedup', 0) < MIN_SPEEDUP:
+        return 0
+    return min(asked, entry['workers'])
+
+
+def run_render(kind, data, out_path, draw, pagesize=None):
+    """Drop-in for guardrails.run_guarded() that goes page-parallel for long documents."""
+    workers = measured_workers(kind, _env_int('PDF_WORKERS', 0))
+    if workers <= 1 or not can_fork():
+        return run_guarded(kind, data, out_path, draw, pagesize)
+
+    guard = RenderGuard(kind)
+    try:
+        check_payload(data, guard.limits)
+        pages, fonts = paginate(kind, draw, pagesize, RenderGuard(kind, guard.limits))
+        if pages < _env_int('PDF_PARALLEL_MIN_PAGES', MIN_PAGES):
+            return run_guarded(kind, data, out_path, draw, pagesize)
+        pdf, _ = render_parallel(kind, draw, pagesize, workers, guard, fonts, pages)
+        if len(pdf) > guard.limits['max_output_bytes']:
+            raise RenderLimitError('max_output_bytes', len(pdf), guard.limits['max_output_bytes'], 'stitch')
+    except RenderLimitError as e:
+        exit_limit(kind, e)
+    with open(out_path, 'wb') as f:
+        f.write(pdf)
+    return guard
@@ -0,0 +1,166 @@
+"""
+USA Wrap Co — PDF Stitcher
+Concatenates the page-range parts rendered by parallel.py into one document.
+
+Only reads what reportlab writes (classic xref table, one section, no object
+streams), so no PDF library is needed. Objects are renumbered into one file and
+anything byte-identical after renumbering — standard fonts, font dictionaries,
+logos and other images — is written once and shared by every page that uses it.
+TrueType subsets differ per part (each only holds the glyphs its pages use); they
+are kept per part and retagged so two subsets never share a /BaseFont name.
+"""
+
+import re, hashlib
+
+_XREF_ROW = re.compile(rb'(\d{10}) (\d{5}) ([nf])')
+_OBJ_HEAD = re.compile(rb'(\d+) 0 obj\s*')
+_STREAM = re.compile(rb'>>\s*stream\r?\n')
+_REF = re.compile(rb'/Parent (\d+) 0 R|(\d+) 0 R\b')
+_KIDS = re.compile(rb'/Kids\s*\[([^\]]*)\]')
+_NOSHARE = re.compile(rb'/Type\s*/(?:Page|Pages|Catalog|Outlines)\b')
+_SUBSET_TAG = re.compile(rb'/([A-Z]{6})\+')
+_VERSION = re.compile(rb'%PDF-(\d\.\d)')
+
+
+def _trailer_ref(tail, key):
+    m = re.search(rb'/' + key + rb' (\d+) 0 R', tail)
+    return int(m.group(1)) if m else None
+
+
+def read_pdf(pdf):
+    """({num: (dict_part, stream_part)}, root_num, info_num) for a reportlab PDF."""
+    sx = pdf.rindex(b'startxref')
+    xref_at = int(pdf[sx+9:].split()[0])
+    lines = pdf[xref_at:].split(b'\n')
+    if lines[0].strip() != b'xref':
+        raise ValueError('unsupported PDF: no classic xref table')
+    first, count = map(int, lines[1].split())
+    offsets = {}
+    for i in range(count):
+        m = _XREF_ROW.match(lines[2+i])
+        if m and m.group(3) == b'n':
+            offsets[first+i] = int(m.group(1))
+
+    order = sorted(offsets.items(), key=lambda kv: kv[1])
+    objs = {}
+    for i, (num, off) in enumerate(order):
+        end = order[i+1][1] if i+1 < len(order) else xref_at
+        chunk = pdf[off:end]
+        head = _OBJ_HEAD.match(chunk)
+        body = chunk[head.end():chunk.rindex(b'endobj')]
+        m = _STREAM.search(body)
+        if m:
+            split = m.start() + 2                 # keep '>>' with the dict
+            objs[num] = (body[:split], body[split:])
+        else:
+            objs[num] = (body, b'')
+    tail = pdf[xref_at:]
+    return objs, _trailer_ref(tail, b'Root'), _trailer_ref(tail, b'Info')
+
+
+def page_order(objs, node):
+    d, _ = objs[node]
+    if re.search(rb'/Type\s*/Pages\b', d):
+        kids = _KIDS.search(d).group(1)
+        out = []
+        for ref in re.findall(rb'(\d+) 0 R', kids):
+            out += page_order(objs, int(ref))
+        return out
+    return [node]
+
+
+def _subset_retag(part_no):
+    """AAAAAA+ -> <part in base 26>AAAA+ for every part after the first."""
+    if not part_no:
+        return lambda d: d
+    p1, p2 = divmod(part_no, 26)
+    prefix = bytes([65 + p1 % 26, 65 + p2])
+    return lambda d: _SUBSET_TAG.sub(lambda m: b'/' + prefix + m.group(1)[2:] + b'+', d)
+
+
+class _Writer:
+    CATALOG, PAGES, INFO = 1, 2, 3
+
+    def __init__(self):
+        self.bodies = {}
+        self.next = 4
+        self.shared = {}
+        self.stats = {'objects_in': 0, 'objects_out': 0, 'shared': 0, 'shared_bytes': 0}
+
+    def alloc(self, body):
+        num = self.next; self.next += 1
+        self.bodies[num] = body
+        return num
+
+    def add_part(self, pdf, part_no):
+        objs, root, info = read_pdf(pdf)
+        self.stats['objects_in'] += len(objs)
+        retag = _subset_retag(part_no)
+        mapping = {}
+
+        def rewrite(d):
+            def sub(m):
+                if m.group(1):
+                    return b'/Parent %d 0 R' % self.PAGES
+                return b'%d 0 R' % resolve(int(m.group(2)))
+            return _REF.sub(sub, retag(d))
+
+        def resolve(num):
+            if num in mapping:
+                return mapping[num]
+            d, stream = objs[num]
+            if _NOSHARE.search(d):
+                raise ValueError(f'object {num} references a page-tree node')
+            body = rewrite(d) + stream
+            key = hashlib.sha1(body).digest()
+            if key in self.shared:
+                self.stats['shared'] += 1; self.stats['shared_bytes'] += len(body)
+                new = self.shared[key]
+            else:
+                new = self.shared[key] = self.alloc(body)
+            mapping[num] = new
+            return new
+
+        pages_root = _trailer_ref(objs[root][0], b'Pages')
+        pages = []
+        for num in page_order(objs, pages_root):
+            d, stream = objs[num]
+            pages.append(self.alloc(rewrite(d) + stream))
+        if info is not None and self.INFO not in self.bodies:
+            self.bodies[self.INFO] = rewrite(objs[info][0])
+        return pages
+
+    def write(self, page_nums, version):
+        self.bodies[self.CATALOG] = b'<<\n/PageMode /UseNone /Pages %d 0 R /Type /Catalog\n>>\n' % self.PAGES
+        kids = b' '.join(b'%d 0 R' % n for n in page_nums)
+        self.bodies[self.PAGES] = b'<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>\n' % (len(page_nums), kids)
+        self.bodies.setdefault(self.INFO, b'<<\n/Producer (USA Wrap Co stitch)\n>>\n')
+
+        out = bytearray(b'%PDF-' + version + b'\n%\x93\x8c\x8b\x9e stitched by scripts/pdf/stitch.py\n')
+        offsets = []
+        for num in range(1, self.next):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n' % num + self.bodies[num] + b'endobj\n'
+        digest = hashlib.md5(out).hexdigest().encode()
+        xref_at = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % self.next
+        out += b''.join(b'%010d 00000 n \n' % off for off in offsets)
+        out += (b'trailer\n<<\n/ID [<%s><%s>]\n/Info %d 0 R\n/Root %d 0 R\n/Size %d\n>>\nstartxref\n%d\n%%%%EOF\n'
+                % (digest, digest, self.INFO, self.CATALOG, self.next, xref_at))
+        self.stats['objects_out'] = self.next - 1
+        return bytes(out)
+
+
+def stitch(parts):
+    """Merge PDFs (bytes, in page order) into one. Returns (pdf_bytes, stats)."""
+    w = _Writer()
+    page_nums = []
+    version = b'1.3'
+    for i, pdf in enumerate(parts):
+        m = _VERSION.match(pdf)
+        if m and m.group(1) > version:
+            version = m.group(1)
+        page_nums += w.add_part(pdf, i)
+    pdf = w.write(page_nums, version)
+    w.stats['pages'] = len(page_nums)
+    return pdf, w.stats
@@ -0,0 +1,127 @@
+"""
+USA Wrap Co — Stitcher Check
+stitch.py reads and writes PDF by hand, so its output is checked here against an
+independent reader (pypdf, strict mode): multi-page parts from parallel.py, and
+whole documents with TrueType subsets and images merged into one.
+
+Run:  python3 test_stitch.py        (or python3 -m pytest test_stitch.py)
+Needs pypdf (pip install pypdf).
+"""
+
+import io, os, re, sys
+
+os.environ.setdefault('PDF_LIMIT_MAX_PAGES', '5000')
+os.environ.setdefault('PDF_LIMIT_MAX_LINE_ITEMS', '50000')
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import letter
+
+from guardrails import GuardedCanvas, RenderGuard
+from parallel import paginate, render_parallel, split_pages, can_fork, _render_range
+import parallel
+from stitch import stitch
+import bench_layout, gen_invoice, gen_salesorder, gen_estimate
+
+
+def _serial(kind, draw):
+    buf = io.BytesIO()
+    c = GuardedCanvas(buf, pagesize=letter, guard=RenderGuard(kind))
+    draw(c); c.save()
+    return buf.getvalue()
+
+
+def _texts(pdf):
+    r = PdfReader(io.BytesIO(pdf), strict=True)
+    return [p.extract_text() for p in r.pages]
+
+
+def _parts(kind, draw, n_parts):
+    """Page-range parts rendered in-process (no fork needed), as the workers would."""
+    pages, fonts = paginate(kind, draw)
+    parallel._JOB = (kind, draw, letter, fonts, RenderGuard(kind).limits)
+    try:
+        return [_render_range(b) for b in split_pages(pages, n_parts)], pages
+    finally:
+        parallel._JOB = None
+
+
+def _check_ranges(kind, mod, fn, rows):
+    data = bench_layout.PAYLOADS[kind](rows)
+    draw = lambda c: getattr(mod, fn)(c, data)
+    ref = _texts(_serial(kind, draw))
+    assert len(ref) > 4, f'{kind}: want a multi-page document, got {len(ref)} pages'
+    for n_parts in (2, 3, len(ref)):
+        parts, pages = _parts(kind, draw, n_parts)
+        pdf, stats = stitch(parts)
+        got = _texts(pdf)
+        assert pages == len(ref) == stats['pages'] == len(got), (kind, n_parts, pages, len(ref), len(got))
+        for i, (a, b) in enumerate(zip(ref, got)):
+            assert a == b, f'{kind}, {n_parts} parts: page {i + 1} text differs'
+        assert stats['shared'] > 0, 'identical fonts/images across parts should be written once'
+
+
+def test_invoice_ranges():
+    _check_ranges('invoice', gen_invoice, 'gen_invoice', 160)
+
+
+def test_salesorder_ranges():
+    _check_ranges('salesorder', gen_salesorder, 'gen_salesorder', 300)
+
+
+def _ttf_doc(text, pages=2):
+    """Small PDF in reportlab's bundled Vera, so each document carries its own TrueType subset."""
+    import reportlab
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    if 'StitchVera' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont('StitchVera', os.path.join(os.path.dirname(reportlab.__file__), 'fonts', 'Vera.ttf')))
+    buf = io.BytesIO()
+    c = GuardedCanvas(buf, pagesize=letter, guard=RenderGuard('test'))
+    for i in range(pages):
+        c.setFont('StitchVera', 14); c.drawString(72, 700, f'{text} page {i + 1}')
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def test_whole_documents():
+    """Unrelated documents: TrueType subsets must stay distinct, images resolve, page order holds."""
+    est = _serial('estimate', lambda c: gen_estimate.gen_estimate(c, bench_layout.PAYLOADS['estimate'](8)))
+    inv = _serial('invoice', lambda c: gen_invoice.gen_invoice(c, bench_layout.PAYLOADS['invoice'](60)))
+    a, b = _ttf_doc('Harbor Freightways'), _ttf_doc('QUIZ jumbo vex')
+    pdf, stats = stitch([est, a, inv, b, est])
+    r = PdfReader(io.BytesIO(pdf), strict=True)
+    want = _texts(est) + _texts(a) + _texts(inv) + _texts(b) + _texts(est)
+    assert [p.extract_text() for p in r.pages] == want
+    subsets = set()
+    for page in r.pages:
+        fonts = page['/Resources'].get('/Font') or {}
+        for ref in fonts.values():
+            base = str(ref.get_object().get('/BaseFont', ''))
+            if re.match(r'/[A-Z]{6}\+', base):
+                subsets.add(base)
+        for ref in (page['/Resources'].get('/XObject') or {}).values():
+            assert ref.get_object()['/Width'] > 0
+    assert len(subsets) >= 2, 'expected a TrueType subset per Vera document'
+    names = {s[1:7] for s in subsets}
+    assert len(names) == len(subsets), 'two different subsets share a tag'
+
+
+def test_parallel_matches_serial():
+    if not can_fork():
+        return
+    data = bench_layout.PAYLOADS['invoice'](160)
+    draw = lambda c: gen_invoice.gen_invoice(c, data)
+    pdf, _ = render_parallel('invoice', draw, workers=3)
+    assert _texts(pdf) == _texts(_serial('invoice', draw))
+
+
+if __name__ == '__main__':
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith('test_') and callable(fn):
+            try:
+                fn(); print(f'ok    {name}')
+            except AssertionError as e:
+                failed += 1; print(f'FAIL  {name}: {e}')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+"""
+WrapShop Pro — Upload Checkpoints
+Append-only record of the rows a load has already committed, so an interrupted
+or partly failed run picks up where it stopped instead of starting over.
+
+The first line names the run (mode, org and a hash of the sheet); a checkpoint
+from a different run is ignored and replaced. Every committed batch adds one
+line of ids and is flushed to disk before the next batch is counted done.
+"""
+
+import os, json, hashlib, threading
+
+
+def run_key(*parts):
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Checkpoint:
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.lock = threading.Lock()
+        self.done = set()
+        self.resumed = False
+        self.meta = {}
+        self._f = None
+
+    def load(self):
+        """Committed ids from an earlier attempt at this same run (empty if none)."""
+        try:
+            with open(self.path) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return self.done
+        try:
+            head = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            head = {}
+        if head.get("run") != self.key:
+            return self.done
+        self.meta = head
+        for line in lines[1:]:
+            try:
+                self.done.update(json.loads(line)["ids"])
+            except (ValueError, KeyError):
+                break                        # torn last line from a crash — stop there
+        self.resumed = True
+        return self.done
+
+    def start(self, **meta):
+        """Open for appending; writes the header unless resuming."""
+        if self.resumed:
+            self._f = open(self.path, "a")
+        else:
+            self.meta = {"run": self.key, **meta}
+            self._f = open(self.path, "w")
+            self._write(self.meta)
+
+    def _write(self, obj):
+        self._f.write(json.dumps(obj) + "\n")
+        self._f.flush(); os.fsync(self._f.fileno())
+
+    def commit(self, ids):
+        ids = list(ids)
+        with self.lock:
+            self._write({"ids": ids})
+            self.done.update(ids)
+
+    def close(self):
+        if self._f:
+            self._f.close(); self._f = None
+
+    def clear(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,167 @@
+"""
+WrapShop Pro — Vehicle Measurements COPY Loader
+Loads the parsed sheet straight into Postgres instead of through the REST API:
+rows are streamed as CSV into a temp staging table with COPY ... FROM STDIN and
+diffed and merged into vehicle_measurements in the same transaction. Readers
+see either the old catalog or the new one, never a half-loaded or empty table,
+and unchanged rows are left untouched. The diff (legacy-id adoption, counts,
+the delete guard) is SQL against the staging table, so the existing table is
+never read into Python.
+
+Needs psycopg2 (pip install psycopg2-binary) and a direct connection string,
+e.g. Supabase's "Session pooler" URI. Pass it as DATABASE_URL or --dsn.
+test_copy_load.py runs it against a throwaway local Postgres.
+"""
+
+import csv, io, time
+
+try:
+    import psycopg2
+except ImportError:          # only this mode needs it; REST modes are stdlib-only
+    psycopg2 = None
+
+from measurements import COLUMNS, SEARCH_DDL
+
+STAGE = "vehicle_measurements_stage"
+NULL = "\\N"
+
+
+class CsvStream(io.RawIOBase):
+    """File-like CSV view over an iterable of rows, encoded on demand.
+
+    copy_expert() pulls from this in chunks, so the payload is never built in
+    memory whole — a catalog 100x the size streams the same way.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = iter(rows)
+        self.columns = columns
+        self.buf = b""
+        self.count = 0
+        self.bytes = 0
+        self._line = io.StringIO()
+        self._w = csv.writer(self._line, lineterminator="\n")
+
+    def readable(self):
+        return True
+
+    def _encode(self, row):
+        self._line.seek(0); self._line.truncate()
+        self._w.writerow([NULL if row.get(c) is None else row[c] for c in self.columns])
+        return self._line.getvalue().encode("utf-8")
+
+    def readinto(self, b):
+        while len(self.buf) < len(b):
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.buf += self._encode(row); self.count += 1
+        n = min(len(b), len(self.buf))
+        b[:n] = self.buf[:n]; self.buf = self.buf[n:]
+        self.bytes += n
+        return n
+
+
+def connect(dsn):
+    if psycopg2 is None:
+        raise RuntimeError("--mode copy needs psycopg2: pip install psycopg2-binary")
+    return psycopg2.connect(dsn)
+
+
+def _keys(t):
+    return ", ".join(f"vehicle_search_key({t}.{c})" for c in ("make", "model", "year_range"))
+
+
+def _changed(a, b, columns):
+    return " OR ".join(f"{a}.{c} IS DISTINCT FROM {b}.{c}" for c in columns if c != "id")
+
+
+def adopt_sql():
+    """Give staged rows with no id match the id of an existing row with the same make/model/year.
+
+    The SQL form of sync.diff(): the n-th unmatched staged row of a natural key
+    (sheet order) takes the n-th unmatched existing row of that key (id order),
+    so legacy random ids survive a reload just as they do through the REST sync.
+    """
+    org = "v.org_id IS NOT DISTINCT FROM %(org)s"
+    return f"""
+        WITH s AS (
+            SELECT s.ord, ({_keys("s")}) AS k,
+                   row_number() OVER (PARTITION BY {_keys("s")} ORDER BY s.ord) AS n
+              FROM {STAGE} s
+             WHERE NOT EXISTS (SELECT 1 FROM vehicle_measurements v WHERE v.id = s.id AND {org})
+        ), r AS (
+            SELECT v.id, ({_keys("v")}) AS k,
+                   row_number() OVER (PARTITION BY {_keys("v")} ORDER BY v.id::text) AS n
+              FROM vehicle_measurements v
+             WHERE {org} AND NOT EXISTS (SELECT 1 FROM {STAGE} s WHERE s.id = v.id)
+        )
+        UPDATE {STAGE} t SET id = r.id
+          FROM s JOIN r USING (k, n)
+         WHERE t.ord = s.ord"""
+
+
+def count_sql(columns):
+    """Existing rows, rows the merge would remove, insert and change — before anything is written."""
+    org = "v.org_id IS NOT DISTINCT FROM %(org)s"
+    return f"""
+        SELECT (SELECT count(*) FROM vehicle_measurements v WHERE {org}),
+               (SELECT count(*) FROM vehicle_measurements v
+                 WHERE {org} AND NOT EXISTS (SELECT 1 FROM {STAGE} s WHERE s.id = v.id)),
+               count(*) FILTER (WHERE v.id IS NULL),
+               count(*) FILTER (WHERE v.id IS NOT NULL AND ({_changed("s", "v", columns)}))
+          FROM {STAGE} s LEFT JOIN vehicle_measurements v ON v.id = s.id"""
+
+
+def merge_sql(columns):
+    cols = ", ".join(columns)
+    sets = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "id")
+    return (f"INSERT INTO vehicle_measurements AS v ({cols}) SELECT {cols} FROM {STAGE} "
+            f"ON CONFLICT (id) DO UPDATE SET {sets} WHERE {_changed('v', 'EXCLUDED', columns)}")
+
+
+def load(dsn, records, org_id, max_delete_share=None, log=print):
+    """Stage, diff and merge `records` in one transaction. Returns a stats dict.
+
+    The diff runs in Postgres against the staging table, so nothing but the
+    sheet crosses the wire. Rolls back without writing if the merge would
+    remove more than `max_delete_share` of the org's existing rows.
+    """
+    columns = ["id", *COLUMNS]
+    org = {"org": org_id}
+    t0 = time.monotonic()
+    conn = connect(dsn)
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(SEARCH_DDL)      # key columns, trigger and indexes, if the migration hasn't run
+            # ord keeps sheet order for adopt_sql(); LIKE copies defaults but not the trigger
+            cur.execute(f"CREATE TEMP TABLE {STAGE} (LIKE vehicle_measurements INCLUDING DEFAULTS, "
+                        f"ord bigserial) ON COMMIT DROP")
+            stream = CsvStream(records, columns)
+            t1 = time.monotonic()
+            cur.copy_expert(f"COPY {STAGE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                            io.BufferedReader(stream, 1 << 16))
+            t2 = time.monotonic()
+            cur.execute(f"CREATE INDEX ON {STAGE} (id)")
+            cur.execute(f"ANALYZE {STAGE}")
+            cur.execute(adopt_sql(), org)
+            adopted = cur.rowcount
+            cur.execute(count_sql(columns), org)
+            existing, deletes, inserts, updates = cur.fetchone()
+            log(f"  {existing} rows in the table: {inserts} new, {updates} changed, {deletes} removed, "
+                f"{stream.count - inserts - updates} unchanged" + (f" ({adopted} legacy ids kept)" if adopted else ""))
+            if max_delete_share is not None and existing and deletes > max_delete_share * existing:
+                raise RuntimeError(f"would remove {deletes} of {existing} rows — is the sheet complete?")
+            t3 = time.monotonic()
+            cur.execute(merge_sql(columns))
+            upserted = cur.rowcount
+            cur.execute(f"DELETE FROM vehicle_measurements v WHERE v.org_id IS NOT DISTINCT FROM %(org)s "
+                        f"AND NOT EXISTS (SELECT 1 FROM {STAGE} s WHERE s.id = v.id)", org)
+            deleted = cur.rowcount
+        t4 = time.monotonic()
+    finally:
+        conn.close()
+    return {"staged": stream.count, "copy_bytes": stream.bytes, "adopted": adopted,
+            "inserted": inserts, "updated": updates, "written": upserted, "deleted": deleted,
+            "copy_s": round(t2 - t1, 3), "diff_s": round(t3 - t2, 3), "merge_s": round(t4 - t3, 3),
+            "total_s": round(t4 - t0, 3)}
@@ -0,0 +1,104 @@
+"""
+WrapShop Pro — Vehicle Facet Tree
+What the vehicle pickers ask for on every page view — the makes for a year, the
+models for a make, the rows behind a model — as one small tree, so the dropdowns
+are answered from memory instead of a full-table select and a JS dedupe.
+
+The app builds this tree per org from vehicle_catalog(org) (lib/vehicleFacets.ts,
+cached in lib/vehicleCatalog.ts), since each org sees its own overrides and custom
+vehicles and production ids are the ones the catalog actually holds. This script
+is the reference for the layout and writes the sheet's tree for inspection.
+
+Layout (FORMAT 1):
+  ids     measurement row ids; row indices below point into this list
+  span    [year_start, year_end] per row (null when the sheet has no year)
+  makes   make names as stored in vehicle_measurements, sorted
+  models  model names, sorted
+  all     {make index: {model index: [row index, ...]}}   every row
+  years   {year: {make index: [model index, ...]}}  models with a row covering
+          the year; the rows are all[make][model] whose span covers it
+
+`hash` is a sha256 over everything except `built_at`, so it changes exactly when
+the catalog does; app/api/vehicles/facets serves it as the ETag.
+
+Build:  python3 facets.py [--file sheet.txt] [--out vehicle-facets.json]
+"""
+
+import os, sys, json, time, hashlib, argparse
+from collections import defaultdict
+
+from measurements import find_data_file, parse_file
+
+FORMAT = 1
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+OUT = "vehicle-facets.json"
+
+
+def content_hash(tree):
+    body = {k: v for k, v in tree.items() if k not in ("hash", "built_at")}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:32]
+
+
+def build(records):
+    """Facet tree dict over parsed sheet records (ids, make/model names, year_start/year_end)."""
+    rows = sorted(records, key=lambda r: (r["make"], r["model"], r.get("year_start") or 0, r["id"]))
+    makes = sorted({r["make"] for r in rows})
+    models = sorted({r["model"] for r in rows})
+    make_i = {m: i for i, m in enumerate(makes)}
+    model_i = {m: i for i, m in enumerate(models)}
+
+    every, years = defaultdict(lambda: defaultdict(list)), defaultdict(lambda: defaultdict(set))
+    for n, r in enumerate(rows):
+        mk, md = make_i[r["make"]], model_i[r["model"]]
+        every[mk][md].append(n)
+        ys, ye = r.get("year_start"), r.get("year_end")
+        if ys is not None:
+            for y in range(ys, (ye or ys) + 1):
+                years[y][mk].add(md)
+
+    tree = {
+        "format": FORMAT,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "count": len(rows),
+        "ids": [r["id"] for r in rows],
+        "span": [[r.get("year_start"), r.get("year_end")] for r in rows],
+        "makes": makes, "models": models,
+        "all": {str(mk): {str(md): ns for md, ns in sorted(ms.items())} for mk, ms in sorted(every.items())},
+        "years": {str(y): {str(mk): sorted(mds) for mk, mds in sorted(t.items())}
+                  for y, t in sorted(years.items(), reverse=True)},
+    }
+    tree["hash"] = content_hash(tree)
+    return tree
+
+
+def write(records, path=OUT):
+    """Build and save the tree; returns (hash, bytes, changed). An unchanged catalog leaves the file alone."""
+    tree = build(records)
+    try:
+        with open(path) as f:
+            if json.load(f).get("hash") == tree["hash"]:
+                return tree["hash"], os.path.getsize(path), False
+    except (OSError, ValueError):
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(tree, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
+    return tree["hash"], os.path.getsize(path), True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write the vehicle facet tree artifact.")
+    ap.add_argument("--file", help="measurement sheet")
+    ap.add_argument("--out", default=OUT)
+    args = ap.parse_args()
+    data_file = find_data_file(args.file, dirs=[ROOT])
+    if not data_file:
+        print("❌ Cannot find the measurement sheet"); sys.exit(1)
+    records, _ = parse_file(data_file)
+    digest, size, changed = write(records, args.out)
+    print(f"{'✅ Wrote' if changed else '✅ Unchanged'} {args.out}  ({size / 1024:.0f} KB, hash {digest[:12]})")
+
+
+if __name__ == "__main__":
+    main()
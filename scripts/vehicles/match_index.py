@@ -0,0 +1,336 @@
+"""
+WrapShop Pro — Vehicle Match Index
+Builds a small in-memory index over the measurement sheet for typo-tolerant
+make/model lookup ("intergra sedan 99", "chevy silverado 2500", "land rover lr3"),
+so the quote builder can suggest vehicles on every keystroke without a database
+round trip.
+
+What goes in the artifact:
+  makes     canonical names, with the sheet's spellings and common nicknames as
+            aliases (HUMV -> Hummer, Hyundia -> Hyundai, chevy -> Chevrolet), and
+            multi-word makes the sheet splits after the first word put back
+            together ("Land" + "Rover LR3" -> Land Rover / LR3)
+  families  models grouped by their leading word within a make, near-spellings
+            merged ("Integra 3-Door" and "Intergra 4-Door Sedan" -> Integra)
+  vocab     every model token, with a posting list of the entries it appears in
+  grams     character trigrams of the vocab, for fuzzy token expansion
+  keys      per entry, the row's natural key ("make|model|year_range", each
+            norm_key()'d as stored). The app resolves a match to the org's catalog
+            row by this key: production ids are not the sheet's, and an org may
+            hide or override the row.
+
+Build:  python3 match_index.py build [--file sheet.txt] [--out lib/data/vehicle-match-index.json]
+Query:  python3 match_index.py query "intergra sedan" [--year 1999]
+Bench:  python3 match_index.py bench
+
+The artifact carries FORMAT; bump it whenever the layout changes so an app that
+loads an older file (lib/vehicleMatch.ts) refuses it instead of misreading it.
+"""
+
+import os, sys, json, math, time, bisect, argparse, difflib
+from collections import Counter, defaultdict
+
+from measurements import find_data_file, parse_file, natural_key, norm_key
+from checkpoint import file_hash
+
+FORMAT = 2
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+OUT = os.path.join(ROOT, "lib", "data", "vehicle-match-index.json")
+
+# canonical make -> other spellings (sheet typos, run-together names, nicknames)
+MAKES = {
+    "Chevrolet":     ["chevy", "chev"],
+    "Hummer":        ["humv", "humvee"],
+    "Hyundai":       ["hyundia", "hundai"],
+    "Land Rover":    ["land", "landrover"],
+    "Mercedes-Benz": ["mercedes", "mercedes benz", "benz", "mb"],
+    "Volkswagen":    ["vw"],
+    "Western Star":  ["westernstar"],
+}
+FAMILY_MERGE = 0.85      # SequenceMatcher ratio above which two family words are one family
+FUZZY_MIN    = 0.5       # trigram Dice below which a vocab token is not a typo of the query token
+PREFIX_W     = 0.8       # weight of a prefix hit on the token being typed
+MAX_EXPAND   = 12        # vocab tokens one query token may expand to
+
+
+def grams(tok):
+    t = f"${tok}$"
+    return {t[i:i + 3] for i in range(len(t) - 2)} if len(t) > 3 else {t}
+
+
+def _alias_table():
+    alias = {}
+    for name, others in MAKES.items():
+        for a in [name, *others]:
+            alias[norm_key(a)] = name
+    return alias
+
+
+def canonical(make, model, alias=None):
+    """(make, model) with the make's canonical name, re-joining makes the sheet split
+    and dropping a model that repeats the make ("HUMV | Hummer – H2" -> Hummer / H2)."""
+    alias = alias or _alias_table()
+    words = (model or "").split()
+    if words:
+        joined = alias.get(norm_key(f"{make} {words[0]}"))
+        if joined and norm_key(joined).count(" "):
+            return joined, " ".join(words[1:])
+    make = alias.get(norm_key(make), make)
+    if len(words) > 1 and alias.get(norm_key(words[0]), norm_key(words[0])) in (make, norm_key(make)):
+        model = " ".join(words[1:]).lstrip("–- ")
+    return make, model
+
+
+def _families(models):
+    """{model: family name} for one make: leading word, near-spellings folded into the commoner one."""
+    lead = {m: (norm_key(m).split() or [""])[0] for m in models}
+    counts = Counter(lead.values())
+    fams = []                                     # [key, display]
+    key_of = {}
+    for word, _ in counts.most_common():
+        hit = next((f for f in fams if len(word) >= 5 and len(f[0]) >= 5
+                    and difflib.SequenceMatcher(None, word, f[0]).ratio() >= FAMILY_MERGE), None)
+        if hit is None:
+            hit = [word, None]; fams.append(hit)
+        key_of[word] = hit
+    for m in models:
+        f = key_of[lead[m]]
+        if f[1] is None and lead[m] == f[0]:
+            f[1] = m.replace("–", "-").split(" - ")[0].split()[0].strip(",")
+    return {m: key_of[lead[m]] for m in models}
+
+
+# ── BUILD ────────────────────────────────────────────────────────────────────
+def build(records, source=None):
+    """Index dict (the JSON artifact) over parsed sheet records."""
+    alias = _alias_table()
+    rows = []
+    for r in records:
+        make, model = canonical(r["make"], r["model"], alias)
+        rows.append((r, make, model))
+
+    makes = sorted({m for _, m, _ in rows})
+    make_i = {m: i for i, m in enumerate(makes)}
+    aliases = {k: make_i[v] for k, v in alias.items() if v in make_i}
+    for m in makes:
+        aliases.setdefault(norm_key(m), make_i[m])
+        aliases.setdefault(norm_key(m).replace(" ", ""), make_i[m])
+
+    by_make = defaultdict(list)
+    for _, make, model in rows:
+        by_make[make].append(model)
+    families, fam_i, model_fam = [], {}, {}
+    for make in makes:
+        for model, (key, name) in _families(sorted(set(by_make[make]))).items():
+            if (make, key) not in fam_i:
+                fam_i[make, key] = len(families); families.append([make_i[make], name or key, key])
+            model_fam[make, model] = fam_i[make, key]
+
+    entries, postings = [], defaultdict(set)
+    for n, (r, make, model) in enumerate(rows):
+        f = model_fam[make, model]
+        entries.append([r["id"], make_i[make], model, f, r.get("year_start"), r.get("year_end")])
+        for tok in {*norm_key(model).split(), families[f][2]}:
+            postings[tok].add(n)
+
+    vocab = sorted(postings)
+    gram_post = defaultdict(list)
+    for vi, tok in enumerate(vocab):
+        for g in sorted(grams(tok)):
+            gram_post[g].append(vi)
+
+    return {
+        "format": FORMAT,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source": source,
+        "makes": makes, "aliases": aliases, "families": families,
+        "entries": entries,
+        "keys": ["|".join(natural_key(r)) for r, _, _ in rows],
+        "vocab": vocab, "postings": [sorted(postings[t]) for t in vocab],
+        "grams": dict(sorted(gram_post.items())),
+    }
+
+
+def save(index, path=OUT):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ── QUERY ────────────────────────────────────────────────────────────────────
+class MatchIndex:
+    """Loaded artifact plus the lookup tables a query needs."""
+
+    def __init__(self, data):
+        if data.get("format") != FORMAT:
+            raise ValueError(f"match index format {data.get('format')} (expected {FORMAT}) — rebuild it")
+        self.data = data
+        self.makes = data["makes"]
+        self.families = data["families"]
+        self.entries = data["entries"]
+        self.vocab = data["vocab"]
+        self.vocab_i = {t: i for i, t in enumerate(self.vocab)}
+        self.postings = data["postings"]
+        self.grams = data["grams"]
+        self.aliases = data["aliases"]
+        self.alias_grams = {a: grams(a) for a in self.aliases if " " not in a and len(a) >= 4}
+        n = len(self.entries)
+        self.idf = [math.log(1 + n / len(p)) for p in self.postings]
+        self.ngram_len = [len(grams(t)) for t in self.vocab]
+        self.by_make = defaultdict(list)
+        for e, row in enumerate(self.entries):
+            self.by_make[row[1]].append(e)
+
+    @classmethod
+    def load(cls, path=OUT):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _make_of(self, toks):
+        """(make index or None, remaining tokens, soft): exact alias (two words first), else a close
+        misspelling. A make word that is also a model word ("hummer") stays a token and is `soft`:
+        it ranks that make first instead of filtering to it."""
+        for i in range(len(toks) - 1):
+            m = self.aliases.get(f"{toks[i]} {toks[i + 1]}")
+            if m is not None:
+                return m, toks[:i] + toks[i + 2:], False
+        soft = None
+        for i, t in enumerate(toks):
+            m = self.aliases.get(t)
+            if m is not None and t not in self.vocab_i:
+                return m, toks[:i] + toks[i + 1:], False
+            if m is not None and soft is None:
+                soft = m
+        if soft is not None:
+            return soft, toks, True
+        for i, t in enumerate(toks):
+            if len(t) < 4 or t in self.vocab_i:
+                continue
+            g = grams(t)
+            best = max(((2 * len(g & ag) / (len(g) + len(ag)), a) for a, ag in self.alias_grams.items()),
+                       default=(0, None))
+            if best[0] >= 0.6:
+                return self.aliases[best[1]], toks[:i] + toks[i + 1:], False
+        return None, toks, False
+
+    def _expand(self, tok, typing):
+        """{vocab index: weight} for a query token: exact 1.0, prefix while typing, else trigram Dice."""
+        vi = self.vocab_i.get(tok)
+        if vi is not None and not typing:
+            return {vi: 1.0}
+        hits = {vi: 1.0} if vi is not None else {}
+        if typing:
+            lo = bisect.bisect_left(self.vocab, tok)
+            for j in range(lo, min(lo + MAX_EXPAND, len(self.vocab))):
+                if not self.vocab[j].startswith(tok):
+                    break
+                hits.setdefault(j, PREFIX_W)
+        if vi is None and len(tok) >= 3:
+            g = grams(tok)
+            shared = Counter()
+            for gr in g:
+                for j in self.grams.get(gr, ()):
+                    shared[j] += 1
+            for j, c in shared.most_common(MAX_EXPAND * 2):
+                d = 2 * c / (len(g) + self.ngram_len[j])
+                if d >= FUZZY_MIN and d > hits.get(j, 0):
+                    hits[j] = d
+        return dict(sorted(hits.items(), key=lambda kv: -kv[1])[:MAX_EXPAND])
+
+    def query(self, text, year=None, limit=10, typing=True):
+        """Ranked [{score, id, make, model, family, year_start, year_end}] for free text.
+
+        A four-digit year in the text filters like `year`. With `typing`, the last
+        token also matches as a prefix (the user hasn't finished it yet).
+        """
+        toks = norm_key(text).split()
+        if year is None:
+            for t in toks:
+                if len(t) == 4 and t.isdigit() and 1900 <= int(t) <= 2100:
+                    year = int(t); toks = [x for x in toks if x != t]; break
+        make, toks, soft = self._make_of(toks)
+
+        scores = defaultdict(float)
+        for k, tok in enumerate(toks):
+            best = {}
+            for vi, w in self._expand(tok, typing and k == len(toks) - 1).items():
+                w *= self.idf[vi]
+                for e in self.postings[vi]:
+                    if w > best.get(e, 0):
+                        best[e] = w
+            for e, w in best.items():
+                scores[e] += w
+        if soft:
+            bonus = max(scores.values(), default=0) / max(len(toks), 1)
+            scores = {e: s + (bonus if self.entries[e][1] == make else 0) for e, s in scores.items()}
+        elif make is not None:
+            if toks:
+                scores = {e: s for e, s in scores.items() if self.entries[e][1] == make}
+            else:
+                scores = dict.fromkeys(self.by_make[make], 1.0)
+
+        out = []
+        for e, s in scores.items():
+            _, m, model, f, ys, ye = self.entries[e]
+            if year is not None and ys is not None and not (ys <= year <= (ye or ys)):
+                s *= 0.5
+            out.append((s, ys or 0, e))
+        out.sort(key=lambda x: (-x[0], -x[1]))
+
+        results = []
+        for s, _, e in out[:limit]:
+            eid, m, model, f, ys, ye = self.entries[e]
+            results.append({"score": round(s, 3), "id": eid, "make": self.makes[m], "model": model,
+                            "family": self.families[f][1], "year_start": ys, "year_end": ye})
+        return results
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def _bench(idx, n):
+    samples = ["intergra sedan", "chevy silverado 2500 crew", "sprinter 170 high", "f150 supercrew 2019",
+               "land rover lr3", "frieghtliner cascadia", "toyta tacoma", "transit 148 med", "humv h2", "si"]
+    times = []
+    for i in range(n):
+        q = samples[i % len(samples)]
+        t0 = time.perf_counter(); idx.query(q); times.append(time.perf_counter() - t0)
+    times.sort()
+    p = lambda x: times[min(len(times) - 1, int(len(times) * x))] * 1e6
+    print(f"  {n} queries: p50 {p(0.5):.0f} µs  p95 {p(0.95):.0f} µs  p99 {p(0.99):.0f} µs")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or query the vehicle match index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build"); b.add_argument("--file"); b.add_argument("--out", default=OUT)
+    q = sub.add_parser("query"); q.add_argument("text"); q.add_argument("--year", type=int)
+    q.add_argument("--limit", type=int, default=10); q.add_argument("--index", default=OUT)
+    s = sub.add_parser("bench"); s.add_argument("-n", type=int, default=20000); s.add_argument("--index", default=OUT)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        data_file = find_data_file(args.file, dirs=[ROOT])
+        if not data_file:
+            print("❌ Cannot find the measurement sheet"); sys.exit(1)
+        records, _ = parse_file(data_file)
+        index = build(records, source=file_hash(data_file))
+        save(index, args.out)
+        print(f"✅ {len(index['entries'])} vehicles, {len(index['makes'])} makes, {len(index['families'])} families, "
+              f"{len(index['vocab'])} tokens -> {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+        return
+
+    idx = MatchIndex.load(args.index)
+    if args.cmd == "query":
+        t0 = time.perf_counter()
+        results = idx.query(args.text, args.year, args.limit)
+        dt = (time.perf_counter() - t0) * 1e6
+        for r in results:
+            years = f"{r['year_start']}-{r['year_end']}" if r["year_start"] else ""
+            print(f"  {r['score']:6.2f}  {r['make']} {r['model']}  {years}  [{r['family']}]")
+        print(f"  ({len(results)} results in {dt:.0f} µs)")
+    else:
+        _bench(idx, args.n)
+
+
+if __name__ == "__main__":
+    main()
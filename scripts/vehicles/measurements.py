@@ -0,0 +1,202 @@
+"""
+WrapShop Pro — Vehicle Measurements Parser
+Turns the industry measurement sheet ("Make Model Year Side Width ... Total Sq Foot",
+one vehicle per line, page headers in between) into vehicle_measurements rows.
+
+Row ids are uuid5 over a scope + normalized make/model/year_range, so the same
+sheet always produces the same ids and a re-upload can be diffed instead of
+reloaded. The sheet is the shared catalog (org_id NULL); its scope is the org it
+was first loaded under, so ids minted back then stay valid.
+
+Each row also carries the search columns the lookup API filters on: integer
+year_start/year_end parsed from year_range, and make_key/model_key (norm_key()
+of make and model — lib/vehicleKeys.ts must produce the same keys).
+"""
+
+import os, re, uuid
+
+DATA_FILES = ["Make Model Year Side Width Side Hei.txt", "Make_Model_Year_Side_Width_Side_Hei.txt"]
+
+DIM_COLUMNS = [
+    "side_width", "side_height", "side_sqft",
+    "back_width", "back_height", "back_sqft",
+    "hood_width", "hood_length", "hood_sqft",
+    "roof_width", "roof_length", "roof_sqft",
+]
+KEY_COLUMNS = ["year_start", "year_end", "make_key", "model_key"]
+COLUMNS = ["org_id", "make", "model", "year_range", *DIM_COLUMNS, "total_sqft", *KEY_COLUMNS]
+
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://usawrapco.com/vehicle_measurements")
+CATALOG_SCOPE = "d34a6c47-1ac0-4008-87d2-0f7741eebc4f"
+
+# Search columns, their backfill trigger and indexes. Identical to the top of
+# supabase/migrations/20260401000000_vehicle_measurements_search_keys.sql; the
+# COPY loader runs it first, so a database the migration hasn't reached yet gets
+# the same keys. Every statement is idempotent.
+SEARCH_DDL = r"""
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS org_id uuid;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_range text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS make_key text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS model_key text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_start int;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_end int;
+
+CREATE OR REPLACE FUNCTION vehicle_search_key(s text) RETURNS text
+  LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT btrim(regexp_replace(regexp_replace(lower(coalesce(s, '')), '[^\w\s]', '', 'g'), '\s+', ' ', 'g'))
+  $$;
+
+CREATE OR REPLACE FUNCTION vehicle_measurements_fill_keys() RETURNS trigger
+  LANGUAGE plpgsql AS $$
+  DECLARE yrs int[];
+  BEGIN
+    -- A writer that sets a key itself (the ingest) wins; otherwise a changed
+    -- make/model/year_range recomputes the key instead of keeping the old one.
+    IF TG_OP = 'INSERT' THEN
+      NEW.make_key  := coalesce(NEW.make_key,  vehicle_search_key(NEW.make));
+      NEW.model_key := coalesce(NEW.model_key, vehicle_search_key(NEW.model));
+    ELSE
+      IF NEW.make_key IS NULL OR (NEW.make IS DISTINCT FROM OLD.make AND NEW.make_key IS NOT DISTINCT FROM OLD.make_key) THEN
+        NEW.make_key := vehicle_search_key(NEW.make);
+      END IF;
+      IF NEW.model_key IS NULL OR (NEW.model IS DISTINCT FROM OLD.model AND NEW.model_key IS NOT DISTINCT FROM OLD.model_key) THEN
+        NEW.model_key := vehicle_search_key(NEW.model);
+      END IF;
+      IF NEW.year_range IS DISTINCT FROM OLD.year_range AND NEW.year_start IS NOT DISTINCT FROM OLD.year_start THEN
+        NEW.year_start := NULL; NEW.year_end := NULL;
+      END IF;
+    END IF;
+    IF NEW.year_start IS NULL AND NEW.year_range IS NOT NULL THEN
+      SELECT array_agg(m[1]::int) INTO yrs
+        FROM regexp_matches(NEW.year_range, '((?:19|20)\d\d)', 'g') AS m;
+      IF yrs IS NOT NULL THEN
+        NEW.year_start := least(yrs[1], coalesce(yrs[2], yrs[1]));
+        NEW.year_end   := greatest(yrs[1], coalesce(yrs[2], yrs[1]));
+      END IF;
+    END IF;
+    RETURN NEW;
+  END $$;
+
+DROP TRIGGER IF EXISTS trg_vehicle_measurements_fill_keys ON vehicle_measurements;
+CREATE TRIGGER trg_vehicle_measurements_fill_keys
+  BEFORE INSERT OR UPDATE OF make, model, year_range, make_key, model_key, year_start
+  ON vehicle_measurements
+  FOR EACH ROW EXECUTE FUNCTION vehicle_measurements_fill_keys();
+
+-- make -> models, make + model + year -> best match: equality on the keys,
+-- then a range on year_start (newest first)
+CREATE INDEX IF NOT EXISTS idx_vm_make_model_year
+  ON vehicle_measurements (make_key, model_key, year_start DESC, year_end);
+
+-- year -> makes: range on year_start, make_key read from the index
+CREATE INDEX IF NOT EXISTS idx_vm_year_make
+  ON vehicle_measurements (year_start, year_end) INCLUDE (make, make_key);
+"""
+
+SKIP_PATTERNS = ["Page ", "*** Measurements", "Make Model Year Side Width"]
+YEAR_RANGE = re.compile(r"(1[89]\d\d|20\d\d)-(1[89]\d\d|20\d\d)")
+YEAR_ONE   = re.compile(r"(1[89]\d\d|20\d\d)")
+
+
+def find_data_file(explicit=None, dirs=()):
+    """First existing measurement sheet: `explicit`, else a known name in `dirs` or the cwd."""
+    if explicit:
+        return explicit if os.path.exists(explicit) else None
+    for d in [*dirs, os.getcwd()]:
+        for name in DATA_FILES:
+            path = os.path.join(d, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def norm_key(s):
+    """Lowercase, punctuation stripped, whitespace collapsed: 'F-150 SuperCrew' -> 'f150 supercrew'."""
+    s = re.sub(r"[^\w\s]", "", (s or "").lower())
+    return " ".join(s.split())
+
+
+def year_bounds(year_range):
+    """'2006-2011' -> (2006, 2011); '2019' -> (2019, 2019); else (None, None). Reversed ranges are swapped."""
+    years = [int(y) for y in re.findall(r"(?:1[89]|20)\d\d", year_range or "")[:2]]
+    if not years:
+        return None, None
+    return min(years), max(years)
+
+
+def search_keys(rec):
+    """The KEY_COLUMNS for a row with make, model and year_range."""
+    start, end = year_bounds(rec.get("year_range"))
+    return {"year_start": start, "year_end": end,
+            "make_key": norm_key(rec.get("make")), "model_key": norm_key(rec.get("model"))}
+
+
+def natural_key(rec):
+    return norm_key(rec.get("make")), norm_key(rec.get("model")), norm_key(rec.get("year_range"))
+
+
+def vehicle_id(scope, key, n=1):
+    """Stable id for the n-th row with natural key `key` (the sheet repeats a few vehicles)."""
+    name = f"{scope}|{'|'.join(key)}" + (f"#{n}" if n > 1 else "")
+    return str(uuid.uuid5(ID_NAMESPACE, name))
+
+
+def _lines(raw):
+    for line in raw.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if any(p in line and (p != "Page " or line.startswith("Page ")) for p in SKIP_PATTERNS):
+            continue
+        yield line
+
+
+def parse_line(line):
+    """One sheet line -> row dict without org/id, or None if it isn't a vehicle."""
+    year_match = YEAR_RANGE.search(line) or YEAR_ONE.search(line)
+    if not year_match:
+        return None
+
+    tokens = line[:year_match.start()].split()
+    if not tokens:
+        return None
+
+    # Parse measurements (- = NULL/None)
+    meas_vals = []
+    for t in line[year_match.end():].split():
+        if t == "-":
+            meas_vals.append(None)
+        else:
+            try:
+                meas_vals.append(float(t))
+            except ValueError:
+                pass
+    if not meas_vals or meas_vals[-1] is None:
+        return None
+
+    dims = (meas_vals[:-1] + [None] * 12)[:12]
+    rec = {"make": tokens[0], "model": " ".join(tokens[1:]), "year_range": year_match.group(0)}
+    rec.update(zip(DIM_COLUMNS, dims))
+    rec["total_sqft"] = meas_vals[-1]
+    rec.update(search_keys(rec))
+    return rec
+
+
+def parse_file(path, org_id=None):
+    """(records, skipped) for the sheet at `path`, every record carrying its stable id.
+
+    org_id None is the shared catalog; an org id gives that org's own rows (custom vehicles).
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        raw = f.read()
+
+    records, skipped, seen = [], 0, {}
+    for line in _lines(raw):
+        rec = parse_line(line)
+        if rec is None:
+            skipped += 1
+            continue
+        key = natural_key(rec)
+        seen[key] = seen.get(key, 0) + 1
+        records.append({"id": vehicle_id(org_id or CATALOG_SCOPE, key, seen[key]), "org_id": org_id, **rec})
+    return records, skipped
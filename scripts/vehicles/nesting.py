@@ -0,0 +1,325 @@
+"""
+WrapShop Pro — Vinyl Roll Nesting
+Packs a job's print panels onto the roll and reports how much roll they take.
+Material is the biggest cost on a wrap (material_cost on the sales order), and
+the sqft x waste% allowance in takeoff.py only guesses at it. This lays out
+the actual pieces.
+
+  pieces   each vehicle panel the coverage asks for, at the size print_export.py
+           prints it: bleed on every edge, and panels taller than the printable
+           width split into the same overlapping tiles. A piece can turn 90° on
+           the roll unless --no-rotate (directional films: brushed, carbon)
+  packing  skyline bottom-left. Every piece goes where its top edge lands
+           lowest on the roll, tried in several orders (longest side, area,
+           height, width); the shortest layout wins. --improve N spends N more
+           seconds on a local search over the order (swaps and reversed runs,
+           keeping any layout that is no longer)
+  rolls    --widths 54,60 or --rolls inventory.json (the /api/inventory/vinyl
+           response: width_in, sqft_available, cost_per_foot). Every width is
+           nested; the cheapest wins (by cost per foot when known, else by
+           media sqft), preferring widths the stock on hand covers. Rolls
+           print inside a --margin on each edge
+
+Input: a fleet CSV as takeoff.py reads it (unit, make, model, year, coverage[,
+qty][, partial_pct]), or a pieces CSV with name, width, height[, qty] in inches
+(used as given, no bleed added).
+
+Output: <base>.json (the chosen roll, linear_ft, waste %, the other widths, each
+unit's share of the linear feet and the cut plan) and <base>_cuts.csv (one row
+per piece: x across the roll, y along it, inches). --workorder wo.json writes
+linear_ft into a work order (gen_workorder.py); for a fleet batch each unit's
+page gets its own share.
+
+Run:  python3 nesting.py fleet.csv --widths 54,60 [--improve 10] [--out fleet_nest]
+      python3 nesting.py pieces.csv --rolls rolls.json --workorder wo.json
+"""
+
+import os, sys, csv, json, time, random, argparse
+
+import numpy as np
+
+from takeoff import Catalog, COVERAGE, COVERAGE_ALIASES, read_fleet, _year, _num
+import print_export
+
+WIDTHS_IN = (54.0,)
+MARGIN_IN = 0.5             # unprinted edge each side (54" media prints 53", as print_export assumes)
+GAP_IN = 0.25               # between pieces, for the cutter
+EPS = 1e-6
+
+# takeoff.PANELS order (side, back, hood, roof) -> the print panels each one is
+SHEET_PANELS = [("driver", "passenger"), ("back",), ("hood",), ("roof",)]
+
+
+# ── PIECES ───────────────────────────────────────────────────────────────────
+def panel_pieces(sizes, print_w_in, bleed_in=print_export.BLEED_IN, overlap_in=print_export.OVERLAP_IN):
+    """[(panel, tile, across_in, along_in)]: the print tiles of each panel, in print_export's feed direction."""
+    dpi = 100                                   # layout works in pixels; 1/100" is plenty for nesting
+    out = []
+    for panel, size in sizes.items():
+        lay = print_export.layout(panel, size, dpi, bleed_in, print_w_in, overlap_in)
+        h = lay["height_px"] / dpi
+        for i, (x0, x1) in enumerate(lay["columns"]):
+            w = (x1 - x0) / dpi
+            # "along" panels run lengthwise down the roll; "across" tiles stand across it
+            out.append((panel, i + 1, h, w) if lay["feed"] == "along" else (panel, i + 1, w, h))
+    return out
+
+
+def fleet_pieces(catalog, units, print_w_in):
+    """Pieces for every unit of a takeoff fleet CSV; returns (pieces, problems)."""
+    pieces, problems = [], []
+    for n, u in enumerate(units):
+        name = u.get("unit") or str(n + 1)
+        row, _, _ = catalog.match(u.get("make", ""), u.get("model", ""), _year(u.get("year")))
+        if row < 0:
+            problems.append(f"{name}: no catalog match for {u.get('make', '')} {u.get('model', '')}"); continue
+        cov = COVERAGE_ALIASES.get(u.get("coverage", "").lower(), u.get("coverage", "").lower() or "full")
+        if cov not in COVERAGE:
+            problems.append(f"{name}: unknown coverage {cov!r}"); continue
+        want = {p for w, names in zip(COVERAGE[cov], SHEET_PANELS) if w for p in names}
+        sizes = print_export.panel_sizes(catalog.records[row], want)
+        if cov == "partial":
+            k = _num(u.get("partial_pct", ""), 50.0) / 100
+            sizes = {p: (a * k, h) for p, (a, h) in sizes.items()}
+        for q in range(max(0, int(round(_num(u.get("qty", ""), 1.0))))):
+            unit = name if q == 0 else f"{name}#{q + 1}"
+            for panel, tile, a, b in panel_pieces(sizes, print_w_in):
+                pieces.append({"unit": unit, "panel": panel, "tile": tile, "across": a, "along": b})
+    return pieces, problems
+
+
+def csv_pieces(rows):
+    pieces = []
+    for n, r in enumerate(rows):
+        w, h = _num(r.get("width", ""), 0.0), _num(r.get("height", ""), 0.0)
+        if w <= 0 or h <= 0:
+            continue
+        name = r.get("name") or r.get("unit") or str(n + 1)
+        for q in range(max(0, int(round(_num(r.get("qty", ""), 1.0))))):
+            pieces.append({"unit": name, "panel": r.get("panel") or name, "tile": q + 1, "across": w, "along": h})
+    return pieces
+
+
+# ── PACKING ──────────────────────────────────────────────────────────────────
+def pack(sizes, order, width, rotate=True):
+    """Skyline bottom-left. sizes: (n, 2) array of (across, along). Returns (length, [(x, y, rotated)])."""
+    sky = [[0.0, width, 0.0]]                   # segments of the packed edge: x, width, y
+    spots = [None] * len(sizes)
+    length = 0.0
+    for i in order:
+        a, b = sizes[i]
+        best = None
+        for w, h, rot in ((a, b, False), (b, a, True)) if rotate and abs(a - b) > EPS else ((a, b, False),):
+            if w > width + EPS:
+                continue
+            for j in range(len(sky)):
+                x = sky[j][0]
+                if x + w > width + EPS:
+                    break
+                y, k, span = 0.0, j, 0.0
+                while span < w - EPS:
+                    y = max(y, sky[k][2]); span += sky[k][1]; k += 1
+                if best is None or (y + h, x) < (best[0] + best[4], best[1]):
+                    best = (y, x, w, rot, h)
+        if best is None:
+            raise ValueError(f"piece {sizes[i][0]:g}\" x {sizes[i][1]:g}\" does not fit a {width:g}\" roll")
+        y, x, w, rot, h = best
+        spots[i] = (x, y, rot)
+        length = max(length, y + h)
+        # the piece's top becomes a new segment; trim whatever it covers
+        new, x1 = [], x + w
+        for sx, sw, sy in sky:
+            if sx + sw <= x + EPS or sx >= x1 - EPS:
+                new.append([sx, sw, sy]); continue
+            if sx < x:
+                new.append([sx, x - sx, sy])
+            if sx + sw > x1:
+                new.append([x1, sx + sw - x1, sy])
+        new.append([x, w, y + h])
+        new.sort()
+        sky = [new[0]]
+        for seg in new[1:]:
+            if abs(seg[2] - sky[-1][2]) < EPS:
+                sky[-1][1] += seg[1]
+            else:
+                sky.append(seg)
+    return length, spots
+
+
+ORDERS = {
+    "longest side": lambda s: -np.maximum(s[:, 0], s[:, 1]),
+    "area":         lambda s: -(s[:, 0] * s[:, 1]),
+    "along":        lambda s: -s[:, 1],
+    "across":       lambda s: -s[:, 0],
+}
+
+
+def nest(pieces, width, rotate=True, gap=GAP_IN, improve_s=0.0, seed=0):
+    """Best layout of `pieces` on a printable `width`: {length_in, order, spots, heuristic, tries}."""
+    # every piece carries the gap on its far edges; the roll is a gap wider to match
+    sizes = np.array([(p["across"] + gap, p["along"] + gap) for p in pieces], dtype=np.float64)
+    w = width + gap
+    best = None
+    for name, key in ORDERS.items():
+        order = [int(i) for i in np.argsort(key(sizes), kind="stable")]
+        length, spots = pack(sizes, order, w, rotate)
+        if best is None or length < best["length"] - EPS:
+            best = {"length": length, "order": order, "spots": spots, "heuristic": name}
+    tries = len(ORDERS)
+    if improve_s > 0 and len(pieces) > 1:
+        rng = random.Random(seed)
+        stop = time.perf_counter() + improve_s
+        order = best["order"]
+        while time.perf_counter() < stop:
+            cand = order[:]
+            i, j = sorted(rng.sample(range(len(cand)), 2))
+            if rng.random() < 0.5:
+                cand[i], cand[j] = cand[j], cand[i]
+            else:
+                cand[i:j + 1] = cand[i:j + 1][::-1]
+            length, spots = pack(sizes, cand, w, rotate)
+            tries += 1
+            if length <= best["length"] + EPS:       # sideways moves keep the search from stalling
+                if length < best["length"] - EPS:
+                    best = {"length": length, "order": cand, "spots": spots, "heuristic": "improved"}
+                order = cand
+    best["length_in"] = max(0.0, best.pop("length") - gap)
+    best["tries"] = tries
+    return best
+
+
+# ── REPORT ───────────────────────────────────────────────────────────────────
+def plan_for(pieces, roll_w, rotate=True, gap=GAP_IN, margin=MARGIN_IN, improve_s=0.0, cost_per_foot=None):
+    width = roll_w - 2 * margin
+    t0 = time.perf_counter()
+    res = nest(pieces, width, rotate, gap, improve_s)
+    secs = time.perf_counter() - t0
+    length_ft = res["length_in"] / 12
+    linear_ft = np.ceil(length_ft * 10) / 10
+    media = linear_ft * roll_w / 12
+    used = sum(p["across"] * p["along"] for p in pieces) / 144
+    cuts = []
+    for i, (x, y, rot) in enumerate(res["spots"]):
+        p = pieces[i]
+        a, b = (p["along"], p["across"]) if rot else (p["across"], p["along"])
+        cuts.append({"unit": p["unit"], "panel": p["panel"], "tile": p["tile"], "x_in": round(margin + x, 2),
+                     "y_in": round(y, 2), "across_in": round(a, 2), "along_in": round(b, 2), "rotated": rot})
+    cuts.sort(key=lambda c: (c["y_in"], c["x_in"]))
+    # each unit is charged the roll in proportion to the area of its pieces
+    share = {}
+    for p in pieces:
+        share[p["unit"]] = share.get(p["unit"], 0.0) + p["across"] * p["along"] / 144
+    return {"roll_width_in": roll_w, "printable_in": width, "linear_ft": float(linear_ft),
+            "media_sqft": round(float(media), 1), "piece_sqft": round(used, 1),
+            "waste_pct": round(100 * (1 - used / media), 1) if media else 0.0,
+            "cost": round(float(linear_ft) * cost_per_foot, 2) if cost_per_foot else None,
+            "pieces": len(pieces), "heuristic": res["heuristic"], "tries": res["tries"], "nest_s": round(secs, 2),
+            "units": {u: round(float(linear_ft) * s / used, 1) for u, s in share.items()} if used else {},
+            "cuts": cuts}
+
+
+def read_rolls(path):
+    """[(width_in, cost_per_foot, sqft_available)] from an /api/inventory/vinyl response, best stocked first."""
+    with open(path) as f:
+        data = json.load(f)
+    widths = {}
+    for r in data.get("rolls", data) if isinstance(data, dict) else data:
+        w = _num(r.get("width_in") or r.get("width_inches") or "", 0.0)
+        if w <= 0:
+            continue
+        cur = widths.setdefault(w, [None, 0.0])
+        cost = r.get("cost_per_foot")
+        if cost and (cur[0] is None or cost < cur[0]):
+            cur[0] = float(cost)
+        cur[1] += _num(r.get("sqft_available") or "", 0.0)
+    return [(w, c, s) for w, (c, s) in sorted(widths.items())]
+
+
+def linear_ft_text(plan):
+    return f"{plan['linear_ft']:g} ft of {plan['roll_width_in']:g}\" roll"
+
+
+def update_workorder(path, plan):
+    with open(path) as f:
+        wo = json.load(f)
+    wo["linear_ft"] = linear_ft_text(plan)
+    for unit in wo.get("work_orders", []):
+        ft = plan["units"].get(str(unit.get("unit", "")))
+        if ft is not None:
+            unit["linear_ft"] = f"{ft:g} ft of {plan['roll_width_in']:g}\" roll"
+    with open(path, "w") as f:
+        json.dump(wo, f, indent=1)
+
+
+def write_outputs(base, chosen, others):
+    with open(base + ".json", "w") as f:
+        json.dump({**chosen, "alternatives": [{k: v for k, v in o.items() if k not in ("cuts", "units")}
+                                              for o in others]}, f, indent=1)
+    with open(base + "_cuts.csv", "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(chosen["cuts"][0]) if chosen["cuts"] else ["unit"])
+        w.writeheader(); w.writerows(chosen["cuts"])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Nest print panels onto vinyl rolls; linear feet, waste and a cut plan.")
+    ap.add_argument("input", help="fleet CSV (unit, make, model, year, coverage...) or pieces CSV (name, width, height)")
+    ap.add_argument("--widths", help="roll widths in inches, comma separated (default 54)")
+    ap.add_argument("--rolls", help="inventory JSON (/api/inventory/vinyl response) for widths and costs")
+    ap.add_argument("--sheet", help="measurement sheet (default: repo root)")
+    ap.add_argument("--margin", type=float, default=MARGIN_IN, help="unprinted edge per side, inches")
+    ap.add_argument("--gap", type=float, default=GAP_IN, help="space between pieces, inches")
+    ap.add_argument("--no-rotate", action="store_true", help="keep every piece in its print direction")
+    ap.add_argument("--improve", type=float, default=0.0, help="seconds of local search per width after the heuristics")
+    ap.add_argument("--workorder", help="work order JSON to write linear_ft into")
+    ap.add_argument("--out", help="output base name (default: <input>_nest)")
+    args = ap.parse_args()
+
+    if args.rolls:
+        rolls = read_rolls(args.rolls)
+    else:
+        rolls = [(float(w), None, None) for w in (args.widths.split(",") if args.widths else WIDTHS_IN)]
+    if not rolls:
+        print("❌ No roll widths"); sys.exit(1)
+
+    rows = read_fleet(args.input)
+    fleet = bool(rows) and "make" in rows[0]
+    catalog = Catalog.from_sheet(args.sheet) if fleet else None
+    plans = []
+    for w, cost, stock in rolls:
+        if fleet:
+            pieces, problems = fleet_pieces(catalog, rows, w - 2 * args.margin)
+        else:
+            pieces, problems = csv_pieces(rows), []
+        if not pieces:
+            print("❌ No pieces to nest"); sys.exit(1)
+        try:
+            plan = plan_for(pieces, w, not args.no_rotate, args.gap, args.margin, args.improve, cost)
+        except ValueError as e:
+            print(f"⚠️  {w:g}\" roll: {e}"); continue
+        if stock is not None:
+            plan["sqft_available"] = round(stock, 1)
+            plan["short_sqft"] = round(max(0.0, plan["media_sqft"] - stock), 1)
+        plans.append(plan)
+        print(f"  {w:g}\" roll: {plan['pieces']} pieces -> {plan['linear_ft']:g} linear ft, "
+              f"{plan['media_sqft']:g} sqft media, {plan['waste_pct']:g}% waste"
+              + (f", ${plan['cost']:,.2f}" if plan["cost"] else "")
+              + f"  ({plan['heuristic']}, {plan['tries']} layouts, {plan['nest_s']:.1f}s)")
+    for p in problems:
+        print(f"⚠️  {p}")
+    if not plans:
+        print("❌ No roll width fits every piece"); sys.exit(1)
+
+    plans.sort(key=lambda p: (p.get("short_sqft", 0) > 0, p["cost"] if p["cost"] is not None else float("inf"), p["media_sqft"], p["linear_ft"]))
+    chosen, others = plans[0], plans[1:]
+    base = args.out or os.path.splitext(args.input)[0] + "_nest"
+    write_outputs(base, chosen, others)
+    if args.workorder:
+        update_workorder(args.workorder, chosen)
+    print(f"✅ {linear_ft_text(chosen)}, {chosen['waste_pct']:g}% waste -> {base}.json, {base}_cuts.csv"
+          + (f", {args.workorder}" if args.workorder else ""))
+    if chosen.get("short_sqft"):
+        print(f"⚠️  Inventory is {chosen['short_sqft']:g} sqft short at {chosen['roll_width_in']:g}\"")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+WrapShop Pro — Per-Org Vehicle Overlay
+vehicle_measurements holds one shared catalog (org_id NULL). What an org changes
+lives in vehicle_measurement_overrides, keyed by org, instead of in a copy of
+the whole catalog:
+
+  override  vehicle_id set: non-null columns replace the catalog row's
+  hidden    vehicle_id set, hidden true: the row drops out for that org
+  custom    vehicle_id NULL: a vehicle the catalog doesn't have
+
+resolve() is the same merge as vehicle_catalog(org) in
+supabase/migrations/20260402000000_vehicle_catalog_overlay.sql, so an overlay can
+be checked locally before it is pushed.
+
+Overlay rows are tied to the live catalog rows (sync.fetch_remote), not to the
+parsed sheet: production keeps the legacy random ids the sync adopted, and an
+override has to reference the id that is actually in the table. Without a
+service key, resolve falls back to the sheet — enough to check the merge, but
+its vehicle_ids are the sheet's.
+
+Overlay file (CSV or a JSON list; header names as the table's columns):
+  vehicle_id | make, model, year_range   which catalog row; a row that names no
+                                        catalog vehicle is a custom vehicle
+  hidden, side_width ... total_sqft, notes, and any pricing or derived column
+  (full_wrap_sqft, install_pay, suggested_price ..., see VALUE_NUMERIC)
+
+Run:  [SUPABASE_SERVICE_ROLE_KEY=...] python3 overlay.py resolve --org ORG overlay.csv [--out catalog.json]
+      SUPABASE_SERVICE_ROLE_KEY=... python3 overlay.py push --org ORG overlay.csv
+
+The app caches each org's catalog for a few minutes. With APP_URL (the app's base
+URL) and CRON_SECRET set, push asks POST /api/vehicles/catalog to drop the org's
+copy so the overlay shows at once.
+"""
+
+import os, sys, csv, json, uuid, argparse, urllib.request
+
+from measurements import (DIM_COLUMNS, ID_NAMESPACE, find_data_file, natural_key,
+                          parse_file, search_keys)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://uqfqkvslxoucxmxxrobt.supabase.co")
+APP_URL = os.environ.get("APP_URL", "")
+
+OVERLAY_TABLE = "vehicle_measurement_overrides"
+# derived and pricing columns of vehicle_measurements an override can also set
+VALUE_TEXT = ["body_style", "trim", "category"]
+VALUE_NUMERIC = ["full_wrap_sqft", "full_wrap_with_roof_sqft", "partial_wrap_sqft", "wrap_sqft",
+                 "three_quarter_wrap_sqft", "half_wrap_sqft", "driver_sqft", "passenger_sqft",
+                 "trunk_sqft", "doors_sqft", "bumpers_sqft", "mirrors_sqft", "pillars_sqft", "rockers_sqft",
+                 "linear_feet", "print_width_standard", "install_hours", "install_pay", "suggested_price",
+                 "std_hours", "std_value"]
+FIELDS = ["make", "model", "year_range", *DIM_COLUMNS, "total_sqft", *VALUE_TEXT, *VALUE_NUMERIC]
+OVERRIDE_COLUMNS = ["id", "org_id", "vehicle_id", "hidden", *FIELDS, "year_start", "year_end", "notes"]
+TRUE = {"1", "true", "yes", "y", "t", "x"}
+
+
+def override_id(org_id, vehicle_id=None, key=None):
+    """Stable id per org and catalog row (or per org and custom make/model/year), so a push is an upsert."""
+    name = f"{org_id}|override|{vehicle_id}" if vehicle_id else f"{org_id}|custom|{'|'.join(key)}"
+    return str(uuid.uuid5(ID_NAMESPACE, name))
+
+
+# ── OVERLAY FILE ─────────────────────────────────────────────────────────────
+def _value(col, v):
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    if col == "hidden":
+        return v if isinstance(v, bool) else str(v).strip().lower() in TRUE
+    if col in DIM_COLUMNS or col == "total_sqft" or col in VALUE_NUMERIC:
+        return float(v)
+    return str(v).strip()
+
+
+def read_overlay(path):
+    """Overlay rows as dicts of table columns; blanks are None (= keep the catalog value)."""
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            raw = json.load(f)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            raw = [{(k or "").strip().lower(): v for k, v in row.items()} for row in csv.DictReader(f)]
+    cols = {"vehicle_id", "hidden", *FIELDS, "notes"}
+    return [{c: _value(c, r.get(c)) for c in cols} for r in raw]
+
+
+def overrides_for(org_id, rows, catalog):
+    """Table rows for an org's overlay file: each row tied to its catalog vehicle, or made custom."""
+    by_id = {r["id"]: r for r in catalog}
+    by_key = {}
+    for r in catalog:
+        by_key.setdefault(natural_key(r), r["id"])
+    out, problems = [], []
+    for n, row in enumerate(rows, 1):
+        vid = row.get("vehicle_id") or by_key.get(natural_key(row))
+        if row.get("vehicle_id") and vid not in by_id:
+            problems.append(f"row {n}: vehicle_id {vid} is not in the catalog"); continue
+        if vid:
+            # naming the row is how it was found, not a change to it
+            fields = {c: row.get(c) for c in FIELDS}
+            if not row.get("vehicle_id"):
+                fields.update(make=None, model=None, year_range=None)
+        elif row.get("make") and row.get("model"):
+            fields = {c: row.get(c) for c in FIELDS}
+        else:
+            problems.append(f"row {n}: no catalog match and no make/model for a custom vehicle"); continue
+        rec = {"id": override_id(org_id, vid, None if vid else natural_key(row)), "org_id": org_id,
+               "vehicle_id": vid, "hidden": bool(row.get("hidden")), **fields, "notes": row.get("notes")}
+        years = search_keys(rec) if rec["year_range"] else {"year_start": None, "year_end": None}
+        rec["year_start"], rec["year_end"] = years["year_start"], years["year_end"]
+        out.append({c: rec.get(c) for c in OVERRIDE_COLUMNS})
+    return out, problems
+
+
+# ── MERGE ────────────────────────────────────────────────────────────────────
+def resolve(catalog, overrides):
+    """The catalog as one org sees it. Each row gets `catalog_source`: catalog, override or custom."""
+    by_vehicle = {o["vehicle_id"]: o for o in overrides if o.get("vehicle_id")}
+    out = []
+    for row in catalog:
+        o = by_vehicle.get(row["id"])
+        if o is None:
+            out.append({**row, "catalog_source": "catalog"}); continue
+        if o.get("hidden"):
+            continue
+        merged = {**row, **{c: o[c] for c in FIELDS if o.get(c) is not None}, "catalog_source": "override"}
+        if any(o.get(c) is not None for c in ("make", "model", "year_range")):
+            merged.update(search_keys(merged))
+        out.append(merged)
+    for o in overrides:
+        if o.get("vehicle_id") is None and not o.get("hidden"):
+            out.append({"id": o["id"], "org_id": o["org_id"], **{c: o.get(c) for c in FIELDS},
+                        **search_keys(o), "catalog_source": "custom"})
+    return out
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def live_catalog(url, key):
+    """The shared catalog rows as they are in the table, with the ids overrides must reference."""
+    from rest import Client
+    import sync
+    client = Client(url, key)
+    try:
+        return sync.fetch_remote(client, None)
+    finally:
+        client.close()
+
+
+def load(args, live):
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if key:
+        catalog = live_catalog(args.url, key)
+        print(f"Resolving against {len(catalog)} live catalog rows")
+    elif live:
+        print("❌ SUPABASE_SERVICE_ROLE_KEY is not set"); sys.exit(1)
+    else:
+        data_file = find_data_file(args.file, dirs=[ROOT])
+        if not data_file:
+            print("❌ Cannot find the measurement sheet"); sys.exit(1)
+        catalog, _ = parse_file(data_file)
+        print("⚠️  No SUPABASE_SERVICE_ROLE_KEY: resolving against the sheet, whose ids may not be the live ones")
+    overrides, problems = overrides_for(args.org, read_overlay(args.overlay), catalog)
+    for p in problems:
+        print(f"  ⚠️  {p}")
+    return catalog, overrides, problems
+
+
+def cmd_resolve(args):
+    catalog, overrides, _ = load(args, live=False)
+    rows = resolve(catalog, overrides)
+    counts = {s: sum(r["catalog_source"] == s for r in rows) for s in ("catalog", "override", "custom")}
+    hidden = sum(bool(o["hidden"]) for o in overrides)
+    print(f"✅ {len(rows)} vehicles for org {args.org}: {counts['catalog']} catalog, "
+          f"{counts['override']} overridden, {counts['custom']} custom, {hidden} hidden")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=1)
+        print(f"   -> {args.out}")
+
+
+def cmd_push(args):
+    from rest import Client
+    from upload import BatchUploader
+    catalog, overrides, problems = load(args, live=True)
+    if problems and not args.force:
+        print("❌ Fix the rows above (or pass --force to push the rest)"); sys.exit(1)
+    client = Client(args.url, os.environ["SUPABASE_SERVICE_ROLE_KEY"])
+    try:
+        up = BatchUploader(client, f"{OVERLAY_TABLE}?on_conflict=id", "resolution=merge-duplicates,return=minimal")
+        stats = up.run(overrides)
+    finally:
+        client.close()
+    for status, body, rows in up.errors:
+        print(f"  ❌ {len(rows)} rows FAILED — HTTP {status}\n     {body}")
+    if up.errors:
+        sys.exit(1)
+    print(f"✅ Pushed {stats.sent} overrides for org {args.org}")
+    refresh_app(args.org)
+
+
+def refresh_app(org_id):
+    """Drop the app's cached catalog for the org (POST /api/vehicles/catalog)."""
+    secret = os.environ.get("CRON_SECRET")
+    if not (APP_URL and secret):
+        print("   the app shows the overlay within 5 minutes (set APP_URL and CRON_SECRET to refresh it now)")
+        return
+    req = urllib.request.Request(f"{APP_URL.rstrip('/')}/api/vehicles/catalog", method="POST",
+                                 data=json.dumps({"org_id": org_id}).encode(),
+                                 headers={"Authorization": f"Bearer {secret}", "Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30):
+            print("   app catalog refreshed")
+    except OSError as e:
+        print(f"  ⚠️  app refresh failed ({e}); the overlay shows within 5 minutes")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check or push an org's vehicle catalog overlay.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("resolve", "push"):
+        p = sub.add_parser(name)
+        p.add_argument("overlay", help="overlay CSV or JSON")
+        p.add_argument("--org", required=True, help="org id the overlay belongs to")
+        p.add_argument("--url", default=SUPABASE_URL)
+        if name == "resolve":
+            p.add_argument("--file", help="measurement sheet, when resolving without a service key")
+            p.add_argument("--out", help="write the resolved catalog as JSON")
+        else:
+            p.add_argument("--force", action="store_true", help="push even if some rows were rejected")
+    args = ap.parse_args()
+    {"resolve": cmd_resolve, "push": cmd_push}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+WrapShop Pro — Local PostgREST Stand-in
+In-memory HTTP server that answers the handful of PostgREST calls the vehicle
+loaders make, so uploads can be timed and broken on purpose without touching
+Supabase:
+
+  GET    /rest/v1/<table>?select=..&col=eq.v&id=gt.v&order=id.asc&limit=n
+  POST   /rest/v1/<table>[?on_conflict=id]    insert, or upsert with
+                                              Prefer: resolution=merge-duplicates
+  DELETE /rest/v1/<table>?id=in.(a,b)|col=eq.v
+
+Run:   python3 postgrest_standin.py --port 54321 --latency-ms 40 --per-row-ms 0.2
+then:  SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_SERVICE_ROLE_KEY=x python3 upload_vehicles.py
+"""
+
+import json, time, random, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+
+class Store:
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rows_written = 0
+        self.connections = 0
+
+    def table(self, name):
+        return self.tables.setdefault(name, {})
+
+
+def _match(row, filters):
+    for col, expr in filters:
+        op, _, val = expr.partition(".")
+        v = row.get(col)
+        if op == "eq" and str(v) != val: return False
+        if op == "is" and val == "null" and v is not None: return False
+        if op == "gt" and not (v is not None and str(v) > val): return False
+        if op == "in" and str(v) not in val.strip("()").split(","): return False
+    return True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive, like the real thing
+    store = None
+    opts = None
+
+    def log_message(self, *a):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.store.lock:
+            self.store.connections += 1
+
+    def _reply(self, status, body=b""):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        name = parts.path.rsplit("/", 1)[-1]
+        q = parse_qsl(parts.query, keep_blank_values=True)
+        reserved = {"select", "order", "limit", "offset", "on_conflict"}
+        filters = [(k, v) for k, v in q if k not in reserved]
+        return name, dict(q), filters
+
+    def _delay(self, rows=0):
+        o = self.opts
+        time.sleep((o.latency_ms + o.per_row_ms * rows) / 1000)
+        with self.store.lock:
+            self.store.requests += 1
+        if o.fail_rate and random.random() < o.fail_rate:
+            self._reply(random.choice([500, 502, 503, 429]), {"message": "stand-in: injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        name, q, filters = self._route()
+        if self._delay():
+            return
+        with self.store.lock:
+            rows = [r for r in self.store.table(name).values() if _match(r, filters)]
+        if q.get("order"):
+            col, _, direction = q["order"].partition(".")
+            rows.sort(key=lambda r: str(r.get(col)), reverse=direction == "desc")
+        rows = rows[int(q.get("offset", 0)):]
+        if q.get("limit"):
+            rows = rows[:int(q["limit"])]
+        if q.get("select") and q["select"] != "*":
+            cols = q["select"].split(",")
+            rows = [{c: r.get(c) for c in cols} for r in rows]
+        self._reply(200, rows)
+
+    def do_POST(self):
+        name, q, _ = self._route()
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if len(raw) > self.opts.max_body:
+            self._reply(413, {"message": "Payload Too Large"})
+            return
+        rows = json.loads(raw)
+        rows = rows if isinstance(rows, list) else [rows]
+        if self._delay(len(rows)):
+            return
+        merge = "merge-duplicates" in self.headers.get("Prefer", "")
+        with self.store.lock:
+            table = self.store.table(name)
+            if not merge and any(r.get("id") in table for r in rows):
+                self._reply(409, {"code": "23505", "message": "duplicate key value violates unique constraint"})
+                return
+            for r in rows:
+                table[r["id"]] = {**table.get(r["id"], {}), **r}
+            self.store.rows_written += len(rows)
+        self._reply(201)
+
+    def do_DELETE(self):
+        name, _, filters = self._route()
+        if self._delay():
+            return
+        with self.store.lock:
+            table = self.store.table(name)
+            gone = [k for k, r in table.items() if _match(r, filters)]
+            for k in gone:
+                del table[k]
+            self.store.rows_written += len(gone)
+        self._reply(204)
+
+
+def serve(port=0, latency_ms=0.0, per_row_ms=0.0, max_body=10_000_000, fail_rate=0.0):
+    """Start a stand-in on a background thread. Returns (server, store, base_url)."""
+    opts = argparse.Namespace(latency_ms=latency_ms, per_row_ms=per_row_ms,
+                              max_body=max_body, fail_rate=fail_rate)
+    store = Store()
+    handler = type("StandinHandler", (Handler,), {"store": store, "opts": opts})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, store, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="In-memory PostgREST stand-in for the vehicle loaders.")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="fixed cost per request")
+    ap.add_argument("--per-row-ms", type=float, default=0.1, help="extra cost per row written")
+    ap.add_argument("--max-body", type=int, default=10_000_000, help="413 above this many bytes")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered 5xx/429")
+    args = ap.parse_args()
+    server, store, url = serve(args.port, args.latency_ms, args.per_row_ms, args.max_body, args.fail_rate)
+    print(f"PostgREST stand-in on {url}  (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"  {store.requests} requests, {store.connections} connections, "
+                  f"{store.rows_written} rows written, "
+                  f"{sum(len(t) for t in store.tables.values())} rows held")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
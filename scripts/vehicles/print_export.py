@@ -0,0 +1,311 @@
+"""
+WrapShop Pro — Print Panel Export
+Production print files for a wrap, straight from the vehicle measurements: each
+panel is laid out at true scale with bleed, and split into printer-width tiles
+that overlap so the installer can line them up.
+
+exportPrint() in lib/mockup/pipeline.ts builds one bleed-padded image in memory,
+which is fine for a preview. A box-truck side at 150 DPI is over 35,000 px
+across, though, and would not fit in memory that way. Here every tile is an
+uncompressed TIFF whose header is written up front. Its pixels are then filled
+in row strips, each strip resampled from the artwork straight into a memory map
+of that strip of the file. Peak memory is the artwork plus one strip, whatever
+the size of the vehicle.
+
+  panels   driver, passenger   side_width x side_height
+           back                back_width x back_height
+           hood, roof          length x width, front to back left to right
+                               (as the work order's panel diagram draws them)
+  art      --art <panel>=file per panel; "side" covers driver and passenger,
+           and a bare --art file covers every panel without its own. Art is
+           scaled to cover the panel plus bleed and centred
+  tiles    <panel>_<i>of<n>.tif (RGB, DPI tagged), of equal width up to the
+           printable width, sharing --overlap inches. A panel whose height fits
+           the printable width is one tile, fed along the roll
+  manifest manifest.json: vehicle, panels, tiles with inch offsets, and a
+           proof_<panel>.jpg per panel with the tile seams marked
+
+Run:  python3 print_export.py --make Ford --model "Transit 250" --year 2020 --art wrap.png --out print/
+      python3 print_export.py --dims side=236x82,back=80x82 --art side=side.png --art back=back.png
+"""
+
+import os, sys, json, math, time, struct, argparse
+
+try:
+    import resource
+except ImportError:          # Windows — no peak-memory report
+    resource = None
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from takeoff import Catalog
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+DPI = 150
+BLEED_IN = 2.0              # per edge; panels are trimmed and tucked on the vehicle, not cut to the line
+PRINT_WIDTH_IN = 53.0       # printable width of 54" media
+OVERLAP_IN = 0.5
+STRIP_BYTES = 16 * 1024 * 1024
+TIFF_ROWS = 64              # rows per TIFF strip (what readers fetch at a time)
+PROOF_PX_PER_IN = 4
+
+# panel -> (across column, up column, art keys tried in order)
+PANELS = {
+    "driver":    ("side_width",  "side_height", ("driver", "side")),
+    "passenger": ("side_width",  "side_height", ("passenger", "side")),
+    "back":      ("back_width",  "back_height", ("back",)),
+    "hood":      ("hood_length", "hood_width",  ("hood",)),
+    "roof":      ("roof_length", "roof_width",  ("roof",)),
+}
+DIM_ALIASES = {"side": ("driver", "passenger")}
+
+
+def _num(v):
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return None
+    return v if v > 0 else None
+
+
+def panel_sizes(row, only=None):
+    """{panel: (across_in, up_in)} for every panel the measurement row has both dimensions for."""
+    out = {}
+    for name, (across, up, _) in PANELS.items():
+        a, u = _num(row.get(across)), _num(row.get(up))
+        if a and u and (not only or name in only):
+            out[name] = (a, u)
+    return out
+
+
+def parse_dims(text):
+    """'side=236x82,back=80x82' -> {panel: (across, up)}; side fills driver and passenger."""
+    out = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, size = part.partition("=")
+        a, _, u = size.lower().partition("x")
+        if not (_num(a) and _num(u)):
+            raise ValueError(f"bad panel size {part!r} (want name=WIDTHxHEIGHT in inches)")
+        for panel in DIM_ALIASES.get(name.strip(), (name.strip(),)):
+            if panel not in PANELS:
+                raise ValueError(f"unknown panel {name!r} (have: side, {', '.join(PANELS)})")
+            out[panel] = (float(a), float(u))
+    return out
+
+
+def art_for(panel, art):
+    for key in PANELS[panel][2]:
+        if key in art:
+            return art[key]
+    return art.get("*")
+
+
+# ── LAYOUT ───────────────────────────────────────────────────────────────────
+def tile_columns(width_px, tile_px, overlap_px):
+    """[(x0, x1)] of equal-width tiles no wider than tile_px, neighbours sharing overlap_px."""
+    if width_px <= tile_px:
+        return [(0, width_px)]
+    n = math.ceil((width_px - overlap_px) / (tile_px - overlap_px))
+    w = math.ceil((width_px + (n - 1) * overlap_px) / n)
+    step = (width_px - w) / (n - 1)
+    return [(round(i * step), round(i * step) + w) for i in range(n)]
+
+
+def layout(panel, size_in, dpi, bleed_in, print_w_in, overlap_in):
+    a, u = size_in
+    w, h = round((a + 2 * bleed_in) * dpi), round((u + 2 * bleed_in) * dpi)
+    tile_px = round(print_w_in * dpi)
+    # a panel no taller than the media runs along the roll in one piece
+    cols = [(0, w)] if h <= tile_px else tile_columns(w, tile_px, round(overlap_in * dpi))
+    return {"panel": panel, "across_in": a, "up_in": u, "width_px": w, "height_px": h,
+            "feed": "along" if len(cols) == 1 and h <= tile_px else "across", "columns": cols}
+
+
+def cover_box(src_size, w, h):
+    """(x0, y0, scale): canvas pixel (x, y) samples the art at (x0 + x / scale, y0 + y / scale)."""
+    sw, sh = src_size
+    s = max(w / sw, h / sh)
+    return max(0.0, (sw - w / s) / 2), max(0.0, (sh - h / s) / 2), s
+
+
+def _clip(box, size):
+    # float error can put the matching edge a hair outside the art
+    return (max(0.0, box[0]), max(0.0, box[1]), min(size[0], box[2]), min(size[1], box[3]))
+
+
+# ── TIFF ─────────────────────────────────────────────────────────────────────
+def tiff_header(w, h, dpi, rows=TIFF_ROWS):
+    """Little-endian baseline RGB TIFF header + IFD for uncompressed w x h pixels that follow it."""
+    row_bytes = w * 3
+    n = math.ceil(h / rows)
+    counts = [min(rows, h - i * rows) * row_bytes for i in range(n)]
+    entries = 13
+    extra = 8 + 2 + entries * 12 + 4              # header, entry count, entries, next-IFD
+    bps_at = extra; extra += 6
+    xres_at = extra; extra += 8
+    yres_at = extra; extra += 8
+    offs_at = extra; extra += 4 * n
+    cnts_at = extra; extra += 4 * n
+    data_at = (extra + 15) // 16 * 16
+    if data_at + h * row_bytes >= 2 ** 32:
+        raise ValueError(f"{w}x{h} px is past the 4 GB TIFF limit; lower the DPI or the printable width")
+    offsets = [data_at + i * rows * row_bytes for i in range(n)]
+
+    def entry(tag, typ, count, value):
+        if typ == 3 and count == 1:
+            return struct.pack("<HHIHH", tag, typ, count, value, 0)
+        return struct.pack("<HHII", tag, typ, count, value)
+
+    ifd = [
+        entry(256, 4, 1, w), entry(257, 4, 1, h), entry(258, 3, 3, bps_at), entry(259, 3, 1, 1),
+        entry(262, 3, 1, 2),
+        entry(273, 4, n, offsets[0] if n == 1 else offs_at), entry(277, 3, 1, 3), entry(278, 4, 1, rows),
+        entry(279, 4, n, counts[0] if n == 1 else cnts_at),
+        entry(282, 5, 1, xres_at), entry(283, 5, 1, yres_at), entry(284, 3, 1, 1), entry(296, 3, 1, 2),
+    ]
+    head = b"II*\x00" + struct.pack("<I", 8) + struct.pack("<H", entries) + b"".join(ifd) + struct.pack("<I", 0)
+    head += struct.pack("<3H", 8, 8, 8) + struct.pack("<2I", dpi, 1) * 2
+    head += struct.pack(f"<{n}I", *offsets) + struct.pack(f"<{n}I", *counts)
+    return head + b"\x00" * (data_at - len(head)), data_at
+
+
+def write_tile(path, art, box, x0, x1, h, dpi, strip_bytes=STRIP_BYTES):
+    """Resample columns x0..x1 of the panel canvas from `art` into a TIFF, one memory-mapped strip at a time."""
+    w = x1 - x0
+    header, data_at = tiff_header(w, h, dpi)
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(data_at + w * h * 3)
+    bx, by, s = box
+    rows = max(1, strip_bytes // (w * 3))
+    for y0 in range(0, h, rows):
+        y1 = min(h, y0 + rows)
+        strip = art.resize((w, y1 - y0), Image.LANCZOS,
+                           box=_clip((bx + x0 / s, by + y0 / s, bx + x1 / s, by + y1 / s), art.size))
+        mm = np.memmap(path, dtype=np.uint8, mode="r+", offset=data_at + y0 * w * 3, shape=(y1 - y0, w, 3))
+        mm[:] = np.asarray(strip)
+        mm.flush()
+        del mm, strip
+
+
+def proof(art, box, lay, path, px_per_in=PROOF_PX_PER_IN, dpi=DPI):
+    """Small preview of the panel with its tile seams, overlaps and trim line."""
+    k = px_per_in / dpi
+    w, h = max(1, round(lay["width_px"] * k)), max(1, round(lay["height_px"] * k))
+    bx, by, s = box
+    img = art.resize((w, h), Image.BILINEAR, box=_clip((bx, by, bx + lay["width_px"] / s, by + lay["height_px"] / s), art.size))
+    draw = ImageDraw.Draw(img)
+    for x0, x1 in lay["columns"]:
+        draw.rectangle((x0 * k, 0, x1 * k - 1, h - 1), outline=(255, 0, 255))
+    bleed = (lay["width_px"] - lay["across_in"] * dpi) / 2 * k
+    draw.rectangle((bleed, bleed, w - bleed, h - bleed), outline=(0, 255, 255))
+    img.save(path, quality=85)
+
+
+# ── EXPORT ───────────────────────────────────────────────────────────────────
+def export(sizes, art, out_dir, dpi=DPI, bleed_in=BLEED_IN, print_w_in=PRINT_WIDTH_IN, overlap_in=OVERLAP_IN,
+           vehicle=None, log=print):
+    """Write every panel's tiles, proofs and manifest.json. `art` maps art keys (or "*") to image paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    loaded, panels = {}, []
+    for panel, size in sizes.items():
+        src = art_for(panel, art)
+        if not src:
+            log(f"  ⚠️  {panel}: no artwork, skipped"); continue
+        if src not in loaded:
+            loaded.clear()                      # one artwork in memory at a time
+            loaded[src] = Image.open(src).convert("RGB")
+        img = loaded[src]
+        lay = layout(panel, size, dpi, bleed_in, print_w_in, overlap_in)
+        box = cover_box(img.size, lay["width_px"], lay["height_px"])
+        t0 = time.perf_counter()
+        tiles = []
+        for i, (x0, x1) in enumerate(lay["columns"]):
+            name = f"{panel}_{i + 1}of{len(lay['columns'])}.tif"
+            write_tile(os.path.join(out_dir, name), img, box, x0, x1, lay["height_px"], dpi)
+            tiles.append({"file": name, "x_in": round(x0 / dpi - bleed_in, 3), "width_in": round((x1 - x0) / dpi, 3),
+                          "height_in": round(lay["height_px"] / dpi, 3), "width_px": x1 - x0,
+                          "height_px": lay["height_px"]})
+        proof(img, box, lay, os.path.join(out_dir, f"proof_{panel}.jpg"), dpi=dpi)
+        secs = time.perf_counter() - t0
+        log(f"  {panel:9s} {size[0]:g}\" x {size[1]:g}\"  {lay['width_px']} x {lay['height_px']} px  "
+            f"{len(tiles)} tile{'s' if len(tiles) != 1 else ''} ({lay['feed']})  {secs:.1f}s")
+        panels.append({"panel": panel, "art": os.path.basename(src), "across_in": size[0], "up_in": size[1],
+                       "feed": lay["feed"], "tiles": tiles})
+    manifest = {"vehicle": vehicle, "dpi": dpi, "bleed_in": bleed_in, "print_width_in": print_w_in,
+                "overlap_in": overlap_in, "panels": panels}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def peak_rss_mb():
+    """Peak resident memory in MB, or None where the resource module is missing."""
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiled print files per panel from vehicle measurements.")
+    ap.add_argument("--make"); ap.add_argument("--model"); ap.add_argument("--year", type=int)
+    ap.add_argument("--dims", help="panel sizes in inches instead of a catalog vehicle: side=236x82,back=80x82")
+    ap.add_argument("--sheet", help="measurement sheet (default: the one in the repo root)")
+    ap.add_argument("--art", action="append", default=[], help="artwork: file, or panel=file (repeatable)")
+    ap.add_argument("--panels", help=f"comma list of panels (default: all of {', '.join(PANELS)})")
+    ap.add_argument("--out", default="print_export")
+    ap.add_argument("--dpi", type=int, default=DPI)
+    ap.add_argument("--bleed", type=float, default=BLEED_IN, help="inches per edge")
+    ap.add_argument("--print-width", type=float, default=PRINT_WIDTH_IN, help="printable media width, inches")
+    ap.add_argument("--overlap", type=float, default=OVERLAP_IN, help="inches shared by neighbouring tiles")
+    args = ap.parse_args()
+
+    art = {}
+    for a in args.art:
+        key, sep, path = a.partition("=")
+        if not sep:
+            key, path = "*", a
+        if not os.path.exists(path):
+            print(f"❌ Artwork not found: {path}"); sys.exit(1)
+        art[key] = path
+    if not art:
+        print("❌ Give at least one --art"); sys.exit(1)
+    only = set(args.panels.split(",")) if args.panels else None
+
+    if args.dims:
+        try:
+            sizes = {p: s for p, s in parse_dims(args.dims).items() if not only or p in only}
+        except ValueError as e:
+            print(f"❌ {e}"); sys.exit(1)
+        vehicle = {"dims": args.dims}
+    else:
+        if not (args.make and args.model):
+            print("❌ Give --make and --model (and --year), or --dims"); sys.exit(1)
+        try:
+            catalog = Catalog.from_sheet(args.sheet)
+        except FileNotFoundError:
+            print(f"❌ Measurement sheet not found (looked in {ROOT})"); sys.exit(1)
+        row, how, _ = catalog.match(args.make, args.model, args.year)
+        if row < 0:
+            print(f"❌ No catalog match for {args.make} {args.model} {args.year or ''}"); sys.exit(1)
+        rec = catalog.records[row]
+        sizes = panel_sizes(rec, only)
+        vehicle = {"id": rec["id"], "make": rec["make"], "model": rec["model"], "year_range": rec["year_range"],
+                   "match": how}
+        print(f"{rec['make']} {rec['model']} {rec['year_range']} ({how} match)")
+    if not sizes:
+        print("❌ No panels with both dimensions"); sys.exit(1)
+
+    t0 = time.time()
+    manifest = export(sizes, art, args.out, args.dpi, args.bleed, args.print_width, args.overlap, vehicle)
+    tiles = sum(len(p["tiles"]) for p in manifest["panels"])
+    peak = peak_rss_mb()
+    print(f"✅ {tiles} tiles for {len(manifest['panels'])} panels in {time.time() - t0:.1f}s -> {args.out}/"
+          + (f" (peak memory {peak:.0f} MB)" if peak is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+WrapShop Pro — Rate Card Builder
+Prices every vehicle in the catalog for every coverage package and film tier in
+one pass, for printed price sheets and anything else that wants the whole matrix
+as a file. The rate-card page does not read it: admins edit the rules on that
+page and see prices change as they type, and a row there is five multiplications
+(RateCardClient.tsx calc()), so it keeps computing in the browser. The two agree:
+the artifact's Full column prices the vehicle's total_sqft, as the page does,
+with the same formula, base film and rounding.
+
+  vehicles  the measurement sheet, with an org's overlay applied (--org and
+            --overlay, the same merge as vehicle_catalog(org))
+  packages  takeoff.py's coverages: sqft per package = panel sqft x weights, a
+            (vehicles x 4) @ (4 x packages) product; partial is half of full.
+            full_roof (labelled Full) is the sheet's total_sqft where it has one
+            — the page's number — and the panel sum otherwise
+  tiers     FILM_TIERS (MATERIAL_OPTIONS in lib/estimator/vehicleDb.ts), each
+            priced relative to the org's material_per_sqft, which is what its
+            base film (Avery MPI 1105) costs it
+  rules     rate_card_settings: install hours = sqft / production_speed, install
+            = hours x install_rate_hr, cost = install + material + design_fee,
+            price = cost / max_cost_pct, to the nearest dollar as the page
+            shows it, or rounded up to --round dollars
+
+Artifact: rate_card-<version>.json.gz, columnar, whole dollars, null where a
+vehicle lacks a package's panels. The version is a hash of every input (sheet,
+overlay, rules, tiers, packages), so an unchanged rebuild is skipped, and
+latest.json names the current version. The PDF comes from
+scripts/pdf/gen_ratecard.py <artifact> <out.pdf>.
+
+Run:  python3 rate_card.py [--rules rate_card_settings.json] [--org ORG --overlay overlay.csv] [--out rate_cards/]
+"""
+
+import os, sys, gzip, json, time, hashlib, argparse
+
+import numpy as np
+
+from measurements import find_data_file, parse_file
+from takeoff import PANELS, COVERAGE
+import overlay
+import validate
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+SCHEMA = 2
+
+# the page's fallback when an org has no rate_card_settings row
+DEFAULT_RULES = {"install_rate_hr": 35, "production_speed": 35.71, "material_per_sqft": 2.10,
+                 "design_fee": 150, "max_cost_pct": 25}
+BASE_FILM_RATE = 2.10       # Avery MPI 1105, the film material_per_sqft is quoted for
+FILM_TIERS = [
+    ("avery1105", "Avery MPI 1105", 2.10),
+    ("avery1005", "Avery MPI 1005", 1.85),
+    ("3m2080",    "3M 2080 Series", 2.50),
+    ("3mij180",   "3M IJ180",       2.30),
+    ("averysupr", "Avery Supreme",  2.75),
+    ("arlonslx",  "Arlon SLX",      2.20),
+    ("hexisskin", "Hexis Skintac",  2.00),
+]
+# Full first: it is the rate-card page's price (every panel, roof included); No Roof is takeoff's "full"
+PACKAGES = ("full_roof", "full", "partial", "sides", "sides_back", "roof")
+PACKAGE_LABELS = {"full_roof": "Full", "full": "No Roof", "partial": "Partial", "sides": "Sides",
+                  "sides_back": "Sides + Back", "roof": "Roof"}
+TOTAL_PACKAGE = "full_roof"     # priced from total_sqft, like the page
+PARTIAL_SHARE = 0.5
+
+
+def read_rules(path=None):
+    rules = dict(DEFAULT_RULES)
+    if path:
+        with open(path) as f:
+            data = json.load(f)
+        row = data[0] if isinstance(data, list) else data
+        rules.update({k: float(row[k]) for k in DEFAULT_RULES if row.get(k) is not None})
+    return rules
+
+
+# ── MATRIX ───────────────────────────────────────────────────────────────────
+def build(vehicles, rules, tiers=FILM_TIERS, packages=PACKAGES, round_to=None):
+    """{sqft (V, C), install (V, C), price (V, C, T)}; NaN where a vehicle lacks a package's panels.
+
+    round_to=None rounds to the nearest dollar (the page's display); a number rounds up to it.
+    """
+    panels = np.array([[np.nan if v.get(p) is None else v[p] for p in PANELS] for v in vehicles],
+                      dtype=np.float64).reshape(-1, len(PANELS))
+    weights = np.array([COVERAGE[p] for p in packages], dtype=np.float64)                     # (C, 4)
+    scale = np.array([PARTIAL_SHARE if p == "partial" else 1.0 for p in packages])
+    # a needed panel that is blank leaves the package unpriced instead of cheaper
+    need = weights[None, :, :] > 0
+    missing = (np.isnan(panels)[:, None, :] & need).any(axis=2)                               # (V, C)
+    sqft = np.where(missing, np.nan, np.nan_to_num(panels) @ weights.T * scale)
+    if TOTAL_PACKAGE in packages:
+        total = np.array([v.get("total_sqft") or np.nan for v in vehicles], dtype=np.float64)
+        c = packages.index(TOTAL_PACKAGE)
+        sqft[:, c] = np.where(total > 0, total, sqft[:, c])
+
+    film = np.array([t[2] for t in tiers]) * (rules["material_per_sqft"] / BASE_FILM_RATE)     # (T,)
+    install = sqft / rules["production_speed"] * rules["install_rate_hr"]
+    cost = install[:, :, None] + sqft[:, :, None] * film[None, None, :] + rules["design_fee"]
+    price = cost / (rules["max_cost_pct"] / 100)
+    price = np.floor(price + 0.5) if round_to is None else np.ceil(price / round_to) * round_to
+    return {"sqft": sqft, "install": install, "film": film, "price": price}
+
+
+def _ints(a):
+    """Nested lists of whole numbers, None for NaN."""
+    out = np.where(np.isnan(a), -1, np.rint(a)).astype(np.int64).tolist()
+
+    def fix(x):
+        return [fix(v) for v in x] if isinstance(x, list) else (None if x < 0 else x)
+    return fix(out)
+
+
+def version_of(vehicles, rules, tiers, packages, round_to, org_id=None):
+    h = hashlib.sha256()
+    h.update(json.dumps([org_id, rules, tiers, list(packages), round_to, SCHEMA], sort_keys=True).encode())
+    for v in vehicles:
+        h.update(json.dumps([v["id"], v["make"], v["model"], v["year_range"], *[v.get(p) for p in PANELS]]).encode())
+    return h.hexdigest()[:12]
+
+
+def artifact(vehicles, m, rules, tiers, packages, version, org_id=None, round_to=None):
+    return {
+        "schema": SCHEMA, "version": version, "org_id": org_id,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "rules": rules, "round_to": round_to,
+        "packages": [{"id": p, "label": PACKAGE_LABELS.get(p, p)} for p in packages],
+        "tiers": [{"id": t[0], "name": t[1], "rate": round(float(r), 4)} for t, r in zip(tiers, m["film"])],
+        "vehicles": {k: [v.get(k) for v in vehicles] for k in ("id", "make", "model", "year_range")},
+        "sqft": _ints(m["sqft"]),                 # [vehicle][package]
+        "install": _ints(m["install"]),           # [vehicle][package], tier-independent
+        "price": _ints(m["price"]),               # [vehicle][package][tier]
+    }
+
+
+def load_artifact(path):
+    with (gzip.open(path, "rt") if path.endswith(".gz") else open(path)) as f:
+        return json.load(f)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precompute the rate-card price matrix for the vehicle catalog.")
+    ap.add_argument("--rules", help="rate_card_settings row as JSON (default: the page's fallback rules)")
+    ap.add_argument("--org", help="org id, for the overlay and the artifact")
+    ap.add_argument("--overlay", help="the org's overlay file (overlay.py format)")
+    ap.add_argument("--sheet", help="measurement sheet (default: repo root)")
+    ap.add_argument("--round", type=float, help="round prices up to this many dollars (default: nearest dollar, as the page)")
+    ap.add_argument("--out", default="rate_cards", help="artifact folder")
+    ap.add_argument("--force", action="store_true", help="rewrite even when the version exists")
+    args = ap.parse_args()
+
+    data_file = find_data_file(args.sheet, dirs=[ROOT])
+    if not data_file:
+        print("❌ Cannot find the measurement sheet"); sys.exit(1)
+    t0 = time.perf_counter()
+    vehicles, _ = parse_file(data_file)
+    validate.realign(vehicles, validate.validate(vehicles))      # as loaded: shifted rows fixed
+    if args.overlay:
+        if not args.org:
+            print("❌ --overlay needs --org"); sys.exit(1)
+        overrides, problems = overlay.overrides_for(args.org, overlay.read_overlay(args.overlay), vehicles)
+        for p in problems:
+            print(f"  ⚠️  {p}")
+        vehicles = overlay.resolve(vehicles, overrides)
+    vehicles.sort(key=lambda v: (v["make"] or "", v["model"] or "", v["year_range"] or ""))
+    rules = read_rules(args.rules)
+    packages = PACKAGES
+    version = version_of(vehicles, rules, FILM_TIERS, packages, args.round, args.org)
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"rate_card-{version}.json.gz")
+    if os.path.exists(path) and not args.force:
+        print(f"✅ Rate card {version} is current -> {path}"); return
+
+    t1 = time.perf_counter()
+    m = build(vehicles, rules, FILM_TIERS, packages, args.round)
+    t2 = time.perf_counter()
+    doc = artifact(vehicles, m, rules, FILM_TIERS, packages, version, args.org, args.round)
+    with gzip.open(path, "wt") as f:
+        json.dump(doc, f, separators=(",", ":"))
+    with open(os.path.join(args.out, "latest.json"), "w") as f:
+        json.dump({"version": version, "file": os.path.basename(path), "org_id": args.org}, f)
+    priced = int(np.isfinite(m["price"]).sum())
+    print(f"✅ Rate card {version}: {len(vehicles)} vehicles x {len(packages)} packages x {len(FILM_TIERS)} tiers "
+          f"({priced:,} prices) in {1000 * (t2 - t1):.1f} ms -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    print(f"   load {1000 * (t1 - t0):.0f} ms. PDF: python3 scripts/pdf/gen_ratecard.py {path} rate_card.pdf")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+WrapShop Pro — Supabase REST Client
+Thin PostgREST wrapper shared by the vehicle loaders.
+
+Connections are kept alive and pooled: each request borrows an open HTTP/1.1
+connection, so a run of batches pays for one TLS handshake per pooled connection,
+not one per request. Safe to share across threads; at most `pool_size`
+connections are open at once.
+"""
+
+import json, queue, threading
+import http.client
+from urllib.parse import urlsplit
+
+# A keep-alive connection the server already closed surfaces as one of these on
+# the first request after the close; that request is resent once on a fresh
+# connection.
+STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+class Client:
+    def __init__(self, url, key, pool_size=4, timeout=60):
+        parts = urlsplit(url.rstrip("/"))
+        self.scheme, self.host = parts.scheme, parts.netloc
+        self.prefix = parts.path + "/rest/v1/"
+        self.timeout = timeout
+        self.headers = {
+            "Content-Type":  "application/json",
+            "apikey":        key,
+            "Authorization": f"Bearer {key}",
+            "Connection":    "keep-alive",
+        }
+        self.pool = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.opened = 0
+
+    # ── connection pool ───────────────────────────────────────────────────────
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.opened += 1
+        return cls(self.host, timeout=self.timeout)
+
+    def _borrow(self):
+        self.slots.acquire()
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _return(self, conn, reuse=True):
+        if reuse:
+            self.pool.put(conn)
+        else:
+            conn.close()
+        self.slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # ── requests ──────────────────────────────────────────────────────────────
+    def request(self, method, path, body=None, prefer="return=minimal"):
+        """(status, text). HTTP errors come back as their status; network errors raise."""
+        data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode("utf-8")
+        headers = dict(self.headers, Prefer=prefer) if prefer else dict(self.headers)
+        conn = self._borrow()
+        for attempt in (0, 1):
+            try:
+                conn.request(method, self.prefix + path, body=data, headers=headers)
+                resp = conn.getresponse()
+                text = resp.read().decode("utf-8")
+                self._return(conn, not resp.will_close)
+                return resp.status, text
+            except STALE:
+                conn.close()
+                if attempt:
+                    self.slots.release()
+                    raise
+                conn = self._connect()
+            except BaseException:
+                conn.close(); self.slots.release()
+                raise
+
+    def get_json(self, path):
+        status, text = self.request("GET", path, prefer=None)
+        if status != 200:
+            raise RuntimeError(f"GET {path} -> HTTP {status}: {text[:300]}")
+        return json.loads(text)
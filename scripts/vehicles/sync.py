@@ -0,0 +1,136 @@
+"""
+WrapShop Pro — Vehicle Measurements Sync
+Brings the vehicle_measurements catalog rows in line with the parsed sheet by sending
+only what changed: upserts for new and edited rows first, deletes for rows that
+left the sheet last. Lookups never see an empty table, and a re-run with nothing
+changed makes no writes at all.
+
+Rows are matched by id, then by normalized make/model/year_range, so rows loaded
+by the old delete-and-reinsert uploader (random ids) keep their existing ids.
+"""
+
+import json
+from numbers import Number
+
+from measurements import COLUMNS, natural_key
+from upload import BatchUploader, call_with_retry
+
+TABLE      = "vehicle_measurements"
+PAGE_SIZE  = 1000     # PostgREST's default max-rows
+DELETE_IDS = 100      # ids per DELETE ... ?id=in.(...) — keeps the URL short
+
+
+def org_filter(org_id):
+    """PostgREST filter for an org's rows; None is the shared catalog."""
+    return "org_id=is.null" if org_id is None else f"org_id=eq.{org_id}"
+
+
+def fetch_remote(client, org_id=None, page_size=PAGE_SIZE):
+    """Every row for `org_id` (None: the shared catalog), paged by id (keyset, so pages stay stable under writes)."""
+    select = ",".join(["id", *COLUMNS])
+    rows, last = [], None
+    while True:
+        path = f"{TABLE}?select={select}&{org_filter(org_id)}&order=id.asc&limit={page_size}"
+        if last:
+            path += f"&id=gt.{last}"
+        status, body = call_with_retry(lambda: client.request("GET", path, prefer=None))
+        if status != 200:
+            raise RuntimeError(f"GET {path} -> HTTP {status}: {body[:300]}")
+        page = json.loads(body)
+        rows += page
+        if len(page) < page_size:
+            return rows
+        last = page[-1]["id"]
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, Number) or isinstance(b, Number):     # PostgREST floats, psycopg2 Decimals
+        try:
+            return round(float(a), 4) == round(float(b), 4)
+        except (TypeError, ValueError):
+            return False
+    return str(a) == str(b)
+
+
+def changed_columns(local, remote):
+    return [c for c in COLUMNS if not _same(local.get(c), remote.get(c))]
+
+
+class Diff:
+    def __init__(self):
+        self.inserts = []       # local rows with no remote match
+        self.updates = []       # local rows whose remote row differs
+        self.deletes = []       # remote ids with no local match
+        self.unchanged = 0
+        self.adopted = 0        # matched by make/model/year, kept the remote id
+
+    @property
+    def upserts(self):
+        return self.inserts + self.updates
+
+    def summary(self):
+        return (f"{len(self.inserts)} new, {len(self.updates)} changed, {len(self.deletes)} removed, "
+                f"{self.unchanged} unchanged" + (f" ({self.adopted} legacy ids kept)" if self.adopted else ""))
+
+
+def diff(local, remote):
+    """Diff the parsed sheet against the remote rows. Local rows may get a remote id."""
+    d = Diff()
+    by_id = {r["id"]: r for r in remote}
+    pairs, unmatched = [], []
+    for rec in local:
+        r = by_id.pop(rec["id"], None)
+        if r is not None:
+            pairs.append((rec, r))
+        else:
+            unmatched.append(rec)
+
+    by_key = {}
+    for r in sorted(by_id.values(), key=lambda r: r["id"]):
+        by_key.setdefault(natural_key(r), []).append(r)
+    for rec in unmatched:
+        candidates = by_key.get(natural_key(rec))
+        if candidates:
+            r = candidates.pop(0)
+            del by_id[r["id"]]
+            rec["id"] = r["id"]; d.adopted += 1
+            pairs.append((rec, r))
+        else:
+            d.inserts.append(rec)
+
+    for rec, r in pairs:
+        if changed_columns(rec, r):
+            d.updates.append(rec)
+        else:
+            d.unchanged += 1
+    d.deletes = sorted(by_id)
+    return d
+
+
+def apply(client, d, batch_size=100, concurrency=4, checkpoint=None, log=print):
+    """Send the diff. Returns ([(status, row) that failed], upload Stats or None)."""
+    failed, stats = [], None
+    if d.upserts:
+        up = BatchUploader(client, f"{TABLE}?on_conflict=id", "resolution=merge-duplicates,return=minimal",
+                           concurrency=concurrency, batch_size=batch_size, checkpoint=checkpoint)
+        stats = up.run(d.upserts)
+        for status, body, rows in up.errors:
+            log(f"  ❌ Upsert of {len(rows)} rows FAILED — HTTP {status}\n     {body}")
+            failed += [(status, r) for r in rows]
+
+    for i in range(0, len(d.deletes), DELETE_IDS):
+        ids = d.deletes[i:i+DELETE_IDS]
+        status, body = delete_ids(client, ids)
+        if status in (200, 204):
+            log(f"  ✅ Removed {len(ids)} rows no longer in the sheet")
+        else:
+            log(f"  ❌ Delete FAILED — HTTP {status}\n     {body[:300]}")
+            failed += [(status, {"id": rid, "make": "(delete)", "model": "", "year_range": ""}) for rid in ids]
+    return failed, stats
+
+
+def delete_ids(client, ids):
+    """DELETE by id, retried like an upload batch. Deleting twice is harmless."""
+    return call_with_retry(lambda: client.request("DELETE", f"{TABLE}?id=in.({','.join(ids)})"))
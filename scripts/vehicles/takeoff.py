@@ -0,0 +1,290 @@
+"""
+WrapShop Pro — Fleet Takeoff
+Square footage, material and waste for a whole fleet bid in one pass, instead of
+one lookup per vehicle.
+
+The measurement sheet is loaded into a NumPy structured array (the
+vehicle_measurements columns from upload_vehicles.py). Each fleet unit is matched
+to a catalog row once per distinct make/model/year — exact on the search keys
+first, then through the fuzzy match index — and every per-unit number after that
+is array arithmetic over all units at once.
+
+Input CSV (header names are case-insensitive; extra columns are carried through):
+  unit, make, model, year, coverage[, qty][, partial_pct]
+
+  status     ok            exact match on make and model
+             review        fuzzy match: counted, but check catalog_vehicle (and
+                           the tied alternates) before the bid goes out
+             incomplete    a panel the coverage needs is blank on the sheet
+             unmatched     no catalog row; not counted
+             bad_coverage  coverage not recognised; not counted
+
+  coverage   full        sides + back + hood            (full_wrap_sqft)
+             full_roof   full + roof                    (total_sqft)
+             partial     share of full, partial_pct (default 50)
+             sides       both sides only
+             sides_back  sides + back
+             roof        roof only
+
+Run:  python3 takeoff.py fleet.csv [--waste 10] [--rate 9.5] [--out fleet_takeoff]
+      -> fleet_takeoff.csv (one row per unit) and fleet_takeoff.json (units,
+         totals and estimate line_items for gen_estimate.py)
+"""
+
+import os, sys, csv, json, time, argparse
+import numpy as np
+
+from measurements import find_data_file, parse_file, norm_key
+import match_index
+import validate
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+PANELS = ["side_sqft", "back_sqft", "hood_sqft", "roof_sqft"]
+# coverage -> weight per panel in PANELS order; "partial" is scaled by partial_pct afterwards.
+# side_sqft is one side (the sheet's total_sqft is 2 x side + back + hood + roof)
+COVERAGE = {
+    "full":       (2, 1, 1, 0),
+    "full_roof":  (2, 1, 1, 1),
+    "partial":    (2, 1, 1, 0),
+    "sides":      (2, 0, 0, 0),
+    "sides_back": (2, 1, 0, 0),
+    "roof":       (0, 0, 0, 1),
+}
+COVERAGE_ALIASES = {"full wrap": "full", "full_wrap": "full", "full+roof": "full_roof", "partial wrap": "partial",
+                    "half": "partial", "sides only": "sides", "side": "sides", "sides_only": "sides", "roof only": "roof"}
+ROLL_FT = 4.5             # 54" print media, as sqftToLinearFeet() in lib/vehicleDatabase.ts
+WASTE_PCT = 10            # default of WASTE_BUFFER_OPTIONS in the estimator
+FUZZY_MIN_SCORE = 3.0     # match index score below which a unit is left unmatched
+
+CATALOG_DTYPE = [("id", "U36"), ("make", "U32"), ("model", "U96"), ("year_range", "U12"),
+                 ("year_start", "i2"), ("year_end", "i2"), *[(p, "f4") for p in PANELS], ("total_sqft", "f4")]
+
+
+# ── CATALOG ──────────────────────────────────────────────────────────────────
+class Catalog:
+    """The measurement sheet as a structured array, plus what matching needs."""
+
+    def __init__(self, records):
+        self.records = records
+        self.rows = np.array([(r["id"], r["make"], r["model"], r["year_range"],
+                               r.get("year_start") or 0, r.get("year_end") or r.get("year_start") or 0,
+                               *[np.nan if r.get(p) is None else r[p] for p in PANELS],
+                               np.nan if r.get("total_sqft") is None else r["total_sqft"])
+                              for r in records], dtype=CATALOG_DTYPE)
+        self.panels = np.stack([self.rows[p] for p in PANELS], axis=1).astype(np.float64)
+        self.by_key = {}
+        for i, r in enumerate(records):
+            self.by_key.setdefault((r["make_key"], r["model_key"]), []).append(i)
+        self.row_of_id = {r["id"]: i for i, r in enumerate(records)}
+        self._fuzzy = None
+
+    @classmethod
+    def from_sheet(cls, path=None):
+        data_file = find_data_file(path, dirs=[ROOT])
+        if not data_file:
+            raise FileNotFoundError("measurement sheet not found")
+        records = parse_file(data_file)[0]
+        validate.realign(records, validate.validate(records))    # as loaded: shifted rows fixed
+        return cls(records)
+
+    def _pick_year(self, rows, year):
+        """Row covering `year`, else the one whose range is nearest; newest when no year."""
+        ys, ye = self.rows["year_start"][rows], self.rows["year_end"][rows]
+        if year is None:
+            return rows[int(np.argmax(ys))]
+        gap = np.maximum(ys - year, 0) + np.maximum(year - ye, 0)
+        return rows[int(np.lexsort((-ys, gap))[0])]
+
+    def match(self, make, model, year):
+        """(catalog row or -1, how, score) for one make/model/year."""
+        rows = self.by_key.get((norm_key(make), norm_key(model)))
+        if rows:
+            return self._pick_year(np.array(rows), year), "exact", None
+        if self._fuzzy is None:
+            self._fuzzy = match_index.MatchIndex(match_index.build(self.records))
+        hits = self._fuzzy.query(f"{make} {model}", year=year, limit=1, typing=False)
+        if hits and hits[0]["score"] >= FUZZY_MIN_SCORE:
+            return self.row_of_id[hits[0]["id"]], "fuzzy", hits[0]["score"]
+        return -1, "none", None
+
+    def alternates(self, make, model, year, row, limit=3):
+        """Other catalog vehicles the fuzzy index scores level with `row`, for a reviewer to choose from."""
+        hits = self._fuzzy.query(f"{make} {model}", year=year, limit=limit + 1, typing=False)
+        top = hits[0]["score"] if hits else None
+        rows = [self.row_of_id[h["id"]] for h in hits if h["score"] == top]
+        return [f"{r['make']} {r['model']} {r['year_range']}" for r in self.rows[[i for i in rows if i != row]]][:limit]
+
+
+# ── FLEET ────────────────────────────────────────────────────────────────────
+def _year(v):
+    try:
+        y = int(float(v))
+        return y if 1900 <= y <= 2100 else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _num(v, default):
+    try:
+        return float(v) if str(v).strip() else default
+    except (TypeError, ValueError):
+        return default
+
+
+def read_fleet(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        return [{(k or "").strip().lower(): (v or "").strip() for k, v in row.items()} for row in reader]
+
+
+def takeoff(catalog, units, waste_pct=WASTE_PCT):
+    """Per-unit arrays and aggregate totals for a list of unit dicts (see module docstring)."""
+    n = len(units)
+    # one catalog match per distinct vehicle, then fan out
+    keys = [(u.get("make", ""), u.get("model", ""), _year(u.get("year"))) for u in units]
+    resolved = {k: catalog.match(*k) for k in dict.fromkeys(keys)}
+    row = np.array([resolved[k][0] for k in keys], dtype=np.int64)
+    how = np.array([resolved[k][1] for k in keys])
+    score = [resolved[k][2] for k in keys]
+    alts = {k: catalog.alternates(*k, r[0]) for k, r in resolved.items() if r[1] == "fuzzy"}
+    alternates = [alts.get(k, []) for k in keys]
+
+    cov_names = list(COVERAGE)
+    cov_text = [COVERAGE_ALIASES.get(u.get("coverage", "").lower(), u.get("coverage", "").lower() or "full")
+                for u in units]
+    bad_cov = np.array([c not in COVERAGE for c in cov_text])
+    cov = np.array([cov_names.index(c) if c in COVERAGE else 0 for c in cov_text])
+    weights = np.array([COVERAGE[c] for c in cov_names], dtype=np.float64)[cov]            # (n, 4)
+    partial = np.array([_num(u.get("partial_pct", ""), 50.0) for u in units]) / 100
+    scale = np.where(cov == cov_names.index("partial"), partial, 1.0)
+    qty = np.array([max(0.0, _num(u.get("qty", ""), 1.0)) for u in units])
+
+    matched = row >= 0
+    counted = matched & ~bad_cov                    # a unit with unknown coverage is flagged, not billed as full
+    panels = np.where(matched[:, None], catalog.panels[np.where(matched, row, 0)], np.nan)  # (n, 4)
+    missing = np.isnan(panels) & (weights > 0)                                            # needed but blank
+    sqft = np.nansum(np.where(weights > 0, panels, 0.0) * weights, axis=1) * scale
+    sqft = np.round(np.where(counted, sqft, 0.0), 1)
+    material = np.ceil(sqft * (1 + waste_pct / 100))                                      # calcWithWaste()
+    waste = material - sqft
+    linear_ft = np.ceil(material / ROLL_FT * 10) / 10                                     # sqftToLinearFeet()
+
+    status = np.where(~matched, "unmatched",
+             np.where(bad_cov, "bad_coverage",
+             np.where(missing.any(axis=1), "incomplete",
+             np.where(how == "fuzzy", "review", "ok"))))
+    totals = {
+        "units": int(qty.sum()), "lines": n,
+        "matched": int(qty[matched].sum()), "unmatched": int(qty[~matched].sum()),
+        "bad_coverage": int(qty[matched & bad_cov].sum()), "review": int(qty[status == "review"].sum()),
+        "coverage_sqft": round(float((sqft * qty).sum()), 1),
+        "material_sqft": round(float((material * qty).sum()), 1),
+        "waste_sqft": round(float((waste * qty).sum()), 1),
+        "linear_ft": round(float((linear_ft * qty).sum()), 1),
+        "waste_pct": waste_pct,
+    }
+    return {"row": row, "how": how, "score": score, "alternates": alternates, "coverage": np.array(cov_names)[cov], "qty": qty,
+            "panels": panels, "sqft": sqft, "material": material, "waste": waste, "linear_ft": linear_ft,
+            "status": status, "totals": totals}
+
+
+# ── OUTPUT ───────────────────────────────────────────────────────────────────
+def unit_rows(catalog, units, t):
+    out = []
+    for i, u in enumerate(units):
+        r = catalog.rows[t["row"][i]] if t["row"][i] >= 0 else None
+        out.append({
+            "unit": u.get("unit") or str(i + 1),
+            "make": u.get("make", ""), "model": u.get("model", ""), "year": u.get("year", ""),
+            "coverage": str(t["coverage"][i]), "qty": float(t["qty"][i]),
+            "match": str(t["how"][i]), "match_score": t["score"][i], "status": str(t["status"][i]),
+            "match_alternates": "; ".join(t["alternates"][i]),
+            "vehicle_id": str(r["id"]) if r is not None else "",
+            "catalog_vehicle": f"{r['make']} {r['model']} {r['year_range']}" if r is not None else "",
+            **{p: (None if np.isnan(t["panels"][i, k]) else round(float(t["panels"][i, k]), 1))
+               for k, p in enumerate(PANELS)},
+            "coverage_sqft": float(t["sqft"][i]), "material_sqft": float(t["material"][i]),
+            "waste_sqft": round(float(t["waste"][i]), 1), "linear_ft": float(t["linear_ft"][i]),
+        })
+    return out
+
+
+def _money(x):
+    return f"${x:,.2f}"
+
+
+def line_items(rows, rate=None):
+    """Estimate line items (gen_estimate.py shape), one per distinct vehicle and coverage."""
+    groups = {}
+    for r in rows:
+        if r["status"] in ("unmatched", "bad_coverage"):
+            continue
+        g = groups.setdefault((r["catalog_vehicle"], r["coverage"]), {"qty": 0, "sqft": 0.0, "material": 0.0,
+                                                                       "units": [], "linear_ft": 0.0,
+                                                                       "review": False})
+        g["qty"] += r["qty"]; g["sqft"] += r["coverage_sqft"] * r["qty"]
+        g["material"] += r["material_sqft"] * r["qty"]; g["linear_ft"] += r["linear_ft"] * r["qty"]
+        g["units"].append(r["unit"]); g["review"] |= r["status"] == "review"
+    items = []
+    for (vehicle, cov), g in groups.items():
+        amount = g["material"] * rate if rate else None
+        units = ", ".join(g["units"][:8]) + (f" +{len(g['units']) - 8} more" if len(g["units"]) > 8 else "")
+        items.append({
+            "name": f"Fleet Wrap - {cov.replace('_', ' ').title()}", "vehicle": vehicle,
+            "qty": f"{g['qty']:g}", "amount": _money(amount) if amount is not None else "",
+            "sub": f"{g['sqft'] / g['qty']:.1f} sqft per unit - {g['material']:,.0f} sqft material "
+                   f"- {g['linear_ft']:,.1f} linear ft",
+            "bullets": [f"Units: {units}"] + (["Vehicle matched by name only - confirm the model"] if g["review"] else []),
+        })
+    return items
+
+
+def write_outputs(base, rows, totals, items):
+    fields = list(rows[0]) if rows else ["unit"]
+    with open(base + ".csv", "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader(); w.writerows(rows)
+    payload = {"totals": totals, "line_items": items, "units": rows}
+    if items and all(i["amount"] for i in items):
+        payload["subtotal"] = _money(sum(float(i["amount"].strip("$").replace(",", "")) for i in items))
+    with open(base + ".json", "w") as f:
+        json.dump(payload, f, indent=1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fleet square footage, material and waste from the measurement sheet.")
+    ap.add_argument("fleet", help="CSV of units: unit, make, model, year, coverage[, qty][, partial_pct]")
+    ap.add_argument("--sheet", help="measurement sheet (default: repo root)")
+    ap.add_argument("--waste", type=float, default=WASTE_PCT, help="waste allowance, percent of coverage")
+    ap.add_argument("--rate", type=float, help="$ per material sqft — fills line item amounts and subtotal")
+    ap.add_argument("--out", help="output base name (default: <fleet>_takeoff)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    catalog = Catalog.from_sheet(args.sheet)
+    t1 = time.perf_counter()
+    units = read_fleet(args.fleet)
+    if not units:
+        print("❌ No units in the fleet file"); sys.exit(1)
+    t = takeoff(catalog, units, args.waste)
+    rows = unit_rows(catalog, units, t)
+    items = line_items(rows, args.rate)
+    t2 = time.perf_counter()
+
+    base = args.out or os.path.splitext(args.fleet)[0] + "_takeoff"
+    write_outputs(base, rows, t["totals"], items)
+    tot = t["totals"]
+    print(f"✅ {tot['units']} units ({tot['lines']} lines): {tot['coverage_sqft']:,.1f} sqft coverage, "
+          f"{tot['material_sqft']:,.0f} sqft material ({tot['waste_pct']:g}% waste), {tot['linear_ft']:,.1f} linear ft")
+    flagged = {"unmatched": "unmatched (not counted)", "bad_coverage": "with unknown coverage (not counted)",
+               "review": "matched by name only (review)", "incomplete": "missing a needed panel"}
+    for s, label in flagged.items():
+        k = int((t["status"] == s).sum())
+        if k:
+            print(f"⚠️  {k} lines {label} — see the status column")
+    print(f"   catalog {1000 * (t1 - t0):.0f} ms, takeoff {1000 * (t2 - t1):.0f} ms -> {base}.csv, {base}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+WrapShop Pro — Catalog Overlay Check
+Applies the vehicle_measurements migrations and the catalog overlay to a real
+Postgres and checks that vehicle_catalog(org) hands back whole measurement rows:
+every vehicle_measurements column, including the pricing and wrap-area keys the
+lookup API's callers read, with the org's overrides applied on top.
+
+Uses TEST_DATABASE_URL if set (the tables it touches are dropped and recreated
+— never point it at a real database), else a throwaway server from pgserver
+(pip install pgserver psycopg2-binary). Skips when neither is available.
+
+Run:  python3 test_catalog_overlay.py        (or python3 -m pytest test_catalog_overlay.py)
+"""
+
+import json, os, sys
+
+import pytest
+
+import copy_load
+from overlay import OVERLAY_TABLE
+from test_copy_load import ROOT, dsn, query
+
+MIGRATIONS = os.path.join(ROOT, "supabase", "migrations")
+SHOP_ORG = "d34a6c47-1ac0-4008-87d2-0f7741eebc4f"
+OTHER_ORG = "5b0f1c2e-8a4d-4c8e-9d7a-2f6b3e1a9c40"
+
+# What /api/vehicles/lookup's best match is read for: VehicleSelector, SalesTabBuilder,
+# EstimateDetailClient, CommercialVehicleCalc, MockupWizard, the mockup generator and
+# JobDetailClient all price or size the job from these.
+BASELINE_KEYS = [
+    "id", "make", "model", "year_range", "year_start", "year_end", "body_style",
+    "side_width", "side_height", "side_sqft", "back_sqft", "hood_sqft", "roof_sqft", "total_sqft",
+    "full_wrap_sqft", "wrap_sqft", "three_quarter_wrap_sqft", "half_wrap_sqft",
+    "driver_sqft", "passenger_sqft", "linear_feet", "install_hours", "install_pay", "suggested_price",
+]
+
+# In migration order. The base file's policies use CREATE POLICY IF NOT EXISTS, which
+# Postgres itself rejects, and the old uq_vehicle_ymm key predates per-org rows.
+SCHEMA = [
+    "20260228130000_vehicle_measurements.sql",
+    "20260302210000_vehicle_measurements_category_columns.sql",
+    "20260303120000_add_wrap_sqft_and_install_fields.sql",
+    "20260304042700_add_missing_vehicle_columns.sql",
+    "20260304043000_add_vehicle_pricing_columns.sql",
+    "20260304050000_add_full_wrap_with_roof.sql",
+    "20260401000000_vehicle_measurements_search_keys.sql",
+]
+OVERLAY = "20260402000000_vehicle_catalog_overlay.sql"
+
+SUPABASE_STANDIN = """
+DROP VIEW IF EXISTS vehicle_catalog_row CASCADE;
+DROP TABLE IF EXISTS vehicle_measurement_overrides, vehicle_measurements, profiles CASCADE;
+CREATE TABLE profiles (id uuid PRIMARY KEY, org_id uuid, role text);
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql AS 'SELECT NULL::uuid';
+DO $$ BEGIN CREATE ROLE authenticated; EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+"""
+
+# Servers built without uuid-ossp (pgserver's) get a stand-in: override ids then differ
+# from overlay.override_id(), which nothing here compares.
+UUID_V5_STANDIN = """
+CREATE OR REPLACE FUNCTION uuid_generate_v5(ns uuid, name text) RETURNS uuid
+  LANGUAGE sql IMMUTABLE AS $$ SELECT md5(ns::text || name)::uuid $$;
+"""
+
+pytestmark = pytest.mark.skipif(not dsn(), reason="no TEST_DATABASE_URL and no pgserver")
+
+
+def migration(name):
+    with open(os.path.join(MIGRATIONS, name), encoding="utf-8") as f:
+        sql = f.read()
+    if name == SCHEMA[0]:
+        sql = sql.split("ALTER TABLE")[0]
+    if "uq_vehicle_ymm" in sql:
+        sql = sql.split("-- Unique")[0]
+    return sql
+
+
+def seed_rows(n=40):
+    with open(os.path.join(ROOT, "lib", "data", "vehicle-measurements.json"), encoding="utf-8") as f:
+        return json.load(f)[:n]
+
+
+def build_catalog():
+    """Fresh schema with a few sheet rows in the shop's catalog, then the overlay migration."""
+    conn = copy_load.connect(dsn())
+    with conn, conn.cursor() as cur:
+        cur.execute(SUPABASE_STANDIN)
+        for name in SCHEMA:
+            cur.execute(migration(name))
+        cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'vehicle_measurements'")
+        columns = {r[0] for r in cur.fetchall()}
+        for r in seed_rows():
+            row = {k: v for k, v in r.items() if k in columns and k != "id"}
+            row["org_id"] = SHOP_ORG
+            keys = sorted(row)
+            cur.execute(f"INSERT INTO vehicle_measurements ({', '.join(keys)}) VALUES ({', '.join(['%s'] * len(keys))})",
+                        [row[k] for k in keys])
+        overlay = migration(OVERLAY)
+        cur.execute("SELECT count(*) FROM pg_available_extensions WHERE name = 'uuid-ossp'")
+        if not cur.fetchone()[0]:
+            cur.execute(UUID_V5_STANDIN)
+            overlay = overlay.replace('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";', "")
+        cur.execute(overlay)
+    conn.close()
+    return columns
+
+
+def catalog(org):
+    conn = copy_load.connect(dsn())
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT * FROM vehicle_catalog(%s) ORDER BY id", (org,))
+        names = [d.name for d in cur.description]
+        rows = [dict(zip(names, r)) for r in cur.fetchall()]
+    conn.close()
+    return names, rows
+
+
+def test_catalog_rows_keep_every_measurement_column():
+    columns = build_catalog()
+    names, rows = catalog(SHOP_ORG)
+    missing = [k for k in BASELINE_KEYS if k not in names]
+    assert not missing, f"vehicle_catalog() drops {missing}"
+    assert columns <= set(names), sorted(columns - set(names))
+    assert rows and all(r["catalog_source"] == "catalog" for r in rows)
+    differing = query("SELECT v.id::text FROM vehicle_catalog(%s) c JOIN vehicle_measurements v USING (id) "
+                      "WHERE to_jsonb(c) - 'catalog_source' <> to_jsonb(v)", (SHOP_ORG,))
+    assert not differing, f"catalog rows differ from vehicle_measurements: {differing[:3]}"
+
+
+def test_override_applies_to_pricing_keys():
+    build_catalog()
+    (vid, price, pay), = query("SELECT id::text, suggested_price, install_pay FROM vehicle_measurements "
+                               "WHERE suggested_price IS NOT NULL ORDER BY id LIMIT 1")
+    conn = copy_load.connect(dsn())
+    with conn, conn.cursor() as cur:
+        cur.execute(f"INSERT INTO {OVERLAY_TABLE} (org_id, vehicle_id, suggested_price) VALUES (%s, %s, %s)",
+                    (OTHER_ORG, vid, price + 100))
+    conn.close()
+    names, rows = catalog(OTHER_ORG)
+    assert all(k in names for k in BASELINE_KEYS)
+    row = next(r for r in rows if str(r["id"]) == vid)
+    assert row["catalog_source"] == "override"
+    assert row["suggested_price"] == price + 100 and row["install_pay"] == pay
+    _, shop = catalog(SHOP_ORG)
+    assert next(r for r in shop if str(r["id"]) == vid)["suggested_price"] == price
+
+
+if __name__ == "__main__":
+    if not dsn():
+        print("skipped: no TEST_DATABASE_URL and no pgserver")
+        sys.exit(0)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn(); print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1; print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,150 @@
+"""
+WrapShop Pro — COPY Loader Check
+Runs copy_load.load() against a real Postgres: a fresh load, a no-op reload,
+legacy random ids kept through the SQL diff exactly as sync.diff() keeps them,
+and the delete guard rolling everything back.
+
+Uses TEST_DATABASE_URL if set (the tables it touches are dropped and recreated
+— never point it at a real database), else a throwaway server from pgserver
+(pip install pgserver psycopg2-binary). Skips when neither is available.
+
+Run:  python3 test_copy_load.py        (or python3 -m pytest test_copy_load.py)
+"""
+
+import copy, os, random, sys, tempfile, uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy_load
+import sync
+from measurements import find_data_file, parse_file
+
+TABLE_DDL = """
+DROP TABLE IF EXISTS vehicle_measurements CASCADE;
+CREATE TABLE vehicle_measurements (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  org_id uuid,
+  make text NOT NULL,
+  model text NOT NULL,
+  year_range text,
+  side_width numeric, side_height numeric, side_sqft numeric,
+  back_width numeric, back_height numeric, back_sqft numeric,
+  hood_width numeric, hood_length numeric, hood_sqft numeric,
+  roof_width numeric, roof_length numeric, roof_sqft numeric,
+  total_sqft numeric,
+  created_at timestamptz DEFAULT now()
+);
+"""
+
+_DSN = None
+
+
+def dsn():
+    """A database to test against, or None."""
+    global _DSN
+    if _DSN is None:
+        _DSN = os.environ.get("TEST_DATABASE_URL", "")
+        if not _DSN and copy_load.psycopg2 is not None:
+            try:
+                import pgserver
+                _DSN = pgserver.get_server(tempfile.mkdtemp(prefix="copy_load_pg_")).get_uri()
+            except Exception:
+                _DSN = ""
+    return _DSN or None
+
+
+pytestmark = pytest.mark.skipif(not dsn(), reason="no TEST_DATABASE_URL and no pgserver")
+
+
+def fresh_table():
+    conn = copy_load.connect(dsn())
+    with conn, conn.cursor() as cur:
+        cur.execute(TABLE_DDL)       # the search columns come from SEARCH_DDL on the first load
+    conn.close()
+
+
+def query(sql, args=()):
+    conn = copy_load.connect(dsn())
+    with conn, conn.cursor() as cur:
+        cur.execute(sql, args)
+        rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def sheet():
+    path = find_data_file(dirs=[ROOT])
+    assert path, "measurement sheet not found"
+    return parse_file(path)[0]
+
+
+def load(records, **kw):
+    return copy_load.load(dsn(), copy.deepcopy(records), None, log=lambda *_: None, **kw)
+
+
+def test_fresh_load_then_noop():
+    fresh_table()
+    records = sheet()
+    st = load(records)
+    assert st["inserted"] == st["written"] == st["staged"] == len(records) and st["deleted"] == 0
+    (n, keyed), = query("SELECT count(*), count(*) FILTER (WHERE make_key IS NOT NULL AND year_start IS NOT NULL) "
+                        "FROM vehicle_measurements")
+    assert n == len(records) and keyed == sum(r["year_start"] is not None for r in records)
+    st = load(records)
+    assert st["written"] == st["deleted"] == st["adopted"] == 0, st
+
+
+def test_legacy_ids_match_sync_diff():
+    """Rows first loaded with random ids keep them, paired the same way sync.diff() pairs them."""
+    fresh_table()
+    records = sheet()
+    rng = random.Random(7)
+    legacy = []
+    for r in records:
+        row = dict(r, id=str(uuid.UUID(int=rng.getrandbits(128), version=4)))
+        if rng.random() < 0.3:       # older uploads wrote other spellings of the same name
+            row["model"] = row["model"].upper() + "."
+        legacy.append(row)
+    stray = dict(records[0], id=str(uuid.uuid4()), model="Not In The Sheet")
+    st = load(legacy + [stray])
+    assert st["written"] == len(legacy) + 1
+
+    remote = [{"id": r["id"], **{k: r[k] for k in ("make", "model", "year_range")}} for r in legacy + [stray]]
+    local = copy.deepcopy(records)
+    expected = sync.diff(local, remote)          # gives `local` rows their adopted ids
+    st = load(records)
+    assert st["adopted"] == expected.adopted == len(records), (st["adopted"], expected.adopted)
+    assert st["inserted"] == 0 and st["deleted"] == len(expected.deletes) == 1
+    got = sorted(query("SELECT id::text, make, model, year_range FROM vehicle_measurements"))
+    want = sorted((r["id"], r["make"], r["model"], r["year_range"]) for r in local)
+    assert got == want, "SQL adoption paired rows differently from sync.diff()"
+
+
+def test_delete_guard_rolls_back():
+    fresh_table()
+    records = sheet()
+    load(records)
+    before = query("SELECT count(*), max(id::text) FROM vehicle_measurements")
+    try:
+        load(records[: len(records) // 3], max_delete_share=0.5)
+    except RuntimeError as e:
+        assert "would remove" in str(e)
+    else:
+        raise AssertionError("a load removing two thirds of the rows should be refused")
+    assert query("SELECT count(*), max(id::text) FROM vehicle_measurements") == before
+
+
+if __name__ == "__main__":
+    if not dsn():
+        print("skipped: no TEST_DATABASE_URL and no pgserver")
+        sys.exit(0)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn(); print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1; print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,207 @@
+"""
+WrapShop Pro — Concurrent Batch Uploader
+Sends rows to a PostgREST table from a small pool of senders sharing the keep-alive
+connections of one rest.Client, so a load is bound by how fast the server takes
+rows rather than by one round trip after another.
+
+Batch size adapts while the load runs: it grows while batches come back faster
+than `target_s`, halves when they come back slower than twice that, and is capped
+so a request body never exceeds `max_bytes`. A 413 halves the batch and resends
+the same rows in two smaller requests.
+
+A batch that fails with 429, a 5xx or a dropped connection is retried with
+exponential backoff and full jitter (and the batch size halves, to ease off the
+server); anything else fails the batch at once. With a checkpoint, every committed
+batch is recorded and rows an earlier attempt already committed are skipped.
+"""
+
+import json, sys, time, random, threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100
+    lo = int(k); hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def retryable(status):
+    """429, 5xx and network errors (status 0) are worth another try; other errors are not."""
+    return status == 0 or status == 429 or status >= 500
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    """Full-jitter exponential backoff: uniform over [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_retry(fn, retries=5, base=0.5, cap=30.0):
+    """Call fn() -> (status, body) until it succeeds, fails for good or runs out of tries."""
+    for attempt in range(retries + 1):
+        try:
+            status, body = fn()
+        except (OSError, http.client.HTTPException) as e:
+            status, body = 0, f"{type(e).__name__}: {e}"
+        if 200 <= status < 300 or not retryable(status) or attempt == retries:
+            return status, body
+        time.sleep(backoff(attempt, base, cap))
+
+
+class Stats:
+    def __init__(self, total):
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.skipped = 0           # committed by an earlier attempt (checkpoint)
+        self.latency = []          # seconds per successful request
+        self.sizes = []
+        self.started = time.monotonic()
+
+    def rate(self):
+        dt = time.monotonic() - self.started
+        return self.sent / dt if dt > 0 else 0.0
+
+    def line(self):
+        return (f"  {self.sent + self.failed}/{self.total} rows  {self.rate():,.0f} rows/s  "
+                f"batch p50 {pct(self.latency, 50)*1000:.0f} ms  p95 {pct(self.latency, 95)*1000:.0f} ms"
+                + (f"  {self.retries} retries" if self.retries else ""))
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "rows": self.sent, "failed": self.failed, "batches": self.batches,
+            "retries": self.retries, "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 2), "rows_per_s": round(self.rate(), 1),
+            "batch_p50_ms": round(pct(self.latency, 50) * 1000, 1),
+            "batch_p95_ms": round(pct(self.latency, 95) * 1000, 1),
+            "batch_p99_ms": round(pct(self.latency, 99) * 1000, 1),
+            "batch_size_final": self.sizes[-1] if self.sizes else 0,
+            "batch_size_max": max(self.sizes) if self.sizes else 0,
+        }
+
+
+class BatchUploader:
+    def __init__(self, client, path, prefer="return=minimal", concurrency=4, batch_size=100,
+                 min_batch=10, max_batch=2000, max_bytes=1_000_000, target_s=1.0, progress=True,
+                 retries=5, backoff_s=0.5, backoff_max_s=30.0, checkpoint=None):
+        self.client = client
+        self.path = path
+        self.prefer = prefer
+        self.concurrency = concurrency
+        self.size = batch_size
+        self.min_batch, self.max_batch = min_batch, max_batch
+        self.max_bytes = max_bytes
+        self.target_s = target_s
+        self.progress = progress
+        self.retries = retries
+        self.backoff_s, self.backoff_max_s = backoff_s, backoff_max_s
+        self.checkpoint = checkpoint
+        self.lock = threading.Lock()
+        self.errors = []           # (status, body, rows) for batches that failed
+
+    # ── sizing ────────────────────────────────────────────────────────────────
+    def _adapt(self, seconds, rows):
+        with self.lock:
+            if seconds < self.target_s and rows >= self.size:
+                self.size = min(self.max_batch, int(self.size * 1.5) + 1)
+            elif seconds > 2 * self.target_s:
+                self.size = max(self.min_batch, self.size // 2)
+
+    def _shrink(self, rows):
+        with self.lock:
+            self.size = max(self.min_batch, min(self.size, rows) // 2)
+
+    def _encode(self, batch):
+        """JSON body for `batch`, trimmed from the end until it fits max_bytes."""
+        body = json.dumps(batch).encode("utf-8")
+        while len(body) > self.max_bytes and len(batch) > 1:
+            batch = batch[:max(1, len(batch) * self.max_bytes // len(body) - 1)]
+            body = json.dumps(batch).encode("utf-8")
+        return batch, body
+
+    # ── sending ───────────────────────────────────────────────────────────────
+    def send(self, batch):
+        """POST one batch. Returns (ok, status, body, seconds); status 0 is a network error."""
+        body = json.dumps(batch).encode("utf-8")
+        t0 = time.monotonic()
+        try:
+            status, text = self.client.request("POST", self.path, body, prefer=self.prefer)
+        except (OSError, http.client.HTTPException) as e:
+            status, text = 0, f"{type(e).__name__}: {e}"
+        return status in (200, 201, 204), status, text, time.monotonic() - t0
+
+    def _send_rows(self, rows, stats):
+        for attempt in range(self.retries + 1):
+            ok, status, text, seconds = self.send(rows)
+            if status == 413 and len(rows) > 1:
+                self._shrink(len(rows))
+                half = len(rows) // 2
+                self._send_rows(rows[:half], stats); self._send_rows(rows[half:], stats)
+                return
+            if ok or not retryable(status) or attempt == self.retries:
+                break
+            with self.lock:
+                stats.retries += 1
+            self._shrink(len(rows) * 2)
+            time.sleep(backoff(attempt, self.backoff_s, self.backoff_max_s))
+        if ok and self.checkpoint:
+            self.checkpoint.commit(r["id"] for r in rows)
+        with self.lock:
+            stats.batches += 1; stats.sizes.append(len(rows))
+            if ok:
+                stats.sent += len(rows); stats.latency.append(seconds)
+            else:
+                stats.failed += len(rows); self.errors.append((status, text[:300], rows))
+        if ok:
+            self._adapt(seconds, len(rows))
+
+    def run(self, rows):
+        """Upload every row. Returns a Stats; failed batches are in self.errors."""
+        if self.checkpoint:
+            done = self.checkpoint.done
+            todo = [r for r in rows if r["id"] not in done]
+            skipped, rows = len(rows) - len(todo), todo
+        else:
+            skipped = 0
+        stats = Stats(len(rows))
+        stats.skipped = skipped
+        cursor = [0]
+
+        def take():
+            with self.lock:
+                lo = cursor[0]
+                if lo >= len(rows):
+                    return None
+                batch, _ = self._encode(rows[lo:lo + self.size])
+                cursor[0] = lo + len(batch)
+                return batch
+
+        def worker():
+            while True:
+                batch = take()
+                if batch is None:
+                    return
+                self._send_rows(batch, stats)
+
+        done = threading.Event()
+        if self.progress:
+            threading.Thread(target=self._ticker, args=(stats, done), daemon=True).start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as ex:
+                for f in [ex.submit(worker) for _ in range(self.concurrency)]:
+                    f.result()
+        finally:
+            done.set()
+        if self.progress:
+            sys.stdout.write("\r" + stats.line() + "\n"); sys.stdout.flush()
+        return stats
+
+    def _ticker(self, stats, done):
+        while not done.wait(0.5):
+            sys.stdout.write("\r" + stats.line()); sys.stdout.flush()
@@ -0,0 +1,245 @@
+"""
+WrapShop Pro — Measurement Sheet Validation
+Consistency checks over the whole parsed sheet, run as array operations so the
+full catalog is checked in milliseconds on every ingest:
+
+  area      each panel's sq ft against width x height / 144 — the sheet adds a
+            print allowance, so the ratio must sit inside AREA_RATIO
+  total     total_sqft against 2 x side + back + hood + roof (side is one side)
+  shifted   a "-" missing from a blank panel moves every later number one
+            column left (scripts/fix-shifted-vehicles.mjs cleans up after this
+            in the JSON). A row is flagged when re-inserting the blank at some
+            column makes more panels pass the area check; the report carries the
+            realigned values, and `fixable` when they also add up to total_sqft
+  outlier   total_sqft far from the median of its vehicle class (robust z on
+            log sq ft)
+  range     negative measurements, or a total that isn't positive (a 0 panel
+            dimension means "no panel", like "-")
+
+validate() returns a report dict; `blocked` lists the checks whose share of
+failing rows is above THRESHOLDS. check() is what ingest runs: it writes every
+fixable realignment into the records (two independent checks agree on it, so it
+is a correction, not a guess), then validates again, so the thresholds apply to
+what is left. upload_vehicles.py writes that report and stops before loading
+when anything is blocked.
+
+Run:  python3 validate.py [--file sheet.txt] [--report vehicle_validation.json] [--threshold shifted=0.2]
+"""
+
+import os, sys, json, time, argparse
+import numpy as np
+
+from measurements import DIM_COLUMNS, find_data_file, parse_file
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+AREA_RATIO = (0.95, 1.5)     # sqft / (w*h/144); the sheet runs 1.07-1.35
+TOTAL_TOL = 0.02             # relative
+OUTLIER_Z = 4.0              # robust z (MAD) on log total_sqft within a class
+# Shares of rows allowed to fail after check() has realigned what it can. A shifted
+# row left over is one whose realignment doesn't add up to its total, so it stays
+# as rare as a bad total; the current sheet has 181 shifted rows, all fixable, and
+# none left.
+THRESHOLDS = {"area": 0.05, "total": 0.05, "shifted": 0.02, "outlier": 0.03, "range": 0.0}
+
+PANEL_SLICES = {"side": (0, 1, 2), "back": (3, 4, 5), "hood": (6, 7, 8), "roof": (9, 10, 11)}
+TRACTOR_MAKES = {"freightliner", "kenworth", "peterbilt", "mack", "volvo", "international",
+                 "westernstar", "sterling", "dennis"}
+TRACTOR_WORDS = {"sleeper", "cabover", "tractor", "conventional"}
+CLASS_WORDS = [
+    ("cab_only",  ["cab only"]),
+    ("box_truck", ["box", "cutaway", "chassis", "npr", "nqr", "nrr", "fuso", "hino", "lcf", "4500hd", "5500hd"]),
+    ("van",       ["van", "brightdrop", "etransit", "sprinter", "transit", "express", "savana", "econoline", "promaster", "metris",
+                   "nv", "astro", "safari", "vandura", "ram van", "e-series", "e150", "e250", "e350"]),
+    ("pickup",    ["cab", "pickup", "f150", "f250", "f350", "silverado", "sierra", "ram", "tacoma", "tundra",
+                   "titan", "frontier", "colorado", "canyon", "ranger", "ridgeline", "gladiator", "maverick"]),
+    ("suv",       ["suv", "tahoe", "suburban", "yukon", "explorer", "expedition", "4runner", "highlander",
+                   "pilot", "durango", "wrangler", "cherokee", "bronco", "mdx", "rdx", "escalade"]),
+]
+
+
+def vehicle_class(make_key, model_key):
+    """Coarse class for outlier grouping, from make/model keywords."""
+    words = set(model_key.split())
+    if (make_key in TRACTOR_MAKES and not words & {"sprinter", "van"}) or words & TRACTOR_WORDS:
+        return "tractor"
+    for cls, keys in CLASS_WORDS:
+        if any(k in words or (" " in k and k in model_key) for k in keys):
+            return cls
+    return "car"
+
+
+def dims_matrix(records):
+    return np.array([[np.nan if r.get(c) is None else r[c] for c in DIM_COLUMNS] for r in records], dtype=np.float64)
+
+
+def _blank_zeros(D):
+    return np.where(D == 0, np.nan, D)
+
+
+def _area_fail(D):
+    """(n, 4) bool: panel present (w, h, sqft all set) and its ratio outside AREA_RATIO."""
+    W, H, S = D[..., 0::3], D[..., 1::3], D[..., 2::3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = S / (W * H / 144)
+    present = ~(np.isnan(W) | np.isnan(H) | np.isnan(S))
+    return present & ~((ratio >= AREA_RATIO[0]) & (ratio <= AREA_RATIO[1])), present
+
+
+def _realign(D):
+    """(12, n, 12): D with a blank re-inserted at each column (later values move right, the last drops)."""
+    idx = np.arange(12)
+    out = np.empty((12, *D.shape))
+    for p in range(12):
+        src = np.where(idx > p, idx - 1, idx)
+        out[p] = D[:, src]
+        out[p][:, p] = np.nan
+    return out
+
+
+def _total_of(D):
+    S = D[..., 2::3]
+    return np.nansum(S * np.array([2, 1, 1, 1]), axis=-1)
+
+
+def validate(records, thresholds=None):
+    """Report dict for parsed records. Vectorized over all rows; no per-row Python in the checks."""
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+    t0 = time.perf_counter()
+    n = len(records)
+    raw = dims_matrix(records)
+    D = _blank_zeros(raw)
+    total = np.array([np.nan if r.get("total_sqft") is None else r["total_sqft"] for r in records], dtype=np.float64)
+
+    area_bad, present = _area_fail(D)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_err = np.abs(total - _total_of(D)) / total
+    total_bad = total_err > TOTAL_TOL
+    range_bad = (raw < 0).any(axis=1) | ~(total > 0)
+
+    # shifted: the last column must be blank for a realignment to be possible
+    R = _realign(D)                                                     # (12, n, 12)
+    r_bad, r_present = _area_fail(R)                                    # (12, n, 4)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_total_ok = np.abs(total - _total_of(R)) / total <= TOTAL_TOL  # (12, n)
+    r_score = (r_present & ~r_bad).sum(axis=2) + r_total_ok
+    cur_score = (present & ~area_bad).sum(axis=1) + ~total_bad
+    best = r_score.argmax(axis=0)
+    gain = r_score[best, np.arange(n)] - cur_score
+    shifted = np.isnan(D[:, 11]) & (area_bad.any(axis=1) | total_bad) & (gain > 0) \
+        & ~r_bad[best, np.arange(n)].any(axis=1)
+
+    # outliers per class, robust z on log total
+    classes = np.array([vehicle_class(r.get("make_key", ""), r.get("model_key", "")) for r in records])
+    logt = np.log(np.where(total > 0, total, np.nan))
+    z = np.zeros(n)
+    for cls in np.unique(classes):
+        m = classes == cls
+        med = np.nanmedian(logt[m])
+        mad = np.nanmedian(np.abs(logt[m] - med)) * 1.4826 or 1e-9
+        z[m] = (logt[m] - med) / mad
+    outlier = np.abs(z) > OUTLIER_Z
+
+    # a shifted row fails area/total because of the shift — count it once
+    flags = {"shifted": shifted, "area": area_bad.any(axis=1) & ~shifted, "total": total_bad & ~shifted,
+             "outlier": outlier & ~shifted, "range": range_bad}
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    names = list(PANEL_SLICES)
+    issues = []
+    for check, mask in flags.items():
+        for i in np.flatnonzero(mask):
+            r = records[i]
+            item = {"id": r["id"], "make": r["make"], "model": r["model"], "year_range": r["year_range"],
+                    "check": check}
+            if check == "area":
+                item["panels"] = [names[k] for k in np.flatnonzero(area_bad[i])]
+            elif check == "total":
+                item["total_sqft"] = total[i]; item["panel_sum"] = round(float(_total_of(D[i])), 1)
+            elif check == "shifted":
+                item["blank_at"] = DIM_COLUMNS[best[i]]
+                item["realigned"] = {c: (None if np.isnan(v) else float(v)) for c, v in zip(DIM_COLUMNS, R[best[i], i])}
+                item["fixable"] = bool(r_total_ok[best[i], i])
+            elif check == "outlier":
+                item["class"] = str(classes[i]); item["z"] = round(float(z[i]), 2)
+            issues.append(item)
+
+    counts = {k: int(v.sum()) for k, v in flags.items()}
+    shares = {k: (counts[k] / n if n else 0.0) for k in counts}
+    blocked = [k for k in counts if shares[k] > thresholds.get(k, 1.0)]
+    return {
+        "rows": n, "elapsed_ms": round(elapsed_ms, 2),
+        "counts": counts, "shares": {k: round(v, 4) for k, v in shares.items()},
+        "thresholds": thresholds, "blocked": blocked,
+        "classes": {str(c): int((classes == c).sum()) for c in np.unique(classes)},
+        "issues": issues,
+    }
+
+
+def realign(records, report):
+    """Write the report's fixable realignments into `records` (in place). Returns the rows fixed."""
+    by_id = {r["id"]: r for r in records}
+    fixed = []
+    for item in report["issues"]:
+        if item["check"] == "shifted" and item["fixable"]:
+            rec = by_id[item["id"]]
+            rec.update(item["realigned"])
+            fixed.append({k: item[k] for k in ("id", "make", "model", "year_range", "blank_at")})
+    return fixed
+
+
+def check(records, thresholds=None):
+    """Realign the fixable shifted rows in place, then validate what is left (the ingest gate)."""
+    fixed = realign(records, validate(records, thresholds))
+    report = validate(records, thresholds)
+    report["realigned"] = fixed
+    return report
+
+
+def summary_lines(report):
+    out = []
+    if report.get("realigned"):
+        out.append(f"  🔧 realigned {len(report['realigned']):4d} shifted rows (blank panel re-inserted)")
+    for k, c in report["counts"].items():
+        if c:
+            mark = "❌" if k in report["blocked"] else "⚠️ "
+            out.append(f"  {mark} {k:8s} {c:5d} rows ({report['shares'][k]:.1%}, limit {report['thresholds'][k]:.0%})")
+    return out
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+
+def parse_thresholds(items):
+    out = {}
+    for item in items or []:
+        k, _, v = item.partition("=")
+        out[k.strip()] = float(v)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check the measurement sheet for inconsistent rows.")
+    ap.add_argument("--file", help="measurement sheet")
+    ap.add_argument("--report", default="vehicle_validation.json")
+    ap.add_argument("--threshold", action="append", metavar="CHECK=SHARE", help="override a blocking threshold")
+    args = ap.parse_args()
+    data_file = find_data_file(args.file, dirs=[ROOT])
+    if not data_file:
+        print("❌ Cannot find the measurement sheet"); sys.exit(1)
+    records, _ = parse_file(data_file)
+    report = check(records, parse_thresholds(args.threshold))
+    write_report(report, args.report)
+    print(f"Checked {report['rows']} rows in {report['elapsed_ms']:.1f} ms -> {args.report}")
+    for line in summary_lines(report):
+        print(line)
+    if report["blocked"]:
+        print(f"❌ Over threshold: {', '.join(report['blocked'])}")
+        sys.exit(1)
+    print("✅ Within thresholds")
+
+
+if __name__ == "__main__":
+    main()
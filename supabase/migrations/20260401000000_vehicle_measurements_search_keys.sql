@@ -0,0 +1,74 @@
+-- ── Vehicle Measurements: search keys ───────────────────────────────────────
+-- The lookup API filters on make/model/year. ilike('make', ..) cannot use an index,
+-- so rows now carry make_key/model_key (lowercase, punctuation stripped, whitespace
+-- collapsed — see norm_key() in scripts/vehicles/measurements.py and
+-- lib/vehicleKeys.ts) and integer year_start/year_end parsed from year_range.
+-- upload_vehicles.py writes these at ingest; the trigger fills them for any other
+-- writer that leaves them NULL, and recomputes them when make, model or
+-- year_range changes under a writer that doesn't set them.
+-- Everything up to the backfill at the end is SEARCH_DDL in
+-- scripts/vehicles/measurements.py, which the COPY ingest applies before it
+-- loads; change both together.
+
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS org_id uuid;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_range text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS make_key text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS model_key text;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_start int;
+ALTER TABLE vehicle_measurements ADD COLUMN IF NOT EXISTS year_end int;
+
+CREATE OR REPLACE FUNCTION vehicle_search_key(s text) RETURNS text
+  LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT btrim(regexp_replace(regexp_replace(lower(coalesce(s, '')), '[^\w\s]', '', 'g'), '\s+', ' ', 'g'))
+  $$;
+
+CREATE OR REPLACE FUNCTION vehicle_measurements_fill_keys() RETURNS trigger
+  LANGUAGE plpgsql AS $$
+  DECLARE yrs int[];
+  BEGIN
+    -- A writer that sets a key itself (the ingest) wins; otherwise a changed
+    -- make/model/year_range recomputes the key instead of keeping the old one.
+    IF TG_OP = 'INSERT' THEN
+      NEW.make_key  := coalesce(NEW.make_key,  vehicle_search_key(NEW.make));
+      NEW.model_key := coalesce(NEW.model_key, vehicle_search_key(NEW.model));
+    ELSE
+      IF NEW.make_key IS NULL OR (NEW.make IS DISTINCT FROM OLD.make AND NEW.make_key IS NOT DISTINCT FROM OLD.make_key) THEN
+        NEW.make_key := vehicle_search_key(NEW.make);
+      END IF;
+      IF NEW.model_key IS NULL OR (NEW.model IS DISTINCT FROM OLD.model AND NEW.model_key IS NOT DISTINCT FROM OLD.model_key) THEN
+        NEW.model_key := vehicle_search_key(NEW.model);
+      END IF;
+      IF NEW.year_range IS DISTINCT FROM OLD.year_range AND NEW.year_start IS NOT DISTINCT FROM OLD.year_start THEN
+        NEW.year_start := NULL; NEW.year_end := NULL;
+      END IF;
+    END IF;
+    IF NEW.year_start IS NULL AND NEW.year_range IS NOT NULL THEN
+      SELECT array_agg(m[1]::int) INTO yrs
+        FROM regexp_matches(NEW.year_range, '((?:19|20)\d\d)', 'g') AS m;
+      IF yrs IS NOT NULL THEN
+        NEW.year_start := least(yrs[1], coalesce(yrs[2], yrs[1]));
+        NEW.year_end   := greatest(yrs[1], coalesce(yrs[2], yrs[1]));
+      END IF;
+    END IF;
+    RETURN NEW;
+  END $$;
+
+DROP TRIGGER IF EXISTS trg_vehicle_measurements_fill_keys ON vehicle_measurements;
+CREATE TRIGGER trg_vehicle_measurements_fill_keys
+  BEFORE INSERT OR UPDATE OF make, model, year_range, make_key, model_key, year_start
+  ON vehicle_measurements
+  FOR EACH ROW EXECUTE FUNCTION vehicle_measurements_fill_keys();
+
+-- make -> models, make + model + year -> best match: equality on the keys,
+-- then a range on year_start (newest first)
+CREATE INDEX IF NOT EXISTS idx_vm_make_model_year
+  ON vehicle_measurements (make_key, model_key, year_start DESC, year_end);
+
+-- year -> makes: range on year_start, make_key read from the index
+CREATE INDEX IF NOT EXISTS idx_vm_year_make
+  ON vehicle_measurements (year_start, year_end) INCLUDE (make, make_key);
+
+-- Backfill existing rows (the trigger also fills year_start/year_end where NULL)
+UPDATE vehicle_measurements
+   SET make_key = vehicle_search_key(make), model_key = vehicle_search_key(model)
+ WHERE make_key IS NULL OR model_key IS NULL;
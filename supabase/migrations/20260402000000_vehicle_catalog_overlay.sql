@@ -0,0 +1,195 @@
+-- ── Vehicle Catalog: shared rows + per-org overlay ─────────────────────────
+-- vehicle_measurements is one shared catalog (org_id IS NULL), loaded once by
+-- upload_vehicles.py. An org's corrections, hidden rows and custom vehicles live
+-- in vehicle_measurement_overrides; vehicle_catalog(org) merges the two into
+-- rows shaped like vehicle_measurements (every column, pricing included).
+-- Onboarding an org writes nothing to the catalog, and a catalog refresh is one load.
+
+CREATE TABLE IF NOT EXISTS vehicle_measurement_overrides (
+  id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  org_id       uuid NOT NULL,
+  vehicle_id   uuid REFERENCES vehicle_measurements(id) ON DELETE SET NULL,  -- NULL = custom vehicle
+  hidden       boolean NOT NULL DEFAULT false,
+  make         text,
+  model        text,
+  year_range   text,
+  year_start   integer,
+  year_end     integer,
+  side_width   numeric, side_height numeric, side_sqft numeric,
+  back_width   numeric, back_height numeric, back_sqft numeric,
+  hood_width   numeric, hood_length numeric, hood_sqft numeric,
+  roof_width   numeric, roof_length numeric, roof_sqft numeric,
+  total_sqft   numeric,
+  -- derived and pricing columns, overridable like the measurements
+  body_style   text, trim text, category text,
+  full_wrap_sqft numeric, full_wrap_with_roof_sqft numeric, partial_wrap_sqft numeric, wrap_sqft numeric,
+  three_quarter_wrap_sqft numeric, half_wrap_sqft numeric, driver_sqft numeric, passenger_sqft numeric,
+  trunk_sqft numeric, doors_sqft numeric, bumpers_sqft numeric, mirrors_sqft numeric,
+  pillars_sqft numeric, rockers_sqft numeric, linear_feet numeric, print_width_standard numeric,
+  install_hours numeric, install_pay numeric, suggested_price numeric, std_hours numeric, std_value numeric,
+  notes        text,
+  created_at   timestamptz DEFAULT now(),
+  updated_at   timestamptz DEFAULT now(),
+  CONSTRAINT vmo_custom_has_name CHECK (vehicle_id IS NOT NULL OR (make IS NOT NULL AND model IS NOT NULL))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vmo_org_vehicle
+  ON vehicle_measurement_overrides (org_id, vehicle_id) WHERE vehicle_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_vmo_org ON vehicle_measurement_overrides (org_id);
+
+ALTER TABLE vehicle_measurement_overrides ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "vmo_org_read" ON vehicle_measurement_overrides;
+CREATE POLICY "vmo_org_read" ON vehicle_measurement_overrides FOR SELECT TO authenticated
+  USING (org_id IN (SELECT org_id FROM profiles WHERE id = auth.uid()));
+
+DROP POLICY IF EXISTS "vmo_org_admin_write" ON vehicle_measurement_overrides;
+CREATE POLICY "vmo_org_admin_write" ON vehicle_measurement_overrides FOR ALL TO authenticated
+  USING (
+    org_id IN (SELECT org_id FROM profiles WHERE id = auth.uid())
+    AND (SELECT role FROM profiles WHERE id = auth.uid()) IN ('owner', 'admin')
+  );
+
+-- ── Catalog rows that leave keep their corrections ─────────────────────────
+-- A sync or COPY load deletes catalog rows that left the sheet. An org's
+-- correction to such a row must not vanish with it: it becomes that org's custom
+-- vehicle, with the catalog row's values (pricing included) filling whatever it
+-- didn't override, so it satisfies vmo_custom_has_name.
+-- A hidden row of a deleted vehicle has nothing left to hide and goes.
+-- The id becomes the one overlay.py gives that custom vehicle, unless the org
+-- already has a custom vehicle with that name.
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+CREATE OR REPLACE FUNCTION vehicle_override_id(p_org uuid, p_name text) RETURNS uuid
+  LANGUAGE sql IMMUTABLE AS $$
+    -- overlay.override_id(): uuid5 in measurements.ID_NAMESPACE
+    SELECT uuid_generate_v5('56dd2b71-2754-579e-b8a0-375bcc091410'::uuid, p_org::text || '|' || p_name)
+  $$;
+
+-- An override's values: its non-null columns that name a catalog column.
+-- Every column added to the overrides table is one an override can target.
+CREATE OR REPLACE FUNCTION vehicle_override_values(o vehicle_measurement_overrides) RETURNS jsonb
+  LANGUAGE sql IMMUTABLE AS $$
+    SELECT jsonb_strip_nulls(to_jsonb(o)) - 'id' - 'org_id' - 'vehicle_id' - 'hidden' - 'notes'
+                                          - 'created_at' - 'updated_at'
+  $$;
+
+CREATE OR REPLACE FUNCTION vehicle_measurements_keep_overrides() RETURNS trigger
+  LANGUAGE plpgsql AS $$
+  DECLARE
+    o vehicle_measurement_overrides;
+    kept vehicle_measurement_overrides;
+  BEGIN
+    DELETE FROM vehicle_measurement_overrides WHERE vehicle_id = OLD.id AND hidden;
+    FOR o IN SELECT * FROM vehicle_measurement_overrides WHERE vehicle_id = OLD.id LOOP
+      -- the catalog row's values under the override's own
+      kept := jsonb_populate_record(o, to_jsonb(OLD) - 'id' - 'org_id' - 'notes' - 'created_at' - 'updated_at'
+                                       || vehicle_override_values(o));
+      kept.vehicle_id := NULL;
+      kept.updated_at := now();
+      kept.id := vehicle_override_id(o.org_id, 'custom|' || vehicle_search_key(kept.make) || '|'
+                                     || vehicle_search_key(kept.model) || '|' || vehicle_search_key(kept.year_range));
+      IF EXISTS (SELECT 1 FROM vehicle_measurement_overrides x WHERE x.id = kept.id AND x.id <> o.id) THEN
+        kept.id := o.id;
+      END IF;
+      DELETE FROM vehicle_measurement_overrides WHERE id = o.id;
+      INSERT INTO vehicle_measurement_overrides SELECT kept.*;
+    END LOOP;
+    RETURN OLD;
+  END $$;
+
+-- ── Move per-org copies onto the shared catalog ─────────────────────────────
+-- The uploader stamped every row with the shop's org; those rows are the catalog.
+-- Every other org's rows are mostly its own full copy of the same sheet, so they
+-- are diffed against the catalog by make/model/year: the n-th copy of a name
+-- pairs with the n-th catalog row of that name, both taken in order of their
+-- values, so identical duplicates pair with each other:
+--   same values               nothing to keep
+--   different values          an override carrying only the columns that differ
+--   no catalog row            a custom vehicle
+-- Values are every column an override can carry, pricing included. Ids are the
+-- ones overlay.py would give the same rows, so a later push of the org's overlay
+-- file updates these instead of duplicating them.
+CREATE OR REPLACE FUNCTION vehicle_row_values(r anyelement) RETURNS jsonb
+  LANGUAGE sql STABLE AS $$
+    -- a row's values in override form (the columns an override can carry)
+    SELECT vehicle_override_values(jsonb_populate_record(NULL::vehicle_measurement_overrides, to_jsonb(r)))
+  $$;
+
+WITH cat AS (
+  SELECT v.*, vehicle_search_key(make) AS mk, vehicle_search_key(model) AS mo, vehicle_search_key(year_range) AS yr,
+         row_number() OVER (PARTITION BY vehicle_search_key(make), vehicle_search_key(model), vehicle_search_key(year_range)
+                            ORDER BY vehicle_row_values(v)::text, id::text) AS n
+    FROM vehicle_measurements v
+   WHERE org_id = 'd34a6c47-1ac0-4008-87d2-0f7741eebc4f'
+), org AS (
+  SELECT v.*, vehicle_search_key(make) AS mk, vehicle_search_key(model) AS mo, vehicle_search_key(year_range) AS yr,
+         row_number() OVER (PARTITION BY org_id, vehicle_search_key(make), vehicle_search_key(model), vehicle_search_key(year_range)
+                            ORDER BY vehicle_row_values(v)::text, id::text) AS n
+    FROM vehicle_measurements v
+   WHERE org_id IS NOT NULL AND org_id <> 'd34a6c47-1ac0-4008-87d2-0f7741eebc4f'
+), pairs AS (
+  -- the copy's values, as an override would carry them (columns the overrides table has)
+  SELECT o.org_id, o.mk, o.mo, o.yr, c.id AS cid, to_jsonb(c) AS cj, vehicle_row_values(o) AS vals
+    FROM org o
+    LEFT JOIN cat c USING (mk, mo, yr, n)
+), diffs AS (
+  SELECT org_id, mk, mo, yr, cid,
+         CASE WHEN cid IS NULL THEN vals
+              ELSE coalesce((SELECT jsonb_object_agg(e.key, e.value) FROM jsonb_each(vals) e
+                              WHERE e.key NOT IN ('make', 'model', 'year_range', 'year_start', 'year_end')
+                                AND e.value IS DISTINCT FROM cj -> e.key), '{}') END AS vals
+    FROM pairs
+)
+INSERT INTO vehicle_measurement_overrides
+SELECT (jsonb_populate_record(NULL::vehicle_measurement_overrides, vals || jsonb_build_object(
+          'id', CASE WHEN cid IS NULL THEN vehicle_override_id(org_id, 'custom|' || mk || '|' || mo || '|' || yr)
+                     ELSE vehicle_override_id(org_id, 'override|' || cid::text) END,
+          'org_id', org_id, 'vehicle_id', cid, 'hidden', false, 'created_at', now(), 'updated_at', now()))).*
+  FROM diffs
+ WHERE cid IS NULL OR vals <> '{}'
+ON CONFLICT (id) DO NOTHING;
+
+DELETE FROM vehicle_measurements
+ WHERE org_id IS NOT NULL AND org_id <> 'd34a6c47-1ac0-4008-87d2-0f7741eebc4f';
+
+UPDATE vehicle_measurements SET org_id = NULL WHERE org_id IS NOT NULL;
+
+-- After the move: the per-org copies deleted above had no overrides to keep.
+DROP TRIGGER IF EXISTS trg_vehicle_measurements_keep_overrides ON vehicle_measurements;
+CREATE TRIGGER trg_vehicle_measurements_keep_overrides
+  BEFORE DELETE ON vehicle_measurements
+  FOR EACH ROW EXECUTE FUNCTION vehicle_measurements_keep_overrides();
+
+-- ── Resolved catalog for one org ────────────────────────────────────────────
+-- Same merge as resolve() in scripts/vehicles/overlay.py: an override's non-null
+-- columns replace the catalog row's, hidden rows drop out, custom vehicles append.
+-- Rows have every vehicle_measurements column (vehicle_catalog_row is that row
+-- type plus catalog_source: catalog, override or custom), so the function stands
+-- in for a select('*') on the table. The view is only a row type; it has no rows.
+-- Re-run this block when vehicle_measurements gains a column.
+DROP FUNCTION IF EXISTS vehicle_catalog(uuid);
+DROP VIEW IF EXISTS vehicle_catalog_row;
+CREATE VIEW vehicle_catalog_row AS
+  SELECT v.*, NULL::text AS catalog_source FROM vehicle_measurements v WHERE false;
+
+CREATE OR REPLACE FUNCTION vehicle_catalog(p_org uuid)
+RETURNS SETOF vehicle_catalog_row
+LANGUAGE sql STABLE AS $$
+  SELECT (jsonb_populate_record(NULL::vehicle_catalog_row,
+            to_jsonb(v) || coalesce(vehicle_override_values(o), '{}') || jsonb_build_object(
+              'make_key',  CASE WHEN o.make  IS NULL THEN v.make_key  ELSE vehicle_search_key(o.make)  END,
+              'model_key', CASE WHEN o.model IS NULL THEN v.model_key ELSE vehicle_search_key(o.model) END,
+              'catalog_source', CASE WHEN o.id IS NULL THEN 'catalog' ELSE 'override' END))).*
+    FROM vehicle_measurements v
+    LEFT JOIN vehicle_measurement_overrides o ON o.vehicle_id = v.id AND o.org_id = p_org
+   WHERE v.org_id IS NULL AND NOT coalesce(o.hidden, false)
+  UNION ALL
+  SELECT (jsonb_populate_record(NULL::vehicle_catalog_row,
+            vehicle_override_values(o) || jsonb_build_object(
+              'id', o.id, 'org_id', o.org_id, 'notes', o.notes, 'created_at', o.created_at, 'updated_at', o.updated_at,
+              'make_key', vehicle_search_key(o.make), 'model_key', vehicle_search_key(o.model),
+              'catalog_source', 'custom'))).*
+    FROM vehicle_measurement_overrides o
+   WHERE o.org_id = p_org AND o.vehicle_id IS NULL AND NOT o.hidden
+$$;
@@ -1,159 +1,54 @@
 """
 WrapShop Pro — Vehicle Measurements Batch Uploader
-Run this script ONCE from any machine with Python 3 installed.
-It will restore all 2,045 vehicles directly to Supabase in batches.
-
-Requirements: pip install requests
-Run: python upload_vehicles.py
+Loads all ~2,000 vehicles from the measurement sheet into Supabase.
+
+The sheet is the shared catalog every org reads (org_id NULL); an org's own
+corrections and custom vehicles live in vehicle_measurement_overrides
+(scripts/vehicles/overlay.py), so a catalog refresh is one load however many
+orgs there are.
+
+By default it syncs: reads the current catalog rows, works out what is new, changed
+or gone, and sends only that (upserts first, deletes last). Ids are derived from
+make/model/year_range, so re-running with an unchanged sheet writes nothing and
+the vehicle lookup never sees an empty table. --mode replace keeps the old
+clear-then-reinsert behaviour for a deliberate full reload of a catalog no org
+has overlaid yet; it refuses while any override or hidden row points at a
+catalog row (deleting the rows would turn those into duplicate custom vehicles
+and unhide hidden ones). --mode copy skips the
+REST API: it streams the sheet into Postgres with COPY and merges it in one
+transaction (needs psycopg2 and DATABASE_URL).
+
+Requirements: Python 3 and numpy (the sheet validation; --skip-validation loads
+without it), psycopg2 for --mode copy
+Run:   SUPABASE_SERVICE_ROLE_KEY=... python upload_vehicles.py [--dry-run]
 """
 
-import re
-import uuid
+import os
+import sys
 import json
-import urllib.request
-import urllib.error
+import argparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "scripts", "vehicles"))
+
+from measurements import DATA_FILES, find_data_file, parse_file
+from rest import Client
+from upload import BatchUploader, call_with_retry
+from checkpoint import Checkpoint, run_key, file_hash
+import sync
+from overlay import OVERLAY_TABLE
+import match_index
 
 # ── CONFIG ─────────────────────────────────────────────────────────────────────
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://uqfqkvslxoucxmxxrobt.supabase.co")
-SERVICE_KEY   = os.environ["SUPABASE_SERVICE_ROLE_KEY"]  # set in environment, never hardcode
-ORG_ID        = os.environ.get("ORG_ID", "d34a6c47-1ac0-4008-87d2-0f7741eebc4f")
-BATCH_SIZE    = 100   # rows per request (safe for Supabase REST)
+BATCH_SIZE    = 100   # starting rows per request; adapts to observed latency
+CONCURRENCY   = 4     # batches in flight, each on its own keep-alive connection
+MAX_DELETE_SHARE = 0.5   # sync refuses to remove more than this share of remote rows
+CHECKPOINT    = os.path.join(script_dir, ".upload_vehicles.ckpt")
+FAILURES      = os.path.join(script_dir, "upload_vehicles_failures.json")
+VALIDATION    = os.path.join(script_dir, "vehicle_validation.json")
 # ───────────────────────────────────────────────────────────────────────────────
 
-HEADERS = {
-    "Content-Type":  "application/json",
-    "apikey":        SERVICE_KEY,
-    "Authorization": f"Bearer {SERVICE_KEY}",
-    "Prefer":        "return=minimal",
-}
-
-# ── PARSE DATA FILE ────────────────────────────────────────────────────────────
-import os, sys
-
-# Find the data file — works from anywhere
-script_dir = os.path.dirname(os.path.abspath(__file__))
-data_file = os.path.join(script_dir, "Make_Model_Year_Side_Width_Side_Hei.txt")
-
-if not os.path.exists(data_file):
-    # Try current working directory
-    data_file = "Make_Model_Year_Side_Width_Side_Hei.txt"
-
-if not os.path.exists(data_file):
-    print("ERROR: Cannot find Make_Model_Year_Side_Width_Side_Hei.txt")
-    print(f"  Looked in: {script_dir} and current directory")
-    print("  Place the .txt file in the same folder as this script and re-run.")
-    sys.exit(1)
-
-print(f"Reading vehicle data from: {data_file}")
-
-with open(data_file, "r", encoding="utf-8-sig") as f:
-    raw = f.read()
-
-skip_patterns = ["Page ", "*** Measurements", "Make Model Year Side Width"]
-lines = []
-for line in raw.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
-    line = line.strip()
-    if not line:
-        continue
-    skip = False
-    for p in skip_patterns:
-        if p in line and (p != "Page " or line.startswith("Page ")):
-            skip = True
-            break
-    if not skip:
-        lines.append(line)
-
-records = []
-skipped = 0
-
-for line in lines:
-    if not line.strip():
-        continue
-
-    # Find year range (e.g. 2001-2026) or single year
-    year_match = re.search(r"(1[89]\d\d|20\d\d)-(1[89]\d\d|20\d\d)", line)
-    if not year_match:
-        year_match = re.search(r"(1[89]\d\d|20\d\d)", line)
-    if not year_match:
-        skipped += 1
-        continue
-
-    year_str    = year_match.group(0)
-    before_year = line[:year_match.start()].strip()
-    after_year  = line[year_match.end():].strip()
-
-    tokens = before_year.split()
-    if not tokens:
-        skipped += 1
-        continue
-
-    make  = tokens[0]
-    model = " ".join(tokens[1:]) if len(tokens) > 1 else ""
-
-    # Parse measurements (- = NULL/None)
-    meas_vals = []
-    for t in after_year.split():
-        if t == "-":
-            meas_vals.append(None)
-        else:
-            try:
-                meas_vals.append(float(t))
-            except ValueError:
-                pass
-
-    if not meas_vals:
-        skipped += 1
-        continue
-
-    total_sqft = meas_vals[-1]
-    if total_sqft is None:
-        skipped += 1
-        continue
-
-    dims = meas_vals[:-1]
-    if len(dims) < 12:
-        dims += [None] * (12 - len(dims))
-    else:
-        dims = dims[:12]
-
-    all_vals = dims + [total_sqft]  # 13 values
-
-    records.append({
-        "id":          str(uuid.uuid4()),
-        "org_id":      ORG_ID,
-        "make":        make,
-        "model":       model,
-        "year_range":  year_str,
-        "side_width":  all_vals[0],
-        "side_height": all_vals[1],
-        "side_sqft":   all_vals[2],
-        "back_width":  all_vals[3],
-        "back_height": all_vals[4],
-        "back_sqft":   all_vals[5],
-        "hood_width":  all_vals[6],
-        "hood_length": all_vals[7],
-        "hood_sqft":   all_vals[8],
-        "roof_width":  all_vals[9],
-        "roof_length": all_vals[10],
-        "roof_sqft":   all_vals[11],
-        "total_sqft":  all_vals[12],
-    })
-
-print(f"Parsed {len(records)} vehicles ({skipped} skipped).")
-
-
-# ── SUPABASE HELPERS ───────────────────────────────────────────────────────────
-
-def supabase_request(method, path, body=None):
-    url  = f"{SUPABASE_URL}/rest/v1/{path}"
-    data = json.dumps(body).encode("utf-8") if body is not None else None
-    req  = urllib.request.Request(url, data=data, headers=HEADERS, method=method)
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return resp.status, resp.read().decode("utf-8")
-    except urllib.error.HTTPError as e:
-        return e.code, e.read().decode("utf-8")
-
 
 # ── STEP 1: ENSURE TABLE EXISTS ───────────────────────────────────────────────
 # The table should already exist; we skip DDL here (REST API doesn't support it).
@@ -161,7 +56,7 @@ def supabase_request(method, path, body=None):
 #
 #   CREATE TABLE IF NOT EXISTS vehicle_measurements (
 #     id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
-#     org_id uuid,
+#     org_id uuid,                -- NULL: shared catalog row
 #     make text NOT NULL,
 #     model text NOT NULL,
 #     year_range text,
@@ -170,50 +65,264 @@ def supabase_request(method, path, body=None):
 #     hood_width numeric, hood_length numeric, hood_sqft numeric,
 #     roof_width numeric, roof_length numeric, roof_sqft numeric,
 #     total_sqft numeric,
+#     year_start int, year_end int,
+#     make_key text, model_key text,
 #     created_at timestamptz DEFAULT now()
 #   );
 #   ALTER TABLE vehicle_measurements ENABLE ROW LEVEL SECURITY;
 #   CREATE POLICY "service_access" ON vehicle_measurements FOR ALL USING (true);
+#   CREATE INDEX ON vehicle_measurements (make_key, model_key, year_start DESC, year_end);
+#
+# The search columns (year_start/year_end, make_key/model_key) and their indexes
+# come from supabase/migrations/20260401000000_vehicle_measurements_search_keys.sql;
+# --mode copy applies the same statements (SEARCH_DDL in measurements.py) itself.
+# A sheet loaded before that migration picks them up on the next sync: every row
+# shows as changed once and is rewritten with its keys.
+#
+# supabase/migrations/20260402000000_vehicle_catalog_overlay.sql turns the
+# per-org copies into the shared catalog plus overrides. Catalog ids keep the
+# values they were minted with, so nothing that references a row has to move.
+
+
+def load_records(path):
+    data_file = find_data_file(path, dirs=[script_dir])
+    if not data_file:
+        print(f"ERROR: Cannot find the measurement sheet ({' or '.join(repr(n) for n in DATA_FILES)})")
+        print(f"  Looked in: {script_dir} and current directory")
+        print("  Place the .txt file in the same folder as this script or pass --file.")
+        sys.exit(1)
+    print(f"Reading vehicle data from: {data_file}")
+    records, skipped = parse_file(data_file)
+    print(f"Parsed {len(records)} vehicles ({skipped} skipped).")
+    return records, data_file
+
+
+def check_sheet(records, threshold_args):
+    """Realign shifted rows, run the consistency checks; stop before loading when a check is over its threshold."""
+    import validate          # numpy, only needed here
+    report = validate.check(records, validate.parse_thresholds(threshold_args))
+    validate.write_report(report, VALIDATION)
+    print(f"Checked {report['rows']} rows in {report['elapsed_ms']:.0f} ms -> {os.path.basename(VALIDATION)}")
+    for line in validate.summary_lines(report):
+        print(line)
+    if report["blocked"]:
+        print(f"\n❌ Sheet failed validation ({', '.join(report['blocked'])}) — nothing loaded.")
+        print("   Fix the rows in the report, raise a limit with --threshold CHECK=SHARE, or pass --skip-validation.")
+        sys.exit(1)
+
+
+def report_failures(failed):
+    """Print and save the rows that could not be written; clear a stale report on success."""
+    if not failed:
+        if os.path.exists(FAILURES):
+            os.remove(FAILURES)
+        return
+    print(f"\nRows not written ({len(failed)}):")
+    for status, r in failed[:25]:
+        print(f"  HTTP {status or 'conn'}  {r.get('make', '')} {r.get('model', '')} {r.get('year_range', '')}  ({r['id']})")
+    if len(failed) > 25:
+        print(f"  ... and {len(failed) - 25} more")
+    with open(FAILURES, "w") as f:
+        json.dump([{"status": status, "id": r["id"], "make": r.get("make"), "model": r.get("model"),
+                    "year_range": r.get("year_range")} for status, r in failed], f, indent=2)
+    print(f"  Full list: {FAILURES}")
+
+
+def finish(ckpt, failed):
+    report_failures(failed)
+    if failed:
+        ckpt.close()
+        print("   Re-run to retry — committed batches are checkpointed and will be skipped.")
+    else:
+        ckpt.clear()
 
 
-# ── STEP 2: DELETE EXISTING RECORDS FOR THIS ORG ─────────────────────────────
-print("\nClearing existing vehicle records for this org...")
-status, body = supabase_request(
-    "DELETE",
-    f"vehicle_measurements?org_id=eq.{ORG_ID}"
-)
-if status in (200, 204):
-    print("  ✅ Cleared.")
-else:
-    print(f"  ⚠️  Delete returned {status}: {body}")
-    print("  Continuing anyway — old records may remain.")
-
+# ── SYNC (default) ────────────────────────────────────────────────────────────
+def print_stats(stats):
+    r = stats.report()
+    print(f"  {r['rows']} rows in {r['elapsed_s']}s  ({r['rows_per_s']:,.0f} rows/s, {r['batches']} batches, "
+          f"final batch size {r['batch_size_final']})")
+    print(f"  batch latency p50 {r['batch_p50_ms']:.0f} ms  p95 {r['batch_p95_ms']:.0f} ms  p99 {r['batch_p99_ms']:.0f} ms")
 
-# ── STEP 3: INSERT IN BATCHES ─────────────────────────────────────────────────
-total   = len(records)
-batches = (total + BATCH_SIZE - 1) // BATCH_SIZE
-failed  = 0
 
-print(f"\nUploading {total} vehicles in {batches} batches of {BATCH_SIZE}...\n")
+def run_sync(client, records, ckpt, dry_run=False, force=False):
+    print("\nReading current catalog rows...")
+    try:
+        remote = sync.fetch_remote(client)
+    except RuntimeError as e:
+        print(f"ERROR: could not read the current rows — {e}")
+        sys.exit(1)
+    d = sync.diff(records, remote)
+    print(f"  {len(remote)} rows on the server: {d.summary()}")
+
+    if remote and len(d.deletes) > MAX_DELETE_SHARE * len(remote) and not force:
+        print(f"\n⚠️  This would remove {len(d.deletes)} of {len(remote)} rows — is the sheet complete?")
+        print("   Re-run with --force if that is intended.")
+        sys.exit(1)
+    if dry_run:
+        print("\nDry run — nothing written.")
+        return 0
+    if not d.upserts and not d.deletes:
+        print("\n🎉 Already up to date — nothing to write.")
+        ckpt.clear(); report_failures([])
+        return 0
+
+    print(f"\nSending {len(d.upserts)} upserts and {len(d.deletes)} deletes...\n")
+    ckpt.start(mode="sync", org="catalog")
+    failed, stats = sync.apply(client, d, BATCH_SIZE, CONCURRENCY, ckpt)
+    if stats:
+        print_stats(stats)
+    print()
+    if not failed:
+        print(f"🎉 Synced: {d.summary()}.")
+    else:
+        print(f"⚠️  Done with errors: {len(failed)} rows not written.")
+    finish(ckpt, failed)
+    return len(failed)
+
+
+# ── COPY (--mode copy) ─────────────────────────────────────────────────────────
+def run_copy(dsn, records, force=False):
+    import copy_load
+    if copy_load.psycopg2 is None:
+        print("ERROR: --mode copy needs psycopg2: pip install psycopg2-binary")
+        return len(records)
+    print("\nStaging and merging through COPY in one transaction...")
+    try:
+        st = copy_load.load(dsn, records, None, None if force else MAX_DELETE_SHARE)
+    except Exception as e:           # psycopg2 errors, the delete guard — all rolled back
+        print(f"  ❌ {e}")
+        print("  Rolled back — the table is unchanged.")
+        return len(records)
+    print(f"  staged {st['staged']} rows ({st['copy_bytes'] / 1024:,.0f} KB) in {st['copy_s']}s, "
+          f"diffed in {st['diff_s']}s, merged in {st['merge_s']}s")
+    print(f"\n🎉 Done in {st['total_s']}s: {st['written']} rows written, {st['deleted']} removed.")
+    return 0
+
+
+# ── APP ARTIFACTS ─────────────────────────────────────────────────────────────
+def write_artifacts(records, data_file):
+    """Match index the app suggests vehicles from (lib/data/). Rebuilt only when the sheet changed.
+
+    Picker lists and lookups are served from each org's vehicle_catalog() (lib/vehicleCatalog.ts),
+    so they need no artifact.
+    """
+    source = file_hash(data_file)
+    try:
+        with open(match_index.OUT) as f:
+            current = json.load(f)
+        if current.get("format") == match_index.FORMAT and current.get("source") == source:
+            print(f"\n✅ Unchanged {os.path.relpath(match_index.OUT, script_dir)}")
+            return
+    except (OSError, ValueError):
+        pass
+    match_index.save(match_index.build(records, source=source))
+    print(f"\n✅ Wrote {os.path.relpath(match_index.OUT, script_dir)}")
+    print("   Commit it so the next deploy suggests from the new catalog.")
+
+
+# ── REPLACE (--mode replace) ──────────────────────────────────────────────────
+def tied_overrides(client):
+    """Whether any org's override or hidden row references a catalog row (False before the overlay exists)."""
+    status, body = client.request("GET", f"{OVERLAY_TABLE}?select=id&vehicle_id=not.is.null&limit=1", prefer=None)
+    if status == 404:
+        return False
+    if status != 200:
+        raise RuntimeError(f"GET {OVERLAY_TABLE} -> HTTP {status}: {body[:300]}")
+    return bool(json.loads(body))
+
+
+def run_replace(client, records, ckpt):
+    try:
+        tied = tied_overrides(client)
+    except RuntimeError as e:
+        print(f"ERROR: could not check for org overrides — {e}")
+        sys.exit(1)
+    if tied:
+        print("\n❌ Orgs have overrides or hidden rows on the catalog; a replace would delete the rows they")
+        print("   point at. Reload with the default sync or --mode copy, which keep the ids.")
+        sys.exit(1)
+    if ckpt.resumed:
+        print(f"\nResuming an interrupted reload: {len(ckpt.done)} rows already committed, not clearing again.")
+    else:
+        print("\nClearing existing catalog rows...")
+        status, body = call_with_retry(lambda: client.request("DELETE", f"vehicle_measurements?{sync.org_filter(None)}"))
+        if status in (200, 204):
+            print("  ✅ Cleared.")
+        else:
+            print(f"  ⚠️  Delete returned {status}: {body}")
+            print("  Continuing anyway — old records may remain.")
+    ckpt.start(mode="replace", org="catalog")
+
+    total = len(records)
+    print(f"\nUploading {total} vehicles, {CONCURRENCY} batches in flight...\n")
+    # upsert rather than plain insert: a retried batch the server already took must not 409
+    up = BatchUploader(client, "vehicle_measurements?on_conflict=id", "resolution=merge-duplicates,return=minimal",
+                       concurrency=CONCURRENCY, batch_size=BATCH_SIZE, checkpoint=ckpt)
+    stats = up.run(records)
+    failed = []
+    for status, body, rows in up.errors:
+        print(f"  ❌ Batch of {len(rows)} rows FAILED — HTTP {status}")
+        print(f"     {body}")
+        failed += [(status, r) for r in rows]
+    print_stats(stats)
+
+    print()
+    if not failed:
+        print(f"🎉 All {total} vehicles uploaded successfully!"
+              + (f" ({stats.skipped} committed by the earlier attempt)" if stats.skipped else ""))
+    else:
+        print(f"⚠️  Done with errors: {total - len(failed)}/{total} uploaded, {len(failed)} failed.")
+    finish(ckpt, failed)
+    return len(failed)
+
+
+def main():
+    global CONCURRENCY, BATCH_SIZE
+    ap = argparse.ArgumentParser(description="Load the vehicle measurement sheet into Supabase.")
+    ap.add_argument("--file", help="measurement sheet (default: looked up next to this script)")
+    ap.add_argument("--mode", choices=["sync", "replace", "copy"], default="sync")
+    ap.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="copy: Postgres connection string")
+    ap.add_argument("--dry-run", action="store_true", help="sync: show the diff, write nothing")
+    ap.add_argument("--force", action="store_true", help="sync: allow removing most of the catalog rows")
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY, help="batches in flight")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="starting rows per batch")
+    ap.add_argument("--fresh", action="store_true", help="ignore the checkpoint of an interrupted run")
+    ap.add_argument("--threshold", action="append", metavar="CHECK=SHARE",
+                    help="validation: allowed share of failing rows for a check (repeatable)")
+    ap.add_argument("--skip-validation", action="store_true", help="load even if the sheet fails validation")
+    args = ap.parse_args()
+    CONCURRENCY, BATCH_SIZE = max(1, args.concurrency), max(1, args.batch_size)
+
+    records, data_file = load_records(args.file)
+    if not args.skip_validation:
+        check_sheet(records, args.threshold)
+    if args.mode == "copy":
+        if not args.dsn:
+            print("ERROR: --mode copy needs DATABASE_URL or --dsn.")
+            sys.exit(1)
+        failed = run_copy(args.dsn, records, args.force)
+        if not failed:
+            write_artifacts(records, data_file)
+        sys.exit(1 if failed else 0)
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")   # set in environment, never hardcode
+    if not key:
+        print("ERROR: SUPABASE_SERVICE_ROLE_KEY is not set.")
+        sys.exit(1)
+    client = Client(SUPABASE_URL, key, pool_size=CONCURRENCY)
+
+    ckpt = Checkpoint(CHECKPOINT, run_key(args.mode, SUPABASE_URL, "catalog", file_hash(data_file)))
+    if not args.fresh and not args.dry_run:
+        ckpt.load()
+
+    if args.mode == "replace":
+        failed = run_replace(client, records, ckpt)
+    else:
+        failed = run_sync(client, records, ckpt, args.dry_run, args.force)
+    if not failed and not args.dry_run:
+        write_artifacts(records, data_file)
+    sys.exit(1 if failed else 0)
 
-for i in range(batches):
-    batch     = records[i * BATCH_SIZE : (i + 1) * BATCH_SIZE]
-    status, body = supabase_request("POST", "vehicle_measurements", batch)
 
-    if status in (200, 201):
-        start = i * BATCH_SIZE + 1
-        end   = min((i + 1) * BATCH_SIZE, total)
-        print(f"  ✅ Batch {i+1}/{batches}  ({start}–{end})")
-    else:
-        print(f"  ❌ Batch {i+1}/{batches} FAILED — HTTP {status}")
-        print(f"     {body[:300]}")
-        failed += len(batch)
-
-# ── DONE ──────────────────────────────────────────────────────────────────────
-print()
-if failed == 0:
-    print(f"🎉 All {total} vehicles uploaded successfully!")
-else:
-    uploaded = total - failed
-    print(f"⚠️  Done with errors: {uploaded}/{total} uploaded, {failed} failed.")
-    print("   Re-run the script to retry — it clears old records first.")
+if __name__ == "__main__":
+    main()